@@ -0,0 +1,160 @@
+"""
+Atomic Workbook Writes
+Helpers that let several Streamlit sessions and batch jobs write dashboard
+workbooks into the same output directory at once:
+- new_run_id(): second-resolution timestamp plus a random suffix, so two
+  runs started in the same minute (or second) never share a file name;
+  parse_run_name() reads the timestamp and tickers back from a file name
+- FileLock: advisory lock on '<file>.lock', held while a workbook is read,
+  updated and rewritten, so writers of the same file take turns
+- atomic_write(): write to a temporary file in the same directory and
+  rename it over the target, so readers only ever open the last complete
+  version (never a half-written one). Temporary files keep the extension
+  (pandas checks it) and start with '~$', like Excel's own owner files;
+  directory listings should skip them with is_temp_file()
+
+Locks use fcntl on POSIX and msvcrt on Windows. They are advisory: only
+code that takes the lock is kept out.
+"""
+import logging
+import os
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+LOCK_SUFFIX = '.lock'
+TEMP_PREFIX = '~$'
+RUN_ID_FORMAT = '%Y%m%d_%H%M%S'
+RUN_ID_TOKEN_BYTES = 3  # Six hex characters
+POLL_INTERVAL = 0.05  # Seconds between lock attempts
+REPLACE_RETRIES = 20  # Windows refuses to replace a file a reader has open
+# dashboard_data_20241222_0943_HYG_SJNK.xlsx or dashboard_data_20241222_094312-1a2b3c_HYG_SJNK.xlsx
+# (unique run id) -> timestamp, ticker suffix
+RUN_NAME = re.compile(r'_(\d{8})_(\d{4})(\d{2})?(?:-[0-9a-f]+)?(?:_(.+))?$')
+
+
+def is_temp_file(file_name: str) -> bool:
+    """True for in-progress atomic_write files (and Excel owner files)"""
+    return os.path.basename(file_name).startswith(TEMP_PREFIX)
+
+
+def new_run_id(now: Optional[datetime] = None) -> str:
+    """
+    Unique run identifier, e.g. '20241222_094312-1a2b3c'
+    Sorts by time; the random suffix separates runs started in the same second.
+    """
+    return f"{(now or datetime.now()).strftime(RUN_ID_FORMAT)}-{secrets.token_hex(RUN_ID_TOKEN_BYTES)}"
+
+
+def parse_run_name(file_name: str):
+    """
+    Timestamp and tickers encoded in a workbook file name
+    Returns:
+        (timestamp or None, list of tickers)
+    """
+    match = RUN_NAME.search(Path(file_name).stem)
+    if not match:
+        return None, []
+    timestamp = datetime.strptime(match.group(1) + match.group(2) + (match.group(3) or '00'), '%Y%m%d%H%M%S')
+    return timestamp, match.group(4).split('_') if match.group(4) else []
+
+
+class FileLock:
+    """
+    Exclusive advisory lock for a file, usable as a context manager
+    """
+
+    def __init__(self, path: str, timeout: float = 60.0):
+        """
+        Args:
+            path: File to protect (the lock is taken on path + '.lock')
+            timeout: Seconds to wait before raising TimeoutError
+        """
+        self.lock_path = str(path) + LOCK_SUFFIX
+        self.timeout = timeout
+        self._fd = None
+
+    def _try_lock(self, fd: int) -> bool:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            if self._try_lock(fd):
+                # The previous holder may have removed the lock file after we
+                # opened it; only a lock on the file now at lock_path counts
+                try:
+                    if fcntl is None or os.fstat(fd).st_ino == os.stat(self.lock_path).st_ino:
+                        self._fd = fd
+                        return self
+                except FileNotFoundError:
+                    pass
+            os.close(fd)
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for lock on {self.lock_path}")
+            time.sleep(POLL_INTERVAL)
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            os.unlink(self.lock_path)  # Fails harmlessly on Windows while another process has it open
+        except OSError:
+            pass
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        os.close(self._fd)
+        self._fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+@contextmanager
+def atomic_write(path: str):
+    """
+    Yield a temporary path to write instead of path; on success it replaces
+    path in one step, on error it is removed and path is left untouched
+    """
+    directory, name = os.path.split(str(path))
+    stem, ext = os.path.splitext(name)
+    temp = os.path.join(directory, f"{TEMP_PREFIX}{stem}.{os.getpid()}{secrets.token_hex(RUN_ID_TOKEN_BYTES)}{ext}")
+    try:
+        yield temp
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(temp, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                logger.warning(f"{path} is open elsewhere, retrying replace")
+                time.sleep(POLL_INTERVAL * (attempt + 1))
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
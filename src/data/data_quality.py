@@ -0,0 +1,152 @@
+"""
+Ingestion Data-Quality Checks
+Vectorized checks over downloaded price frames before they are stored, so
+bad prints do not flow into Sharpe, drawdown and yield.
+
+Checks (all tickers of a frame at once):
+- Non-positive closes
+- Robust return z-scores: |log return - median| / (1.4826 * MAD)
+- Reversal spikes: a large outlier return undone the next day (bad print);
+  genuine crash days move less or do not reverse
+- Stale runs: longest run of identical consecutive closes (a warning, as
+  T-bill ETFs can sit still for weeks), and the run at the end of the
+  series (a feed that stopped updating)
+- Ratio jumps: day-over-day change in unadjusted / adjusted close far beyond
+  any dividend, i.e. a split applied to one series and not the other
+- Calendar gaps: trading sessions missing inside the ticker's history, and
+  dates that are not sessions at all
+
+Each ticker gets a status: 'ok', 'warn' (review) or 'quarantine' (kept out
+of the dashboard workbook until checked).
+"""
+import pandas as pd
+import numpy as np
+import logging
+import warnings
+from typing import Optional
+from .trading_calendar import TradingCalendar, nyse_calendar
+
+logger = logging.getLogger(__name__)
+
+ZSCORE_THRESHOLD = 10.0       # Robust z-score of a daily log return
+STALE_WARN_DAYS = 5           # Repeated closes before a warning
+STALE_QUARANTINE_DAYS = 10    # Repeated closes at the end of the series before quarantine
+SPIKE_MIN_MOVE = 0.2          # Abs log return of a bad print (about +/-20%)
+SPIKE_REVERSAL = 0.25         # Next day undoes all but this share of the move
+RATIO_JUMP = 0.2              # Abs log change of unadjusted / adjusted in one day
+MAD_SCALE = 1.4826            # MAD to standard deviation for normal returns
+
+REPORT_COLUMNS = ['observations', 'non_positive', 'zscore_outliers', 'reversal_spikes',
+                  'longest_stale_run', 'ratio_jumps', 'missing_sessions', 'off_calendar',
+                  'status', 'issues']
+
+
+def _runs(flags: np.ndarray):
+    """Longest and trailing run of consecutive True values in each column"""
+    if not len(flags):
+        empty = np.zeros(flags.shape[1], dtype=int)
+        return empty, empty
+    counts = np.cumsum(flags, axis=0)
+    # Count at the last False row, carried forward, is subtracted to restart each run
+    resets = np.maximum.accumulate(np.where(flags, 0, counts), axis=0)
+    runs = counts - resets
+    return runs.max(axis=0), runs[-1]
+
+
+def _to_frame(prices: pd.DataFrame) -> pd.DataFrame:
+    frame = prices.copy()
+    frame.index = pd.to_datetime(frame.index)
+    return frame.sort_index()
+
+
+def check_price_quality(adj_prices: pd.DataFrame,
+                        unadj_prices: Optional[pd.DataFrame] = None,
+                        calendar: Optional[TradingCalendar] = None) -> pd.DataFrame:
+    """
+    Run the ingestion checks on a price frame
+    Args:
+        adj_prices: Date x ticker adjusted closes
+        unadj_prices: Date x ticker unadjusted closes (enables ratio jumps)
+        calendar: Trading calendar for gap checks (defaults to NYSE)
+    Returns:
+        Report DataFrame indexed by ticker with REPORT_COLUMNS
+    """
+    try:
+        calendar = nyse_calendar if calendar is None else calendar
+        adj = _to_frame(adj_prices)
+        values = adj.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+
+        non_positive = (valid & (values <= 0)).sum(axis=0)
+
+        # Robust z-scores of log returns (non-positive closes excluded)
+        with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN columns
+            logs = np.log(np.where(values > 0, values, np.nan))
+            returns = np.diff(logs, axis=0)
+            center = np.nanmedian(returns, axis=0)
+            mad = np.nanmedian(np.abs(returns - center), axis=0)
+            zscores = (returns - center) / (MAD_SCALE * np.where(mad > 0, mad, np.nan))
+        outlier = np.abs(np.nan_to_num(zscores)) > ZSCORE_THRESHOLD
+        following = np.vstack([returns[1:], np.full((1, returns.shape[1]), np.nan)])
+        with np.errstate(invalid='ignore'):
+            reverted = (np.abs(returns) > SPIKE_MIN_MOVE) & \
+                (np.abs(returns + following) < SPIKE_REVERSAL * np.abs(returns))
+        reversal_spikes = (outlier & reverted).sum(axis=0)
+
+        repeated = np.zeros_like(valid)
+        repeated[1:] = valid[1:] & valid[:-1] & (values[1:] == values[:-1])
+        longest_stale, trailing_stale = _runs(repeated)
+
+        ratio_jumps = np.zeros(values.shape[1], dtype=int)
+        if unadj_prices is not None and not unadj_prices.empty:
+            unadj = _to_frame(unadj_prices).reindex(index=adj.index, columns=adj.columns)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_ratio = np.log(unadj.to_numpy(dtype=float) / values)
+            ratio_jumps = (np.abs(np.nan_to_num(np.diff(log_ratio, axis=0))) > RATIO_JUMP).sum(axis=0)
+
+        # Sessions missing between each ticker's first and last valid date
+        sessions = calendar.is_session(adj.index)
+        ordinals = calendar.day_ordinals(adj.index)
+        on_calendar = valid & sessions[:, None]
+        has_data = valid.any(axis=0)
+        first = np.where(has_data, ordinals[np.argmax(valid, axis=0)], 0)
+        last = np.where(has_data, ordinals[len(valid) - 1 - np.argmax(valid[::-1], axis=0)], -1)
+        missing_sessions = np.maximum(last - first + 1 - on_calendar.sum(axis=0), 0)
+        off_calendar = (valid & ~sessions[:, None]).sum(axis=0)
+
+        report = pd.DataFrame({
+            'observations': valid.sum(axis=0),
+            'non_positive': non_positive,
+            'zscore_outliers': outlier.sum(axis=0),
+            'reversal_spikes': reversal_spikes,
+            'longest_stale_run': longest_stale,
+            'ratio_jumps': ratio_jumps,
+            'missing_sessions': missing_sessions,
+            'off_calendar': off_calendar,
+        }, index=adj.columns)
+
+        quarantine = {
+            'no data': report['observations'] == 0,
+            'non-positive close': report['non_positive'] > 0,
+            'reversal spike': report['reversal_spikes'] > 0,
+            'split mismatch': report['ratio_jumps'] > 0,
+            'stale feed': pd.Series(trailing_stale >= STALE_QUARANTINE_DAYS, index=report.index),
+        }
+        warn = {
+            'return outlier': report['zscore_outliers'] > 0,
+            'repeated closes': report['longest_stale_run'] >= STALE_WARN_DAYS,
+            'missing sessions': report['missing_sessions'] > 0,
+            'off-calendar dates': report['off_calendar'] > 0,
+        }
+        quarantined = np.logical_or.reduce(list(quarantine.values()))
+        warned = np.logical_or.reduce(list(warn.values()))
+        report['status'] = np.select([quarantined, warned], ['quarantine', 'warn'], default='ok')
+
+        flags = pd.DataFrame({**quarantine, **warn})
+        report['issues'] = [', '.join(flags.columns[row]) for row in flags.to_numpy()]
+        return report[REPORT_COLUMNS]
+
+    except Exception as e:
+        logger.error(f"Error checking price quality: {str(e)}")
+        return pd.DataFrame(columns=REPORT_COLUMNS)
@@ -0,0 +1,129 @@
+"""
+Multi-Format Dataset Export
+Writes the datasets behind a dashboard workbook (prices, unadjusted prices,
+dividends, metrics) in formats other tools read faster than XLSX:
+- parquet: columnar, compressed; pandas, Spark, DuckDB
+- csv.gz: gzip-compressed CSV for anything that reads text
+- arrow: uncompressed Arrow IPC file, memory-mappable by pyarrow
+- jsonl: one JSON object per row, for services and log tooling
+
+Each dataset is converted to one Arrow table, and every selected format is
+written from that same table in parallel threads (pyarrow releases the GIL
+while encoding). Files are written through atomic_write, so consumers never
+open a partial file.
+"""
+import pandas as pd
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from .atomic_io import atomic_write
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'Date'
+JSON_CHUNK_ROWS = 10000
+
+
+def arrow_safe(frame: pd.DataFrame) -> pd.DataFrame:
+    """Cast object columns mixing strings and numbers (e.g. 'N/A' next to floats) to strings"""
+    frame = frame.copy()
+    for column in frame.columns:
+        values = frame[column].dropna()
+        if frame[column].dtype == object and values.map(type).nunique() > 1:
+            frame[column] = frame[column].map(lambda v: v if pd.isna(v) else str(v))
+    frame.columns = [str(column) for column in frame.columns]
+    return frame
+
+
+def to_table(frame: pd.DataFrame, index: bool = True) -> pa.Table:
+    """
+    One Arrow table for a dataset
+    Args:
+        frame: Date-indexed sheet (index=True) or a plain table such as Metrics
+        index: Keep the index as a leading 'Date' column
+    """
+    if index:
+        frame = frame.copy()
+        frame.index = pd.to_datetime(frame.index)
+        frame = frame.rename_axis(INDEX_NAME).reset_index()
+    return pa.Table.from_pandas(arrow_safe(frame), preserve_index=False)
+
+
+def _write_parquet(table: pa.Table, path: str):
+    pq.write_table(table, path, compression='snappy')
+
+
+def _write_csv_gz(table: pa.Table, path: str):
+    with pa.CompressedOutputStream(path, 'gzip') as stream:
+        pa_csv.write_csv(table, stream)
+
+
+def _write_arrow(table: pa.Table, path: str):
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _write_jsonl(table: pa.Table, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        for batch in table.to_batches(max_chunksize=JSON_CHUNK_ROWS):
+            frame = batch.to_pandas()
+            if len(frame):
+                f.write(frame.to_json(orient='records', lines=True, date_format='iso'))  # Ends with a newline
+
+
+# Format name -> (file extension, writer)
+FORMATS = {
+    'parquet': ('.parquet', _write_parquet),
+    'csv.gz': ('.csv.gz', _write_csv_gz),
+    'arrow': ('.arrow', _write_arrow),
+    'jsonl': ('.jsonl', _write_jsonl),
+}
+
+
+def dataset_file_name(dataset: str, fmt: str) -> str:
+    """'Daily Prices', 'csv.gz' -> 'daily_prices.csv.gz'"""
+    return dataset.lower().replace(' ', '_') + FORMATS[fmt][0]
+
+
+def export_datasets(datasets: Dict[str, pd.DataFrame], directory: str, formats: Iterable[str],
+                    indexed: Optional[Iterable[str]] = None,
+                    max_workers: Optional[int] = None) -> Dict[Tuple[str, str], str]:
+    """
+    Write every dataset in every selected format
+    Args:
+        datasets: Dataset name -> frame; empty frames are skipped
+        directory: Output directory (created if needed)
+        formats: Names from FORMATS
+        indexed: Datasets whose index (dates) is written as a column
+            (defaults to all)
+        max_workers: Writer threads (defaults to one per file)
+    Returns:
+        (dataset, format) -> path of each file written
+    Raises:
+        ValueError: For an unknown format name
+    """
+    formats = list(formats)
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown export formats {unknown}; choose from {list(FORMATS)}")
+    os.makedirs(directory, exist_ok=True)
+    indexed = set(datasets if indexed is None else indexed)
+    tables = {name: to_table(frame, index=name in indexed)
+              for name, frame in datasets.items() if frame is not None and not frame.empty}
+
+    def write(name: str, fmt: str) -> str:
+        path = os.path.join(directory, dataset_file_name(name, fmt))
+        with atomic_write(path) as temp_path:
+            FORMATS[fmt][1](tables[name], temp_path)
+        return path
+
+    jobs = [(name, fmt) for name in tables for fmt in formats]
+    if not jobs:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs)) as pool:
+        futures = {job: pool.submit(write, *job) for job in jobs}
+        return {job: future.result() for job, future in futures.items()}
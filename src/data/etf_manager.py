@@ -1,17 +1,49 @@
 """
 ETF Data Manager
 Handles ETF-specific data operations and validations.
+
+Bulk screening (screen_etfs) keeps a metadata table cached on disk, fetches
+only missing or stale entries on a thread pool under a shared rate limit,
+and applies the validate_etf criteria as vectorized filters over the table.
+Each fetched batch is also upserted into the SQLite warehouse's metadata
+table, so it can be joined with prices and metrics there.
 """
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import threading
 import yfinance as yf
 import logging
 from typing import Dict, List, Optional, Tuple, Any
 import time
+from .warehouse import Warehouse, DEFAULT_WAREHOUSE, WAREHOUSE_FILE
 
 logger = logging.getLogger(__name__)
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = PROJECT_ROOT / "data" / "etf_metadata"
+
+
+class RateLimiter:
+    """Spaces request starts across threads to at most `rate` per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        """Block until this caller's request slot"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 class ETFManager:
     """Manages ETF-specific data operations"""
     
@@ -19,12 +51,37 @@ class ETFManager:
     MIN_ASSETS = 1_000_000  # Minimum assets under management
     MIN_VOLUME = 10_000     # Minimum daily trading volume
     MAX_EXPENSE = 2.0       # Maximum expense ratio (%)
+
+    # Bulk screening
+    METADATA_TTL = timedelta(days=7)        # Refetch metadata older than this
+    FAILED_TTL = timedelta(days=1)          # Retry failed lookups sooner
+    BULK_WORKERS = 8                        # Concurrent info requests
+    BULK_REQUESTS_PER_SECOND = 5            # Shared rate limit across workers
+    METADATA_FIELDS = {                     # yfinance info key -> metadata column
+        'quoteType': 'quote_type',
+        'longName': 'name',
+        'category': 'category',
+        'totalAssets': 'aum',
+        'averageVolume': 'avg_volume',
+        'expenseRatio': 'expense_ratio',
+    }
     
-    def __init__(self):
-        """Initialize ETF Manager"""
+    def __init__(self, cache_dir: str = None, warehouse_path: str = None):
+        """
+        Initialize ETF Manager
+        Args:
+            cache_dir: Directory for the bulk metadata cache. If None, uses default
+            warehouse_path: Warehouse receiving fetched metadata. If None, the
+                pipeline's warehouse (or <cache_dir>/warehouse.sqlite for a custom cache_dir)
+        """
         self.cache = {}
         self.last_request = datetime.now()
         self.REQUEST_DELAY = 2  # seconds between requests
+        if warehouse_path is None:
+            warehouse_path = DEFAULT_WAREHOUSE if cache_dir is None else Path(cache_dir) / WAREHOUSE_FILE
+        self.warehouse_path = Path(warehouse_path)
+        cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.metadata_file = cache_dir / "etf_metadata.parquet"
         
     def validate_etf(self, ticker: str) -> Tuple[bool, str]:
         """
@@ -171,3 +228,133 @@ class ETFManager:
             logger.error(f"Error calculating metrics for {ticker}: {str(e)}")
             
         return metrics
+
+    def _load_metadata_cache(self) -> pd.DataFrame:
+        """Load cached ETF metadata from parquet file (columns an older cache lacks are added empty)"""
+        if self.metadata_file.exists():
+            try:
+                cached = pd.read_parquet(self.metadata_file)
+                columns = list(self.METADATA_FIELDS.values()) + ['fetched_at', 'error']
+                return cached.reindex(columns=columns) if not cached.empty else cached
+            except Exception as e:
+                logger.error(f"Error loading ETF metadata cache: {e}")
+        return pd.DataFrame()
+
+    def _save_metadata_cache(self, metadata: pd.DataFrame):
+        """Save ETF metadata to cache file"""
+        try:
+            self.metadata_file.parent.mkdir(parents=True, exist_ok=True)
+            metadata.to_parquet(self.metadata_file)
+        except Exception as e:
+            logger.error(f"Error saving ETF metadata cache: {e}")
+
+    def _store_in_warehouse(self, metadata: pd.DataFrame):
+        """Upsert fetched metadata rows into the warehouse"""
+        try:
+            Warehouse(str(self.warehouse_path)).store_metadata(metadata)
+        except Exception as e:
+            logger.warning(f"Could not store ETF metadata in warehouse: {e}")
+
+    def _fetch_metadata_row(self, ticker: str, limiter: RateLimiter) -> Dict[str, Any]:
+        """Fetch one ticker's info as a metadata row (error set on failure)"""
+        row = {'ticker': ticker, 'fetched_at': pd.Timestamp.now(), 'error': None}
+        row.update(dict.fromkeys(self.METADATA_FIELDS.values()))  # Same columns when the fetch fails
+        try:
+            limiter.wait()
+            info = yf.Ticker(ticker).info or {}
+            for key, column in self.METADATA_FIELDS.items():
+                row[column] = info.get(key)
+            if row['expense_ratio'] is not None:
+                row['expense_ratio'] = row['expense_ratio'] * 100
+            if row['quote_type'] is None:
+                row['error'] = "No info returned"
+        except Exception as e:
+            logger.error(f"Error fetching ETF info for {ticker}: {str(e)}")
+            row['error'] = str(e)
+        return row
+
+    def get_metadata(self, tickers: List[str], refresh: bool = False) -> pd.DataFrame:
+        """
+        Metadata table for many tickers, fetching only missing or stale entries
+        Args:
+            tickers: Ticker symbols
+            refresh: Refetch every ticker regardless of cache age
+        Returns:
+            DataFrame indexed by ticker with METADATA_FIELDS columns,
+            fetched_at and error
+        """
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        cached = self._load_metadata_cache()
+
+        if refresh or cached.empty:
+            stale = tickers
+        else:
+            known = cached.reindex(tickers)
+            age = pd.Timestamp.now() - pd.to_datetime(known['fetched_at'])
+            ttl = np.where(known['error'].notna(), self.FAILED_TTL, self.METADATA_TTL)
+            stale = list(known.index[known['fetched_at'].isna() | (age > pd.to_timedelta(ttl)).to_numpy()])
+
+        if stale:
+            logger.info(f"Fetching ETF metadata for {len(stale)} of {len(tickers)} tickers")
+            limiter = RateLimiter(self.BULK_REQUESTS_PER_SECOND)
+            with ThreadPoolExecutor(max_workers=self.BULK_WORKERS) as pool:
+                rows = list(pool.map(lambda t: self._fetch_metadata_row(t, limiter), stale))
+            fetched = pd.DataFrame(rows).set_index('ticker')
+            fetched['aum'] = pd.to_numeric(fetched['aum'], errors='coerce')
+            fetched['avg_volume'] = pd.to_numeric(fetched['avg_volume'], errors='coerce')
+            fetched['expense_ratio'] = pd.to_numeric(fetched['expense_ratio'], errors='coerce')
+            cached = fetched if cached.empty else pd.concat([cached.drop(stale, errors='ignore'), fetched])
+            self._save_metadata_cache(cached)
+            self._store_in_warehouse(fetched)
+
+        return cached.reindex(tickers)
+
+    def screen_etfs(self, tickers: List[str],
+                    min_assets: Optional[float] = None,
+                    min_volume: Optional[float] = None,
+                    max_expense: Optional[float] = None,
+                    refresh: bool = False) -> pd.DataFrame:
+        """
+        Apply the validate_etf criteria to many tickers at once
+        Args:
+            tickers: Candidate ticker symbols
+            min_assets: Minimum AUM (defaults to MIN_ASSETS)
+            min_volume: Minimum average daily volume (defaults to MIN_VOLUME)
+            max_expense: Maximum expense ratio in % (defaults to MAX_EXPENSE)
+            refresh: Refetch all metadata regardless of cache age
+        Returns:
+            Metadata table with is_valid and message columns (messages as
+            returned by validate_etf)
+        """
+        try:
+            min_assets = self.MIN_ASSETS if min_assets is None else min_assets
+            min_volume = self.MIN_VOLUME if min_volume is None else min_volume
+            max_expense = self.MAX_EXPENSE if max_expense is None else max_expense
+
+            table = self.get_metadata(tickers, refresh=refresh)
+            aum = table['aum'].fillna(0)
+            volume = table['avg_volume'].fillna(0)
+            expense = table['expense_ratio']
+
+            # Same order of checks as validate_etf: first failure wins
+            failed = table['quote_type'].isna()
+            not_etf = table['quote_type'].fillna('').str.lower() != 'etf'
+            low_aum = aum < min_assets
+            low_volume = volume < min_volume
+            high_expense = expense.notna() & (expense > max_expense)
+            conditions = [failed, not_etf, low_aum, low_volume, high_expense]
+            messages = [
+                pd.Series("Failed to fetch ETF info", index=table.index),
+                table.index.to_series() + " is not an ETF",
+                "AUM too low: $" + aum.map('{:,.0f}'.format),
+                "Volume too low: " + volume.map('{:,.0f}'.format),
+                "Expense ratio too high: " + expense.map('{:.2f}%'.format),
+            ]
+
+            table['is_valid'] = ~np.logical_or.reduce(conditions)
+            table['message'] = np.select(conditions, messages, default="Valid ETF")
+            return table
+
+        except Exception as e:
+            logger.error(f"Error screening ETFs: {str(e)}")
+            return pd.DataFrame()
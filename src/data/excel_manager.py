@@ -24,7 +24,20 @@ import yfinance as yf
 import logging
 from typing import Dict, List, Optional, Tuple
 import time
-from ..models.metrics_writer import calculate_and_write_metrics
+from ..models.metrics_writer import calculate_and_write_metrics, calculate_metrics_table
+from ..models.total_return import back_adjusted_prices
+from ..models.adjustment import AdjustmentEngine, actions_from_dividends, dividends_from_actions
+from ..models.yield_series import calculate_yield_history
+from .trading_calendar import nyse_calendar
+from .data_quality import check_price_quality
+from .sidecar import read_sheets, write_sidecar
+from .xlsx_reader import sheet_names
+from .warehouse import Warehouse
+from .snapshot_store import SnapshotStore
+from .atomic_io import FileLock, atomic_write, new_run_id
+from .workbook_export import write_streaming_workbook
+from .dataset_export import export_datasets
+from .price_store import PriceMatrixStore
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -40,11 +53,25 @@ class ExcelManager:
     UNADJUSTED_PRICES_SHEET = 'Unadjusted Prices'
     DIVIDENDS_SHEET = 'Dividends'
     CALCULATIONS_SHEET = 'Metrics'
+    TTM_YIELD_SHEET = 'TTM Yield'
+    YIELD_30D_SHEET = '30D Yield'
+    QUALITY_SHEET = 'Data Quality'
     
     # Rate limiting parameters
     REQUEST_DELAY = 4  # seconds between requests
     MAX_RETRIES = 3
     MAX_FILENAME_TICKERS = 3  # Maximum number of tickers to include in filename
+    RECONSTRUCT_ADJUSTED = False  # Build adjusted closes from unadjusted + dividends instead of a second request
+    QUARANTINE_SUSPECT = True  # Keep tickers failing data-quality checks out of the workbook
+    QUARANTINE_DIR = 'quarantine'  # Subdirectory of data_dir for quarantined downloads
+    WAREHOUSE_FILE = 'warehouse.sqlite'  # SQLite warehouse in data_dir, loaded after each save (None to skip)
+    LOCK_TIMEOUT = 120  # seconds to wait for another writer of the same workbook
+    SNAPSHOT_DIR = 'snapshots'  # Deduplicated run snapshots in data_dir, updated after each save (None to skip)
+    EXPORT_FORMATS = ()  # Extra dataset formats written after each save: 'parquet', 'csv.gz', 'arrow', 'jsonl'
+    EXPORT_DIR = 'exports'  # Subdirectory of data_dir for the extra formats, one folder per workbook
+    PRICE_STORE_DIR = 'price_store'  # Memory-mapped Daily Prices of every saved ticker in data_dir (None to skip)
+    UNIVERSE_METRICS_CHUNK = 256  # Tickers per Metrics batch in save_universe, so a price store is read a slice at a time
+    ADJUSTMENT_DIR = 'adjustment'  # Unadjusted closes and dividends in data_dir; repeat downloads fetch only new days (None to skip)
     
     def __init__(self, data_dir: str, tickers: List[str] = None):
         """
@@ -56,9 +83,8 @@ class ExcelManager:
         self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
         
-        # Generate dated Excel file path with timestamp and first 3 tickers
-        now = datetime.now()
-        date_str = now.strftime('%Y%m%d_%H%M')
+        # Generate a unique Excel file path from the run id and first 3 tickers
+        self.run_id = new_run_id()
         ticker_str = ''
         if tickers:
             display_tickers = tickers[:self.MAX_FILENAME_TICKERS]
@@ -66,7 +92,9 @@ class ExcelManager:
             if len(tickers) > self.MAX_FILENAME_TICKERS:
                 logger.info(f"Using first {self.MAX_FILENAME_TICKERS} tickers in filename out of {len(tickers)} total tickers")
         
-        self.excel_path = os.path.join(self.data_dir, f"dashboard_data_{date_str}{ticker_str}.xlsx")
+        self.excel_path = os.path.join(self.data_dir, f"dashboard_data_{self.run_id}{ticker_str}.xlsx")
+        self.quality_report = pd.DataFrame()  # Data-quality results for this run, one row per ticker
+        self.quarantined = {}  # ticker -> issues for tickers held back this run
         self.ensure_excel_file()
         logger.info(f"Excel Manager initialized with data directory: {self.data_dir}")
 
@@ -75,7 +103,8 @@ class ExcelManager:
         if not os.path.exists(self.excel_path):
             logger.info(f"Creating new Excel file at {self.excel_path}")
             try:
-                with pd.ExcelWriter(self.excel_path, engine='xlsxwriter') as writer:
+                with FileLock(self.excel_path, self.LOCK_TIMEOUT), atomic_write(self.excel_path) as temp_path, \
+                        pd.ExcelWriter(temp_path, engine='xlsxwriter') as writer:
                     # Create empty DataFrames with datetime index
                     empty_df = pd.DataFrame(index=pd.date_range(start='2020-01-01', periods=1))
                     empty_df.index.name = 'Date'
@@ -96,37 +125,52 @@ class ExcelManager:
     def download_ticker_data(self, ticker: str) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame], Optional[pd.DataFrame]]:
         """
         Download price and dividend data for a ticker starting from 2020-01-01
+        A ticker already in the data_dir adjustment engine only fetches the
+        days after its last stored close; new dividends rescale the stored
+        factors and the adjusted closes come from the engine. A split after
+        the last stored close, or dividends Yahoo has restated, mean the stored
+        closes are on a different basis, so the full history is refetched.
         Returns: (adjusted_prices, unadjusted_prices, dividends)
         """
         retries = 0
+        last_close = self._last_stored_close(ticker)
         while retries < self.MAX_RETRIES:
             try:
                 # Set date range
-                start_date = '2020-01-01'
+                history_start = '2020-01-01'
+                incremental = last_close is not None
+                start_date = (last_close + timedelta(days=1)).strftime('%Y-%m-%d') if incremental else history_start
                 end_date = date.today().strftime('%Y-%m-%d')
                 logger.info(f"Fetching data for {ticker} from {start_date} to {end_date}")
                 
                 # Download data
                 stock = yf.Ticker(ticker)
                 
-                # Get adjusted price data
-                logger.info(f"Getting adjusted price history for {ticker}")
-                adj_hist = stock.history(start=start_date, end=end_date, auto_adjust=True)
-                if adj_hist.empty:
-                    logger.warning(f"No data found for {ticker} on attempt {retries + 1}")
-                    retries += 1
-                    continue
+                # Get adjusted price data (rebuilt locally below when RECONSTRUCT_ADJUSTED or already stored)
+                adj_hist = None
+                if not self.RECONSTRUCT_ADJUSTED and not incremental:
+                    logger.info(f"Getting adjusted price history for {ticker}")
+                    adj_hist = stock.history(start=start_date, end=end_date, auto_adjust=True)
+                    if adj_hist.empty:
+                        logger.warning(f"No data found for {ticker} on attempt {retries + 1}")
+                        retries += 1
+                        continue
                 
                 # Get unadjusted price data
                 logger.info(f"Getting unadjusted price history for {ticker}")
                 unadj_hist = stock.history(start=start_date, end=end_date, auto_adjust=False)
+                if unadj_hist.empty and not incremental:
+                    logger.warning(f"No unadjusted data found for {ticker} on attempt {retries + 1}")
+                    retries += 1
+                    continue
                 
                 # Get comprehensive dividend data
                 try:
                     logger.info(f"Getting dividend history for {ticker}")
                     # Get both actions and dividends to ensure we don't miss any
-                    actions_div = stock.actions[['Dividends']].loc[start_date:end_date]
-                    regular_div = stock.dividends.loc[start_date:end_date].to_frame()
+                    # Whole window even when incremental: late-reported dividends still rescale history
+                    actions_div = stock.actions[['Dividends']].loc[history_start:end_date]
+                    regular_div = stock.dividends.loc[history_start:end_date].to_frame()
                     
                     # Combine both sources and remove duplicates
                     if not actions_div.empty:
@@ -144,14 +188,32 @@ class ExcelManager:
                     dividends = pd.DataFrame(columns=[ticker])
                 
                 # Convert timezone-aware dates to dates only
-                adj_hist.index = adj_hist.index.date
                 unadj_hist.index = unadj_hist.index.date
                 if not dividends.empty:
                     dividends.index = dividends.index.date
                 
+                if incremental and self._history_restated(ticker, stock, dividends, last_close):
+                    logger.warning(f"Split or restated dividends for {ticker}, downloading full history")
+                    self._forget_adjustments(ticker)
+                    last_close = None
+                    continue
+
                 # Create single-column dataframes with ticker as column name
-                adj_prices = pd.DataFrame({ticker: adj_hist['Close']})
                 unadj_prices = pd.DataFrame({ticker: unadj_hist['Close']})
+                engine = self._update_adjustments(ticker, unadj_prices, dividends)
+                if incremental:
+                    if engine is None:
+                        logger.warning(f"Stored history unavailable for {ticker}, downloading full history")
+                        last_close = None
+                        continue
+                    logger.info(f"Adjusted {len(unadj_prices)} new days for {ticker} from stored factors")
+                    return self._engine_frames(engine, ticker)
+                if self.RECONSTRUCT_ADJUSTED:
+                    logger.info(f"Rebuilding adjusted prices for {ticker} from dividends")
+                    adj_prices = back_adjusted_prices(unadj_prices, dividends)
+                else:
+                    adj_hist.index = adj_hist.index.date
+                    adj_prices = pd.DataFrame({ticker: adj_hist['Close']})
                 
                 logger.info(f"Successfully downloaded data for {ticker}")
                 return adj_prices, unadj_prices, dividends
@@ -168,81 +230,91 @@ class ExcelManager:
     def save_ticker_data(self, ticker: str, adj_prices: pd.DataFrame, unadj_prices: pd.DataFrame, dividends: pd.DataFrame) -> bool:
         """
         Save ticker data to Excel, preserving existing data for other tickers
+        The workbook is locked while it is read, merged and rewritten, and the
+        new version replaces the old one in a single rename.
+        The download is checked for data-quality problems first. A ticker that
+        fails (with QUARANTINE_SUSPECT set) is written to the quarantine
+        directory instead of the workbook and listed in self.quarantined.
         Returns: True if save was successful, False otherwise
         """
         try:
-            # Initialize DataFrames
-            existing_adj = pd.DataFrame()
-            existing_unadj = pd.DataFrame()
-            existing_div = pd.DataFrame()
+            if self._check_quality(ticker, adj_prices, unadj_prices, dividends):
+                return True
+
+            # Hold the workbook lock for the whole read-merge-write so concurrent savers take turns
+            with FileLock(self.excel_path, self.LOCK_TIMEOUT):
+                # Initialize DataFrames
+                existing_adj = pd.DataFrame()
+                existing_unadj = pd.DataFrame()
+                existing_div = pd.DataFrame()
             
-            # Read existing data if file exists
-            if os.path.exists(self.excel_path):
-                try:
-                    with pd.ExcelFile(self.excel_path) as xls:
-                        existing_adj = pd.read_excel(xls, self.DAILY_PRICES_SHEET, index_col=0)
-                        existing_unadj = pd.read_excel(xls, self.UNADJUSTED_PRICES_SHEET, index_col=0)
-                        existing_div = pd.read_excel(xls, self.DIVIDENDS_SHEET, index_col=0)
-                        
+                # Read existing data if file exists
+                if os.path.exists(self.excel_path):
+                    try:
+                        sheets = read_sheets(self.excel_path, [self.DAILY_PRICES_SHEET, self.UNADJUSTED_PRICES_SHEET,
+                                                               self.DIVIDENDS_SHEET], index_col=0)
+                        existing_adj = sheets[self.DAILY_PRICES_SHEET]
+                        existing_unadj = sheets[self.UNADJUSTED_PRICES_SHEET]
+                        existing_div = sheets[self.DIVIDENDS_SHEET]
+                    
                         # Convert string dates to datetime.date objects
                         existing_adj.index = pd.to_datetime(existing_adj.index).date
                         existing_unadj.index = pd.to_datetime(existing_unadj.index).date
                         existing_div.index = pd.to_datetime(existing_div.index).date
-                        
+                    
                         # Remove any 'Amount' column from existing dividend data
                         if 'Amount' in existing_div.columns:
                             existing_div = existing_div.drop('Amount', axis=1)
-                except Exception as e:
-                    logger.warning(f"Could not read existing file, creating new: {str(e)}")
+                    except Exception as e:
+                        logger.warning(f"Could not read existing file, creating new: {str(e)}")
             
-            # Update data for this ticker
-            if not existing_adj.empty:
-                existing_adj[ticker] = adj_prices[ticker]
-            else:
-                existing_adj = adj_prices
-                
-            if not existing_unadj.empty:
-                existing_unadj[ticker] = unadj_prices[ticker]
-            else:
-                existing_unadj = unadj_prices
-                
-            # Handle dividend data merging
-            if not existing_div.empty:
-                if not dividends.empty:
-                    # Create a new DataFrame with all dates from both existing and new data
-                    all_dates = pd.Index(sorted(set(existing_div.index) | set(dividends.index)))
-                    new_div = pd.DataFrame(index=all_dates)
-                    
-                    # Copy existing data
-                    for col in existing_div.columns:
-                        if col != ticker:  # Skip the current ticker as we'll update it
-                            new_div[col] = existing_div[col]
-                    
-                    # Add the new ticker data
-                    new_div[ticker] = dividends[ticker]
+                # Align every sheet to one canonical date index so dates missing
+                # from earlier tickers (or from this one) are kept, not dropped
+                existing_adj = self._update_column(existing_adj, adj_prices, ticker)
+                existing_unadj = self._update_column(existing_unadj, unadj_prices, ticker)
+                if dividends is not None and not dividends.empty:
+                    existing_div = self._update_column(existing_div, dividends, ticker).dropna(how='all')
+                elif existing_div.empty or len(existing_div.columns) == 0:
+                    existing_div = pd.DataFrame()
+
+                # Save to Excel with xlsxwriter engine, through a temp file so readers never see a partial workbook
+                with atomic_write(self.excel_path) as temp_path, pd.ExcelWriter(temp_path, engine='xlsxwriter') as writer:
+                    existing_adj.to_excel(writer, sheet_name=self.DAILY_PRICES_SHEET)
+                    existing_unadj.to_excel(writer, sheet_name=self.UNADJUSTED_PRICES_SHEET)
+                    if not existing_div.empty:
+                        existing_div.to_excel(writer, sheet_name=self.DIVIDENDS_SHEET)
+                    else:
+                        pd.DataFrame().to_excel(writer, sheet_name=self.DIVIDENDS_SHEET)
                     
-                    # Remove rows with all NaN values
-                    existing_div = new_div.dropna(how='all')
-            else:
-                existing_div = dividends if not dividends.empty else pd.DataFrame()
-            
-            # Ensure all indexes are sorted
-            existing_adj.sort_index(inplace=True)
-            existing_unadj.sort_index(inplace=True)
-            if not existing_div.empty:
-                existing_div.sort_index(inplace=True)
+                    # Calculate and write metrics
+                    metrics_table = calculate_and_write_metrics(existing_adj, existing_div, writer, self.CALCULATIONS_SHEET)
+
+                    if not self.quality_report.empty:
+                        self.quality_report.to_excel(writer, sheet_name=self.QUALITY_SHEET, index_label='Ticker')
+                
+                    # Store yield history so charts and screens read it instead of recomputing
+                    # (over unadjusted closes: only the last row equals the Metrics %Yield)
+                    yields = calculate_yield_history(existing_unadj, existing_div)
+                    yield_sheets = {}
+                    for key, sheet_name in [('ttm', self.TTM_YIELD_SHEET), ('30d', self.YIELD_30D_SHEET)]:
+                        if not yields[key].empty:
+                            yield_df = yields[key].set_axis(existing_unadj.index)
+                            yield_df.to_excel(writer, sheet_name=sheet_name)
+                            yield_sheets[sheet_name] = yield_df
+                            writer.sheets[sheet_name].set_column(1, yield_df.shape[1], 12, writer.book.add_format({'num_format': '0.00%'}))
             
-            # Save to Excel with xlsxwriter engine
-            with pd.ExcelWriter(self.excel_path, engine='xlsxwriter') as writer:
-                existing_adj.to_excel(writer, sheet_name=self.DAILY_PRICES_SHEET)
-                existing_unadj.to_excel(writer, sheet_name=self.UNADJUSTED_PRICES_SHEET)
-                if not existing_div.empty:
-                    existing_div.to_excel(writer, sheet_name=self.DIVIDENDS_SHEET)
-                else:
-                    pd.DataFrame().to_excel(writer, sheet_name=self.DIVIDENDS_SHEET)
-                    
-                # Calculate and write metrics
-                calculate_and_write_metrics(existing_adj, existing_div, writer, self.CALCULATIONS_SHEET)
+                # Columnar copy of the data sheets from the frames just written, then the queryable warehouse and snapshot
+                sheets = {self.DAILY_PRICES_SHEET: existing_adj, self.UNADJUSTED_PRICES_SHEET: existing_unadj,
+                          self.DIVIDENDS_SHEET: existing_div}
+                written = {**sheets, **yield_sheets}
+                if isinstance(metrics_table, pd.DataFrame):
+                    written[self.CALCULATIONS_SHEET] = metrics_table
+                write_sidecar(self.excel_path, written)
+                self._store_in_warehouse()
+                metrics = self._read_metrics()
+                self._store_snapshot(sheets, metrics)
+                self._export_formats(sheets, metrics)
+                self._update_price_store(existing_adj)
             
             logger.info(f"Successfully saved data for {ticker}")
             return True
@@ -254,16 +326,272 @@ class ExcelManager:
             logger.error(f"Failed to save data for {ticker}: {str(e)}")
             return False
 
+    def save_universe(self, adj_prices, unadj_prices, dividends: Optional[pd.DataFrame] = None,
+                      metrics: Optional[pd.DataFrame] = None) -> bool:
+        """
+        Write a whole universe in one streaming pass instead of ticker by ticker
+        For wide universes (hundreds or thousands of tickers) this keeps memory
+        flat: rows are streamed to xlsxwriter in constant-memory mode and
+        sheets beyond Excel's column limit continue on extra sheets.
+        Without a precomputed table, Metrics are calculated UNIVERSE_METRICS_CHUNK
+        tickers at a time (names are not looked up; Name repeats the ticker).
+        The saved workbook then goes through the same steps as save_ticker_data:
+        sidecar, warehouse, snapshot, dataset exports and price store.
+        Args:
+            adj_prices: Adjusted closes, DataFrame or PriceMatrixStore
+            unadj_prices: Unadjusted closes, DataFrame or PriceMatrixStore
+            dividends: Dividend amounts by ex-date
+            metrics: Precomputed Metrics table
+        Returns: True if save was successful, False otherwise
+        """
+        try:
+            dividends = dividends if dividends is not None else pd.DataFrame()
+            if metrics is None:
+                metrics = self._universe_metrics(adj_prices, dividends)
+            sheets = {self.DAILY_PRICES_SHEET: adj_prices, self.UNADJUSTED_PRICES_SHEET: unadj_prices,
+                      self.DIVIDENDS_SHEET: dividends}
+            with FileLock(self.excel_path, self.LOCK_TIMEOUT):
+                with atomic_write(self.excel_path) as temp_path:
+                    written = write_streaming_workbook(temp_path, sheets, metrics, self.CALCULATIONS_SHEET)
+                logger.info(f"Streamed {sum(len(names) for names in written.values())} sheets to {self.excel_path}")
+
+                # Same follow-up as a per-ticker save; stores are read into frames for the sidecar, snapshot and
+                # exports. Sheets split at the column limit are read back, as the first sheet holds only part
+                frames = {name: data.frame() if isinstance(data, PriceMatrixStore) else data
+                          for name, data in sheets.items()}
+                single = {name: frame for name, frame in frames.items() if len(written.get(name, [])) == 1}
+                if self.CALCULATIONS_SHEET in written:
+                    single[self.CALCULATIONS_SHEET] = metrics
+                write_sidecar(self.excel_path, single)
+                self._store_in_warehouse()
+                metrics = self._read_metrics()
+                self._store_snapshot(frames, metrics)
+                self._export_formats(frames, metrics)
+                if not (isinstance(adj_prices, PriceMatrixStore) and self.PRICE_STORE_DIR and
+                        os.path.abspath(adj_prices.directory) == os.path.abspath(
+                            os.path.join(self.data_dir, self.PRICE_STORE_DIR))):
+                    self._update_price_store(frames[self.DAILY_PRICES_SHEET])
+            return True
+        except PermissionError:
+            logger.error(f"Permission denied: Could not save to {self.excel_path}. Please close the file if it's open.")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to save universe: {str(e)}")
+            return False
+
+    def _universe_metrics(self, adj_prices, dividends: pd.DataFrame) -> pd.DataFrame:
+        """Metrics table for a universe, a chunk of tickers at a time (None if it cannot be calculated)"""
+        try:
+            tickers = adj_prices.tickers if isinstance(adj_prices, PriceMatrixStore) else list(adj_prices.columns)
+            tables = []
+            for start in range(0, len(tickers), self.UNIVERSE_METRICS_CHUNK):
+                chunk = tickers[start:start + self.UNIVERSE_METRICS_CHUNK]
+                prices = adj_prices.frame(chunk) if isinstance(adj_prices, PriceMatrixStore) else adj_prices[chunk].copy()
+                chunk_dividends = dividends[[ticker for ticker in chunk if ticker in dividends.columns]].copy()
+                tables.append(calculate_metrics_table(prices, chunk_dividends, lookup_names=False))
+            return pd.concat(tables, ignore_index=True) if tables else None
+        except Exception as e:
+            logger.warning(f"Could not calculate universe metrics: {str(e)}")
+            return None
+
+    def _store_in_warehouse(self):
+        """Load the saved workbook into the data_dir warehouse as one run"""
+        if not self.WAREHOUSE_FILE:
+            return
+        try:
+            Warehouse(os.path.join(self.data_dir, self.WAREHOUSE_FILE)).load_workbook(self.excel_path)
+        except Exception as e:
+            logger.warning(f"Could not update warehouse: {str(e)}")
+
+    def _read_metrics(self) -> Optional[pd.DataFrame]:
+        """Metrics sheet of the saved workbook (from the sidecar just written)"""
+        try:
+            return read_sheets(self.excel_path, [self.CALCULATIONS_SHEET])[self.CALCULATIONS_SHEET]
+        except ValueError:
+            return None  # Metrics could not be calculated for this save
+
+    def _store_snapshot(self, sheets: Dict[str, pd.DataFrame], metrics: Optional[pd.DataFrame]):
+        """Record the run in the data_dir snapshot store (only new blocks are written)"""
+        if not self.SNAPSHOT_DIR:
+            return
+        try:
+            stats = SnapshotStore(os.path.join(self.data_dir, self.SNAPSHOT_DIR)).put_run(
+                os.path.splitext(os.path.basename(self.excel_path))[0], sheets, metrics,
+                source=os.path.basename(self.excel_path))
+            logger.info(f"Snapshot: {stats['blocks_written']} blocks written, {stats['blocks_reused']} reused")
+        except Exception as e:
+            logger.warning(f"Could not update snapshot store: {str(e)}")
+
+    def _export_formats(self, sheets: Dict[str, pd.DataFrame], metrics: Optional[pd.DataFrame]):
+        """Write the saved datasets in EXPORT_FORMATS next to the workbook's other outputs"""
+        if not self.EXPORT_FORMATS:
+            return
+        try:
+            stem = os.path.splitext(os.path.basename(self.excel_path))[0]
+            datasets = dict(sheets)
+            if metrics is not None:
+                datasets[self.CALCULATIONS_SHEET] = metrics
+            written = export_datasets(datasets, os.path.join(self.data_dir, self.EXPORT_DIR, stem),
+                                      self.EXPORT_FORMATS, indexed=list(sheets))
+            logger.info(f"Exported {len(written)} dataset files ({', '.join(self.EXPORT_FORMATS)})")
+        except Exception as e:
+            logger.warning(f"Could not export datasets: {str(e)}")
+
+    def _update_price_store(self, adj_prices: pd.DataFrame):
+        """Bring the data_dir price matrix store (read by universe-wide screeners) up to date"""
+        if not self.PRICE_STORE_DIR:
+            return
+        try:
+            store = PriceMatrixStore.update(os.path.join(self.data_dir, self.PRICE_STORE_DIR), adj_prices)
+            logger.info(f"Price store: {len(store.tickers)} tickers x {store.meta['rows']} days")
+        except Exception as e:
+            logger.warning(f"Could not update price store: {str(e)}")
+
+    def _last_stored_close(self, ticker: str) -> Optional[pd.Timestamp]:
+        """Last close of a ticker in the data_dir adjustment engine (None if not stored)"""
+        if not self.ADJUSTMENT_DIR:
+            return None
+        try:
+            directory = os.path.join(self.data_dir, self.ADJUSTMENT_DIR)
+            if not os.path.exists(os.path.join(directory, 'unadjusted_prices.parquet')):
+                return None
+            return AdjustmentEngine.load(directory).last_close(ticker)
+        except Exception as e:
+            logger.warning(f"Could not read adjustment engine, downloading full history: {str(e)}")
+            return None
+
+    def _history_restated(self, ticker: str, stock, dividends: pd.DataFrame, last_close: pd.Timestamp) -> bool:
+        """
+        Whether Yahoo's history no longer matches the stored closes and dividends
+        Yahoo restates closes and dividends for splits, so a split after the last
+        stored close (or a stored dividend whose amount changed) means the new
+        closes are not on the stored basis.
+        Returns: True if the full history has to be refetched
+        """
+        try:
+            splits = stock.splits
+            splits = splits[splits > 0]
+            if (pd.to_datetime(pd.DatetimeIndex(splits.index).date) > last_close).any():
+                return True
+            directory = os.path.join(self.data_dir, self.ADJUSTMENT_DIR)
+            actions = AdjustmentEngine.load(directory).actions
+            stored = dividends_from_actions(actions[actions['ticker'] == ticker])
+            if stored.empty or dividends.empty:
+                return False
+            fetched = dividends[ticker].groupby(pd.to_datetime(dividends.index)).sum()
+            common = stored.index.intersection(fetched.index)
+            return not np.allclose(stored.loc[common, ticker].to_numpy(), fetched[common].to_numpy(), rtol=1e-6)
+        except Exception as e:
+            logger.warning(f"Could not check {ticker} for splits, downloading full history: {str(e)}")
+            return True
+
+    def _update_adjustments(self, ticker: str, unadj_prices: pd.DataFrame,
+                            dividends: pd.DataFrame) -> Optional[AdjustmentEngine]:
+        """
+        Add a download's new closes and dividends to the data_dir adjustment engine
+        Only days after the ticker's last stored close and dividends not yet
+        recorded are applied; the rest of the stored factors are left as they are.
+        Returns: Updated engine, or None if it could not be updated
+        """
+        if not self.ADJUSTMENT_DIR:
+            return None
+        directory = os.path.join(self.data_dir, self.ADJUSTMENT_DIR)
+        try:
+            with FileLock(directory, self.LOCK_TIMEOUT):
+                if os.path.exists(os.path.join(directory, 'unadjusted_prices.parquet')):
+                    engine = AdjustmentEngine.load(directory)
+                    engine.add_prices(unadj_prices)
+                else:
+                    engine = AdjustmentEngine(unadj_prices)
+                actions = actions_from_dividends(dividends)
+                stored = engine.actions[(engine.actions['ticker'] == ticker) & (engine.actions['action'] == 'dividend')]
+                for _, action in actions[~actions['date'].isin(stored['date'])].iterrows():
+                    engine.add_action(ticker, action['date'], 'dividend', action['value'])
+                engine.save(directory)
+            return engine
+        except Exception as e:
+            logger.warning(f"Could not update adjustment engine: {str(e)}")
+            return None
+
+    def _forget_adjustments(self, ticker: str):
+        """Drop a ticker from the adjustment engine so its next download fetches the full history"""
+        directory = os.path.join(self.data_dir, self.ADJUSTMENT_DIR) if self.ADJUSTMENT_DIR else None
+        if directory is None or not os.path.exists(os.path.join(directory, 'unadjusted_prices.parquet')):
+            return
+        try:
+            with FileLock(directory, self.LOCK_TIMEOUT):
+                engine = AdjustmentEngine.load(directory)
+                engine.drop_ticker(ticker)
+                engine.save(directory)
+        except Exception as e:
+            logger.warning(f"Could not update adjustment engine: {str(e)}")
+
+    @staticmethod
+    def _engine_frames(engine: AdjustmentEngine, ticker: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """(adjusted_prices, unadjusted_prices, dividends) of one ticker as download_ticker_data returns them"""
+        unadj_prices = engine.prices[[ticker]].dropna()
+        adj_prices = engine.adjusted()[[ticker]].dropna()
+        dividends = dividends_from_actions(engine.actions[engine.actions['ticker'] == ticker])
+        if dividends.empty:
+            dividends = pd.DataFrame(columns=[ticker])
+        for frame in (adj_prices, unadj_prices, dividends):
+            frame.index = pd.DatetimeIndex(frame.index).date
+        return adj_prices, unadj_prices, dividends
+
+    def _check_quality(self, ticker: str, adj_prices: pd.DataFrame, unadj_prices: pd.DataFrame,
+                       dividends: pd.DataFrame) -> bool:
+        """
+        Record data-quality results for a download and quarantine it if suspect
+        Returns: True if the ticker was quarantined (and should not be stored)
+        """
+        report = check_price_quality(adj_prices[[ticker]], unadj_prices[[ticker]])
+        if report.empty:
+            return False
+        self.quality_report = pd.concat([self.quality_report.drop(ticker, errors='ignore'), report])
+        status, issues = report.loc[ticker, 'status'], report.loc[ticker, 'issues']
+        if status == 'warn':
+            logger.warning(f"Data-quality warnings for {ticker}: {issues}")
+        if status != 'quarantine' or not self.QUARANTINE_SUSPECT:
+            return False
+
+        logger.warning(f"Quarantining {ticker}: {issues}")
+        self.quarantined[ticker] = issues
+        self._forget_adjustments(ticker)
+        quarantine_dir = os.path.join(self.data_dir, self.QUARANTINE_DIR)
+        os.makedirs(quarantine_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(self.excel_path))[0]
+        with pd.ExcelWriter(os.path.join(quarantine_dir, f"{stem}_{ticker}.xlsx"), engine='xlsxwriter') as writer:
+            adj_prices.to_excel(writer, sheet_name=self.DAILY_PRICES_SHEET)
+            unadj_prices.to_excel(writer, sheet_name=self.UNADJUSTED_PRICES_SHEET)
+            (dividends if dividends is not None else pd.DataFrame()).to_excel(writer, sheet_name=self.DIVIDENDS_SHEET)
+            report.to_excel(writer, sheet_name=self.QUALITY_SHEET, index_label='Ticker')
+        return True
+
+    @staticmethod
+    def _update_column(existing: pd.DataFrame, new_data: pd.DataFrame, ticker: str) -> pd.DataFrame:
+        """
+        Set one ticker's column on the union of both date indexes
+        Returns: DataFrame indexed by date objects, sorted
+        """
+        if existing.empty or len(existing.columns) == 0:
+            existing = pd.DataFrame()
+        index = nyse_calendar.union_index([existing.index, new_data.index])
+        combined = nyse_calendar.align(existing, index) if len(existing.columns) else pd.DataFrame(index=index)
+        combined[ticker] = nyse_calendar.align(new_data[[ticker]], index)[ticker]
+        combined.index = index.date
+        return combined
+
     def get_ticker_data(self, ticker: str) -> Tuple[Optional[pd.Series], Optional[pd.Series], Optional[pd.Series]]:
         """
         Get ticker data from Excel
         Returns: (daily_prices, unadjusted_prices, dividends)
         """
         try:
-            with pd.ExcelFile(self.excel_path) as xls:
-                daily_prices = pd.read_excel(xls, self.DAILY_PRICES_SHEET, index_col=0)
-                unadj_prices = pd.read_excel(xls, self.UNADJUSTED_PRICES_SHEET, index_col=0)
-                div_data = pd.read_excel(xls, self.DIVIDENDS_SHEET, index_col=0)
+            sheets = read_sheets(self.excel_path, [self.DAILY_PRICES_SHEET, self.UNADJUSTED_PRICES_SHEET,
+                                                   self.DIVIDENDS_SHEET], index_col=0)
+            daily_prices = sheets[self.DAILY_PRICES_SHEET]
+            unadj_prices = sheets[self.UNADJUSTED_PRICES_SHEET]
+            div_data = sheets[self.DIVIDENDS_SHEET]
             
             # Convert index to datetime
             daily_prices.index = pd.to_datetime(daily_prices.index)
@@ -283,3 +611,22 @@ class ExcelManager:
         except Exception as e:
             logger.error(f"Error retrieving data for {ticker}: {str(e)}")
             return None, None, None
+
+    def get_yield_history(self) -> Dict[str, pd.DataFrame]:
+        """
+        Get stored yield history from Excel
+        Yields are over each day's unadjusted close; the latest TTM value is the Metrics %Yield
+        Returns: {'ttm': DataFrame, '30d': DataFrame} indexed by date, empty if not stored
+        """
+        result = {'ttm': pd.DataFrame(), '30d': pd.DataFrame()}
+        try:
+            # Sheet names from the archive, so a workbook without yields is not parsed
+            stored = sheet_names(self.excel_path)
+            keys = {self.TTM_YIELD_SHEET: 'ttm', self.YIELD_30D_SHEET: '30d'}
+            for sheet_name, df in read_sheets(self.excel_path, [name for name in keys if name in stored],
+                                              index_col=0).items():
+                df.index = pd.to_datetime(df.index)
+                result[keys[sheet_name]] = df
+        except Exception as e:
+            logger.error(f"Error retrieving yield history: {str(e)}")
+        return result
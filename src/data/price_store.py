@@ -0,0 +1,299 @@
+"""
+Memory-Mapped Price Matrix Store
+Keeps the aligned date x ticker adjusted-close matrix in one raw binary file
+that is memory-mapped, so universe-wide analytics slice views out of the
+page cache instead of loading and concatenating per-ticker frames.
+
+Layout of a store directory:
+- prices.<generation>.bin: row-major float64/float32 matrix of shape
+  (row_capacity, column_capacity), NaN where a ticker has no close
+- dates.<generation>.bin: int64 day numbers (days since 1970-01-01) for
+  each row
+- meta.json: dtype, capacities, generation, rows in use and ticker order
+
+Rows and columns are preallocated, so appending days (and adding tickers up
+to the column capacity) writes in place past the rows readers know about.
+Outgrowing a capacity, or rewriting the store, writes a new generation of
+both files and points meta.json at it; the files of the old generation are
+never modified, so a reader opened earlier keeps a consistent view. meta.json
+is replaced last, so readers never see rows that are not fully written.
+
+ExcelManager keeps a store of the saved 'Daily Prices' in
+<data_dir>/price_store through update(); universe-wide screeners open it
+with MomentumScreener.from_store().
+"""
+import pandas as pd
+import numpy as np
+import json
+import logging
+from pathlib import Path
+from typing import List, Optional
+from .sidecar import read_sheet
+from .atomic_io import FileLock, atomic_write
+
+logger = logging.getLogger(__name__)
+
+PRICES_FILE = 'prices.{}.bin'  # Formatted with the generation
+DATES_FILE = 'dates.{}.bin'
+META_FILE = 'meta.json'
+LOCK_NAME = 'store'  # Writers hold store.lock in the directory
+LOCK_TIMEOUT = 120
+ROW_HEADROOM = 1.5        # Capacity as a multiple of the rows written at creation
+MIN_ROW_CAPACITY = 4096   # About 16 years of sessions
+MIN_COLUMN_CAPACITY = 64
+
+
+def _day_numbers(index) -> np.ndarray:
+    return pd.DatetimeIndex(pd.to_datetime(index)).normalize().to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def _prepare(prices: pd.DataFrame) -> pd.DataFrame:
+    """Datetime-indexed, sorted, one row per day"""
+    prices = prices.set_axis(pd.to_datetime(prices.index)).sort_index()
+    return prices[~prices.index.duplicated(keep='last')]
+
+
+def _write_generation(path: Path, generation: int, prices: np.ndarray, days: np.ndarray, dtype: str,
+                      row_capacity: int, column_capacity: int):
+    """Write both matrix files of a new generation (never an existing one)"""
+    rows, columns = prices.shape
+    data = np.memmap(path / PRICES_FILE.format(generation), dtype=dtype, mode='w+',
+                     shape=(row_capacity, column_capacity))
+    data[:] = np.nan
+    data[:rows, :columns] = prices
+    data.flush()
+    dates = np.memmap(path / DATES_FILE.format(generation), dtype=np.int64, mode='w+', shape=(row_capacity,))
+    dates[:rows] = days
+    dates.flush()
+    del data, dates
+
+
+def _remove_old_generations(path: Path, generation: int):
+    """Delete the files of earlier generations (kept on Windows while a reader still maps them)"""
+    current = {PRICES_FILE.format(generation), DATES_FILE.format(generation)}
+    for old in list(path.glob(PRICES_FILE.format('*'))) + list(path.glob(DATES_FILE.format('*'))):
+        if old.name not in current:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+class PriceMatrixStore:
+    """
+    Date x ticker price matrix backed by memory-mapped files
+    """
+
+    def __init__(self, directory: str, mode: str = 'r'):
+        """
+        Open an existing store
+        Args:
+            directory: Store directory
+            mode: 'r' for read-only views, 'r+' to append
+        """
+        self.directory = Path(directory)
+        self.mode = mode
+        with open(self.directory / META_FILE) as f:
+            self.meta = json.load(f)
+        self._map()
+
+    def _map(self):
+        """(Re)open the memory maps of the generation and capacities in meta"""
+        shape = (self.meta['row_capacity'], self.meta['column_capacity'])
+        generation = self.meta['generation']
+        self._prices = np.memmap(self.directory / PRICES_FILE.format(generation), dtype=self.meta['dtype'],
+                                 mode=self.mode, shape=shape)
+        self._dates = np.memmap(self.directory / DATES_FILE.format(generation), dtype=np.int64, mode=self.mode,
+                                shape=(shape[0],))
+        self._ticker_positions = {ticker: i for i, ticker in enumerate(self.meta['tickers'])}
+
+    @classmethod
+    def create(cls, directory: str, prices: pd.DataFrame, dtype: str = 'float64',
+               row_capacity: Optional[int] = None, column_capacity: Optional[int] = None) -> 'PriceMatrixStore':
+        """
+        Write a new store from a price frame
+        Args:
+            directory: Store directory (created if needed, replaced if present)
+            prices: Date x ticker adjusted closes ('Daily Prices' sheet)
+            dtype: 'float64' or 'float32'
+            row_capacity: Preallocated rows (defaults to headroom over the data)
+            column_capacity: Preallocated ticker columns
+        Returns:
+            Store opened for appending
+        """
+        prices = _prepare(prices)
+        rows, columns = prices.shape
+        row_capacity = row_capacity or max(int(rows * ROW_HEADROOM), MIN_ROW_CAPACITY)
+        column_capacity = column_capacity or max(2 * columns, MIN_COLUMN_CAPACITY)
+        if rows > row_capacity or columns > column_capacity:
+            raise ValueError("Capacity is smaller than the data")
+
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        generation = 0
+        if (path / META_FILE).exists():  # Replacing a store: readers of the old generation keep their files
+            with open(path / META_FILE) as f:
+                generation = json.load(f).get('generation', -1) + 1
+        _write_generation(path, generation, prices.to_numpy(dtype=dtype), _day_numbers(prices.index), dtype,
+                          row_capacity, column_capacity)
+
+        meta = {'dtype': np.dtype(dtype).name, 'row_capacity': row_capacity, 'column_capacity': column_capacity,
+                'generation': generation, 'rows': rows, 'tickers': [str(ticker) for ticker in prices.columns]}
+        cls._write_meta(path, meta)
+        _remove_old_generations(path, generation)
+        return cls(directory, mode='r+')
+
+    @classmethod
+    def update(cls, directory: str, prices: pd.DataFrame, dtype: str = 'float64') -> 'PriceMatrixStore':
+        """
+        Create the store, or bring it up to date with a price frame
+        Newer days for stored tickers are appended in place. New tickers or
+        revised history (adjusted closes change on every ex-dividend date)
+        rewrite the store as a new generation holding the union of the
+        stored and the given prices, the given prices taking precedence.
+        Args:
+            directory: Store directory
+            prices: Date x ticker adjusted closes
+            dtype: Dtype for a new store
+        Returns:
+            Store opened for appending
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        with FileLock(str(path / LOCK_NAME), timeout=LOCK_TIMEOUT):
+            if not (path / META_FILE).exists():
+                return cls.create(directory, prices, dtype=dtype)
+            store = cls(directory, mode='r+')
+            prices = _prepare(prices)
+            prices.columns = [str(ticker) for ticker in prices.columns]
+            rows = store.meta['rows']
+            last_day = store._dates[rows - 1] if rows else np.iinfo(np.int64).min
+            overlap = prices[_day_numbers(prices.index) <= last_day]
+
+            revised = bool(set(prices.columns) - set(store.tickers))
+            if not revised and not overlap.empty:
+                given = overlap.to_numpy(dtype=np.float64)
+                stored = store.frame(list(prices.columns)).reindex(overlap.index).to_numpy(dtype=np.float64)
+                tolerance = 1e-6 if store.meta['dtype'] == 'float32' else 1e-12
+                revised = bool((~np.isnan(given) & ~np.isclose(given, stored, rtol=tolerance, atol=0)).any())
+            if not revised:
+                store.append(prices)
+                return store
+
+            merged = prices.combine_first(store.frame())
+            merged = merged[store.tickers + [ticker for ticker in prices.columns if ticker not in store.tickers]]
+            column_capacity = max(store.meta['column_capacity'], 2 * merged.shape[1])
+            dtype = store.meta['dtype']
+            del store
+            logger.info(f"Rewriting price store with {merged.shape[1]} tickers x {len(merged)} days")
+            return cls.create(directory, merged, dtype=dtype, column_capacity=column_capacity)
+
+    @classmethod
+    def from_workbook(cls, directory: str, excel_path: str, dtype: str = 'float64') -> 'PriceMatrixStore':
+        """Build a store from a dashboard workbook's 'Daily Prices' sheet"""
+        return cls.create(directory, read_sheet(excel_path, 'Daily Prices', index_col=0), dtype=dtype)
+
+    @staticmethod
+    def _write_meta(path: Path, meta: dict):
+        """Replace meta.json atomically"""
+        with atomic_write(str(path / META_FILE)) as temp, open(temp, 'w') as f:
+            json.dump(meta, f)
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self.meta['tickers'])
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self._dates[:self.meta['rows']].astype('datetime64[D]').astype('datetime64[ns]'))
+
+    @property
+    def values(self) -> np.ndarray:
+        """Zero-copy view of the matrix in use (rows x tickers)"""
+        return self._prices[:self.meta['rows'], :len(self.meta['tickers'])]
+
+    def _row_slice(self, start=None, end=None) -> slice:
+        days = self._dates[:self.meta['rows']]
+        first = 0 if start is None else int(np.searchsorted(days, _day_numbers([start])[0], side='left'))
+        last = len(days) if end is None else int(np.searchsorted(days, _day_numbers([end])[0], side='right'))
+        return slice(first, last)
+
+    def column(self, ticker: str, start=None, end=None) -> np.ndarray:
+        """Zero-copy (strided) view of one ticker's closes"""
+        return self._prices[self._row_slice(start, end), self._ticker_positions[ticker]]
+
+    def frame(self, tickers: Optional[List[str]] = None, start=None, end=None) -> pd.DataFrame:
+        """
+        Price frame over a date range
+        Without tickers, or with tickers that are adjacent in store order,
+        the frame wraps a view of the mapped file; other selections copy
+        only the selected columns.
+        Args:
+            tickers: Tickers to include (defaults to all)
+            start: First date (inclusive)
+            end: Last date (inclusive)
+        Returns:
+            Date x ticker DataFrame
+        """
+        rows = self._row_slice(start, end)
+        if tickers is None:
+            tickers = self.tickers
+            block = self.values[rows]
+        else:
+            positions = np.array([self._ticker_positions[ticker] for ticker in tickers], dtype=int)
+            adjacent = len(positions) and np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions)))
+            block = self._prices[rows, positions[0]:positions[0] + len(positions)] if adjacent \
+                else self._prices[rows][:, positions]
+        return pd.DataFrame(block, index=self.dates[rows], columns=list(tickers), copy=False)
+
+    def append(self, prices: pd.DataFrame) -> int:
+        """
+        Write newer days in place (new tickers get a free column)
+        Args:
+            prices: Date x ticker closes; dates on or before the last stored
+                day are ignored
+        Returns:
+            Number of rows appended
+        """
+        if self.mode == 'r':
+            raise ValueError("Store is open read-only")
+        prices = _prepare(prices)
+        rows = self.meta['rows']
+        if rows:
+            prices = prices[_day_numbers(prices.index) > self._dates[rows - 1]]
+        if prices.empty:
+            return 0
+
+        new_tickers = [str(ticker) for ticker in prices.columns if str(ticker) not in self._ticker_positions]
+        needed_rows = rows + len(prices)
+        needed_columns = len(self.meta['tickers']) + len(new_tickers)
+        if needed_rows > self.meta['row_capacity'] or needed_columns > self.meta['column_capacity']:
+            self._grow(max(needed_rows, int(needed_rows * ROW_HEADROOM)), max(needed_columns, 2 * needed_columns))
+        self.meta['tickers'] = self.meta['tickers'] + new_tickers
+        self._ticker_positions = {ticker: i for i, ticker in enumerate(self.meta['tickers'])}
+
+        positions = [self._ticker_positions[str(ticker)] for ticker in prices.columns]
+        block = self._prices[rows:needed_rows]
+        block[:, positions] = prices.to_numpy(dtype=self.meta['dtype'])
+        self._dates[rows:needed_rows] = _day_numbers(prices.index)
+        self._prices.flush()
+        self._dates.flush()
+
+        self.meta['rows'] = needed_rows
+        self._write_meta(self.directory, self.meta)
+        return len(prices)
+
+    def _grow(self, row_capacity: int, column_capacity: int):
+        """Copy the data into a new generation of files at larger capacities"""
+        logger.info(f"Growing price store to {row_capacity} rows x {column_capacity} columns")
+        rows, columns = self.meta['rows'], len(self.meta['tickers'])
+        generation = self.meta['generation'] + 1
+        _write_generation(self.directory, generation, self._prices[:rows, :columns], self._dates[:rows],
+                          self.meta['dtype'], row_capacity, column_capacity)
+        del self._prices, self._dates
+
+        self.meta = {**self.meta, 'row_capacity': row_capacity, 'column_capacity': column_capacity,
+                     'generation': generation}
+        self._write_meta(self.directory, self.meta)
+        self._map()
+        _remove_old_generations(self.directory, generation)
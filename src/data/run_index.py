@@ -0,0 +1,132 @@
+"""
+Historical Run Index
+Keeps the warehouse in step with the dashboard workbooks in an output
+directory, so earlier runs can be compared without opening each XLSX.
+
+The catalog is the warehouse ExcelManager loads after each save
+(<output_dir>/warehouse.sqlite): its runs table records each workbook's
+run time and the file's mtime/size when it was loaded, and its metrics
+table holds the Metrics sheets in long form. update() stats the directory,
+loads workbooks that are new or changed since (e.g. written by another
+tool or before the warehouse existed) and removes runs whose workbook was
+deleted. Updates from several dashboard sessions take turns under a lock.
+"""
+import pandas as pd
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+from .warehouse import Warehouse, WAREHOUSE_FILE
+from .atomic_io import FileLock, is_temp_file, parse_run_name  # parse_run_name re-exported for callers
+
+logger = logging.getLogger(__name__)
+
+LOCK_TIMEOUT = 120
+
+
+class RunIndex:
+    """
+    Incrementally maintained catalog of the runs in an output directory
+    """
+
+    def __init__(self, output_dir: str, warehouse_path: Optional[str] = None):
+        """
+        Args:
+            output_dir: Directory holding the dashboard workbooks
+            warehouse_path: Warehouse file (defaults to <output_dir>/warehouse.sqlite)
+        """
+        self.output_dir = Path(output_dir)
+        self.warehouse = Warehouse(warehouse_path or str(self.output_dir / WAREHOUSE_FILE))
+
+    def update(self) -> int:
+        """
+        Load new or changed workbooks into the warehouse and forget deleted ones
+        Returns:
+            Number of workbooks (re)loaded
+        """
+        try:
+            with FileLock(str(self.warehouse.path), timeout=LOCK_TIMEOUT):
+                current = {}
+                for entry in os.scandir(self.output_dir):
+                    if entry.is_file() and entry.name.endswith('.xlsx') and not is_temp_file(entry.name):
+                        current[os.path.abspath(entry.path)] = entry
+
+                runs = self.warehouse.runs()
+                directory = os.path.abspath(self.output_dir)
+                in_dir = runs[runs['workbook'].map(lambda path: os.path.dirname(path) == directory).astype(bool)]
+                known = {row.workbook: (row.mtime_ns, row.size) for row in in_dir.itertuples()}
+                changed = [path for path, entry in current.items()
+                           if known.get(path) != (entry.stat().st_mtime_ns, entry.stat().st_size)]
+                removed = in_dir.loc[~in_dir['workbook'].isin(list(current)), 'run_id'].tolist()
+
+                loaded = sum(self.warehouse.load_workbook(path) for path in changed)
+                for run_id in removed:
+                    self.warehouse.delete_run(run_id)
+            if changed or removed:
+                logger.info(f"Run index: {loaded} loaded, {len(removed)} removed")
+            return loaded
+        except Exception as e:
+            logger.error(f"Error updating run index for {self.output_dir}: {str(e)}")
+            return 0
+
+    def runs(self, ticker: Optional[str] = None) -> pd.DataFrame:
+        """Indexed runs by run time, optionally only those covering a ticker"""
+        runs = self.warehouse.runs()
+        if ticker is not None:
+            runs = runs[runs['tickers'].fillna('').str.split(',').map(lambda tickers: ticker in tickers).astype(bool)]
+        return runs.reset_index(drop=True)
+
+    def latest_run(self) -> Optional[str]:
+        """Path of the most recent run that has a Metrics sheet"""
+        runs = self.warehouse.runs()
+        runs = runs[runs['has_metrics']]
+        return None if runs.empty else runs.iloc[-1]['workbook']
+
+    def metric_names(self) -> List[str]:
+        """Numeric metrics present in any run"""
+        return self.warehouse.query(
+            "SELECT DISTINCT metric FROM metrics WHERE value IS NOT NULL ORDER BY metric")['metric'].tolist()
+
+    def metric_over_time(self, metric: str, tickers: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        One metric across runs
+        Args:
+            metric: Metrics sheet column, e.g. 'Sharpe 2Y'
+            tickers: Tickers to include (defaults to all)
+        Returns:
+            Run time x ticker DataFrame (latest run per time)
+        """
+        history = self.warehouse.metric_history(metric, tickers)
+        if history.empty:
+            return pd.DataFrame()
+        created = self.warehouse.runs().set_index('run_id')['created']
+        history = history[history.index.isin(created.index)]
+        history.index = created.reindex(history.index).to_numpy()
+        history = history.groupby(level=0).last().sort_index()
+        history.index.name = None
+        history.columns.name = None
+        return history
+
+    def compare_runs(self, run_ids: List[str], tickers: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Side-by-side metrics for several runs
+        Args:
+            run_ids: Runs to compare, in column order
+            tickers: Tickers to include (defaults to all)
+        Returns:
+            (ticker, metric) x run_id DataFrame of numeric metrics
+        """
+        if not run_ids:
+            return pd.DataFrame()
+        sql = (f"SELECT run_id, ticker, metric, value FROM metrics "
+               f"WHERE value IS NOT NULL AND run_id IN ({', '.join('?' for _ in run_ids)})")
+        params = list(run_ids)
+        if tickers:
+            sql += f" AND ticker IN ({', '.join('?' for _ in tickers)})"
+            params.extend(tickers)
+        rows = self.warehouse.query(sql, tuple(params))
+        if rows.empty:
+            return pd.DataFrame()
+        comparison = rows.pivot_table(index=['ticker', 'metric'], columns='run_id', values='value', aggfunc='last')
+        comparison.columns.name = None
+        return comparison.reindex(columns=[run_id for run_id in run_ids if run_id in comparison.columns])
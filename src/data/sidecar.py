@@ -0,0 +1,197 @@
+"""
+Workbook Sidecar Cache
+Columnar copy of a dashboard workbook's data sheets, stored next to it as
+<workbook stem>.sidecar/ with one uncompressed Arrow IPC (Feather) file per
+sheet and a manifest. Reading all the data sheets takes a few milliseconds
+instead of an openpyxl parse.
+
+The manifest records the SHA-256 of the workbook it was built from. Readers
+use the sidecar only while that checksum still matches, so a workbook that
+was edited, re-saved or copied in from elsewhere falls back to parsing the
+XLSX. Sheets are stored exactly as pd.read_excel returns them (no index
+column), so sidecar and XLSX reads give the same frames. A writer that still
+holds the frames it just saved passes them in (converted with excel_frame)
+instead of having the workbook parsed again.
+"""
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = '.sidecar'
+MANIFEST_FILE = 'manifest.json'
+SIDECAR_SHEETS = ('Daily Prices', 'Unadjusted Prices', 'Dividends', 'Metrics', 'TTM Yield', '30D Yield')
+NO_INDEX_SHEETS = ('Metrics',)  # Written with index=False
+CHUNK_SIZE = 1 << 20
+
+# (path, mtime_ns, size) -> checksum, so repeated reads skip re-hashing
+_checksums: Dict[tuple, str] = {}
+
+
+def sidecar_dir(excel_path: str) -> Path:
+    """Sidecar directory for a workbook"""
+    return Path(excel_path).with_suffix(SIDECAR_SUFFIX)
+
+
+def workbook_checksum(excel_path: str) -> str:
+    """SHA-256 of the workbook bytes (memoized on path, mtime and size)"""
+    stat = os.stat(excel_path)
+    key = (os.path.abspath(excel_path), stat.st_mtime_ns, stat.st_size)
+    if key not in _checksums:
+        digest = hashlib.sha256()
+        with open(excel_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        _checksums[key] = digest.hexdigest()
+    return _checksums[key]
+
+
+def _sheet_file(sheet_name: str) -> str:
+    return sheet_name.lower().replace(' ', '_') + '.arrow'
+
+
+def excel_frame(frame: pd.DataFrame, index: bool = True) -> pd.DataFrame:
+    """
+    A frame as pd.read_excel returns it after frame.to_excel(index=index)
+    The index becomes the first column ('Unnamed: 0' when unnamed), dates become
+    datetimes, blank columns float, whole-number float columns int and object
+    columns their inferred type, as openpyxl cell values would give them.
+    """
+    if not len(frame.columns):
+        return pd.DataFrame()  # Blank sheet
+    frame = frame.rename_axis(frame.index.name or 'Unnamed: 0').reset_index() if index else frame.copy()
+    frame.columns = [str(column) for column in frame.columns]
+    for column in frame.columns:
+        values = frame[column]
+        if values.isna().all():
+            frame[column] = values.astype(float)
+        elif pd.api.types.is_datetime64_any_dtype(values) or \
+                pd.api.types.infer_dtype(values, skipna=True) in ('date', 'datetime'):
+            # Python datetimes, inferred the same way pd.read_excel infers them
+            frame[column] = pd.Series(list(pd.DatetimeIndex(values).to_pydatetime()), index=frame.index)
+        elif pd.api.types.is_float_dtype(values):
+            if values.notna().all() and np.array_equal(values, np.round(values)):
+                frame[column] = values.astype('int64')
+        elif values.dtype == object:
+            frame[column] = values.infer_objects()
+    return frame.reset_index(drop=True)
+
+
+def write_sidecar(excel_path: str, frames: Optional[Dict[str, pd.DataFrame]] = None,
+                  sheets: Iterable[str] = SIDECAR_SHEETS) -> bool:
+    """
+    Build the sidecar for the workbook as written
+    Args:
+        excel_path: Workbook to mirror
+        frames: Sheet name -> frame exactly as passed to to_excel (with the
+            index, except NO_INDEX_SHEETS). Sheets not given here are read back
+            from the workbook
+        sheets: Sheet names to store (missing sheets are skipped)
+    Returns:
+        True if the sidecar was written
+    """
+    try:
+        directory = sidecar_dir(excel_path)
+        directory.mkdir(exist_ok=True)
+        manifest_path = directory / MANIFEST_FILE
+        if manifest_path.exists():
+            manifest_path.unlink()  # Invalidate before touching any sheet file
+
+        frames = frames or {}
+        stored = {name: excel_frame(frames[name], index=name not in NO_INDEX_SHEETS)
+                  for name in sheets if name in frames}
+        missing = [name for name in sheets if name not in frames]
+        if missing:
+            with pd.ExcelFile(excel_path) as xls:
+                names = [name for name in missing if name in xls.sheet_names]
+                stored.update(pd.read_excel(xls, sheet_name=names) if names else {})
+        for name, frame in stored.items():
+            frame.columns = [str(column) for column in frame.columns]
+            frame.to_feather(directory / _sheet_file(name), compression='uncompressed')
+
+        manifest = {
+            'workbook': os.path.basename(excel_path),
+            'checksum': workbook_checksum(excel_path),
+            'sheets': {name: _sheet_file(name) for name in sheets if name in stored},
+        }
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not write sidecar for {excel_path}: {str(e)}")
+        return False
+
+
+def _current_manifest(excel_path: str) -> Optional[dict]:
+    """Sidecar manifest if it was built from the workbook as it is now"""
+    manifest_path = sidecar_dir(excel_path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        return manifest if manifest['checksum'] == workbook_checksum(excel_path) else None
+    except Exception as e:
+        logger.warning(f"Ignoring sidecar for {excel_path}: {str(e)}")
+        return None
+
+
+def read_sidecar(excel_path: str, sheet_name: str, manifest: Optional[dict] = None) -> Optional[pd.DataFrame]:
+    """
+    One sheet from a current sidecar
+    Returns:
+        DataFrame as pd.read_excel would return it, or None if there is no
+        sidecar, it is stale, or it does not hold the sheet
+    """
+    manifest = manifest if manifest is not None else _current_manifest(excel_path)
+    if manifest is None or sheet_name not in manifest['sheets']:
+        return None
+    try:
+        frame = pd.read_feather(sidecar_dir(excel_path) / manifest['sheets'][sheet_name])
+        return frame if len(frame.columns) else pd.DataFrame()  # Blank sheet, as pd.read_excel gives it
+    except Exception as e:
+        logger.warning(f"Ignoring sidecar sheet {sheet_name} of {excel_path}: {str(e)}")
+        return None
+
+
+def with_index(frame: pd.DataFrame, index_col: Optional[int]) -> pd.DataFrame:
+    """Move a column into the index the way pd.read_excel(index_col=...) does"""
+    if index_col is None or not len(frame.columns):
+        return frame
+    frame = frame.set_index(frame.columns[index_col])
+    if str(frame.index.name).startswith('Unnamed:'):
+        frame.index.name = None  # Blank header cell
+    return frame
+
+
+def read_sheet(excel_path: str, sheet_name: str, index_col: Optional[int] = None) -> pd.DataFrame:
+    """
+    Read a workbook sheet, from the sidecar when it is current
+    Args:
+        excel_path: Workbook path
+        sheet_name: Sheet to read
+        index_col: Column position to use as the index (as in pd.read_excel)
+    Returns:
+        DataFrame
+    """
+    frame = read_sidecar(excel_path, sheet_name)
+    if frame is None:
+        return pd.read_excel(excel_path, sheet_name=sheet_name, index_col=index_col)
+    return with_index(frame, index_col)
+
+
+def read_sheets(excel_path: str, sheet_names: Iterable[str],
+                index_col: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """Several sheets, parsing the XLSX once for any the sidecar cannot serve"""
+    manifest = _current_manifest(excel_path) or {'sheets': {}}
+    frames = {name: read_sidecar(excel_path, name, manifest) for name in sheet_names}
+    missing = [name for name, frame in frames.items() if frame is None]
+    parsed = pd.read_excel(excel_path, sheet_name=missing, index_col=index_col) if missing else {}
+    return {name: parsed[name] if frame is None else with_index(frame, index_col)
+            for name, frame in frames.items()}
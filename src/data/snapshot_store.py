@@ -0,0 +1,444 @@
+"""
+Content-Addressed Run Snapshots
+Deduplicated store for the data behind each dashboard run. Repeat analyses
+of the same tickers share almost all of their price history, so instead of
+another full copy each run keeps only references to immutable blocks plus
+its own Metrics sheet.
+
+Layout of a store directory:
+- blocks/<aa>/<sha256>.blk: one block per (sheet, ticker, calendar year),
+  int64 day numbers (delta-encoded) followed by float64 values, zlib
+  compressed; the sheet's date index is stored the same way under the
+  '__index__' column
+- packs/pack-<time>.bin + .json: blocks merged by compact(), with an index
+  of hash -> (offset, length)
+- runs/<run_id>.json: run manifest (created, tickers, block hashes per sheet
+  and column)
+- runs/<run_id>.metrics.parquet: the run's Metrics sheet
+
+A block's file name is the SHA-256 of its uncompressed days and values, so a block that already
+exists is never written again and finished years are shared by every later
+run. apply_retention() drops run manifests according to the retention
+policy; compact() then deletes blocks no remaining run references and
+merges the loose block files still in use into one pack file, so the store
+does not spend a file-system block on every small year of prices.
+
+put_run() and compact() hold a lock on the store (store.lock in the root),
+so a run saved while the store is being compacted cannot lose blocks it
+reuses. Files are written through atomic_write.
+
+Command line (from the project root; the default store is the one
+ExcelManager fills, 'Test Output/snapshots'):
+    python -m src.data.snapshot_store import "Test Output"
+    python -m src.data.snapshot_store compact --keep-last 5 --max-age-days 30
+    python -m src.data.snapshot_store stats
+"""
+import pandas as pd
+import numpy as np
+import argparse
+import hashlib
+import json
+import logging
+import os
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from .sidecar import read_sheets
+from .atomic_io import FileLock, atomic_write, is_temp_file, parse_run_name
+from .dataset_export import arrow_safe
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_ROOT = PROJECT_ROOT / 'Test Output' / 'snapshots'  # ExcelManager's data_dir/SNAPSHOT_DIR
+BLOCKS_DIR = 'blocks'
+PACKS_DIR = 'packs'
+RUNS_DIR = 'runs'
+INDEX_KEY = '__index__'
+SNAPSHOT_SHEETS = ('Daily Prices', 'Unadjusted Prices', 'Dividends')
+METRICS_SHEET = 'Metrics'
+BLOCK_DTYPE = np.dtype([('day', '<i8'), ('value', '<f8')])
+BLOCK_SUFFIX = '.blk'
+COMPRESSION_LEVEL = 6
+LOCK_NAME = 'store'  # Lock file store.lock in the root
+LOCK_TIMEOUT = 300
+
+
+def _write_atomic(path: Path, write):
+    """Write through a uniquely named temporary file and rename, so readers never see a partial file"""
+    with atomic_write(str(path)) as temp:
+        write(Path(temp))
+
+
+def _encode_block(block: np.ndarray) -> bytes:
+    """Delta-encode the days (mostly 1s and 3s) and store columns back to back before compressing"""
+    days = np.diff(block['day'], prepend=block['day'][:1]) if len(block) else block['day']
+    if len(block):
+        days[0] = block['day'][0]
+    return zlib.compress(days.astype('<i8').tobytes() + block['value'].astype('<f8').tobytes(), COMPRESSION_LEVEL)
+
+
+def _decode_block(data: bytes) -> np.ndarray:
+    raw = np.frombuffer(zlib.decompress(data), dtype='<i8')
+    rows = len(raw) // 2
+    block = np.empty(rows, dtype=BLOCK_DTYPE)
+    block['day'] = np.cumsum(raw[:rows])
+    block['value'] = raw[rows:].view('<f8')
+    return block
+
+
+class SnapshotStore:
+    """
+    Deduplicated run snapshots with retention and compaction
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        """
+        Args:
+            root: Store directory (created if needed)
+        """
+        self.root = Path(root)
+        self.blocks_dir = self.root / BLOCKS_DIR
+        self.packs_dir = self.root / PACKS_DIR
+        self.runs_dir = self.root / RUNS_DIR
+        for directory in (self.blocks_dir, self.packs_dir, self.runs_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._load_packs()
+
+    def _lock(self) -> FileLock:
+        return FileLock(str(self.root / LOCK_NAME), timeout=LOCK_TIMEOUT)
+
+    def _loose_blocks(self) -> List[Path]:
+        return [path for path in self.blocks_dir.glob(f'*/*{BLOCK_SUFFIX}') if not is_temp_file(path.name)]
+
+    def _load_packs(self):
+        """Read the pack indexes: hash -> (pack file, offset, length)"""
+        self.packed = {}
+        for index_path in sorted(self.packs_dir.glob('*.json')):
+            with open(index_path) as f:
+                for digest, (offset, length) in json.load(f).items():
+                    self.packed[digest] = (index_path.with_suffix('.bin'), offset, length)
+
+    def _block_path(self, digest: str) -> Path:
+        return self.blocks_dir / digest[:2] / f"{digest}{BLOCK_SUFFIX}"
+
+    def _put_block(self, block: np.ndarray, stats: Dict[str, int]) -> str:
+        """Store one block unless an identical one exists; return its hash"""
+        digest = hashlib.sha256(block.tobytes()).hexdigest()
+        path = self._block_path(digest)
+        if digest in self.packed or path.exists():
+            stats['blocks_reused'] += 1
+        else:
+            path.parent.mkdir(exist_ok=True)
+            data = _encode_block(block)
+            _write_atomic(path, lambda temp: temp.write_bytes(data))
+            stats['blocks_written'] += 1
+            stats['bytes_written'] += path.stat().st_size
+        return digest
+
+    def _block_bytes(self, digest: str) -> bytes:
+        if digest not in self.packed:
+            return self._block_path(digest).read_bytes()
+        pack, offset, length = self.packed[digest]
+        with open(pack, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def _get_block(self, digest: str) -> np.ndarray:
+        return _decode_block(self._block_bytes(digest))
+
+    def _put_series(self, days: np.ndarray, values: np.ndarray, stats: Dict[str, int]) -> List[str]:
+        """Split a day-numbered series into calendar-year blocks"""
+        years = days.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64)
+        bounds = np.flatnonzero(np.diff(years)) + 1
+        hashes = []
+        for chunk_days, chunk_values in zip(np.split(days, bounds), np.split(values, bounds)):
+            block = np.empty(len(chunk_days), dtype=BLOCK_DTYPE)
+            block['day'], block['value'] = chunk_days, chunk_values
+            hashes.append(self._put_block(block, stats))
+        return hashes
+
+    def _get_series(self, hashes: List[str]) -> np.ndarray:
+        blocks = [self._get_block(digest) for digest in hashes]
+        return np.concatenate(blocks) if blocks else np.empty(0, dtype=BLOCK_DTYPE)
+
+    def put_run(self, run_id: str, sheets: Dict[str, pd.DataFrame], metrics: Optional[pd.DataFrame] = None,
+                created: Optional[datetime] = None, source: Optional[str] = None) -> Dict[str, int]:
+        """
+        Snapshot one run (replacing an earlier snapshot with the same id)
+        Args:
+            run_id: Run identifier, normally the workbook stem
+            sheets: Sheet name -> date x ticker frame
+            metrics: Metrics sheet as written to the workbook
+            created: Run time (defaults to now)
+            source: Workbook the run came from
+        Returns:
+            Counts of blocks written and reused, and bytes written
+        """
+        with self._lock():
+            self._load_packs()  # A compaction may have repacked since this store was opened
+            return self._put_run(run_id, sheets, metrics, created, source)
+
+    def _put_run(self, run_id: str, sheets: Dict[str, pd.DataFrame], metrics: Optional[pd.DataFrame],
+                 created: Optional[datetime], source: Optional[str]) -> Dict[str, int]:
+        stats = {'blocks_written': 0, 'blocks_reused': 0, 'bytes_written': 0}
+        manifest = {'run_id': run_id, 'created': (created or datetime.now()).isoformat(),
+                    'source': source, 'tickers': [], 'sheets': {}}
+        tickers = []
+        for name, frame in sheets.items():
+            if frame is None or frame.empty:
+                manifest['sheets'][name] = {}
+                continue
+            frame = frame.sort_index()
+            days = pd.to_datetime(frame.index).to_numpy(dtype='datetime64[D]').astype(np.int64)
+            columns = {INDEX_KEY: self._put_series(days, np.zeros(len(days)), stats)}
+            for column in frame.columns:
+                values = frame[column].to_numpy(dtype=np.float64)
+                present = ~np.isnan(values)
+                columns[str(column)] = self._put_series(days[present], values[present], stats)
+                tickers.append(str(column))
+            manifest['sheets'][name] = columns
+        manifest['tickers'] = list(dict.fromkeys(tickers))
+
+        metrics_path = self.runs_dir / f"{run_id}.metrics.parquet"
+        if metrics is not None and not metrics.empty:
+            _write_atomic(metrics_path, lambda temp: arrow_safe(metrics).to_parquet(temp, index=False))
+            manifest['metrics'] = metrics_path.name
+        manifest_path = self.runs_dir / f"{run_id}.json"
+        _write_atomic(manifest_path, lambda temp: temp.write_text(json.dumps(manifest, indent=1)))
+        stats['bytes_written'] += manifest_path.stat().st_size
+        return stats
+
+    def snapshot_workbook(self, excel_path: str, run_id: Optional[str] = None) -> Optional[Dict[str, int]]:
+        """
+        Snapshot a dashboard workbook
+        Returns:
+            put_run statistics, or None if the workbook could not be read
+        """
+        try:
+            run_id = run_id or Path(excel_path).stem
+            with pd.ExcelFile(excel_path) as xls:
+                names = [name for name in SNAPSHOT_SHEETS + (METRICS_SHEET,) if name in xls.sheet_names]
+            frames = read_sheets(excel_path, names)
+            metrics = frames.pop(METRICS_SHEET, None)
+            frames = {name: frame.set_index(frame.columns[0]) if len(frame.columns) else frame
+                      for name, frame in frames.items()}
+            created = parse_run_name(excel_path)[0] or datetime.fromtimestamp(os.path.getmtime(excel_path))
+            return self.put_run(run_id, frames, metrics, created=created, source=os.path.basename(excel_path))
+        except Exception as e:
+            logger.error(f"Error snapshotting {excel_path}: {str(e)}")
+            return None
+
+    def import_directory(self, output_dir: str) -> pd.DataFrame:
+        """
+        Snapshot every workbook in a directory that is not yet stored
+        Returns:
+            One row of put_run statistics per imported workbook
+        """
+        stored = set(self.run_ids())
+        rows = []
+        for path in sorted(Path(output_dir).glob('*.xlsx')):
+            if path.stem in stored or is_temp_file(path.name):
+                continue
+            stats = self.snapshot_workbook(str(path))
+            if stats is not None:
+                rows.append({'run_id': path.stem, **stats})
+        return pd.DataFrame(rows)
+
+    def run_ids(self) -> List[str]:
+        return sorted(path.stem for path in self.runs_dir.glob('*.json') if not is_temp_file(path.name))
+
+    def manifest(self, run_id: str) -> dict:
+        with open(self.runs_dir / f"{run_id}.json") as f:
+            return json.load(f)
+
+    def runs(self) -> pd.DataFrame:
+        """Stored runs with creation time and tickers, oldest first"""
+        rows = []
+        for run_id in self.run_ids():
+            manifest = self.manifest(run_id)
+            rows.append({'run_id': run_id, 'created': pd.Timestamp(manifest['created']),
+                         'tickers': ','.join(manifest['tickers']), 'source': manifest.get('source')})
+        runs = pd.DataFrame(rows, columns=['run_id', 'created', 'tickers', 'source'])
+        return runs.sort_values('created', kind='stable').reset_index(drop=True)
+
+    def get_run(self, run_id: str) -> Dict[str, pd.DataFrame]:
+        """
+        Rebuild a run's sheets
+        Returns:
+            Sheet name -> date x ticker frame, plus 'Metrics' when stored
+        """
+        manifest = self.manifest(run_id)
+        sheets = {}
+        for name, columns in manifest['sheets'].items():
+            if not columns:
+                sheets[name] = pd.DataFrame()
+                continue
+            index_days = self._get_series(columns[INDEX_KEY])['day']
+            frame = pd.DataFrame(index=index_days)
+            for column, hashes in columns.items():
+                if column != INDEX_KEY:
+                    series = self._get_series(hashes)
+                    frame[column] = pd.Series(series['value'], index=series['day']).reindex(index_days).to_numpy()
+            frame.index = pd.DatetimeIndex(index_days.astype('datetime64[D]'))
+            sheets[name] = frame
+        if manifest.get('metrics'):
+            sheets[METRICS_SHEET] = pd.read_parquet(self.runs_dir / manifest['metrics'])
+        return sheets
+
+    def restore_workbook(self, run_id: str, excel_path: str) -> bool:
+        """Write a run back out as a workbook with its data and Metrics sheets"""
+        try:
+            sheets = self.get_run(run_id)
+            with pd.ExcelWriter(excel_path, engine='xlsxwriter') as writer:
+                for name, frame in sheets.items():
+                    if name == METRICS_SHEET:
+                        frame.to_excel(writer, sheet_name=name, index=False)
+                    else:
+                        frame.set_axis(frame.index.date).to_excel(writer, sheet_name=name)
+            return True
+        except Exception as e:
+            logger.error(f"Error restoring run {run_id}: {str(e)}")
+            return False
+
+    def delete_run(self, run_id: str):
+        """Remove a run's manifest and metrics (blocks are freed by compact())"""
+        for path in (self.runs_dir / f"{run_id}.json", self.runs_dir / f"{run_id}.metrics.parquet"):
+            if path.exists():
+                path.unlink()
+
+    def apply_retention(self, keep_last: int = 5, max_age_days: Optional[int] = 30, keep_daily: bool = True,
+                        now: Optional[datetime] = None) -> List[str]:
+        """
+        Delete runs outside the retention policy
+        A run is kept if any of these hold, per set of tickers:
+        - it is one of the keep_last newest runs of that ticker set
+        - it is younger than max_age_days
+        - keep_daily is set and it is the last run of its calendar day
+        Args:
+            keep_last: Newest runs to keep per ticker set
+            max_age_days: Keep every run younger than this (None to disable)
+            keep_daily: Keep the last run of each day
+            now: Reference time for ages (defaults to now)
+        Returns:
+            Deleted run ids
+        """
+        runs = self.runs()
+        if runs.empty:
+            return []
+        now = pd.Timestamp(now or datetime.now())
+        runs['ticker_set'] = runs['tickers'].map(lambda tickers: ','.join(sorted(tickers.split(','))))
+        runs = runs.sort_values('created', ascending=False, kind='stable')
+
+        keep = runs.groupby('ticker_set').cumcount() < keep_last
+        if max_age_days is not None:
+            keep |= runs['created'] >= now - timedelta(days=max_age_days)
+        if keep_daily:
+            keep |= ~runs.assign(day=runs['created'].dt.normalize()).duplicated(['ticker_set', 'day'])
+
+        deleted = runs.loc[~keep, 'run_id'].tolist()
+        for run_id in deleted:
+            self.delete_run(run_id)
+        logger.info(f"Retention removed {len(deleted)} of {len(runs)} runs")
+        return deleted
+
+    def _referenced(self) -> set:
+        referenced = set()
+        for run_id in self.run_ids():
+            for columns in self.manifest(run_id)['sheets'].values():
+                for hashes in columns.values():
+                    referenced.update(hashes)
+        return referenced
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Free blocks that no run references and pack the rest into one file
+        Loose blocks written after compaction started are left in place, so
+        a run being snapshotted at the same time keeps its blocks.
+        Returns:
+            Counts of blocks kept and removed, and bytes freed
+        """
+        with self._lock():
+            return self._compact()
+
+    def _compact(self) -> Dict[str, int]:
+        started = datetime.now().timestamp()
+        self._load_packs()
+        referenced = self._referenced()
+        loose = [path for path in self._loose_blocks() if path.stat().st_mtime < started]
+        old_packs = sorted(self.packs_dir.glob('*.bin'))
+        before = sum(path.stat().st_size for path in loose + old_packs)
+
+        stored = set(self.packed) | {path.stem for path in loose}
+        digests = sorted(referenced & stored)
+        stem = f"pack-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+        index, offset = {}, 0
+        with atomic_write(str(self.packs_dir / f"{stem}.bin")) as temp, open(temp, 'wb') as f:
+            for digest in digests:
+                data = self._block_bytes(digest)
+                f.write(data)
+                index[digest] = (offset, len(data))
+                offset += len(data)
+        _write_atomic(self.packs_dir / f"{stem}.json", lambda temp: temp.write_text(json.dumps(index)))
+
+        for path in old_packs:
+            path.with_suffix('.json').unlink(missing_ok=True)
+            path.unlink()
+        for path in loose:
+            path.unlink()
+        for path in list(self.blocks_dir.glob('*/~$*')) + list(self.runs_dir.glob('~$*')):
+            if path.stat().st_mtime < started:  # Left behind by an interrupted process
+                path.unlink()
+        for directory in self.blocks_dir.iterdir():
+            try:
+                directory.rmdir()  # Only succeeds once a prefix directory is empty
+            except OSError:
+                pass
+        self._load_packs()
+
+        return {'blocks_kept': len(digests), 'blocks_removed': len(stored) - len(digests), 'bytes_freed': before - offset}
+
+    def stats(self) -> Dict[str, float]:
+        """Stored size against the size the runs would take as separate copies"""
+        sizes = {digest: length for digest, (_, _, length) in self.packed.items()}
+        sizes.update({path.stem: path.stat().st_size for path in self._loose_blocks()})
+        logical = 0
+        run_ids = self.run_ids()
+        for run_id in run_ids:
+            for columns in self.manifest(run_id)['sheets'].values():
+                logical += sum(sizes.get(digest, 0) for hashes in columns.values() for digest in hashes)
+        stored = sum(sizes.values())
+        return {'runs': len(run_ids), 'blocks': len(sizes), 'stored_bytes': stored,
+                'logical_bytes': logical, 'dedup_ratio': logical / stored if stored else 0.0}
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point for importing, compacting and inspecting a store"""
+    parser = argparse.ArgumentParser(description="Deduplicated run snapshot store")
+    parser.add_argument('--root', default=str(DEFAULT_ROOT),
+                        help="Store directory (default: the one ExcelManager writes, %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help="Snapshot every new workbook in a directory")
+    import_parser.add_argument('output_dir')
+    compact_parser = commands.add_parser('compact', help="Apply the retention policy and free unreferenced blocks")
+    compact_parser.add_argument('--keep-last', type=int, default=5)
+    compact_parser.add_argument('--max-age-days', type=int, default=30)
+    compact_parser.add_argument('--no-keep-daily', action='store_true')
+    commands.add_parser('stats', help="Show run, block and deduplication counts")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.root)
+    if args.command == 'import':
+        imported = store.import_directory(args.output_dir)
+        print(f"Imported {len(imported)} runs, "
+              f"{int(imported['bytes_written'].sum()) if len(imported) else 0} bytes written")
+    elif args.command == 'compact':
+        deleted = store.apply_retention(args.keep_last, args.max_age_days, not args.no_keep_daily)
+        result = store.compact()
+        print(f"Removed {len(deleted)} runs and {result['blocks_removed']} blocks ({result['bytes_freed']} bytes)")
+    print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Trading Calendar
+NYSE sessions, holidays and half days computed from the exchange's rules,
+plus the canonical date index every sheet and matrix is aligned to.
+
+Holiday rules (weekend dates move to Friday / Monday):
+- New Year's Day (not moved back to Friday when it falls on a Saturday)
+- Martin Luther King Jr. Day, 3rd Monday of January (from 1998)
+- Washington's Birthday, 3rd Monday of February
+- Good Friday
+- Memorial Day, last Monday of May
+- Juneteenth, June 19 (from 2022)
+- Independence Day, July 4
+- Labor Day, 1st Monday of September
+- Thanksgiving, 4th Thursday of November
+- Christmas, December 25
+plus one-off closures (SPECIAL_CLOSURES).
+
+Half days (1:00 pm close): July 3 before a weekday Independence Day, the day
+after Thanksgiving and Christmas Eve on Monday to Thursday.
+
+Day ordinals number sessions consecutively from CALENDAR_START, so "N trading
+days back" is integer arithmetic instead of a date search.
+"""
+import pandas as pd
+import numpy as np
+import logging
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_START = '1990-01-01'
+
+SPECIAL_CLOSURES = [
+    '1994-04-27',  # President Nixon
+    '2001-09-11', '2001-09-12', '2001-09-13', '2001-09-14',  # September 11
+    '2004-06-11',  # President Reagan
+    '2007-01-02',  # President Ford
+    '2012-10-29', '2012-10-30',  # Hurricane Sandy
+    '2018-12-05',  # President G.H.W. Bush
+    '2025-01-09',  # President Carter
+]
+
+
+def easter_sunday(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    day = (h + l - 7 * m + 33 * month + 19) % 32
+    return date(year, month, day)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th given weekday (Monday = 0) of a month; n = -1 for the last"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays close the Friday before, Sunday holidays the Monday after"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def _year_holidays(year: int) -> tuple:
+    """Regular NYSE holidays in one year"""
+    days = []
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.append(_observed(new_year))
+    if year >= 1998:
+        days.append(_nth_weekday(year, 1, 0, 3))
+    days.append(_nth_weekday(year, 2, 0, 3))
+    days.append(easter_sunday(year) - timedelta(days=2))
+    days.append(_nth_weekday(year, 5, 0, -1))
+    if year >= 2022:
+        days.append(_observed(date(year, 6, 19)))
+    days.append(_observed(date(year, 7, 4)))
+    days.append(_nth_weekday(year, 9, 0, 1))
+    days.append(_nth_weekday(year, 11, 3, 4))
+    days.append(_observed(date(year, 12, 25)))
+    return tuple(days)
+
+
+@lru_cache(maxsize=None)
+def _year_half_days(year: int) -> tuple:
+    """Scheduled 1:00 pm closes in one year"""
+    days = []
+    july_3 = date(year, 7, 3)
+    if july_3.weekday() < 4:
+        days.append(july_3)
+    days.append(_nth_weekday(year, 11, 3, 4) + timedelta(days=1))
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 4:
+        days.append(christmas_eve)
+    return tuple(days)
+
+
+class TradingCalendar:
+    """
+    NYSE trading calendar with session ordinals
+    """
+
+    def __init__(self, start: str = CALENDAR_START, end: Optional[str] = None):
+        """
+        Initialize calendar
+        Args:
+            start: First date covered by ordinals
+            end: Last date covered (defaults to five years after today)
+        """
+        self.start = pd.Timestamp(start)
+        self.end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize() + pd.DateOffset(years=5)
+        self._sessions = pd.bdate_range(self.start, self.end, freq='C',
+                                        holidays=self.holidays(self.start.year, self.end.year))
+
+    def holidays(self, start_year: int, end_year: int) -> pd.DatetimeIndex:
+        """Full-day closures (regular holidays and special closures) in a year range"""
+        days = [d for year in range(start_year, end_year + 1) for d in _year_holidays(year)]
+        special = pd.to_datetime(SPECIAL_CLOSURES)
+        special = special[(special.year >= start_year) & (special.year <= end_year)]
+        return pd.DatetimeIndex(pd.to_datetime(days)).append(special).sort_values()
+
+    def half_days(self, start_year: int, end_year: int) -> pd.DatetimeIndex:
+        """Scheduled early closes in a year range"""
+        days = [d for year in range(start_year, end_year + 1) for d in _year_half_days(year)]
+        return pd.DatetimeIndex(pd.to_datetime(days))
+
+    def sessions(self, start=None, end=None) -> pd.DatetimeIndex:
+        """Trading days between start and end (inclusive)"""
+        first = 0 if start is None else self._sessions.searchsorted(pd.Timestamp(start), side='left')
+        last = len(self._sessions) if end is None else self._sessions.searchsorted(pd.Timestamp(end), side='right')
+        return self._sessions[first:last]
+
+    def is_session(self, dates) -> np.ndarray:
+        """Boolean mask of dates that are trading days"""
+        dates = _as_datetime_index(dates)
+        return self._sessions.get_indexer(dates) >= 0
+
+    def day_ordinals(self, dates) -> np.ndarray:
+        """
+        Integer session number of each date (0 = first session on or after start)
+        Non-sessions get the ordinal of the previous session, so differences
+        still count trading days; dates before the calendar start get -1.
+        """
+        dates = _as_datetime_index(dates)
+        return self._sessions.searchsorted(dates, side='right') - 1
+
+    def union_index(self, indexes: Iterable, fill_sessions: bool = False) -> pd.DatetimeIndex:
+        """
+        Canonical sorted date index covering every input index
+        Args:
+            indexes: Date indexes (DatetimeIndex, date objects or strings)
+            fill_sessions: Also include every session in the covered span, so
+                a missing quote shows up as a NaN row
+        Returns:
+            Sorted, de-duplicated DatetimeIndex
+        """
+        parts = [_as_datetime_index(index) for index in indexes if index is not None and len(index)]
+        if not parts:
+            return pd.DatetimeIndex([])
+        values = np.unique(np.concatenate([part.to_numpy(dtype='datetime64[ns]') for part in parts]))
+        union = pd.DatetimeIndex(values)
+        off_calendar = union[~self.is_session(union)]
+        if len(off_calendar):
+            logger.info(f"{len(off_calendar)} dates outside the trading calendar kept, first {off_calendar[0].date()}")
+        if fill_sessions:
+            union = union.union(self.sessions(union[0], union[-1]))
+        return union
+
+    def align(self, frame: pd.DataFrame, index: pd.DatetimeIndex) -> pd.DataFrame:
+        """Reindex a date-indexed frame onto a canonical index (NaN where absent)"""
+        aligned = frame.copy()
+        aligned.index = _as_datetime_index(frame.index)
+        aligned = aligned[~aligned.index.duplicated(keep='last')]
+        return aligned.reindex(index)
+
+
+def _as_datetime_index(dates) -> pd.DatetimeIndex:
+    """Normalized, timezone-naive DatetimeIndex from dates, datetimes or strings"""
+    index = pd.DatetimeIndex(pd.to_datetime(list(dates) if not isinstance(dates, pd.Index) else dates))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+nyse_calendar = TradingCalendar()
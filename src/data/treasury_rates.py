@@ -1,16 +1,42 @@
 """
 Treasury Rate Manager
 Handles fetching and caching of Treasury rates for risk-free rate calculations
+
+The 13-week bill series is the 'irx' column of the shared risk-free rate
+cache (RiskFreeRate); this manager reads and extends it rather than keeping
+a second copy.
+
+Besides the 13-week bill series, the manager keeps a daily multi-tenor curve
+(^IRX, ^FVX, ^TNX, ^TYX), one column per tenor in years. The longer tenors
+are stored in one parquet file; the 3-month tenor is the same 'irx' store.
+Rates for any tenor are interpolated linearly between the two neighbouring
+tenors (flat beyond the ends) for all dates at once, so bond ETFs can be
+measured against a duration-matched rate. New curve rates are upserted into
+the warehouse's rates table under their yield ticker, in the same warehouse
+as the 'irx' rates.
 """
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import os
 import logging
 from pathlib import Path
+from typing import Optional, Sequence, Union
+from ..models.risk_free_rate import RiskFreeRate, DEFAULT_CACHE_DIR, DEFAULT_RATE, get_risk_free_service
+from .warehouse import Warehouse
 
 logger = logging.getLogger(__name__)
 
+# Yield index ticker -> tenor in years
+CURVE_TICKERS = {'^IRX': 0.25, '^FVX': 5.0, '^TNX': 10.0, '^TYX': 30.0}
+TENOR_TICKERS = {tenor: ticker for ticker, tenor in CURVE_TICKERS.items()}
+SHARED_TICKER = '^IRX'  # Served by the risk-free rate store, not the curve file
+CURVE_START = '2000-01-01'  # First date fetched for an empty curve
+
+# Approximate effective duration (years) of the bond ETFs we track
+ETF_DURATIONS = {'BIL': 0.15, 'SHV': 0.3, 'IEI': 4.3, 'IEF': 7.0, 'TLT': 16.5}
+
 class TreasuryRateManager:
     """Manages Treasury rate data for risk-free rate calculations"""
     
@@ -20,33 +46,20 @@ class TreasuryRateManager:
         Args:
             cache_dir: Directory to store cached rates. If None, uses default
         """
-        if cache_dir is None:
-            cache_dir = Path("data/treasury_rates")
-        self.cache_dir = Path(cache_dir)
-        self.cache_file = self.cache_dir / "treasury_rates.parquet"
+        # The default directory shares the process-wide ^IRX service
+        self.irx = get_risk_free_service('irx') if cache_dir is None else \
+            RiskFreeRate('irx', cache_dir=cache_dir, auto_refresh=False)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
         self.ticker = "^IRX"  # 13-week Treasury Bill
+        self.curve_file = self.cache_dir / "treasury_curve.parquet"
+        self.warehouse_path = self.irx.warehouse_path
+        self._curve = None  # In-memory copy of the curve file (tenors other than SHARED_TICKER)
         self._ensure_cache_dir()
         
     def _ensure_cache_dir(self):
         """Ensure cache directory exists"""
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
-    def _load_cached_rates(self) -> pd.DataFrame:
-        """Load cached rates from parquet file"""
-        if self.cache_file.exists():
-            try:
-                return pd.read_parquet(self.cache_file)
-            except Exception as e:
-                logger.error(f"Error loading cached rates: {e}")
-        return pd.DataFrame()
-        
-    def _save_rates_cache(self, rates: pd.DataFrame):
-        """Save rates to cache file"""
-        try:
-            rates.to_parquet(self.cache_file)
-        except Exception as e:
-            logger.error(f"Error saving rates cache: {e}")
-            
     def get_treasury_rates(self, start_date: datetime, end_date: datetime) -> pd.Series:
         """
         Get Treasury rates for date range, using cache when possible
@@ -56,46 +69,14 @@ class TreasuryRateManager:
         Returns:
             Series of daily Treasury rates (as decimals)
         """
-        # Load cached data
-        cached_rates = self._load_cached_rates()
-        
-        # Convert dates to pandas datetime
         start_date = pd.to_datetime(start_date)
         end_date = pd.to_datetime(end_date)
-        
-        # Initialize result series
-        result = pd.Series(dtype=float)
-        
-        # If we have cached data, use it
-        if not cached_rates.empty:
-            cached_rates.index = pd.to_datetime(cached_rates.index)
-            result = cached_rates[start_date:end_date]
-        
-        # If we're missing any dates, fetch from yfinance
-        if result.empty or (end_date - result.index[-1]).days > 1:
-            fetch_start = start_date
-            if not result.empty:
-                fetch_start = result.index[-1] + timedelta(days=1)
-                
-            try:
-                treasury = yf.Ticker(self.ticker)
-                new_rates = treasury.history(start=fetch_start, end=end_date + timedelta(days=1))
-                if not new_rates.empty:
-                    # Convert percentage to decimal
-                    new_rates = new_rates['Close'] / 100.0
-                    
-                    # Combine with cached data
-                    if result.empty:
-                        result = new_rates
-                    else:
-                        result = pd.concat([result, new_rates])
-                    
-                    # Update cache with all data
-                    self._save_rates_cache(result)
-            except Exception as e:
-                logger.error(f"Error fetching Treasury rates: {e}")
-        
-        return result
+
+        # The shared cache holds the full history from HISTORY_START; only days after it are fetched
+        cached = self.irx.history()
+        if cached.empty or (end_date - cached.index[-1]).days > 1:
+            self.irx.refresh(end_date)
+        return self.irx.history(start_date, end_date).rename('rate')
         
     def get_current_rate(self) -> float:
         """
@@ -109,4 +90,160 @@ class TreasuryRateManager:
         rates = self.get_treasury_rates(start_date, end_date)
         if not rates.empty:
             return rates.iloc[-1]
-        return 0.03  # Fallback to 3% if unable to get rate
+        return DEFAULT_RATE  # Fallback to 3% if unable to get rate
+
+    def _load_tenors(self) -> pd.DataFrame:
+        """Curve file tenors from memory, reading the parquet file on first use"""
+        if self._curve is None:
+            curve = pd.DataFrame()
+            if self.curve_file.exists():
+                try:
+                    curve = pd.read_parquet(self.curve_file)
+                    curve.columns = curve.columns.astype(float)
+                    # Files written before the 3-month tenor moved to the shared store
+                    curve = curve.drop(columns=[CURVE_TICKERS[SHARED_TICKER]], errors='ignore')
+                except Exception as e:
+                    logger.error(f"Error loading cached curve: {e}")
+            self._curve = curve
+        return self._curve
+
+    def _load_curve(self) -> pd.DataFrame:
+        """Full curve: the shared 3-month series joined with the curve file tenors"""
+        tenors = self._load_tenors()
+        short = self.irx.history().rename(CURVE_TICKERS[SHARED_TICKER])
+        if short.empty:
+            return tenors
+        short.index = pd.DatetimeIndex(short.index)
+        curve = short.to_frame().join(tenors, how='outer') if not tenors.empty else short.to_frame()
+        curve.index.name = tenors.index.name if not tenors.empty else 'date'
+        return curve[sorted(curve.columns)]
+
+    def _store_curve(self, curve: pd.DataFrame):
+        """Keep the merged curve file tenors in memory and on disk"""
+        curve = curve.drop(columns=[CURVE_TICKERS[SHARED_TICKER]], errors='ignore')
+        curve = curve[~curve.index.duplicated(keep='last')].sort_index()
+        self._curve = curve[sorted(curve.columns)]
+        try:
+            stored = self._curve.copy()
+            stored.columns = [str(tenor) for tenor in stored.columns]  # Parquet needs string names
+            stored.index.name = 'date'
+            stored.to_parquet(self.curve_file)
+        except Exception as e:
+            logger.error(f"Error saving curve cache: {e}")
+
+    def _store_in_warehouse(self, rates: pd.DataFrame):
+        """Upsert new curve rates (dates x tenor years) under their yield tickers"""
+        try:
+            warehouse = Warehouse(str(self.warehouse_path))
+            for tenor, column in rates.items():
+                warehouse.store_rates(TENOR_TICKERS.get(tenor, str(tenor)), column)
+        except Exception as e:
+            logger.warning(f"Could not store curve rates in warehouse: {e}")
+
+    def update_curve(self, end_date: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Append the days after each tenor's last cached date
+        Args:
+            end_date: Last date to fetch (defaults to today)
+        Returns:
+            Full cached curve (dates x tenor years, decimals)
+        """
+        curve = self._load_tenors()
+        end_date = pd.to_datetime(end_date if end_date is not None else datetime.now()).normalize()
+        self.irx.refresh(end_date)  # 3-month tenor: appends to the shared store
+        new_columns = {}
+        for ticker, tenor in CURVE_TICKERS.items():
+            if ticker == SHARED_TICKER:
+                continue
+            known = curve[tenor].dropna() if tenor in curve.columns else pd.Series(dtype=float)
+            fetch_start = known.index[-1] + timedelta(days=1) if not known.empty else pd.Timestamp(CURVE_START)
+            if fetch_start > end_date:
+                continue
+            try:
+                history = yf.Ticker(ticker).history(start=fetch_start, end=end_date + timedelta(days=1))
+                if not history.empty:
+                    rates = history['Close'] / 100.0
+                    rates.index = pd.to_datetime(rates.index.date)
+                    new_columns[tenor] = rates
+            except Exception as e:
+                logger.error(f"Error fetching {ticker} curve rates: {e}")
+
+        if new_columns:
+            new_rates = pd.DataFrame(new_columns)
+            self._store_curve(new_rates.combine_first(curve) if not curve.empty else new_rates)
+            self._store_in_warehouse(new_rates)
+        return self._load_curve()
+
+    def load_curve_csv(self, csv_path: str) -> pd.DataFrame:
+        """
+        Merge a local curve file in place of downloads
+        Args:
+            csv_path: CSV with a date column and one column per yield ticker
+                (^IRX, ^FVX, ...) or tenor in years, in decimals
+        Returns:
+            Full cached curve
+        """
+        frame = pd.read_csv(csv_path, parse_dates=['date']).set_index('date')
+        frame.columns = [CURVE_TICKERS.get(column, column) for column in frame.columns]
+        frame.columns = frame.columns.astype(float)
+        short = CURVE_TICKERS[SHARED_TICKER]
+        if short in frame.columns:
+            self.irx.merge(frame.pop(short))
+        curve = self._load_tenors()
+        self._store_curve(frame.combine_first(curve) if not curve.empty else frame)
+        self._store_in_warehouse(frame)
+        return self._load_curve()
+
+    def get_curve(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """Cached curve between two dates (dates x tenor years)"""
+        return self._load_curve().loc[start_date:end_date].copy()
+
+    def interpolate_rates(self, tenors: Union[float, Sequence[float]],
+                          index=None) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Rates for arbitrary tenors from the cached curve
+        Args:
+            tenors: Tenor in years, or several tenors
+            index: Dates to align to (last curve date on or before each);
+                defaults to the curve's own dates
+        Returns:
+            Series for a single tenor, DataFrame (dates x tenors) for several
+        """
+        curve = self._load_curve()
+        single = np.ndim(tenors) == 0
+        targets = np.atleast_1d(np.asarray(tenors, dtype=float))
+        if curve.empty:
+            rates = np.full((0 if index is None else len(index), len(targets)), np.nan)
+            dates = pd.DatetimeIndex([]) if index is None else pd.Index(index)
+        else:
+            curve = curve.ffill()
+            if index is not None:
+                dates = pd.Index(index)
+                curve = curve.reindex(pd.to_datetime(dates), method='ffill')
+            else:
+                dates = curve.index
+            points = curve.columns.to_numpy(dtype=float)
+            values = curve.to_numpy(dtype=float)
+            # Neighbouring tenors and weights, clipped so the ends stay flat
+            upper = np.clip(np.searchsorted(points, targets), 1, len(points) - 1) if len(points) > 1 \
+                else np.zeros(len(targets), dtype=int)
+            lower = np.maximum(upper - 1, 0)
+            span = np.where(points[upper] > points[lower], points[upper] - points[lower], 1.0)
+            weight = np.clip((targets - points[lower]) / span, 0.0, 1.0)
+            rates = values[:, lower] * (1 - weight) + values[:, upper] * weight
+
+        if single:
+            return pd.Series(rates[:, 0], index=dates, name=float(targets[0]))
+        return pd.DataFrame(rates, index=dates, columns=targets)
+
+    def duration_matched_rates(self, ticker: str, index=None) -> pd.Series:
+        """
+        Curve rate at a bond ETF's duration (13-week rate for other tickers)
+        Args:
+            ticker: ETF ticker (see ETF_DURATIONS)
+            index: Dates to align to
+        Returns:
+            Series of annual rates as decimals
+        """
+        tenor = ETF_DURATIONS.get(ticker, CURVE_TICKERS['^IRX'])
+        return self.interpolate_rates(tenor, index).rename(ticker)
@@ -0,0 +1,324 @@
+"""
+SQLite Warehouse
+Embedded, serverless store of everything the pipeline produces, so questions
+like "all runs where JNK Sharpe > 1" or "dividend history of every high-yield
+ETF" are answered by an indexed query instead of opening workbooks.
+
+Tables:
+- runs: one row per dashboard workbook (run_id = workbook file stem), with
+  the run time and the file's mtime/size when it was loaded, so RunIndex
+  reloads only workbooks that changed
+- prices: adjusted and unadjusted closes, keyed (ticker, date)
+- actions: dividends and splits, keyed (ticker, date, action)
+- metadata: ETF metadata, keyed ticker; ETFManager.get_metadata upserts
+  each batch it fetches
+- metrics: Metrics sheet in long form, keyed (run_id, ticker, metric);
+  numeric values in value, text (e.g. Name) in text_value
+- rates: risk-free and curve rates, keyed (source, date); RiskFreeRate
+  stores its sources ('irx', 'bil', ...) on refresh and TreasuryRateManager
+  its curve tenors by yield ticker ('^FVX', ...)
+
+Dates are ISO strings, so range filters use the primary-key indexes.
+Writes are upserts, so re-ingesting a workbook or a refreshed series is safe.
+The default file is the one ExcelManager loads after each save
+(Test Output/warehouse.sqlite under the project root).
+"""
+import pandas as pd
+import numpy as np
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable, List, Optional
+from ..models.adjustment import actions_from_dividends
+from .sidecar import read_sheet, read_sheets
+from .atomic_io import parse_run_name
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+WAREHOUSE_FILE = 'warehouse.sqlite'
+DEFAULT_WAREHOUSE = PROJECT_ROOT / 'Test Output' / WAREHOUSE_FILE  # ExcelManager's data_dir/WAREHOUSE_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY, workbook TEXT, tickers TEXT, loaded_at TEXT,
+    created TEXT, mtime_ns INTEGER, size INTEGER);
+CREATE TABLE IF NOT EXISTS prices (
+    ticker TEXT, date TEXT, adj_close REAL, close REAL,
+    PRIMARY KEY (ticker, date)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS actions (
+    ticker TEXT, date TEXT, action TEXT, value REAL,
+    PRIMARY KEY (ticker, date, action)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS metadata (
+    ticker TEXT PRIMARY KEY, quote_type TEXT, name TEXT, category TEXT,
+    aum REAL, avg_volume REAL, expense_ratio REAL, fetched_at TEXT);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT, ticker TEXT, metric TEXT, value REAL, text_value TEXT,
+    PRIMARY KEY (run_id, ticker, metric)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS metrics_by_metric ON metrics (metric, ticker, value);
+CREATE TABLE IF NOT EXISTS rates (
+    source TEXT, date TEXT, rate REAL,
+    PRIMARY KEY (source, date)) WITHOUT ROWID;
+"""
+
+RUN_COLUMNS = {'created': 'TEXT', 'mtime_ns': 'INTEGER', 'size': 'INTEGER'}  # Added after the first release
+METADATA_COLUMNS = ['ticker', 'quote_type', 'name', 'category', 'aum', 'avg_volume', 'expense_ratio', 'fetched_at']
+COMPARISONS = {'>', '>=', '<', '<=', '=', '!='}
+
+
+def _iso_dates(index) -> List[str]:
+    return list(pd.DatetimeIndex(pd.to_datetime(index)).strftime('%Y-%m-%d'))
+
+
+def _long_prices(frame: pd.DataFrame, value_name: str) -> pd.DataFrame:
+    """Wide date x ticker frame to (ticker, date, value) rows without NaNs"""
+    if frame is None or frame.empty:
+        return pd.DataFrame(columns=['ticker', 'date', value_name])
+    wide = frame.copy()
+    wide.index = _iso_dates(wide.index)
+    long = wide.rename_axis('date').reset_index().melt(id_vars='date', var_name='ticker', value_name=value_name)
+    return long.dropna(subset=[value_name])[['ticker', 'date', value_name]]
+
+
+class Warehouse:
+    """
+    Query and load API over the SQLite warehouse file
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (and create if needed) a warehouse
+        Args:
+            path: SQLite file. If None, uses default
+        """
+        self.path = Path(path) if path is not None else DEFAULT_WAREHOUSE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+            for column, sql_type in RUN_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {sql_type}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")   # Dashboard reads while the pipeline writes
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _upsert(self, conn: sqlite3.Connection, table: str, columns: List[str], rows: Iterable[tuple]):
+        placeholders = ', '.join('?' for _ in columns)
+        conn.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+    # Loading
+
+    def store_prices(self, adj_prices: Optional[pd.DataFrame], unadj_prices: Optional[pd.DataFrame] = None):
+        """Upsert adjusted and unadjusted closes (date x ticker frames)"""
+        adj = _long_prices(adj_prices, 'adj_close')
+        close = _long_prices(unadj_prices, 'close')
+        rows = adj.merge(close, on=['ticker', 'date'], how='outer')
+        rows = rows.astype(object).where(rows.notna(), None)
+        # A frame missing one side (or a NaN cell) keeps the stored value
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO prices (ticker, date, adj_close, close) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(ticker, date) DO UPDATE SET "
+                "adj_close = COALESCE(excluded.adj_close, adj_close), close = COALESCE(excluded.close, close)",
+                rows.itertuples(index=False))
+
+    def store_actions(self, actions: pd.DataFrame):
+        """Upsert corporate actions (date, ticker, action, value columns)"""
+        if actions is None or actions.empty:
+            return
+        rows = zip(actions['ticker'], _iso_dates(actions['date']), actions['action'], actions['value'].astype(float))
+        with closing(self._connect()) as conn, conn:
+            self._upsert(conn, 'actions', ['ticker', 'date', 'action', 'value'], rows)
+
+    def store_dividends(self, dividends: Optional[pd.DataFrame]):
+        """Upsert a sparse 'Dividends' sheet"""
+        self.store_actions(actions_from_dividends(dividends))
+
+    def store_metadata(self, metadata: pd.DataFrame):
+        """Upsert ETF metadata (ETFManager.get_metadata output)"""
+        if metadata is None or metadata.empty:
+            return
+        frame = metadata.reset_index() if 'ticker' not in metadata.columns else metadata.copy()
+        frame = frame.reindex(columns=METADATA_COLUMNS)
+        frame['fetched_at'] = frame['fetched_at'].astype(str)
+        frame = frame.astype(object).where(frame.notna(), None)
+        with closing(self._connect()) as conn, conn:
+            self._upsert(conn, 'metadata', METADATA_COLUMNS, frame.itertuples(index=False))
+
+    def store_metrics(self, run_id: str, metrics: pd.DataFrame):
+        """
+        Replace one run's metrics
+        Args:
+            run_id: Run identifier
+            metrics: Metrics sheet (Ticker column plus one column per metric)
+        """
+        frame = metrics.set_index('Ticker') if 'Ticker' in metrics.columns else metrics
+        rows = []
+        for ticker, row in frame.iterrows():
+            for metric, value in row.items():
+                if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+                    rows.append((run_id, str(ticker), str(metric), None if pd.isna(value) else float(value), None))
+                elif not pd.isna(value):
+                    rows.append((run_id, str(ticker), str(metric), None, str(value)))
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM metrics WHERE run_id = ?", (run_id,))
+            self._upsert(conn, 'metrics', ['run_id', 'ticker', 'metric', 'value', 'text_value'], rows)
+
+    def store_rates(self, source: str, rates: pd.Series):
+        """Upsert a date-indexed rate series under a source name"""
+        rates = rates.dropna()
+        with closing(self._connect()) as conn, conn:
+            self._upsert(conn, 'rates', ['source', 'date', 'rate'],
+                         zip([source] * len(rates), _iso_dates(rates.index), rates.astype(float)))
+
+    def load_workbook(self, excel_path: str, run_id: Optional[str] = None) -> bool:
+        """
+        Ingest a dashboard workbook as one run
+        Args:
+            excel_path: Workbook written by ExcelManager
+            run_id: Run identifier (defaults to the file stem)
+        Returns:
+            True if loaded
+        """
+        try:
+            run_id = run_id or os.path.splitext(os.path.basename(excel_path))[0]
+            sheets = read_sheets(excel_path, ['Daily Prices', 'Unadjusted Prices', 'Dividends'], index_col=0)
+            self.store_prices(sheets['Daily Prices'], sheets['Unadjusted Prices'])
+            self.store_dividends(sheets['Dividends'])
+            try:
+                metrics = read_sheet(excel_path, 'Metrics')
+                self.store_metrics(run_id, metrics.rename(columns={metrics.columns[0]: 'Ticker'}))
+            except ValueError:
+                logger.warning(f"No Metrics sheet in {excel_path}")
+            tickers = ','.join(str(ticker) for ticker in sheets['Daily Prices'].columns)
+            stat = os.stat(excel_path)
+            created = parse_run_name(excel_path)[0] or pd.Timestamp(stat.st_mtime, unit='s')
+            with closing(self._connect()) as conn, conn:
+                self._upsert(conn, 'runs', ['run_id', 'workbook', 'tickers', 'loaded_at', 'created', 'mtime_ns', 'size'],
+                             [(run_id, os.path.abspath(excel_path), tickers, pd.Timestamp.now().isoformat(),
+                               pd.Timestamp(created).isoformat(), stat.st_mtime_ns, stat.st_size)])
+            return True
+        except Exception as e:
+            logger.error(f"Error loading {excel_path} into warehouse: {str(e)}")
+            return False
+
+    def delete_run(self, run_id: str):
+        """Remove a run and its metrics (prices and actions are shared between runs and kept)"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM metrics WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    # Queries
+
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        """Run a read-only SQL query"""
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def prices(self, tickers: List[str], start=None, end=None, column: str = 'adj_close') -> pd.DataFrame:
+        """
+        Date x ticker closes
+        Args:
+            tickers: Tickers to return
+            start: First date (inclusive)
+            end: Last date (inclusive)
+            column: 'adj_close' or 'close'
+        Returns:
+            Wide DataFrame indexed by date
+        """
+        if column not in ('adj_close', 'close'):
+            raise ValueError(f"Unknown price column: {column}")
+        start = _iso_dates([start])[0] if start is not None else '0000-01-01'
+        end = _iso_dates([end])[0] if end is not None else '9999-12-31'
+        frames = []
+        for ticker in tickers:
+            rows = self.query(f"SELECT date, {column} FROM prices WHERE ticker = ? AND date BETWEEN ? AND ? "
+                              "ORDER BY date", (ticker, start, end))
+            frames.append(rows.set_index('date')[column].rename(ticker))
+        result = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+        result.index = pd.to_datetime(result.index)
+        return result.sort_index()
+
+    def dividends(self, tickers: Optional[List[str]] = None, category: Optional[str] = None) -> pd.DataFrame:
+        """
+        Dividend history, optionally for tickers or a metadata category
+        Returns:
+            DataFrame with ticker, date, value
+        """
+        sql = "SELECT a.ticker, a.date, a.value FROM actions a"
+        where, params = ["a.action = 'dividend'"], []
+        if category is not None:
+            sql += " JOIN metadata m ON m.ticker = a.ticker"
+            where.append("m.category = ?")
+            params.append(category)
+        if tickers:
+            where.append(f"a.ticker IN ({', '.join('?' for _ in tickers)})")
+            params.extend(tickers)
+        result = self.query(f"{sql} WHERE {' AND '.join(where)} ORDER BY a.ticker, a.date", tuple(params))
+        result['date'] = pd.to_datetime(result['date'])
+        return result
+
+    def runs(self) -> pd.DataFrame:
+        """
+        Loaded runs, oldest first
+        Returns:
+            DataFrame with run_id, workbook, created, tickers, mtime_ns, size
+            and has_metrics
+        """
+        runs = self.query("SELECT r.run_id, r.workbook, r.created, r.tickers, r.mtime_ns, r.size, "
+                          "EXISTS (SELECT 1 FROM metrics m WHERE m.run_id = r.run_id) AS has_metrics "
+                          "FROM runs r ORDER BY r.created, r.run_id")
+        runs['created'] = pd.to_datetime(runs['created'], format='ISO8601')
+        runs['has_metrics'] = runs['has_metrics'].astype(bool)
+        return runs
+
+    def runs_where(self, metric: str, op: str, value: float, ticker: Optional[str] = None) -> pd.DataFrame:
+        """
+        Runs whose metric passes a comparison, e.g. ('Sharpe 2Y', '>', 1, 'JNK')
+        Returns:
+            DataFrame with run_id, ticker, value, workbook
+        """
+        if op not in COMPARISONS:
+            raise ValueError(f"Unknown comparison: {op}")
+        sql = ("SELECT m.run_id, m.ticker, m.value, r.workbook FROM metrics m "
+               "LEFT JOIN runs r ON r.run_id = m.run_id "
+               f"WHERE m.metric = ? AND m.value {op} ?")
+        params = [metric, value]
+        if ticker is not None:
+            sql += " AND m.ticker = ?"
+            params.append(ticker)
+        return self.query(sql + " ORDER BY m.run_id", tuple(params))
+
+    def metric_history(self, metric: str, tickers: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        One metric across runs
+        Returns:
+            run_id x ticker DataFrame of values
+        """
+        sql = "SELECT run_id, ticker, value FROM metrics WHERE metric = ?"
+        params = [metric]
+        if tickers:
+            sql += f" AND ticker IN ({', '.join('?' for _ in tickers)})"
+            params.extend(tickers)
+        rows = self.query(sql, tuple(params))
+        return rows.pivot(index='run_id', columns='ticker', values='value').sort_index()
+
+    def last_rate_date(self, source: str) -> Optional[pd.Timestamp]:
+        """Last stored date of a rate source (None if it has no rates)"""
+        with closing(self._connect()) as conn:
+            last = conn.execute("SELECT MAX(date) FROM rates WHERE source = ?", (source,)).fetchone()[0]
+        return pd.Timestamp(last) if last is not None else None
+
+    def rates(self, source: str, start=None, end=None) -> pd.Series:
+        """Stored rate series for a source"""
+        start = _iso_dates([start])[0] if start is not None else '0000-01-01'
+        end = _iso_dates([end])[0] if end is not None else '9999-12-31'
+        rows = self.query("SELECT date, rate FROM rates WHERE source = ? AND date BETWEEN ? AND ? ORDER BY date",
+                          (source, start, end))
+        return pd.Series(rows['rate'].to_numpy(), index=pd.to_datetime(rows['date']), name=source)
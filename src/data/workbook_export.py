@@ -0,0 +1,154 @@
+"""
+Streaming Workbook Export
+Writes date x ticker sheets for very wide universes without building the
+whole workbook in memory. xlsxwriter runs in constant_memory mode, which
+flushes each finished row to disk, and rows are pulled from the source a
+chunk at a time, so peak memory depends on the chunk size rather than on
+the number of tickers or days.
+
+Sources can be DataFrames or a PriceMatrixStore, whose memory-mapped matrix
+is read in row chunks without loading the whole file. Cell formats are
+created once per sheet and reused for every cell. Excel sheets hold at most
+16,384 columns; wider sheets continue in 'Daily Prices (2)', 'Daily Prices
+(3)', ... with the date column repeated, and read_split_sheet() joins them
+back together.
+"""
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, List, Optional
+import xlsxwriter
+from .price_store import PriceMatrixStore
+from .sidecar import read_sheets
+
+logger = logging.getLogger(__name__)
+
+EXCEL_MAX_COLUMNS = 16384
+EXCEL_MAX_ROWS = 1048576
+ROW_CHUNK = 256  # Rows pulled from the source per step
+DATE_FORMAT = 'yyyy-mm-dd'
+NUMBER_FORMATS = {'Daily Prices': '0.00', 'Unadjusted Prices': '0.00', 'Dividends': '0.0000'}
+DEFAULT_NUMBER_FORMAT = 'General'
+
+
+class _FrameSource:
+    """Row-chunk access to a DataFrame"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.sort_index()
+        self.tickers = [str(column) for column in frame.columns]
+        self.dates = pd.DatetimeIndex(pd.to_datetime(self.frame.index))
+
+    def block(self, rows: slice, columns: slice) -> np.ndarray:
+        return self.frame.iloc[rows, columns].to_numpy(dtype=np.float64)
+
+
+class _StoreSource:
+    """Row-chunk access to a memory-mapped price store"""
+
+    def __init__(self, store: PriceMatrixStore):
+        self.store = store
+        self.tickers = store.tickers
+        self.dates = store.dates
+
+    def block(self, rows: slice, columns: slice) -> np.ndarray:
+        return np.asarray(self.store.values[rows, columns], dtype=np.float64)
+
+
+def _source(data):
+    return _StoreSource(data) if isinstance(data, PriceMatrixStore) else _FrameSource(data)
+
+
+def sheet_parts(sheet_name: str, n_columns: int, max_columns: int = EXCEL_MAX_COLUMNS - 1) -> List[tuple]:
+    """
+    Sheet names and column ranges for a sheet split at the column limit
+    Returns:
+        List of (sheet name, column slice); at least one part
+    """
+    parts = []
+    for part, start in enumerate(range(0, max(n_columns, 1), max_columns)):
+        name = sheet_name if part == 0 else f"{sheet_name} ({part + 1})"
+        parts.append((name, slice(start, min(start + max_columns, n_columns))))
+    return parts
+
+
+def _write_sheet(workbook, sheet_name: str, source, columns: slice, row_chunk: int):
+    """Stream one sheet: header row, then dates and values chunk by chunk"""
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+    date_format = workbook.add_format({'num_format': DATE_FORMAT})
+    number_format = workbook.add_format({'num_format': NUMBER_FORMATS.get(sheet_name.split(' (')[0],
+                                                                          DEFAULT_NUMBER_FORMAT)})
+    worksheet.set_column(0, 0, 12)
+
+    worksheet.write_blank(0, 0, None, header_format)
+    for offset, ticker in enumerate(source.tickers[columns]):
+        worksheet.write_string(0, offset + 1, ticker, header_format)
+
+    dates = source.dates.to_pydatetime()
+    for start in range(0, len(dates), row_chunk):
+        stop = min(start + row_chunk, len(dates))
+        block = source.block(slice(start, stop), columns)
+        present = ~np.isnan(block)
+        for i in range(stop - start):
+            row = start + i + 1
+            worksheet.write_datetime(row, 0, dates[start + i], date_format)
+            for j in np.flatnonzero(present[i]):
+                worksheet.write_number(row, int(j) + 1, float(block[i, j]), number_format)
+
+
+def write_streaming_workbook(excel_path: str, sheets: Dict[str, object], metrics: Optional[pd.DataFrame] = None,
+                             metrics_sheet: str = 'Metrics', max_columns: int = EXCEL_MAX_COLUMNS - 1,
+                             row_chunk: int = ROW_CHUNK) -> Dict[str, List[str]]:
+    """
+    Write date x ticker sheets in constant memory
+    Args:
+        excel_path: Workbook to create
+        sheets: Sheet name -> DataFrame or PriceMatrixStore, in sheet order
+        metrics: Optional (small) Metrics table, written after the data sheets
+        metrics_sheet: Name for the metrics sheet
+        max_columns: Data columns per sheet before continuing on a new sheet
+        row_chunk: Rows read from the source at a time
+    Returns:
+        Sheet name -> names of the sheets it was written to
+    """
+    written = {}
+    workbook = xlsxwriter.Workbook(excel_path, {'constant_memory': True})
+    try:
+        for name, data in sheets.items():
+            source = _source(data)
+            if len(source.dates) >= EXCEL_MAX_ROWS:
+                raise ValueError(f"{name} has {len(source.dates)} rows, more than an Excel sheet holds")
+            parts = sheet_parts(name, len(source.tickers), max_columns)
+            for part_name, columns in parts:
+                _write_sheet(workbook, part_name, source, columns, row_chunk)
+            written[name] = [part_name for part_name, _ in parts]
+            if len(parts) > 1:
+                logger.info(f"Split {name} ({len(source.tickers)} tickers) across {len(parts)} sheets")
+
+        if metrics is not None and not metrics.empty:
+            worksheet = workbook.add_worksheet(metrics_sheet)
+            header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+            for j, column in enumerate(metrics.columns):
+                worksheet.write_string(0, j, str(column), header_format)
+            for i, values in enumerate(metrics.itertuples(index=False), start=1):
+                for j, value in enumerate(values):
+                    if not pd.isna(value):
+                        worksheet.write(i, j, value)
+            written[metrics_sheet] = [metrics_sheet]
+    finally:
+        workbook.close()
+    return written
+
+
+def read_split_sheet(excel_path: str, sheet_name: str) -> pd.DataFrame:
+    """
+    Read a date x ticker sheet together with its continuation sheets
+    Returns:
+        DataFrame indexed by date with every ticker column
+    """
+    with pd.ExcelFile(excel_path) as xls:
+        names = [name for name in xls.sheet_names
+                 if name == sheet_name or (name.startswith(f"{sheet_name} (") and name.endswith(')'))]
+    frames = read_sheets(excel_path, names, index_col=0)
+    return pd.concat([frames[name] for name in names], axis=1)
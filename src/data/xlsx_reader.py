@@ -0,0 +1,182 @@
+"""
+Fast Single-Sheet XLSX Reader
+Reads one sheet of a workbook straight from the XLSX archive, for workbooks
+without a sidecar (e.g. supplied from outside) when only a small sheet
+such as 'Metrics' is needed. pd.read_excel with openpyxl loads the whole
+workbook package, styles included, before returning a sheet; this reader
+opens the zip, resolves the sheet's part through workbook.xml and its
+relationships, and streams only that part's XML with the C ElementTree
+parser. The shared-strings table is read only if the sheet uses it.
+
+Cells are converted the way pandas' openpyxl reader converts them (whole
+numbers to int, errors to NaN, blanks to "") and the rows go through the
+same TextParser, so the frame matches pd.read_excel for the same sheet.
+Styles are skipped, so date cells arrive as Excel serial numbers; pass
+their column positions in date_columns to convert them.
+"""
+import pandas as pd
+import numpy as np
+import logging
+import posixpath
+import zipfile
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from xml.etree.ElementTree import iterparse, fromstring
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+logger = logging.getLogger(__name__)
+
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+def _local(tag: str) -> str:
+    """Tag name without its namespace (transitional and strict OOXML differ)"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _column_index(reference: str) -> int:
+    """Zero-based column of a cell reference such as 'AB12'"""
+    index = 0
+    for char in reference:
+        if char.isdigit():
+            break
+        index = index * 26 + (ord(char.upper()) - 64)
+    return index - 1
+
+
+def _sheet_paths(archive: zipfile.ZipFile) -> dict:
+    """Sheet name -> archive path of its worksheet part"""
+    workbook = fromstring(archive.read('xl/workbook.xml'))
+    relationships = fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in relationships}
+    paths = {}
+    for element in workbook.iter():
+        if _local(element.tag) == 'sheet':
+            target = targets[element.get(f'{{{REL_NS}}}id')]
+            paths[element.get('name')] = target.lstrip('/') if target.startswith('/') \
+                else posixpath.normpath(posixpath.join('xl', target))
+    return paths
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    for _, element in iterparse(archive.open('xl/sharedStrings.xml')):
+        if _local(element.tag) == 'si':
+            # Plain <t> or rich-text runs <r><t>; phonetic hints (<rPh>) are not part of the value
+            parts = []
+            for child in element:
+                if _local(child.tag) == 't':
+                    parts.append(child.text or '')
+                elif _local(child.tag) == 'r':
+                    parts.extend(node.text or '' for node in child if _local(node.tag) == 't')
+            strings.append(''.join(parts))
+            element.clear()
+    return strings
+
+
+def sheet_names(excel_path: str) -> List[str]:
+    """Sheet names in workbook order"""
+    with zipfile.ZipFile(excel_path) as archive:
+        return list(_sheet_paths(archive))
+
+
+def _number(text: str):
+    value = float(text)
+    whole = int(value) if np.isfinite(value) else None
+    return whole if whole == value else value
+
+
+def read_sheet_rows(excel_path: str, sheet_name: str) -> List[list]:
+    """
+    Cell values of one sheet as rows, converted like pandas' openpyxl reader
+    Raises:
+        ValueError: If the workbook has no such sheet
+    """
+    with zipfile.ZipFile(excel_path) as archive:
+        paths = _sheet_paths(archive)
+        if sheet_name not in paths:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        strings = None
+        rows, row, row_number = [], [], 0
+        for _, element in iterparse(archive.open(paths[sheet_name])):
+            tag = _local(element.tag)
+            if tag == 'c':
+                reference = element.get('r')
+                column = _column_index(reference) if reference else len(row)
+                cell_type = element.get('t', 'n')
+                value = ''
+                text = None
+                for child in element:
+                    if _local(child.tag) == 'v':
+                        text = child.text
+                    elif _local(child.tag) == 'is':
+                        text = ''.join(node.text or '' for node in child.iter() if _local(node.tag) == 't')
+                if text is not None:
+                    if cell_type == 's':
+                        if strings is None:
+                            strings = _shared_strings(archive)
+                        value = strings[int(text)]
+                    elif cell_type in ('str', 'inlineStr'):
+                        value = text
+                    elif cell_type == 'b':
+                        value = text == '1'
+                    elif cell_type == 'e':
+                        value = np.nan
+                    elif cell_type == 'd':
+                        value = datetime.fromisoformat(text)
+                    else:
+                        value = _number(text)
+                if column >= len(row):
+                    row.extend([''] * (column - len(row) + 1))
+                row[column] = value
+                element.clear()
+            elif tag == 'row':
+                number = int(element.get('r', row_number + 1))
+                rows.extend([] for _ in range(number - row_number - 1))  # Rows with no cells at all
+                while row and row[-1] == '':
+                    row.pop()
+                rows.append(row)
+                row, row_number = [], number
+                element.clear()
+
+    while rows and not rows[-1]:
+        rows.pop()
+    if rows:
+        width = max(len(row) for row in rows)
+        rows = [row + [''] * (width - len(row)) for row in rows]
+    return rows
+
+
+def _to_datetime(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and not pd.isna(value):
+        return EXCEL_EPOCH + timedelta(days=value)
+    return value
+
+
+def read_xlsx_sheet(excel_path: str, sheet_name: str, index_col: Optional[int] = None,
+                    date_columns: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """
+    Read one sheet without loading the rest of the workbook
+    Args:
+        excel_path: Workbook path
+        sheet_name: Sheet to read
+        index_col: Column position to use as the index (as in pd.read_excel)
+        date_columns: Column positions holding dates (converted from serials)
+    Returns:
+        DataFrame as pd.read_excel would return it
+    """
+    rows = read_sheet_rows(excel_path, sheet_name)
+    if not rows:
+        return pd.DataFrame()
+    for column in date_columns or []:
+        for row in rows[1:]:
+            row[column] = _to_datetime(row[column])
+    try:
+        with TextParser(rows, header=0, index_col=index_col, skip_blank_lines=False) as parser:
+            return parser.read()
+    except EmptyDataError:
+        return pd.DataFrame()
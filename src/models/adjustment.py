@@ -0,0 +1,231 @@
+"""
+Local Adjustment Engine
+Keeps raw unadjusted closes and a corporate actions table, and derives
+adjusted closes locally as unadjusted close x cumulative adjustment factor.
+
+factor[t] = product over actions on dates e > t of the action's event factor
+- Dividend: 1 - D / P[e-1] (vendor / CRSP convention, as in total_return)
+- Split: 1 / ratio (only for closes that are not already split-adjusted;
+  Yahoo's unadjusted closes and dividends already are)
+
+Because the factor is a product, a new action only rescales the factors
+before its date: one column, one vector multiply, and no history refetch.
+New price rows start with factor 1.0. Actions dated after their ticker's
+last close are held as pending until the closes around them arrive.
+ExcelManager keeps one engine per data directory, so a repeat download
+fetches only the days after each ticker's last close plus any new dividends.
+"""
+import pandas as pd
+import numpy as np
+import logging
+from pathlib import Path
+from typing import Optional
+from .total_return import align_dividends, dividend_adjustment_factors
+
+logger = logging.getLogger(__name__)
+
+ACTION_COLUMNS = ['date', 'ticker', 'action', 'value']  # action: 'dividend' or 'split'
+
+
+def actions_from_dividends(dividends: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Long corporate actions table from a sparse 'Dividends' sheet
+    Args:
+        dividends: DataFrame of per-share dividends (rows = ex-dates, NaN = none)
+    Returns:
+        DataFrame with ACTION_COLUMNS, one row per dividend
+    """
+    if dividends is None or dividends.empty:
+        return pd.DataFrame(columns=ACTION_COLUMNS)
+    divs = dividends.copy()
+    divs.index = pd.to_datetime(divs.index)
+    divs.index.name = 'date'
+    long = divs.stack().rename('value').reset_index()
+    long.columns = ['date', 'ticker', 'value']
+    long = long[long['value'] > 0]
+    long.insert(2, 'action', 'dividend')
+    return long[ACTION_COLUMNS].sort_values(['date', 'ticker']).reset_index(drop=True)
+
+
+def dividends_from_actions(actions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sparse 'Dividends' sheet from a corporate actions table (inverse of actions_from_dividends)
+    Args:
+        actions: Corporate actions with ACTION_COLUMNS
+    Returns:
+        DataFrame of per-share dividends, rows = ex-dates, one column per ticker
+    """
+    dividends = actions[actions['action'] == 'dividend']
+    if dividends.empty:
+        return pd.DataFrame()
+    sheet = dividends.pivot_table(index='date', columns='ticker', values='value', aggfunc='sum')
+    sheet.index.name = None
+    sheet.columns.name = None
+    return sheet
+
+
+def adjustment_factors(unadj_prices: pd.DataFrame, actions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cumulative adjustment factors from closes and an actions table (full rebuild)
+    Args:
+        unadj_prices: Date x ticker unadjusted closes
+        actions: Corporate actions with ACTION_COLUMNS
+    Returns:
+        Date x ticker factors (1.0 after the last action)
+    """
+    dividends = actions[actions['action'] == 'dividend']
+    div_matrix = dividends.pivot_table(index='date', columns='ticker', values='value', aggfunc='sum') \
+        if not dividends.empty else None
+    factors = dividend_adjustment_factors(unadj_prices, div_matrix)
+
+    splits = actions[actions['action'] == 'split']
+    if not splits.empty:
+        split_matrix = splits.pivot_table(index='date', columns='ticker', values='value', aggfunc='prod')
+        ratios = align_dividends(split_matrix.fillna(0.0), factors.index, factors.columns)
+        event = pd.DataFrame(np.where(ratios > 0, 1.0 / np.where(ratios > 0, ratios, 1.0), 1.0),
+                             index=factors.index, columns=factors.columns)
+        factors = factors * event.iloc[::-1].cumprod().iloc[::-1].shift(-1).fillna(1.0)
+    return factors
+
+
+class AdjustmentEngine:
+    """
+    Adjusted closes from stored unadjusted closes and corporate actions
+    """
+
+    def __init__(self, unadj_prices: pd.DataFrame, actions: Optional[pd.DataFrame] = None):
+        """
+        Initialize engine
+        Args:
+            unadj_prices: Date x ticker unadjusted closes ('Unadjusted Prices' sheet)
+            actions: Corporate actions with ACTION_COLUMNS (see actions_from_dividends)
+        """
+        prices = unadj_prices.copy()
+        prices.index = pd.to_datetime(prices.index)
+        self.prices = prices.sort_index()
+        self.actions = pd.DataFrame(columns=ACTION_COLUMNS) if actions is None else actions.copy()
+        self.actions['date'] = pd.to_datetime(self.actions['date'])
+        applied = self._reached(self.actions)
+        self.pending = self.actions[~applied].reset_index(drop=True)
+        self.factors = adjustment_factors(self.prices, self.actions[applied])
+
+    @classmethod
+    def from_sheets(cls, unadj_prices: pd.DataFrame, dividends: Optional[pd.DataFrame]) -> 'AdjustmentEngine':
+        """Build from the 'Unadjusted Prices' and 'Dividends' sheets"""
+        return cls(unadj_prices, actions_from_dividends(dividends))
+
+    def adjusted(self) -> pd.DataFrame:
+        """Adjusted closes: unadjusted close x cumulative factor"""
+        return self.prices * self.factors
+
+    def last_close(self, ticker: str) -> Optional[pd.Timestamp]:
+        """Date of a ticker's last stored close (None if it has none)"""
+        return self.prices[ticker].last_valid_index() if ticker in self.prices.columns else None
+
+    def _reached(self, actions: pd.DataFrame) -> np.ndarray:
+        """Actions dated on or before their ticker's last stored close"""
+        last = pd.to_datetime(actions['ticker'].map(lambda ticker: self.last_close(ticker)))
+        return (pd.to_datetime(actions['date']) <= last).to_numpy(dtype=bool)
+
+    def _apply(self, ticker: str, date: pd.Timestamp, action: str, value: float):
+        """Rescale the factors before one action (date within the price history)"""
+        index = self.prices.index
+        position = index.searchsorted(date, side='left')  # Off-calendar dates move to the next day
+        column = self.factors.columns.get_loc(ticker)
+        if action == 'split':
+            event = 1.0 / value
+        else:
+            prior = self.prices.iloc[:position, column].dropna()
+            if prior.empty:
+                logger.warning(f"No close before {ticker} dividend on {date.date()}; factor unchanged")
+                return
+            prior_close = prior.iloc[-1]
+            # Dividends sharing an ex-date combine as 1 - (D1 + D2) / P, as in the full rebuild
+            dividends = self.actions[(self.actions['ticker'] == ticker) & (self.actions['action'] == 'dividend')]
+            earlier = dividends['value'][index.searchsorted(dividends['date'], side='left') == position].sum()
+            event = (1.0 - (earlier + value) / prior_close) / (1.0 - earlier / prior_close)
+        self.factors.iloc[:position, column] *= event
+
+    def add_action(self, ticker: str, date, action: str, value: float):
+        """
+        Record a dividend or split and update only the affected factors
+        Args:
+            ticker: Ticker symbol (must have prices)
+            date: Ex-date (dividend) or effective date (split)
+            action: 'dividend' or 'split'
+            value: Per-share amount (dividend) or new shares per old share (split)
+        """
+        if action not in ('dividend', 'split'):
+            raise ValueError(f"Unknown corporate action: {action}")
+        if ticker not in self.prices.columns:
+            raise ValueError(f"No prices stored for {ticker}")
+        date = pd.Timestamp(date)
+        row = pd.DataFrame([[date, ticker, action, float(value)]], columns=ACTION_COLUMNS)
+        last_close = self.last_close(ticker)
+        if last_close is None or date > last_close:
+            self.pending = pd.concat([self.pending, row], ignore_index=True)
+            logger.info(f"{ticker} {action} on {date.date()} pending until prices reach it")
+        else:
+            self._apply(ticker, date, action, float(value))
+        self.actions = pd.concat([self.actions, row], ignore_index=True)
+
+    def add_prices(self, new_prices: pd.DataFrame):
+        """
+        Append newer unadjusted closes (factor 1.0) and apply pending actions they reach
+        Args:
+            new_prices: Date x ticker closes; only those after each ticker's last
+                stored close are used, and a new ticker's history is taken whole
+        """
+        new_prices = new_prices.copy()
+        new_prices.index = pd.to_datetime(new_prices.index)
+        new_prices = new_prices.sort_index()
+        for ticker in new_prices.columns:
+            last_close = self.last_close(ticker)
+            if last_close is not None:
+                new_prices.loc[new_prices.index <= last_close, ticker] = np.nan
+        new_prices = new_prices.dropna(how='all')
+        if new_prices.empty:
+            return
+        was_pending = ~self._reached(self.actions)
+
+        # Closes after a ticker's last close sit after all its applied actions: factor 1.0
+        index = self.prices.index.union(new_prices.index)
+        columns = self.prices.columns.append(new_prices.columns.difference(self.prices.columns))
+        self.prices = self.prices.reindex(index=index, columns=columns)
+        self.factors = self.factors.reindex(index=index, columns=columns).bfill().fillna(1.0)
+        new_cells = new_prices.reindex(index=index, columns=columns).notna()
+        self.prices = self.prices.mask(new_cells, new_prices.reindex(index=index, columns=columns))
+        self.factors = self.factors.mask(new_cells, 1.0)
+
+        # Re-record pending actions: those the new closes reach are applied, the rest stay pending
+        pending = self.pending
+        self.pending = pd.DataFrame(columns=ACTION_COLUMNS)
+        self.actions = self.actions[~was_pending].reset_index(drop=True)
+        for _, action in pending.iterrows():
+            self.add_action(action['ticker'], action['date'], action['action'], action['value'])
+
+    def drop_ticker(self, ticker: str):
+        """Forget a ticker's closes, factors and actions (e.g. a quarantined download)"""
+        self.prices = self.prices.drop(columns=ticker, errors='ignore')
+        self.factors = self.factors.drop(columns=ticker, errors='ignore')
+        self.actions = self.actions[self.actions['ticker'] != ticker].reset_index(drop=True)
+        self.pending = self.pending[self.pending['ticker'] != ticker].reset_index(drop=True)
+
+    def save(self, directory: str):
+        """Store closes, actions and factors as parquet files"""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        self.prices.to_parquet(path / 'unadjusted_prices.parquet')
+        self.actions.to_parquet(path / 'corporate_actions.parquet')
+        self.factors.to_parquet(path / 'adjustment_factors.parquet')
+
+    @classmethod
+    def load(cls, directory: str) -> 'AdjustmentEngine':
+        """Load a stored engine without recomputing its factors"""
+        path = Path(directory)
+        engine = cls.__new__(cls)
+        engine.prices = pd.read_parquet(path / 'unadjusted_prices.parquet')
+        engine.actions = pd.read_parquet(path / 'corporate_actions.parquet')
+        engine.factors = pd.read_parquet(path / 'adjustment_factors.parquet')
+        engine.pending = engine.actions[~engine._reached(engine.actions)].reset_index(drop=True)
+        return engine
@@ -0,0 +1,208 @@
+"""
+As-Of Metrics Backfill
+Recomputes the Metrics sheet as it would have read on past dates
+(month-ends by default) for every ticker in one vectorized sweep.
+
+Techniques:
+- Returns, squared returns and risk-free rates are prefix-summed once, so the
+  2-year Sharpe and volatility on any date is a difference of two rows
+- Point returns (Day%, 1MTH%, YTD%) are row lookups by position; YTD starts
+  at each ticker's first valid close of the year
+- Windowed max drawdown gathers only the 504-day windows ending on the
+  requested dates, in chunks
+- TTM yield comes from the stored-style yield history (yield_series)
+
+Definitions follow PerformanceMetrics / metrics_writer: 21-day month,
+504-day (2Y) window for Sharpe, volatility and drawdown, and TTM yield
+over ex-dates in the trailing year.
+"""
+import pandas as pd
+import numpy as np
+import logging
+from typing import Optional, Sequence, Union
+from .yield_series import calculate_yield_history
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_YEAR = 252
+MONTH_DAYS = 21
+WINDOW_DAYS = 504  # Same 2-year window as PerformanceMetrics.MIN_HISTORY_DAYS
+DRAWDOWN_CHUNK = 64  # As-of dates per drawdown gather
+
+PANEL_COLUMNS = ['Date', 'Ticker', '%Yield', 'Sharpe 2Y', 'Day%', '1MTH%', 'YTD%',
+                 'Volatility', 'Max_Drawdown']
+
+
+def month_end_dates(index: pd.Index) -> pd.DatetimeIndex:
+    """Last trading date of each month present in a date index"""
+    dates = pd.DatetimeIndex(pd.to_datetime(index)).sort_values()
+    months = dates.to_period('M')
+    last_in_month = np.r_[months[1:] != months[:-1], True]
+    return dates[last_in_month]
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """Prefix sums with a leading zero row"""
+    return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+
+def _point_return(values: np.ndarray, end_pos: np.ndarray, start_pos: np.ndarray) -> np.ndarray:
+    """P[end] / P[start] - 1 for each as-of row, NaN where start is out of range"""
+    ok = (start_pos >= 0) & (start_pos < end_pos)
+    safe_start = np.where(ok, start_pos, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = values[end_pos] / values[safe_start] - 1
+    return np.where(ok[:, None], result, np.nan)
+
+
+def _ytd_return(values: np.ndarray, end_pos: np.ndarray, year_start: np.ndarray) -> np.ndarray:
+    """P[end] / first valid close of the year - 1, NaN with fewer than two closes in the year"""
+    n_obs = len(values)
+    positions = np.where(~np.isnan(values), np.arange(n_obs)[:, None], n_obs)
+    next_valid = np.minimum.accumulate(positions[::-1], axis=0)[::-1]
+    start_pos = next_valid[year_start]
+    ok = start_pos < end_pos[:, None]
+    safe_start = np.where(ok, start_pos, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = values[end_pos] / np.take_along_axis(values, safe_start, axis=0) - 1
+    return np.where(ok, result, np.nan)
+
+
+def _window_max_drawdown(values: np.ndarray, end_pos: np.ndarray) -> np.ndarray:
+    """Max drawdown over the WINDOW_DAYS prices ending at each as-of row"""
+    result = np.full((len(end_pos), values.shape[1]), np.nan)
+    offsets = np.arange(-(WINDOW_DAYS - 1), 1)
+    for start in range(0, len(end_pos), DRAWDOWN_CHUNK):
+        chunk = end_pos[start:start + DRAWDOWN_CHUNK]
+        full = chunk >= WINDOW_DAYS - 1
+        if not full.any():
+            continue
+        windows = values[chunk[full][:, None] + offsets]
+        peaks = np.fmax.accumulate(windows, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = np.nanmin(windows / peaks - 1, axis=1)
+        result[start:start + DRAWDOWN_CHUNK][full] = drawdown
+    return result
+
+
+def calculate_asof_metrics(prices: pd.DataFrame,
+                           dividends: Optional[pd.DataFrame] = None,
+                           dates: Optional[Sequence] = None,
+                           risk_free_rate: Union[float, pd.Series] = 0.03) -> pd.DataFrame:
+    """
+    Calculate the Metrics row for every ticker on every as-of date
+    Args:
+        prices: Date x ticker adjusted closes ('Daily Prices' sheet)
+        dividends: Sparse dividend matrix ('Dividends' sheet), optional
+        dates: As-of dates; defaults to month-ends. A date that is not a trading
+            day uses the last trading day on or before it
+        risk_free_rate: Annual rate as a decimal, or a date-indexed Series of
+            annual rates (forward filled onto the price calendar)
+    Returns:
+        Long panel DataFrame with PANEL_COLUMNS, one row per (Date, Ticker)
+    """
+    try:
+        prices = prices.copy()
+        prices.index = pd.to_datetime(prices.index)
+        prices = prices.sort_index()
+        if prices.empty:
+            return pd.DataFrame(columns=PANEL_COLUMNS)
+
+        index = prices.index
+        asof = month_end_dates(index) if dates is None else pd.DatetimeIndex(pd.to_datetime(list(dates)))
+        end_pos = index.searchsorted(asof, side='right') - 1
+        keep = end_pos >= 0
+        asof, end_pos = asof[keep], end_pos[keep]
+
+        values = prices.to_numpy(dtype=float)
+        n_obs = len(index)
+
+        # Prefix sums of daily returns, squared returns and risk-free rates
+        returns = np.vstack([np.full((1, values.shape[1]), np.nan), values[1:] / values[:-1] - 1])
+        valid = ~np.isnan(returns)
+        clean = np.where(valid, returns, 0.0)
+        sum_r, sum_r2, count = _prefix(clean), _prefix(clean * clean), _prefix(valid.astype(float))
+        if isinstance(risk_free_rate, pd.Series):
+            rf = risk_free_rate.copy()
+            rf.index = pd.to_datetime(rf.index)
+            daily_rf = rf.sort_index().reindex(index, method='ffill').bfill().fillna(0.0).to_numpy() / TRADING_DAYS_YEAR
+        else:
+            daily_rf = np.full(n_obs, risk_free_rate / TRADING_DAYS_YEAR)
+        sum_rf = _prefix(daily_rf)
+
+        # 503 returns from the 504 prices ending on each as-of date
+        window_start = end_pos - (WINDOW_DAYS - 2)
+        full_window = window_start >= 1
+        lo = np.where(full_window, window_start, 0)
+        hi = end_pos + 1
+        n = count[hi] - count[lo]
+        s1 = sum_r[hi] - sum_r[lo]
+        s2 = sum_r2[hi] - sum_r2[lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_r = s1 / n
+            std_r = np.sqrt(np.maximum(s2 - s1 * s1 / n, 0.0) / (n - 1))
+            mean_rf = ((sum_rf[hi] - sum_rf[lo]) / (hi - lo))[:, None]
+            sharpe = (mean_r - mean_rf) / std_r * np.sqrt(TRADING_DAYS_YEAR)
+        # Same rule as PerformanceMetrics.has_min_history: WINDOW_DAYS valid closes
+        # to date, so a missing close drops one return rather than blanking the window
+        closes = _prefix((~np.isnan(values)).astype(float))[end_pos + 1]
+        complete = full_window[:, None] & (closes >= WINDOW_DAYS) & (n >= 2)
+        sharpe = np.where(complete, sharpe, np.nan)
+        volatility = np.where(complete, std_r * np.sqrt(TRADING_DAYS_YEAR), np.nan)
+
+        year_start = index.searchsorted(pd.DatetimeIndex([pd.Timestamp(year=d.year, month=1, day=1) for d in index[end_pos]]))
+        day_ret = _point_return(values, end_pos, end_pos - 1)
+        month_ret = _point_return(values, end_pos, end_pos - MONTH_DAYS)
+        ytd_ret = _ytd_return(values, end_pos, year_start)
+        max_dd = _window_max_drawdown(values, end_pos)
+
+        ttm = calculate_yield_history(prices, dividends)['ttm']
+        ttm_yield = ttm.to_numpy()[end_pos] if not ttm.empty else np.zeros_like(day_ret)
+
+        n_dates, n_tickers = len(asof), values.shape[1]
+        panel = pd.DataFrame({
+            'Date': np.repeat(asof, n_tickers),
+            'Ticker': np.tile(prices.columns, n_dates),
+            '%Yield': ttm_yield.ravel(),
+            'Sharpe 2Y': sharpe.ravel(),
+            'Day%': day_ret.ravel(),
+            '1MTH%': month_ret.ravel(),
+            'YTD%': ytd_ret.ravel(),
+            'Volatility': volatility.ravel(),
+            'Max_Drawdown': max_dd.ravel(),
+        })
+        return panel[PANEL_COLUMNS]
+
+    except Exception as e:
+        logger.error(f"Error calculating as-of metrics: {str(e)}")
+        return pd.DataFrame(columns=PANEL_COLUMNS)
+
+
+def write_asof_metrics(panel: pd.DataFrame, writer, sheet_name: str = 'Metrics History') -> bool:
+    """
+    Write an as-of metrics panel to Excel with the Metrics sheet formats
+    Args:
+        panel: Output of calculate_asof_metrics
+        writer: pd.ExcelWriter using the xlsxwriter engine
+        sheet_name: Target sheet
+    Returns:
+        True if written successfully
+    """
+    try:
+        output = panel.copy()
+        output['Date'] = pd.to_datetime(output['Date']).dt.date
+        output.to_excel(writer, sheet_name=sheet_name, index=False)
+        worksheet = writer.sheets[sheet_name]
+        pct_format = writer.book.add_format({'num_format': '0.0%'})
+        ratio_format = writer.book.add_format({'num_format': '0.00'})
+        for idx, col in enumerate(output.columns):
+            if '%' in col or col in ['Volatility', 'Max_Drawdown']:
+                worksheet.set_column(idx, idx, 15, pct_format)
+            elif col == 'Sharpe 2Y':
+                worksheet.set_column(idx, idx, 15, ratio_format)
+            else:
+                worksheet.set_column(idx, idx, 15)
+        return True
+    except Exception as e:
+        logger.error(f"Error writing as-of metrics: {str(e)}")
+        return False
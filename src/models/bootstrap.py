@@ -0,0 +1,191 @@
+"""
+Bootstrap Confidence Intervals
+Stationary block bootstrap (Politis & Romano) confidence intervals for the
+Sharpe and Sortino ratios of every ticker.
+
+- Resamples are generated as integer index matrices (resamples x days) and
+  shared by all tickers, so cross-sectional correlation is preserved.
+- Each index matrix is reduced to per-day draw counts; every bootstrap Sharpe
+  and Sortino then comes from one matrix product with per-day sums.
+- Work is split into fixed-size chunks, each with its own child seed from
+  np.random.SeedSequence, so results are identical for any number of workers.
+- Chunks run on a process pool when n_jobs > 1.
+
+Sharpe and Sortino follow PerformanceMetrics: daily excess return mean over the
+daily return standard deviation (Sharpe) or the root mean square of negative
+excess returns (Sortino), annualized with sqrt(252).
+"""
+import pandas as pd
+import numpy as np
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_YEAR = 252
+DEFAULT_RESAMPLES = 5000
+DEFAULT_BLOCK_LENGTH = 10  # Expected block length in trading days
+CHUNK_SIZE = 500  # Resamples per task; fixed so seeds do not depend on n_jobs
+
+RESULT_COLUMNS = [
+    'sharpe', 'sharpe_lower', 'sharpe_upper', 'sharpe_se',
+    'sortino', 'sortino_lower', 'sortino_upper', 'sortino_se', 'observations'
+]
+
+# Per-process copy of the inputs, set once by the pool initializer
+_worker_statistics = None
+
+
+def stationary_bootstrap_indices(n_obs: int, n_resamples: int, block_length: float,
+                                 rng: np.random.Generator,
+                                 length: Optional[int] = None) -> np.ndarray:
+    """
+    Generate stationary bootstrap index paths without a Python loop
+    Args:
+        n_obs: Number of observations in the original sample
+        n_resamples: Number of resampled paths
+        block_length: Expected block length (geometric distribution mean)
+        rng: Numpy random generator
+        length: Path length (defaults to n_obs)
+    Returns:
+        Integer array (n_resamples, length) of positions into the original sample
+    """
+    length = n_obs if length is None else length
+    positions = np.arange(length)
+    new_block = rng.random((n_resamples, length)) < (1.0 / block_length)
+    new_block[:, 0] = True
+    starts = rng.integers(0, n_obs, size=(n_resamples, length))
+
+    # Position where the current block began, carried forward along each path
+    block_begin = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+    block_start_value = np.take_along_axis(starts, block_begin, axis=1)
+    return (block_start_value + positions - block_begin) % n_obs
+
+
+def _sufficient_statistics(returns: np.ndarray, excess: np.ndarray) -> np.ndarray:
+    """
+    Per-day terms whose sums determine Sharpe and Sortino
+    Both ratios only need sums over days, so a resample is fully described by
+    how many times it draws each day. Returns an array (days, 6 * tickers).
+    NaN marks days before a ticker's history starts and contributes nothing.
+    """
+    valid = ~np.isnan(returns)
+    r = np.where(valid, returns, 0.0)
+    x = np.where(valid, excess, 0.0)
+    downside = np.minimum(x, 0.0)
+    return np.hstack([valid.astype(float), r, r * r, x, downside * downside, (downside < 0).astype(float)])
+
+
+def _ratios_from_sums(sums: np.ndarray):
+    """Sharpe and Sortino from summed sufficient statistics shaped (resamples, 6 * tickers)"""
+    count, sum_r, sum_r2, sum_x, sum_down2, n_down = np.split(sums, 6, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_r = (sum_r2 - sum_r * sum_r / count) / (count - 1)
+        mean_x = sum_x / count
+        sharpe = mean_x / np.sqrt(np.maximum(var_r, 0.0)) * np.sqrt(TRADING_DAYS_YEAR)
+        sortino = mean_x / np.sqrt(sum_down2 / n_down) * np.sqrt(TRADING_DAYS_YEAR)
+    return sharpe, sortino
+
+
+def _init_worker(statistics: np.ndarray):
+    """Process pool initializer: keep the inputs resident in each worker"""
+    global _worker_statistics
+    _worker_statistics = statistics
+
+
+def _run_chunk(seed: np.random.SeedSequence, n_resamples: int, block_length: float,
+               statistics: Optional[np.ndarray] = None):
+    """Bootstrap one chunk of resamples against the given (or worker-resident) inputs"""
+    statistics = _worker_statistics if statistics is None else statistics
+    rng = np.random.default_rng(seed)
+    n_obs = statistics.shape[0]
+    idx = stationary_bootstrap_indices(n_obs, n_resamples, block_length, rng)
+
+    # Index matrix -> draw-count matrix, then one matrix product per chunk
+    offsets = (np.arange(n_resamples) * n_obs)[:, None]
+    counts = np.bincount((idx + offsets).ravel(), minlength=n_resamples * n_obs)
+    counts = counts.reshape(n_resamples, n_obs).astype(float)
+    return _ratios_from_sums(counts @ statistics)
+
+
+def bootstrap_sharpe_sortino(returns: Union[pd.Series, pd.DataFrame],
+                             risk_free_rate: Union[float, pd.Series] = 0.0,
+                             n_resamples: int = DEFAULT_RESAMPLES,
+                             block_length: float = DEFAULT_BLOCK_LENGTH,
+                             confidence: float = 0.95,
+                             seed: int = 0,
+                             n_jobs: Optional[int] = None) -> pd.DataFrame:
+    """
+    Block-bootstrap confidence intervals for Sharpe and Sortino ratios
+    Args:
+        returns: Series or DataFrame of daily returns (e.g. last 504 days)
+        risk_free_rate: Annual risk-free rate as a decimal, or a Series of annual
+            rates indexed by date (aligned to returns and forward filled)
+        n_resamples: Number of bootstrap resamples
+        block_length: Expected block length in trading days
+        confidence: Two-sided interval coverage
+        seed: Base seed; same seed gives the same intervals for any n_jobs
+        n_jobs: Worker processes (None = CPU count, 1 = run in this process)
+    Returns:
+        DataFrame indexed by ticker with point estimates, interval bounds,
+        bootstrap standard errors and the number of observations
+    """
+    try:
+        if isinstance(returns, pd.Series):
+            returns = returns.to_frame(name=returns.name if returns.name is not None else 'returns')
+        if returns.empty:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+
+        if isinstance(risk_free_rate, pd.Series):
+            daily_rf = (risk_free_rate.reindex(returns.index).ffill().bfill() / TRADING_DAYS_YEAR).to_numpy()
+            daily_rf = daily_rf[:, None]
+        else:
+            daily_rf = risk_free_rate / TRADING_DAYS_YEAR
+
+        values = returns.to_numpy(dtype=float)
+        statistics = _sufficient_statistics(values, values - daily_rf)
+        sharpe, sortino = _ratios_from_sums(statistics.sum(axis=0))
+
+        # Fixed-size chunks, each with its own child seed
+        chunk_sizes = [CHUNK_SIZE] * (n_resamples // CHUNK_SIZE)
+        if n_resamples % CHUNK_SIZE:
+            chunk_sizes.append(n_resamples % CHUNK_SIZE)
+        seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+        if n_jobs is None:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = max(1, min(n_jobs, len(chunk_sizes)))
+        if n_jobs == 1:
+            # Inputs passed directly: the worker global is only set inside pool processes
+            results = [_run_chunk(s, size, block_length, statistics) for s, size in zip(seeds, chunk_sizes)]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                     initargs=(statistics,)) as pool:
+                results = list(pool.map(_run_chunk, seeds, chunk_sizes,
+                                        [block_length] * len(chunk_sizes)))
+
+        boot_sharpe = np.concatenate([r[0] for r in results])
+        boot_sortino = np.concatenate([r[1] for r in results])
+
+        alpha = (1 - confidence) / 2
+        with np.errstate(invalid='ignore'):
+            sharpe_bounds = np.nanquantile(boot_sharpe, [alpha, 1 - alpha], axis=0)
+            sortino_bounds = np.nanquantile(boot_sortino, [alpha, 1 - alpha], axis=0)
+
+        return pd.DataFrame({
+            'sharpe': sharpe,
+            'sharpe_lower': sharpe_bounds[0],
+            'sharpe_upper': sharpe_bounds[1],
+            'sharpe_se': np.nanstd(boot_sharpe, axis=0, ddof=1),
+            'sortino': sortino,
+            'sortino_lower': sortino_bounds[0],
+            'sortino_upper': sortino_bounds[1],
+            'sortino_se': np.nanstd(boot_sortino, axis=0, ddof=1),
+            'observations': (~np.isnan(values)).sum(axis=0),
+        }, index=returns.columns)
+
+    except Exception as e:
+        logger.error(f"Error bootstrapping Sharpe/Sortino: {str(e)}")
+        return pd.DataFrame(columns=RESULT_COLUMNS)
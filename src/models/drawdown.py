@@ -0,0 +1,253 @@
+"""
+Drawdown Analytics
+Vectorized drawdown statistics for a date x ticker price matrix.
+
+All tickers are processed in one pass over a 2-D numpy array:
+- Running peak via np.fmax.accumulate (NaN before a ticker's first price is ignored)
+- Peak position via a running maximum of "at peak" row numbers
+- Episodes numbered by the cumulative count of new peaks
+
+Windowed variants (e.g. '2Y') slice the tail of the matrix first, so only the
+rows inside the window are scanned.
+"""
+import pandas as pd
+import numpy as np
+import logging
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_COLUMNS = [
+    'max_drawdown', 'peak_date', 'trough_date', 'recovery_date',
+    'drawdown_days', 'recovery_days', 'time_under_water', 'current_drawdown'
+]
+
+EPISODE_COLUMNS = [
+    'ticker', 'rank', 'depth', 'peak_date', 'trough_date', 'recovery_date',
+    'drawdown_days', 'recovery_days'
+]
+
+
+def _to_frame(prices: Union[pd.Series, pd.DataFrame]) -> pd.DataFrame:
+    """Return prices as a sorted DataFrame with a DatetimeIndex"""
+    if isinstance(prices, pd.Series):
+        prices = prices.to_frame(name=prices.name if prices.name is not None else 'price')
+    prices = prices.copy()
+    prices.index = pd.to_datetime(prices.index)
+    return prices.sort_index()
+
+
+def window_slice(prices: pd.DataFrame, window: Optional[Union[int, str]] = None) -> pd.DataFrame:
+    """
+    Return the trailing window of a price matrix without scanning earlier rows
+    Args:
+        prices: Date-indexed price DataFrame (sorted ascending)
+        window: Number of trading days, a pandas offset alias such as '2Y' / '6M',
+            or None for the full history
+    Returns:
+        View of the rows inside the window
+    """
+    if window is None or prices.empty:
+        return prices
+    if isinstance(window, (int, np.integer)):
+        return prices.iloc[-(int(window) + 1):]
+
+    window = window.upper()
+    count, unit = int(window[:-1]), window[-1]
+    if unit == 'Y':
+        offset = pd.DateOffset(years=count)
+    elif unit == 'M':
+        offset = pd.DateOffset(months=count)
+    elif unit == 'W':
+        offset = pd.DateOffset(weeks=count)
+    elif unit == 'D':
+        offset = pd.DateOffset(days=count)
+    else:
+        raise ValueError(f"Unsupported window: {window}")
+
+    start = prices.index[-1] - offset
+    start_pos = prices.index.searchsorted(start, side='left')
+    return prices.iloc[start_pos:]
+
+
+def _drawdown_arrays(values: np.ndarray):
+    """
+    Core single-pass computation over a 2-D price array
+    Returns:
+        (drawdown, peak_pos, episode_id) arrays, each shaped like values
+    """
+    n_rows = values.shape[0]
+    rows = np.arange(n_rows)[:, None]
+
+    running_peak = np.fmax.accumulate(values, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = values / running_peak - 1.0
+
+    at_peak = values >= running_peak
+    peak_pos = np.maximum.accumulate(np.where(at_peak, rows, -1), axis=0)
+    episode_id = np.cumsum(at_peak, axis=0)
+    return drawdown, peak_pos, episode_id
+
+
+def calculate_drawdown_series(prices: Union[pd.Series, pd.DataFrame],
+                              window: Optional[Union[int, str]] = None) -> pd.DataFrame:
+    """
+    Calculate the drawdown from running peak for every ticker
+    Args:
+        prices: Series or DataFrame of adjusted closing prices
+        window: Optional trailing window (see window_slice)
+    Returns:
+        DataFrame of drawdowns (0 at a new high, negative below the peak)
+    """
+    prices = window_slice(_to_frame(prices), window)
+    drawdown, _, _ = _drawdown_arrays(prices.to_numpy(dtype=float))
+    return pd.DataFrame(drawdown, index=prices.index, columns=prices.columns)
+
+
+def summarize_drawdowns(prices: Union[pd.Series, pd.DataFrame],
+                        window: Optional[Union[int, str]] = None) -> pd.DataFrame:
+    """
+    Summarize the maximum drawdown of every ticker in one vectorized pass
+    Args:
+        prices: Series or DataFrame of adjusted closing prices
+        window: Optional trailing window such as '2Y' or 504
+    Returns:
+        DataFrame indexed by ticker with columns:
+            max_drawdown: Deepest peak-to-trough decline (negative decimal)
+            peak_date / trough_date: Dates bounding the deepest decline
+            recovery_date: First date back at the prior peak (NaT if not recovered)
+            drawdown_days: Trading days from peak to trough
+            recovery_days: Trading days from peak to recovery (or to the last date)
+            time_under_water: Fraction of observed days spent below a prior peak
+            current_drawdown: Drawdown on the last date
+    """
+    try:
+        prices = window_slice(_to_frame(prices), window)
+        if prices.empty:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+        values = prices.to_numpy(dtype=float)
+        n_rows, n_cols = values.shape
+        cols = np.arange(n_cols)
+        dates = prices.index.to_numpy()
+        drawdown, peak_pos, _ = _drawdown_arrays(values)
+
+        valid = ~np.isnan(drawdown)
+        has_data = valid.any(axis=0)
+        filled = np.where(valid, drawdown, np.inf)
+        trough_pos = filled.argmin(axis=0)
+        max_dd = np.where(has_data, drawdown[trough_pos, cols], np.nan)
+        peak_at_trough = peak_pos[trough_pos, cols]
+
+        # First row after the trough where the price is back at its peak
+        recovered = (drawdown >= 0) & (np.arange(n_rows)[:, None] > trough_pos)
+        any_recovery = recovered.any(axis=0)
+        recovery_pos = np.where(any_recovery, recovered.argmax(axis=0), -1)
+
+        under_water = (drawdown < 0).sum(axis=0)
+        observed = valid.sum(axis=0)
+        last_dd = drawdown[-1]
+
+        nat = np.datetime64('NaT')
+        in_drawdown = has_data & (max_dd < 0)
+        summary = pd.DataFrame({
+            'max_drawdown': max_dd,
+            'peak_date': np.where(in_drawdown, dates[np.clip(peak_at_trough, 0, None)], nat),
+            'trough_date': np.where(in_drawdown, dates[trough_pos], nat),
+            'recovery_date': np.where(in_drawdown & any_recovery,
+                                      dates[np.clip(recovery_pos, 0, None)], nat),
+            'drawdown_days': np.where(in_drawdown, trough_pos - peak_at_trough, 0),
+            'recovery_days': np.where(in_drawdown,
+                                      np.where(any_recovery, recovery_pos, n_rows - 1) - peak_at_trough,
+                                      0),
+            'time_under_water': np.divide(under_water, observed,
+                                          out=np.full(n_cols, np.nan), where=observed > 0),
+            'current_drawdown': last_dd,
+        }, index=prices.columns)
+        for col in ['peak_date', 'trough_date', 'recovery_date']:
+            summary[col] = pd.to_datetime(summary[col])
+        return summary
+
+    except Exception as e:
+        logger.error(f"Error summarizing drawdowns: {str(e)}")
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+
+def top_drawdowns(prices: Union[pd.Series, pd.DataFrame], top_n: int = 5,
+                  window: Optional[Union[int, str]] = None) -> pd.DataFrame:
+    """
+    List the top-N distinct drawdown episodes for every ticker
+    An episode runs from a peak until the price regains that peak, so episodes
+    never overlap.
+    Args:
+        prices: Series or DataFrame of adjusted closing prices
+        top_n: Number of episodes to keep per ticker
+        window: Optional trailing window such as '2Y' or 504
+    Returns:
+        Long-format DataFrame with one row per (ticker, episode), ranked by depth
+    """
+    try:
+        prices = window_slice(_to_frame(prices), window)
+        if prices.empty:
+            return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+        values = prices.to_numpy(dtype=float)
+        n_rows, n_cols = values.shape
+        drawdown, peak_pos, episode_id = _drawdown_arrays(values)
+
+        # Long format of the rows below peak only
+        row_idx, col_idx = np.nonzero(drawdown < 0)
+        if len(row_idx) == 0:
+            return pd.DataFrame(columns=EPISODE_COLUMNS)
+        long = pd.DataFrame({
+            'col': col_idx,
+            'episode': episode_id[row_idx, col_idx],
+            'row': row_idx,
+            'depth': drawdown[row_idx, col_idx],
+            'peak_row': peak_pos[row_idx, col_idx],
+        })
+
+        grouped = long.groupby(['col', 'episode'], sort=False)
+        episodes = grouped.agg(depth=('depth', 'min'), peak_row=('peak_row', 'first'),
+                               last_row=('row', 'max'))
+        trough_idx = grouped['depth'].idxmin()
+        episodes['trough_row'] = long.loc[trough_idx.to_numpy(), 'row'].to_numpy()
+        episodes = episodes.reset_index()
+
+        # An episode recovers on the row after its last underwater row, if that row exists
+        recovery_row = episodes['last_row'].to_numpy() + 1
+        recovered = recovery_row < n_rows
+        dates = prices.index
+        episodes['ticker'] = prices.columns[episodes['col'].to_numpy()]
+        episodes['peak_date'] = dates[episodes['peak_row'].to_numpy()]
+        episodes['trough_date'] = dates[episodes['trough_row'].to_numpy()]
+        episodes['recovery_date'] = pd.DatetimeIndex(
+            np.where(recovered, dates.to_numpy()[np.minimum(recovery_row, n_rows - 1)],
+                     np.datetime64('NaT')))
+        episodes['drawdown_days'] = episodes['trough_row'] - episodes['peak_row']
+        episodes['recovery_days'] = np.where(recovered, recovery_row, n_rows - 1) - episodes['peak_row']
+
+        episodes = episodes.sort_values(['col', 'depth'])
+        episodes = episodes.groupby('col', sort=False).head(top_n)
+        episodes['rank'] = episodes.groupby('col').cumcount() + 1
+        return episodes[EPISODE_COLUMNS].reset_index(drop=True)
+
+    except Exception as e:
+        logger.error(f"Error finding drawdown episodes: {str(e)}")
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+
+def max_drawdown(prices: Union[pd.Series, pd.DataFrame],
+                 window: Optional[Union[int, str]] = None) -> Union[float, pd.Series]:
+    """
+    Maximum drawdown depth only
+    Args:
+        prices: Series or DataFrame of adjusted closing prices
+        window: Optional trailing window such as '2Y' or 504
+    Returns:
+        float for a Series input, Series by ticker for a DataFrame input
+    """
+    summary = summarize_drawdowns(prices, window)
+    if isinstance(prices, pd.Series):
+        return summary['max_drawdown'].iloc[0] if not summary.empty else np.nan
+    return summary['max_drawdown']
@@ -22,6 +22,10 @@ Metrics Calculated:
 - 2022%: Calendar year 2022 return
 - Volatility: Annualized volatility
 - Max_Drawdown: Maximum drawdown percentage
+- VaR 95%: One-day historical Value at Risk over the last two years
+- CVaR 95%: One-day historical Expected Shortfall over the last two years
+  (VaR/CVaR need the same two years of closes as Sharpe 2Y; like Sharpe 2Y
+  they are 0.0 for tickers with a shorter history)
 
 Excel Formatting Rules:
 - Percentage metrics: One decimal place (0.0%)
@@ -46,90 +50,122 @@ import numpy as np
 from datetime import datetime
 import yfinance as yf
 from .performance_metrics import PerformanceMetrics
+from .tail_risk import tail_risk_table
 import os
 
-def calculate_and_write_metrics(price_df, dividend_df, writer, sheet_name='Metrics'):
+
+def calculate_metrics_table(price_df, dividend_df, lookup_names=True):
     """
-    Calculate all metrics and write to Excel.
+    Calculate the Metrics sheet rows without writing them.
     Each metric is calculated independently so if one fails, others will still populate.
-    All percentage metrics formatted as XX.X%
+    Args:
+        price_df: Date x ticker adjusted closes
+        dividend_df: Sparse dividend amounts by ex-date
+        lookup_names: Fetch each ticker's name from yfinance (one request per
+            ticker); when False the Name column repeats the ticker
+    Returns:
+        DataFrame with one row per ticker, columns in sheet order
     """
-    if price_df.empty:
-        print("DEBUG: No price data available for metrics calculation")
-        return
-
     # Initialize performance metrics calculator
     perf = PerformanceMetrics()
+
+    # Ensure index is datetime for year filtering
+    price_df.index = pd.to_datetime(price_df.index)
+    if not dividend_df.empty:
+        dividend_df.index = pd.to_datetime(dividend_df.index)
     
+    # Tail risk in one batch over the Sharpe window, for the tickers with a Sharpe window
     try:
-        # Ensure index is datetime for year filtering
-        price_df.index = pd.to_datetime(price_df.index)
-        if not dividend_df.empty:
-            dividend_df.index = pd.to_datetime(dividend_df.index)
+        eligible = [ticker for ticker in price_df.columns if perf.has_min_history(price_df[ticker])]
+        window_returns = price_df[eligible].sort_index().iloc[-perf.MIN_HISTORY_DAYS:].pct_change(fill_method=None).iloc[1:]
+        tail_risk = tail_risk_table(window_returns, confidence_levels=(0.95,), methods=('historical',))
+    except Exception as e:
+        print(f"DEBUG: Error calculating tail risk: {str(e)}")
+        tail_risk = pd.DataFrame()
+    
+    # Calculate metrics for all tickers
+    all_metrics_list = []
+    for ticker in price_df.columns:
+        print(f"DEBUG: Calculating metrics for {ticker}")
         
-        # Calculate metrics for all tickers
-        all_metrics_list = []
-        for ticker in price_df.columns:
-            print(f"DEBUG: Calculating metrics for {ticker}")
-            
-            # Get ETF info from yfinance
+        # Get ETF info from yfinance
+        etf_name = ticker
+        if lookup_names:
             try:
                 ticker_info = yf.Ticker(ticker).info
                 etf_name = ticker_info.get('longName', ticker)
             except Exception as e:
                 print(f"DEBUG: Error getting name for {ticker}: {str(e)}")
                 etf_name = ticker  # Fallback to ticker if name lookup fails
-            
-            # Calculate all metrics using performance_metrics
-            metrics = perf.calculate_all_metrics(price_df[ticker])
-            print(f"DEBUG: Raw metrics for {ticker}: {metrics}")
-            
-            # Calculate trailing 12-month yield if dividend data available
-            annual_yield = 0.0
-            if not dividend_df.empty and ticker in dividend_df.columns:
-                try:
-                    latest_price = price_df[ticker].iloc[-1]
-                    last_date = price_df.index[-1]
-                    one_year_ago = last_date - pd.DateOffset(years=1)
-                    ttm_divs = dividend_df[ticker][dividend_df.index >= one_year_ago].sum()
-                    annual_yield = (ttm_divs / latest_price) if latest_price else 0.0
-                except Exception as e:
-                    print(f"DEBUG: Error calculating yield for {ticker}: {str(e)}")
+        
+        # Calculate all metrics using performance_metrics
+        metrics = perf.calculate_all_metrics(price_df[ticker])
+        print(f"DEBUG: Raw metrics for {ticker}: {metrics}")
+        
+        # Calculate trailing 12-month yield if dividend data available
+        annual_yield = 0.0
+        if not dividend_df.empty and ticker in dividend_df.columns:
+            try:
+                latest_price = price_df[ticker].iloc[-1]
+                last_date = price_df.index[-1]
+                one_year_ago = last_date - pd.DateOffset(years=1)
+                ttm_divs = dividend_df[ticker][dividend_df.index >= one_year_ago].sum()
+                annual_yield = (ttm_divs / latest_price) if latest_price else 0.0
+            except Exception as e:
+                print(f"DEBUG: Error calculating yield for {ticker}: {str(e)}")
 
-            # Calculate calendar year returns
-            cy_2023 = 0.0
-            cy_2022 = 0.0
-            
-            # 2023 return
-            data_2023 = price_df[ticker][price_df.index.year == 2023]
-            if not data_2023.empty:
-                cy_2023 = (data_2023.iloc[-1] / data_2023.iloc[0] - 1)
-            
-            # 2022 return
-            data_2022 = price_df[ticker][price_df.index.year == 2022]
-            if not data_2022.empty:
-                cy_2022 = (data_2022.iloc[-1] / data_2022.iloc[0] - 1)
+        # Calculate calendar year returns
+        cy_2023 = 0.0
+        cy_2022 = 0.0
+        
+        # 2023 return
+        data_2023 = price_df[ticker][price_df.index.year == 2023]
+        if not data_2023.empty:
+            cy_2023 = (data_2023.iloc[-1] / data_2023.iloc[0] - 1)
+        
+        # 2022 return
+        data_2022 = price_df[ticker][price_df.index.year == 2022]
+        if not data_2022.empty:
+            cy_2022 = (data_2022.iloc[-1] / data_2022.iloc[0] - 1)
+
+        # Create metrics dictionary in specific order
+        ticker_metrics = {
+            'Ticker': ticker,
+            'Name': etf_name,
+            '%Yield': annual_yield,
+            'Sharpe 2Y': metrics.get('sharpe_2y', 0.0),
+            'Day%': metrics.get('daily_return', 0.0),
+            '1MTH%': metrics.get('one_month_return', 0.0),
+            'YTD%': metrics.get('ytd_return', 0.0),
+            '2023%': cy_2023,
+            '2022%': cy_2022,
+            'Volatility': metrics.get('volatility', 0.0),
+            'Max_Drawdown': metrics.get('max_drawdown', 0.0),
+            'VaR 95%': tail_risk.at[ticker, 'historical_var_95_1d'] if ticker in tail_risk.index else 0.0,
+            'CVaR 95%': tail_risk.at[ticker, 'historical_cvar_95_1d'] if ticker in tail_risk.index else 0.0
+        }
+        print(f"DEBUG: Created metrics dictionary for {ticker}: {ticker_metrics}")
+        all_metrics_list.append(ticker_metrics)
 
-            # Create metrics dictionary in specific order
-            ticker_metrics = {
-                'Ticker': ticker,
-                'Name': etf_name,
-                '%Yield': annual_yield,
-                'Sharpe 2Y': metrics.get('sharpe_2y', 0.0),
-                'Day%': metrics.get('daily_return', 0.0),
-                '1MTH%': metrics.get('one_month_return', 0.0),
-                'YTD%': metrics.get('ytd_return', 0.0),
-                '2023%': cy_2023,
-                '2022%': cy_2022,
-                'Volatility': metrics.get('volatility', 0.0),
-                'Max_Drawdown': metrics.get('max_drawdown', 0.0)
-            }
-            print(f"DEBUG: Created metrics dictionary for {ticker}: {ticker_metrics}")
-            all_metrics_list.append(ticker_metrics)
+    # Convert all metrics to DataFrame preserving column order
+    metrics_df = pd.DataFrame(all_metrics_list)
+    print(f"DEBUG: Created metrics DataFrame with columns: {metrics_df.columns.tolist()}")
+    return metrics_df
 
-        # Convert all metrics to DataFrame preserving column order
-        metrics_df = pd.DataFrame(all_metrics_list)
-        print(f"DEBUG: Created metrics DataFrame with columns: {metrics_df.columns.tolist()}")
+
+def calculate_and_write_metrics(price_df, dividend_df, writer, sheet_name='Metrics'):
+    """
+    Calculate all metrics and write to Excel.
+    Each metric is calculated independently so if one fails, others will still populate.
+    All percentage metrics formatted as XX.X%
+    Returns the metrics table as written, or None if it could not be written
+    """
+    if price_df.empty:
+        print("DEBUG: No price data available for metrics calculation")
+        return
+
+    try:
+        metrics_df = calculate_metrics_table(price_df, dividend_df)
         
         # Write to Excel with formatting
         metrics_df.to_excel(writer, sheet_name=sheet_name, index=False)
@@ -149,8 +185,8 @@ def calculate_and_write_metrics(price_df, dividend_df, writer, sheet_name='Metri
                 worksheet.set_column(idx, idx, 15, writer.book.add_format({'num_format': '0.00'}))
         
         print(f"DEBUG: Successfully wrote metrics for all tickers")
-        return True
+        return metrics_df
         
     except Exception as e:
         print(f"DEBUG: Error calculating/writing metrics: {str(e)}")
-        return False
+        return None
@@ -0,0 +1,135 @@
+"""
+Momentum Screener
+Multi-horizon momentum, skip-month momentum, relative strength against a
+benchmark and cross-sectional percentile ranks for a whole universe.
+
+The price matrix (date x ticker) is prepared once: gaps inside each ticker's
+listed span are forward filled and the result kept as a numpy array. Every
+screen after that only reads the handful of rows the horizons point at, so
+ranking several thousand tickers takes milliseconds.
+
+Horizons use trading-day counts (21-day month, as in PerformanceMetrics).
+Skip-month momentum ('12-1') is the return from 12 months ago to 1 month
+ago, leaving out the most recent month's short-term reversal.
+
+from_store() screens straight from the memory-mapped PriceMatrixStore that
+ExcelManager keeps in <data_dir>/price_store: the selected rows and tickers
+are sliced out of the mapped file, not loaded from the workbooks.
+"""
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, List, Optional, Tuple
+from ..data.price_store import PriceMatrixStore
+
+logger = logging.getLogger(__name__)
+
+HORIZONS = {'1M': 21, '3M': 63, '6M': 126, '12M': 252}
+SKIP_MONTH = {'12-1': (252, 21), '6-1': (126, 21)}  # (lookback, skip) in trading days
+
+
+class MomentumScreener:
+    """
+    Ranks a universe by momentum from a prepared price matrix
+    """
+
+    def __init__(self, prices: pd.DataFrame,
+                 horizons: Optional[Dict[str, int]] = None,
+                 skip_month: Optional[Dict[str, Tuple[int, int]]] = None):
+        """
+        Initialize screener
+        Args:
+            prices: Date x ticker adjusted closes ('Daily Prices' sheet)
+            horizons: {label: trading days} for plain returns
+            skip_month: {label: (lookback, skip)} for skip-month momentum
+        """
+        prices = prices.set_axis(pd.to_datetime(prices.index)).sort_index()
+        self.dates = prices.index
+        self.tickers = prices.columns
+        listed = prices.bfill().notna()
+        self.values = prices.ffill().where(listed).to_numpy(dtype=float)
+        self.horizons = HORIZONS if horizons is None else horizons
+        self.skip_month = SKIP_MONTH if skip_month is None else skip_month
+
+    @classmethod
+    def from_store(cls, store, tickers: Optional[List[str]] = None, start=None, end=None,
+                   **kwargs) -> 'MomentumScreener':
+        """
+        Screener over a price store (or its directory)
+        Args:
+            store: PriceMatrixStore or the path of one
+            tickers: Tickers to screen (defaults to the whole store)
+            start: First date to load; at least 12 months before the screen
+                date is needed for the longest horizons
+            end: Last date to load
+            **kwargs: horizons / skip_month as for the constructor
+        """
+        if not isinstance(store, PriceMatrixStore):
+            store = PriceMatrixStore(store)
+        return cls(store.frame(tickers, start, end), **kwargs)
+
+    def _row(self, asof) -> int:
+        """Position of the last trading day on or before asof"""
+        if asof is None:
+            return len(self.dates) - 1
+        return int(self.dates.searchsorted(pd.Timestamp(asof), side='right')) - 1
+
+    def _period_return(self, end: int, lookback: int, skip: int = 0) -> np.ndarray:
+        """P[end - skip] / P[end - lookback] - 1 for every ticker (NaN without history)"""
+        start = end - lookback
+        if start < 0 or end - skip < 0:
+            return np.full(len(self.tickers), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.values[end - skip] / self.values[start] - 1
+
+    def scores(self, asof=None, benchmark: Optional[str] = None) -> pd.DataFrame:
+        """
+        Momentum metrics and percentile ranks for every ticker
+        Args:
+            asof: Screen date (defaults to the last date); uses the last
+                trading day on or before it
+            benchmark: Optional ticker to measure relative strength against
+        Returns:
+            DataFrame indexed by ticker with ret_<horizon>, mom_<skip-month>,
+            rs_<horizon> (if benchmark), rank_<metric> percentile ranks (0-1,
+            higher = stronger) and score (mean of the ranks)
+        """
+        try:
+            end = self._row(asof)
+            if end < 0:
+                raise ValueError(f"No prices on or before {asof}")
+
+            metrics = {}
+            for label, days in self.horizons.items():
+                metrics[f'ret_{label}'] = self._period_return(end, days)
+            for label, (lookback, skip) in self.skip_month.items():
+                metrics[f'mom_{label}'] = self._period_return(end, lookback, skip)
+            result = pd.DataFrame(metrics, index=self.tickers)
+
+            ranked = list(result.columns)
+            if benchmark is not None:
+                if benchmark not in self.tickers:
+                    raise ValueError(f"Benchmark {benchmark} not in price data")
+                for label in self.horizons:
+                    column = result[f'ret_{label}']
+                    result[f'rs_{label}'] = (1 + column) / (1 + column[benchmark]) - 1
+
+            ranks = result[ranked].rank(pct=True)
+            ranks.columns = [f'rank_{col}' for col in ranked]
+            result = pd.concat([result, ranks], axis=1)
+            result['score'] = ranks.mean(axis=1)
+            return result
+
+        except Exception as e:
+            logger.error(f"Error calculating momentum scores: {str(e)}")
+            return pd.DataFrame()
+
+    def top(self, n: int = 10, by: str = 'score', asof=None,
+            benchmark: Optional[str] = None) -> pd.DataFrame:
+        """Strongest n tickers by a scores() column"""
+        return self.scores(asof, benchmark).nlargest(n, by)
+
+    def bottom(self, n: int = 10, by: str = 'score', asof=None,
+               benchmark: Optional[str] = None) -> pd.DataFrame:
+        """Weakest n tickers by a scores() column"""
+        return self.scores(asof, benchmark).nsmallest(n, by)
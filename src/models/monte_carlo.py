@@ -0,0 +1,236 @@
+"""
+Monte Carlo Forward Simulation
+Forward distributions of value and income for every ticker (and optionally
+a fixed-weight portfolio) from the stored 'Unadjusted Prices' and
+'Dividends' sheets.
+
+Each simulated day draws a price return and an income return
+(dividend / prior close) for all tickers together:
+- 'bootstrap': stationary block bootstrap of historical days, so
+  cross-sectional correlation, volatility clustering and the payment
+  calendar are kept
+- 'normal': multivariate normal log price returns with the historical mean
+  and covariance; income accrues at the historical average daily rate
+
+Distributions are paid out, not reinvested: value follows the price return
+and income is the cash received per $1 invested at the start.
+
+Paths are simulated in float32 in fixed-size chunks (seeded with
+SeedSequence.spawn, so results do not depend on the number of workers) on a
+process pool. Each chunk is reduced straight away to values on the band
+dates, the path's max drawdown and its total income, so memory grows with
+paths x band dates x tickers rather than paths x days x tickers.
+"""
+import pandas as pd
+import numpy as np
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+from .bootstrap import stationary_bootstrap_indices
+from .total_return import align_dividends
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_YEAR = 252
+DEFAULT_PATHS = 10000
+DEFAULT_BLOCK_LENGTH = 10  # Expected block length in trading days
+CHUNK_SIZE = 500  # Paths per task; fixed so seeds do not depend on n_jobs
+MIN_HISTORY_DAYS = 252
+PORTFOLIO_LABEL = 'Portfolio'
+
+# Per-process copy of the inputs, set once by the pool initializer
+_worker_inputs = None
+
+
+def historical_returns(prices: pd.DataFrame, dividends: Optional[pd.DataFrame] = None):
+    """
+    Daily price and income returns on the days every ticker has a price
+    Args:
+        prices: Date x ticker unadjusted closes (adjusted closes with
+            dividends=None simulate total return with no separate income)
+        dividends: Sparse dividend matrix ('Dividends' sheet)
+    Returns:
+        (price_returns, income_returns) DataFrames on the common history
+    """
+    prices = prices.copy()
+    prices.index = pd.to_datetime(prices.index)
+    prices = prices.sort_index()
+    divs = align_dividends(dividends, prices.index, prices.columns)
+
+    previous = prices.shift(1)
+    price_returns = (prices / previous - 1).iloc[1:]
+    income_returns = (divs / previous).iloc[1:]
+    common = price_returns.notna().all(axis=1) & income_returns.notna().all(axis=1)
+    return price_returns[common], income_returns[common]
+
+
+def _init_worker(inputs: dict):
+    """Process pool initializer: keep the inputs resident in each worker"""
+    global _worker_inputs
+    _worker_inputs = inputs
+
+
+def _draw_chunk(rng: np.random.Generator, n_paths: int):
+    """Daily gross price returns and income returns, each (paths, days, columns)"""
+    inputs = _worker_inputs
+    horizon = inputs['horizon']
+    if inputs['method'] == 'bootstrap':
+        idx = stationary_bootstrap_indices(len(inputs['gross']), n_paths,
+                                           inputs['block_length'], rng, length=horizon)
+        return inputs['gross'][idx], inputs['income'][idx]
+
+    n_assets = len(inputs['mean'])
+    shocks = rng.standard_normal((n_paths, horizon, n_assets), dtype=np.float32)
+    gross = np.exp(shocks @ inputs['cholesky'].T + inputs['mean'])
+    income = np.broadcast_to(inputs['income_rate'], gross.shape)
+    weights = inputs['weights']
+    if weights is not None:
+        # Daily-rebalanced portfolio of the same draws
+        portfolio_gross = gross @ weights + (1 - weights.sum())
+        gross = np.concatenate([gross, portfolio_gross[..., None]], axis=2)
+        income = np.concatenate([income, (income @ weights)[..., None]], axis=2)
+    return gross, income
+
+
+def _run_chunk(seed: np.random.SeedSequence, n_paths: int):
+    """Simulate one chunk and reduce it to band values, max drawdown and income"""
+    gross, income = _draw_chunk(np.random.default_rng(seed), n_paths)
+
+    value = np.cumprod(gross, axis=1)
+    peaks = np.maximum(np.maximum.accumulate(value, axis=1), 1.0)
+    max_drawdown = (value / peaks).min(axis=1) - 1
+
+    # Income on day t is paid on the value at the end of day t-1
+    total_income = income[:, 0] + (value[:, :-1] * income[:, 1:]).sum(axis=1)
+    bands = value[:, _worker_inputs['band_days'] - 1]
+    return bands, max_drawdown.astype(float), total_income.astype(float)
+
+
+def _percentile_columns(percentiles: Sequence[float]):
+    return [f"p{p:g}" for p in percentiles]
+
+
+def simulate_forward(prices: pd.DataFrame,
+                     dividends: Optional[pd.DataFrame] = None,
+                     horizon: int = TRADING_DAYS_YEAR,
+                     n_paths: int = DEFAULT_PATHS,
+                     method: str = 'bootstrap',
+                     block_length: float = DEFAULT_BLOCK_LENGTH,
+                     weights: Optional[pd.Series] = None,
+                     percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+                     drawdown_thresholds: Sequence[float] = (0.1, 0.2, 0.3),
+                     band_step: int = 21,
+                     seed: int = 0,
+                     n_jobs: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Simulate forward value and income paths
+    Args:
+        prices: Date x ticker unadjusted closes ('Unadjusted Prices' sheet)
+        dividends: Sparse dividend matrix ('Dividends' sheet), optional
+        horizon: Trading days to simulate
+        n_paths: Number of simulated paths
+        method: 'bootstrap' (stationary block bootstrap) or 'normal'
+        block_length: Expected bootstrap block length in trading days
+        weights: Optional ticker weights for an extra daily-rebalanced
+            'Portfolio' column (remainder held as cash at 0%)
+        percentiles: Percentiles reported for bands, terminal value and income
+        drawdown_thresholds: Drawdown depths (decimals) to report probabilities for
+        band_step: Trading days between band dates (the horizon is always included)
+        seed: Base seed; same seed gives the same results for any n_jobs
+        n_jobs: Worker processes (None = CPU count, 1 = run in this process)
+    Returns:
+        {'bands': long DataFrame (day, ticker, percentiles) of value per $1,
+         'terminal': value at the horizon by ticker (mean + percentiles),
+         'income': cash income over the horizon per $1 (mean + percentiles),
+         'drawdown': probability that max drawdown exceeds each threshold}
+    """
+    try:
+        if method not in ('bootstrap', 'normal'):
+            raise ValueError(f"Unknown simulation method: {method}")
+        price_returns, income_returns = historical_returns(prices, dividends)
+        if len(price_returns) < MIN_HISTORY_DAYS:
+            logger.warning(f"Only {len(price_returns)} days of common history for simulation")
+        if price_returns.empty:
+            raise ValueError("No common price history across tickers")
+
+        tickers = list(price_returns.columns)
+        returns = price_returns.to_numpy(dtype=float)
+        income = income_returns.to_numpy(dtype=float)
+        log_price = np.log1p(returns)
+        gross = 1 + returns
+        weight_values = None
+        if weights is not None:
+            weight_values = weights.reindex(tickers).fillna(0.0).to_numpy(dtype=float)
+            tickers.append(PORTFOLIO_LABEL)
+            if method == 'bootstrap':
+                # Portfolio return on each historical day, resampled with the tickers
+                gross = np.column_stack([gross, gross @ weight_values + (1 - weight_values.sum())])
+                income = np.column_stack([income, income @ weight_values])
+
+        band_days = np.unique(np.r_[np.arange(band_step, horizon + 1, band_step), horizon])
+        covariance = np.atleast_2d(np.cov(log_price, rowvar=False))
+        inputs = {
+            'method': method,
+            'horizon': horizon,
+            'block_length': block_length,
+            'gross': gross.astype(np.float32),
+            'income': income.astype(np.float32),
+            'mean': log_price.mean(axis=0).astype(np.float32),
+            # Small ridge keeps the factorization valid for collinear tickers
+            'cholesky': np.linalg.cholesky(covariance + 1e-12 * np.eye(len(covariance))).astype(np.float32),
+            'income_rate': income_returns.to_numpy(dtype=float).mean(axis=0).astype(np.float32),
+            'weights': None if weight_values is None else weight_values.astype(np.float32),
+            'band_days': band_days,
+        }
+
+        # Fixed-size chunks, each with its own child seed
+        chunk_sizes = [CHUNK_SIZE] * (n_paths // CHUNK_SIZE)
+        if n_paths % CHUNK_SIZE:
+            chunk_sizes.append(n_paths % CHUNK_SIZE)
+        seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+        if n_jobs is None:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = max(1, min(n_jobs, len(chunk_sizes)))
+        if n_jobs == 1:
+            _init_worker(inputs)
+            results = [_run_chunk(s, size) for s, size in zip(seeds, chunk_sizes)]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                     initargs=(inputs,)) as pool:
+                results = list(pool.map(_run_chunk, seeds, chunk_sizes))
+
+        bands = np.concatenate([r[0] for r in results])
+        max_drawdown = np.concatenate([r[1] for r in results])
+        total_income = np.concatenate([r[2] for r in results])
+
+        columns = _percentile_columns(percentiles)
+        band_values = np.percentile(bands, percentiles, axis=0)  # (percentiles, dates, tickers)
+        band_frame = pd.DataFrame(band_values.reshape(len(percentiles), -1).T, columns=columns)
+        band_frame.insert(0, 'ticker', np.tile(tickers, len(band_days)))
+        band_frame.insert(0, 'day', np.repeat(band_days, len(tickers)))
+
+        def summarize(values: np.ndarray) -> pd.DataFrame:
+            frame = pd.DataFrame(np.percentile(values, percentiles, axis=0).T,
+                                 index=tickers, columns=columns)
+            frame.insert(0, 'mean', values.mean(axis=0))
+            return frame
+
+        drawdown = pd.DataFrame({
+            f"prob_drawdown_{threshold:.0%}": (max_drawdown <= -threshold).mean(axis=0)
+            for threshold in drawdown_thresholds
+        }, index=tickers)
+        drawdown['median_max_drawdown'] = np.median(max_drawdown, axis=0)
+
+        return {
+            'bands': band_frame,
+            'terminal': summarize(bands[:, -1].astype(float)),
+            'income': summarize(total_income),
+            'drawdown': drawdown,
+        }
+
+    except Exception as e:
+        logger.error(f"Error running forward simulation: {str(e)}")
+        return {'bands': pd.DataFrame(), 'terminal': pd.DataFrame(),
+                'income': pd.DataFrame(), 'drawdown': pd.DataFrame()}
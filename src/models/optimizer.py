@@ -0,0 +1,473 @@
+"""
+Portfolio Optimizer
+Minimum-variance, max-Sharpe, risk-parity and target-volatility weights and
+an efficient frontier over the stored universe, using numpy only.
+
+Constraints:
+- Fully invested (weights sum to 1)
+- Box bounds per ticker (scalar or Series)
+- Group bounds, e.g. {'High Yield': (['JNK', 'HYG', 'SJNK'], 0.0, 0.3)};
+  groups must not overlap
+
+Mean-variance problems are solved by accelerated projected gradient descent.
+Projection onto the box-constrained simplex is exact and vectorized across
+portfolios, so all frontier points are solved together as one weight matrix.
+Non-overlapping group bounds keep the projection exact: for a global shift
+each group's sum is clipped into its bounds, the shift is found by bisection,
+and each clipped group is then projected onto its own box-simplex.
+
+Covariance estimates are cached per dataset version (a hash of the returns
+matrix), so repeated frontier requests from the dashboard reuse them.
+"""
+import pandas as pd
+import numpy as np
+import hashlib
+import openpyxl
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+from ..data.atomic_io import FileLock, atomic_write
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_YEAR = 252
+MAX_ITERATIONS = 2000
+TOLERANCE = 1e-9
+BISECTION_STEPS = 64  # Global shift search for group-constrained projection
+
+Groups = Dict[str, Tuple[List[str], float, float]]
+
+
+class CovarianceCache:
+    """Small LRU cache of covariance estimates keyed by dataset version"""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def dataset_version(returns: pd.DataFrame) -> str:
+        """Stable hash of a returns matrix (values, dates and tickers)"""
+        digest = hashlib.sha1()
+        digest.update(np.ascontiguousarray(returns.to_numpy(dtype=float)).tobytes())
+        digest.update('|'.join(map(str, returns.columns)).encode())
+        digest.update('|'.join(map(str, returns.index)).encode())
+        return digest.hexdigest()
+
+    def get(self, returns: pd.DataFrame, method: str = 'ledoit_wolf') -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Annualized mean returns and covariance, computed once per dataset version
+        Args:
+            returns: Date x ticker daily returns
+            method: 'sample' or 'ledoit_wolf'
+        Returns:
+            (mean, covariance) annualized
+        """
+        key = (self.dataset_version(returns), method)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        value = estimate_covariance(returns, method)
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop all cached estimates"""
+        self._entries.clear()
+
+
+covariance_cache = CovarianceCache()
+
+
+def estimate_covariance(returns: pd.DataFrame, method: str = 'ledoit_wolf') -> Tuple[pd.Series, pd.DataFrame]:
+    """
+    Annualized mean and covariance of daily returns
+    Args:
+        returns: Date x ticker daily returns (rows with any NaN are dropped)
+        method: 'sample', or 'ledoit_wolf' for shrinkage toward a scaled identity
+    Returns:
+        (mean, covariance) annualized
+    """
+    clean = returns.dropna()
+    values = clean.to_numpy(dtype=float)
+    n_obs, n_assets = values.shape
+    mean = values.mean(axis=0)
+    centered = values - mean
+    sample = centered.T @ centered / (n_obs - 1)
+
+    if method == 'ledoit_wolf':
+        target_scale = np.trace(sample) / n_assets
+        target = target_scale * np.eye(n_assets)
+        biased = centered.T @ centered / n_obs
+        # Ledoit & Wolf (2004) optimal shrinkage intensity
+        phi = ((centered ** 2).T @ (centered ** 2) / n_obs - biased ** 2).sum()
+        gamma = ((biased - target) ** 2).sum()
+        shrinkage = 0.0 if gamma == 0 else float(np.clip(phi / gamma / n_obs, 0.0, 1.0))
+        covariance = shrinkage * target + (1 - shrinkage) * sample
+    elif method == 'sample':
+        covariance = sample
+    else:
+        raise ValueError(f"Unknown covariance method: {method}")
+
+    return (pd.Series(mean * TRADING_DAYS_YEAR, index=clean.columns),
+            pd.DataFrame(covariance * TRADING_DAYS_YEAR, index=clean.columns, columns=clean.columns))
+
+
+def _bounds(value: Union[float, pd.Series, None], tickers: pd.Index, default: float) -> np.ndarray:
+    """Broadcast a scalar / Series bound to the ticker order"""
+    if value is None:
+        return np.full(len(tickers), default)
+    if isinstance(value, pd.Series):
+        return value.reindex(tickers).fillna(default).to_numpy(dtype=float)
+    return np.full(len(tickers), float(value))
+
+
+def project_box_simplex(points: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                        total: Union[float, np.ndarray] = 1.0) -> np.ndarray:
+    """
+    Exact Euclidean projection of each row onto {sum w = total, lower <= w <= upper}
+    The projection is clip(v - shift, lower, upper) for the shift where the sum
+    is the total. As the shift rises past v - upper a weight leaves its upper bound,
+    and past v - lower it reaches its lower bound, so the sum is piecewise
+    linear with 2N breakpoints. Sorting those events and cumulating their
+    effect gives the sum at every breakpoint in O(N log N) per row.
+    Args:
+        points: K x N array
+        lower / upper: Per-ticker bounds (sum(lower) <= total <= sum(upper))
+        total: Target row sum, scalar or one per row
+    Returns:
+        K x N projected weights
+    """
+    points = np.atleast_2d(points)
+    n_points, n_assets = points.shape
+    lower_b = np.broadcast_to(lower, points.shape)
+    upper_b = np.broadcast_to(upper, points.shape)
+
+    breaks = np.hstack([points - upper_b, points - lower_b])
+    # Leaving the upper bound adds (v - upper) and one free weight; reaching the
+    # lower bound adds (lower - v) and removes one free weight
+    constant = np.hstack([points - upper_b, lower_b - points])
+    free = np.hstack([np.ones(points.shape), -np.ones(points.shape)])
+
+    order = np.argsort(breaks, axis=1, kind='stable')
+    breaks = np.take_along_axis(breaks, order, axis=1)
+    cum_constant = np.cumsum(np.take_along_axis(constant, order, axis=1), axis=1)
+    cum_free = np.cumsum(np.take_along_axis(free, order, axis=1), axis=1)
+    totals = upper_b.sum(axis=1)[:, None] + cum_constant - breaks * cum_free
+    target = np.broadcast_to(np.asarray(total, dtype=float), (n_points,))
+
+    # totals fall as the shift rises: the segment after the last breakpoint with total >= target
+    segment = np.clip((totals >= target[:, None]).sum(axis=1) - 1, 0, 2 * n_assets - 1)
+    rows = np.arange(n_points)
+    base = upper_b.sum(axis=1) + cum_constant[rows, segment]
+    slope = cum_free[rows, segment]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift = np.where(slope > 0, (base - target) / slope, breaks[rows, segment])
+    return np.clip(points - shift[:, None], lower_b, upper_b)
+
+
+def _project_with_groups(points: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                         group_specs: list) -> np.ndarray:
+    """
+    Exact projection onto the box-simplex with non-overlapping group bounds
+    For a global shift s, ungrouped weights are clip(v - s) and each group's
+    sum is clip(v - s) summed, then clipped into the group's bounds; the total
+    falls monotonically in s, so s is found by bisection. Groups whose sum was
+    clipped are then projected onto their own box-simplex at that sum.
+    """
+    points = np.atleast_2d(points)
+    group_lo = [max(g_lo, lower[mask].sum()) for mask, g_lo, _ in group_specs]
+    group_hi = [min(g_hi, upper[mask].sum()) for mask, _, g_hi in group_specs]
+
+    def group_totals(shift: np.ndarray):
+        weights = np.clip(points - shift[:, None], lower, upper)
+        raw = [weights[:, mask].sum(axis=1) for mask, _, _ in group_specs]
+        clipped = [np.clip(r, a, b) for r, a, b in zip(raw, group_lo, group_hi)]
+        return weights, raw, clipped
+
+    low = (points - upper).min(axis=1) - 1.0
+    high = (points - lower).max(axis=1) + 1.0
+    for _ in range(BISECTION_STEPS):
+        middle = (low + high) / 2
+        weights, _, clipped = group_totals(middle)
+        total = weights.sum(axis=1) + sum(c - weights[:, mask].sum(axis=1)
+                                          for c, (mask, _, _) in zip(clipped, group_specs))
+        above = total > 1
+        low = np.where(above, middle, low)
+        high = np.where(above, high, middle)
+
+    weights, raw, clipped = group_totals((low + high) / 2)
+    for (mask, _, _), r, c in zip(group_specs, raw, clipped):
+        bound = r != c
+        if bound.any():
+            sub = np.ix_(bound, mask)
+            weights[sub] = project_box_simplex(points[sub], lower[mask], upper[mask], c[bound])
+    return weights
+
+
+def make_projection(tickers: pd.Index, lower: Union[float, pd.Series, None] = 0.0,
+                    upper: Union[float, pd.Series, None] = 1.0, groups: Optional[Groups] = None):
+    """
+    Build the feasible-set projection for a universe and its constraints
+    Returns:
+        Function mapping a K x N array to the nearest feasible weights
+    """
+    lo = _bounds(lower, tickers, 0.0)
+    hi = _bounds(upper, tickers, 1.0)
+    if lo.sum() > 1 + 1e-12 or hi.sum() < 1 - 1e-12:
+        raise ValueError("Box bounds cannot sum to a fully invested portfolio")
+    group_specs = []
+    assigned = np.zeros(len(tickers), dtype=bool)
+    for name, (members, group_lo, group_hi) in (groups or {}).items():
+        mask = np.asarray(tickers.isin(members))
+        if not mask.any():
+            logger.warning(f"Group {name} has no tickers in the universe")
+            continue
+        if (mask & assigned).any():
+            raise ValueError(f"Group {name} overlaps another group")
+        assigned |= mask
+        group_specs.append((mask, group_lo, group_hi))
+
+    if group_specs:
+        free_lo = lo[~assigned].sum() + sum(max(a, lo[m].sum()) for m, a, _ in group_specs)
+        free_hi = hi[~assigned].sum() + sum(min(b, hi[m].sum()) for m, _, b in group_specs)
+        if free_lo > 1 + 1e-12 or free_hi < 1 - 1e-12:
+            raise ValueError("Group bounds cannot sum to a fully invested portfolio")
+
+    def project(points: np.ndarray) -> np.ndarray:
+        if not group_specs:
+            return project_box_simplex(points, lo, hi)
+        return _project_with_groups(points, lo, hi, group_specs)
+
+    return project
+
+
+def _solve_mean_variance(covariance: np.ndarray, mean: np.ndarray, tilt: np.ndarray,
+                         project) -> np.ndarray:
+    """
+    Minimize 0.5 * w'Cw - tilt * w'mu for every tilt at once
+    FISTA with gradient-based adaptive restart. tilt = 0 gives minimum
+    variance; larger tilts move up the frontier.
+    """
+    n_points, n_assets = len(tilt), len(mean)
+    step = 1.0 / max(np.linalg.eigvalsh(covariance).max(), 1e-12)
+    weights = project(np.full((n_points, n_assets), 1.0 / n_assets))
+    momentum = weights.copy()
+    t = np.ones(n_points)
+    for _ in range(MAX_ITERATIONS):
+        gradient = momentum @ covariance - tilt[:, None] * mean
+        updated = project(momentum - step * gradient)
+        # Restart momentum on rows where it points uphill
+        restart = ((momentum - updated) * (updated - weights)).sum(axis=1) > 0
+        t = np.where(restart, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + ((t - 1) / t_next)[:, None] * (updated - weights)
+        change = np.abs(updated - weights).max()
+        weights, t = updated, t_next
+        if change < TOLERANCE:
+            break
+    return weights
+
+
+def _portfolio_stats(weights: np.ndarray, mean: np.ndarray, covariance: np.ndarray,
+                     risk_free_rate: float) -> pd.DataFrame:
+    """Expected return, volatility and Sharpe of each weight row"""
+    expected = weights @ mean
+    volatility = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', weights, covariance, weights), 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (expected - risk_free_rate) / volatility
+    return pd.DataFrame({'expected_return': expected, 'volatility': volatility, 'sharpe': sharpe})
+
+
+class PortfolioOptimizer:
+    """Optimizes long-only, fully invested portfolios over a returns matrix"""
+
+    def __init__(self, returns: pd.DataFrame, risk_free_rate: float = 0.03,
+                 lower: Union[float, pd.Series, None] = 0.0,
+                 upper: Union[float, pd.Series, None] = 1.0,
+                 groups: Optional[Groups] = None,
+                 covariance_method: str = 'ledoit_wolf',
+                 cache: Optional[CovarianceCache] = None):
+        """
+        Initialize optimizer
+        Args:
+            returns: Date x ticker daily returns
+            risk_free_rate: Annual risk-free rate as a decimal
+            lower / upper: Box bounds per ticker (scalar or Series)
+            groups: {name: (tickers, min_weight, max_weight)}
+            covariance_method: 'ledoit_wolf' or 'sample'
+            cache: Covariance cache (defaults to the module-level cache)
+        """
+        cache = covariance_cache if cache is None else cache
+        mean, covariance = cache.get(returns, covariance_method)
+        self.tickers = covariance.columns
+        self.mean = mean.to_numpy()
+        self.covariance = covariance.to_numpy()
+        self.risk_free_rate = risk_free_rate
+        self.project = make_projection(self.tickers, lower, upper, groups)
+        self._grids = {}
+
+    def _result(self, weights: np.ndarray, labels) -> pd.DataFrame:
+        """Weights plus summary statistics, one row per portfolio"""
+        stats = _portfolio_stats(weights, self.mean, self.covariance, self.risk_free_rate)
+        frame = pd.DataFrame(weights, columns=self.tickers)
+        frame = pd.concat([stats, frame], axis=1)
+        frame.index = labels
+        return frame
+
+    def _tilt_grid(self, n_points: int) -> np.ndarray:
+        """
+        Return tilts from minimum variance (0) up to where the highest-return
+        corner is reached, located with a coarse pass so points are not wasted
+        """
+        if n_points not in self._grids:
+            scale = np.diag(self.covariance).max() / max(np.abs(self.mean).max(), 1e-12)
+            coarse = scale * np.logspace(-3, 3, 25)
+            expected = _solve_mean_variance(self.covariance, self.mean, coarse, self.project) @ self.mean
+            saturated = expected >= expected.max() - 1e-6 * max(abs(expected.max()), 1e-12)
+            top = coarse[int(np.argmax(saturated))]
+            self._grids[n_points] = np.concatenate([[0.0], np.geomspace(min(scale * 1e-3, top / 1e3), top, n_points - 1)])
+        return self._grids[n_points]
+
+    def min_variance(self) -> pd.DataFrame:
+        """Minimum-variance portfolio"""
+        weights = _solve_mean_variance(self.covariance, self.mean, np.array([0.0]), self.project)
+        return self._result(weights, ['min_variance'])
+
+    def efficient_frontier(self, n_points: int = 100) -> pd.DataFrame:
+        """
+        Efficient frontier solved as one batch of mean-variance problems
+        Returns:
+            DataFrame of n_points portfolios sorted by volatility
+        """
+        weights = _solve_mean_variance(self.covariance, self.mean, self._tilt_grid(n_points), self.project)
+        frontier = self._result(weights, range(n_points))
+        frontier = frontier.sort_values('volatility').reset_index(drop=True)
+        frontier.index.name = 'point'
+        return frontier
+
+    def max_sharpe(self, n_points: int = 100) -> pd.DataFrame:
+        """Highest-Sharpe portfolio on the frontier, refined between neighbouring points"""
+        grid = self._tilt_grid(n_points)
+        weights = _solve_mean_variance(self.covariance, self.mean, grid, self.project)
+        sharpe = _portfolio_stats(weights, self.mean, self.covariance, self.risk_free_rate)['sharpe'].to_numpy()
+        best = int(np.nanargmax(sharpe))
+        refine = np.linspace(grid[max(best - 1, 0)], grid[min(best + 1, n_points - 1)], 25)
+        refined = _solve_mean_variance(self.covariance, self.mean, refine, self.project)
+        candidates = np.vstack([weights[best:best + 1], refined])
+        stats = _portfolio_stats(candidates, self.mean, self.covariance, self.risk_free_rate)
+        choice = int(np.nanargmax(stats['sharpe'].to_numpy()))
+        return self._result(candidates[choice:choice + 1], ['max_sharpe'])
+
+    def target_volatility(self, target: float, n_points: int = 100) -> pd.DataFrame:
+        """
+        Highest expected return with volatility at or below target
+        Falls back to minimum variance if the target is below its volatility.
+        """
+        return frontier_target_volatility(self.efficient_frontier(n_points), target)
+
+    def risk_parity(self, budgets: Optional[pd.Series] = None) -> pd.DataFrame:
+        """
+        Equal (or budgeted) risk contribution portfolio
+        Solved unconstrained by cyclical coordinate descent, then projected
+        onto the constraints, so binding bounds give an approximate solution.
+        Args:
+            budgets: Optional risk budget per ticker (normalized to sum to 1)
+        """
+        n_assets = len(self.tickers)
+        b = np.full(n_assets, 1.0 / n_assets) if budgets is None else \
+            budgets.reindex(self.tickers).fillna(0.0).to_numpy(dtype=float)
+        b = b / b.sum()
+        diag = np.diag(self.covariance)
+        x = b / np.sqrt(diag)
+        marginal = self.covariance @ x
+        for _ in range(MAX_ITERATIONS):
+            # Cyclical coordinate descent: solve x_i * (Cx)_i = b_i for each i in turn
+            largest_change = 0.0
+            for i in range(n_assets):
+                other = marginal[i] - diag[i] * x[i]
+                updated = (-other + np.sqrt(other * other + 4 * diag[i] * b[i])) / (2 * diag[i])
+                marginal += self.covariance[:, i] * (updated - x[i])
+                largest_change = max(largest_change, abs(updated - x[i]))
+                x[i] = updated
+            if largest_change < TOLERANCE * x.sum():
+                break
+        weights = self.project((x / x.sum())[None, :])
+        return self._result(weights, ['risk_parity'])
+
+    def risk_contributions(self, weights: pd.Series) -> pd.Series:
+        """Share of portfolio variance contributed by each ticker"""
+        w = weights.reindex(self.tickers).fillna(0.0).to_numpy()
+        contribution = w * (self.covariance @ w)
+        return pd.Series(contribution / contribution.sum(), index=self.tickers)
+
+
+def frontier_max_sharpe(frontier: pd.DataFrame) -> pd.DataFrame:
+    """Highest-Sharpe point of a solved frontier (no re-solve or refinement)"""
+    result = frontier.loc[[frontier['sharpe'].idxmax()]]
+    result.index = ['max_sharpe']
+    return result
+
+
+def frontier_target_volatility(frontier: pd.DataFrame, target: float) -> pd.DataFrame:
+    """
+    Highest expected return on a solved frontier with volatility at or below target
+    Falls back to the lowest-volatility (minimum variance) point if the target is below it.
+    """
+    feasible = frontier[frontier['volatility'] <= target + 1e-12]
+    if feasible.empty:
+        logger.warning(f"Target volatility {target:.2%} below minimum variance; using minimum variance")
+        result = frontier.loc[[frontier['volatility'].idxmin()]]
+    else:
+        result = feasible.loc[[feasible['expected_return'].idxmax()]]
+    result.index = ['target_volatility']
+    return result
+
+
+def write_optimization_results(writer, portfolios: pd.DataFrame,
+                               frontier: Optional[pd.DataFrame] = None,
+                               sheet_name: str = 'Optimization') -> bool:
+    """
+    Write optimized portfolios (and optionally the frontier) to one sheet
+    Args:
+        writer: pd.ExcelWriter (xlsxwriter for new workbooks, openpyxl in append mode)
+        portfolios: Rows from PortfolioOptimizer methods, concatenated
+        frontier: Optional efficient_frontier output, written below the portfolios
+        sheet_name: Target sheet
+    Returns:
+        True if written successfully
+    """
+    try:
+        portfolios.to_excel(writer, sheet_name=sheet_name, index_label='Portfolio')
+        if frontier is not None and not frontier.empty:
+            frontier.to_excel(writer, sheet_name=sheet_name, startrow=len(portfolios) + 3,
+                              index_label='Frontier Point')
+        return True
+    except Exception as e:
+        logger.error(f"Error writing optimization results: {str(e)}")
+        return False
+
+
+def export_to_workbook(excel_path: str, portfolios: pd.DataFrame,
+                       frontier: Optional[pd.DataFrame] = None,
+                       sheet_name: str = 'Optimization') -> bool:
+    """Add (or replace) the optimization sheet in an existing dashboard workbook"""
+    try:
+        # Drop any previous sheet up front: with 'replace', the second (frontier)
+        # write into the same sheet would replace the portfolios just written.
+        # Edits go to a copy that replaces the workbook once complete.
+        with FileLock(excel_path), atomic_write(excel_path) as temp_path:
+            workbook = openpyxl.load_workbook(excel_path)
+            if sheet_name in workbook.sheetnames:
+                del workbook[sheet_name]
+            workbook.save(temp_path)
+            with pd.ExcelWriter(temp_path, engine='openpyxl', mode='a', if_sheet_exists='overlay') as writer:
+                written = write_optimization_results(writer, portfolios, frontier, sheet_name)
+            if not written:
+                raise ValueError("optimization results could not be written")
+        return True
+    except Exception as e:
+        logger.error(f"Error exporting optimization to {excel_path}: {str(e)}")
+        return False
@@ -7,40 +7,19 @@ import numpy as np
 import logging
 from typing import Dict, Optional, Union, List, Tuple
 import yfinance as yf
+from .drawdown import max_drawdown
+from .tail_risk import calculate_tail_risk
+from .risk_free_rate import get_risk_free_service
 
 logger = logging.getLogger(__name__)
 
 def calculate_bil_risk_free_rate() -> float:
     """
-    Calculate risk-free rate using BIL ETF's 2-year dividend yield
+    Risk-free rate from BIL ETF's 2-year dividend yield (cached series)
     Returns:
-        float: Annualized risk-free rate
+        float: Annualized risk-free rate (3% if unavailable)
     """
-    try:
-        print("DEBUG: Starting BIL risk-free rate calculation")
-        # Fetch BIL data
-        bil = yf.Ticker("BIL")
-        
-        # Get 2 years of price history
-        price_history = bil.history(period="2y")
-        avg_price = price_history['Close'].mean()
-        print(f"DEBUG: BIL average price: {avg_price}")
-        
-        # Get dividend history
-        dividends = bil.dividends
-        recent_dividends = dividends[-504:]  # Last 2 years of trading days
-        total_dividends = recent_dividends.sum()
-        print(f"DEBUG: BIL total dividends: {total_dividends}")
-        
-        # Calculate annualized yield
-        risk_free_rate = (total_dividends / 2) / avg_price
-        print(f"DEBUG: Calculated risk-free rate: {risk_free_rate}")
-        
-        return risk_free_rate
-        
-    except Exception as e:
-        print(f"DEBUG: Error calculating BIL risk-free rate: {str(e)}")
-        return 0.03  # Default to 3% if calculation fails
+    return get_risk_free_service('bil').rate()
 
 class PerformanceMetrics:
     """Calculates performance and risk metrics for stocks"""
@@ -97,6 +76,10 @@ class PerformanceMetrics:
             logger.error(f"Error calculating returns: {str(e)}")
             return {}
             
+    def has_min_history(self, prices: pd.Series) -> bool:
+        """True if prices hold the MIN_HISTORY_DAYS closes the 2-year metrics need (NaN padding not counted)"""
+        return prices.count() >= self.MIN_HISTORY_DAYS
+
     def calculate_risk_metrics(self, prices: pd.Series) -> Dict[str, Union[float, Tuple[float, bool]]]:
         """
         Calculate risk metrics including Sharpe ratio
@@ -109,8 +92,8 @@ class PerformanceMetrics:
             metrics = {}
             
             # Ensure we have enough data
-            if len(prices) < self.MIN_HISTORY_DAYS:
-                logger.warning(f"Insufficient data for risk metrics. Need {self.MIN_HISTORY_DAYS} days, got {len(prices)}")
+            if not self.has_min_history(prices):
+                logger.warning(f"Insufficient data for risk metrics. Need {self.MIN_HISTORY_DAYS} days, got {prices.count()}")
                 return metrics
             
             # Get exactly 504 trading days of data, starting from most recent
@@ -193,9 +176,7 @@ class PerformanceMetrics:
     def _calculate_max_drawdown(self, prices: pd.Series) -> Optional[float]:
         """Calculate maximum drawdown"""
         try:
-            peak = prices.expanding(min_periods=1).max()
-            drawdown = (prices - peak) / peak
-            return drawdown.min()
+            return max_drawdown(prices)
         except Exception:
             return None
             
@@ -247,7 +228,8 @@ class PerformanceMetrics:
     def _calculate_var(self, returns: pd.Series, confidence: float) -> Optional[float]:
         """Calculate Value at Risk"""
         try:
-            return np.percentile(returns, (1 - confidence) * 100)
+            result = calculate_tail_risk(returns, confidence_levels=(confidence,), methods=('historical',))
+            return result['var'].iloc[0] if not result.empty else None
         except Exception:
             return None
             
@@ -0,0 +1,173 @@
+"""
+Portfolio Evaluator
+Scores many candidate portfolios (K weight vectors over N tickers) at once.
+
+Rebalancing is handled without a per-portfolio loop:
+- Log growth of each ticker is cumulated once and reset at every rebalance date,
+  giving each ticker's growth since the last rebalance
+- Portfolio value since the last rebalance is then one matrix product,
+  growth (days x N) @ weights.T (N x K), plus any uninvested cash weight
+- Daily portfolio returns are ratios of consecutive values, with the value
+  reset to 1 at each rebalance
+
+Portfolios are processed in chunks of columns to bound memory.
+Sharpe follows PerformanceMetrics: daily excess mean over daily return
+standard deviation, annualized with sqrt(252).
+"""
+import pandas as pd
+import numpy as np
+import logging
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_YEAR = 252
+DEFAULT_CHUNK_SIZE = 2000  # Portfolios per matrix product
+
+REBALANCE_PERIODS = {
+    'daily': None,
+    'weekly': 'W',
+    'monthly': 'M',
+    'quarterly': 'Q',
+    'annual': 'Y',
+    'none': 'none',
+}
+
+RESULT_COLUMNS = ['annual_return', 'volatility', 'sharpe', 'max_drawdown', 'yield']
+
+
+def rebalance_flags(index: pd.Index, rebalance: str) -> np.ndarray:
+    """
+    Mark the rows on which portfolios are reset to target weights
+    Args:
+        index: Date index of the returns matrix
+        rebalance: One of REBALANCE_PERIODS
+    Returns:
+        Boolean array, True on the first row of each rebalance period
+    """
+    if rebalance not in REBALANCE_PERIODS:
+        raise ValueError(f"Unknown rebalance frequency: {rebalance}")
+    n_obs = len(index)
+    period = REBALANCE_PERIODS[rebalance]
+    if period is None:
+        return np.ones(n_obs, dtype=bool)
+    flags = np.zeros(n_obs, dtype=bool)
+    if n_obs == 0:
+        return flags
+    flags[0] = True
+    if period != 'none':
+        labels = pd.DatetimeIndex(pd.to_datetime(index)).to_period(period)
+        flags[1:] = labels[1:] != labels[:-1]
+    return flags
+
+
+def _as_weight_matrix(weights: Union[pd.DataFrame, np.ndarray], columns: pd.Index) -> pd.DataFrame:
+    """Weights as a K x N DataFrame ordered like the returns columns"""
+    if isinstance(weights, pd.Series):
+        weights = weights.to_frame().T
+    if isinstance(weights, pd.DataFrame):
+        missing = set(weights.columns) - set(columns)
+        if missing:
+            raise ValueError(f"Weights reference tickers without returns: {sorted(missing)}")
+        return weights.reindex(columns=columns, fill_value=0.0).astype(float)
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    if weights.shape[1] != len(columns):
+        raise ValueError(f"Expected {len(columns)} weights per portfolio, got {weights.shape[1]}")
+    return pd.DataFrame(weights, columns=columns)
+
+
+def _chunk_returns(log_growth_since: np.ndarray, prev_reset: np.ndarray,
+                   weights: np.ndarray) -> np.ndarray:
+    """Daily returns for one chunk of portfolios (weights K x N)"""
+    cash = 1.0 - weights.sum(axis=1)
+    value = np.exp(log_growth_since) @ weights.T + cash
+    prev_value = np.vstack([np.ones((1, weights.shape[0])), value[:-1]])
+    prev_value[prev_reset] = 1.0
+    return value / prev_value - 1.0
+
+
+def _prepare(returns: pd.DataFrame, rebalance: str):
+    """Log growth since the last rebalance for every row and ticker"""
+    values = returns.to_numpy(dtype=float)
+    values = np.where(np.isnan(values), 0.0, values)  # Not yet listed: held as cash-like
+    log_cum = np.cumsum(np.log1p(values), axis=0)
+    flags = rebalance_flags(returns.index, rebalance)
+
+    # Log growth up to the row before each period began, carried forward
+    reset_pos = np.maximum.accumulate(np.where(flags, np.arange(len(values)), 0))
+    base = np.vstack([np.zeros((1, values.shape[1])), log_cum])[reset_pos]
+    return log_cum - base, flags
+
+
+def portfolio_returns(returns: pd.DataFrame, weights: Union[pd.DataFrame, np.ndarray],
+                      rebalance: str = 'monthly') -> pd.DataFrame:
+    """
+    Daily returns of every portfolio
+    Args:
+        returns: Date x ticker daily returns
+        weights: K x N weights (rows = portfolios, columns = tickers). Rows need
+            not sum to 1; the remainder is held as cash at 0% return
+        rebalance: 'daily', 'weekly', 'monthly', 'quarterly', 'annual' or 'none'
+    Returns:
+        Date x portfolio DataFrame of daily returns
+    """
+    weights = _as_weight_matrix(weights, returns.columns)
+    log_since, flags = _prepare(returns, rebalance)
+    result = _chunk_returns(log_since, flags, weights.to_numpy())
+    return pd.DataFrame(result, index=returns.index, columns=weights.index)
+
+
+def evaluate_portfolios(returns: pd.DataFrame, weights: Union[pd.DataFrame, np.ndarray],
+                        rebalance: str = 'monthly',
+                        risk_free_rate: float = 0.03,
+                        yields: Optional[pd.Series] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Score every portfolio
+    Args:
+        returns: Date x ticker daily returns
+        weights: K x N weights (DataFrame with ticker columns, or array in returns column order)
+        rebalance: Rebalance frequency (see portfolio_returns)
+        risk_free_rate: Annual risk-free rate as a decimal
+        yields: Optional per-ticker yields (e.g. latest TTM yield); portfolio yield is
+            the target-weighted average
+        chunk_size: Portfolios per matrix product
+    Returns:
+        DataFrame indexed like the weights with annual_return, volatility, sharpe,
+        max_drawdown and yield
+    """
+    try:
+        weights = _as_weight_matrix(weights, returns.columns)
+        log_since, flags = _prepare(returns, rebalance)
+        n_obs = len(returns)
+        daily_rf = risk_free_rate / TRADING_DAYS_YEAR
+        weight_values = weights.to_numpy()
+
+        chunks = []
+        for start in range(0, len(weights), chunk_size):
+            port = _chunk_returns(log_since, flags, weight_values[start:start + chunk_size])
+            log_wealth = np.cumsum(np.log1p(port), axis=0)
+            wealth = np.exp(log_wealth)
+            peaks = np.maximum(np.maximum.accumulate(wealth, axis=0), 1.0)
+            std = port.std(axis=0, ddof=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                chunks.append(np.column_stack([
+                    np.exp(log_wealth[-1] * TRADING_DAYS_YEAR / n_obs) - 1,
+                    std * np.sqrt(TRADING_DAYS_YEAR),
+                    (port.mean(axis=0) - daily_rf) / std * np.sqrt(TRADING_DAYS_YEAR),
+                    (wealth / peaks - 1).min(axis=0),
+                ]))
+        stats = np.vstack(chunks)
+
+        if yields is not None:
+            portfolio_yield = weight_values @ yields.reindex(returns.columns).fillna(0.0).to_numpy()
+        else:
+            portfolio_yield = np.full(len(weights), np.nan)
+
+        result = pd.DataFrame(stats, index=weights.index, columns=RESULT_COLUMNS[:4])
+        result['yield'] = portfolio_yield
+        return result
+
+    except Exception as e:
+        logger.error(f"Error evaluating portfolios: {str(e)}")
+        return pd.DataFrame(columns=RESULT_COLUMNS)
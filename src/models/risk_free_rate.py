@@ -0,0 +1,365 @@
+"""
+Risk-Free Rate Service
+One cached daily risk-free rate series per source, shared by every metric.
+
+Sources (annualized decimal rates):
+- 'irx': 13-week Treasury bill yield (^IRX close / 100)
+- 'bil', 'shv': T-bill ETF distribution yield, trailing two years of
+  dividends / 2 over the average close of the same window
+- 'csv': local date,rate file (data/treasury_rates/daily_rates.csv)
+
+All sources share one parquet file (one column per source) that is only
+ever appended to: a refresh fetches the days after the last cached date.
+Sources may add detail columns, stored as '<source>.<name>': the ETF yields
+keep their average close and two-year dividend total, so
+etf_yield_components() is answered from the cache as well.
+The file lives in data/treasury_rates under the project root, whatever the
+working directory.
+New rates are also upserted into the SQLite warehouse's rates table under
+the source name (the pipeline's warehouse for the default cache directory,
+<cache_dir>/warehouse.sqlite for any other).
+The loaded series is also kept in memory as int64 day stamps and a float
+array, so scalar and aligned lookups are a searchsorted away.
+"""
+import pandas as pd
+import numpy as np
+import yfinance as yf
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+from ..data.warehouse import Warehouse, DEFAULT_WAREHOUSE, WAREHOUSE_FILE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = 0.03                                # Fallback when no rate is available
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = PROJECT_ROOT / "data" / "treasury_rates"
+CACHE_FILENAME = "risk_free_rates.parquet"
+HISTORY_START = '2000-01-01'                       # First date fetched for an empty cache
+ETF_YIELD_WINDOW = pd.Timedelta(days=730)          # Two-year window of the ETF yield
+
+
+class YahooRateSource:
+    """Yield index quoted in percent (^IRX, ^FVX, ...)"""
+
+    def __init__(self, ticker: str = '^IRX'):
+        self.ticker = ticker
+
+    def fetch(self, start: datetime, end: datetime) -> pd.Series:
+        history = yf.Ticker(self.ticker).history(start=start, end=end + timedelta(days=1))
+        if history.empty:
+            return pd.Series(dtype=float)
+        rates = history['Close'] / 100.0
+        rates.index = pd.DatetimeIndex(rates.index.date)
+        return rates
+
+
+class ETFYieldSource:
+    """Distribution yield of a T-bill ETF (BIL, SHV), with its inputs as details"""
+
+    details = ('avg_close', 'dividends')
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    def fetch(self, start: datetime, end: datetime) -> pd.DataFrame:
+        # The first new yield needs a full window of earlier closes and dividends
+        history = yf.Ticker(self.ticker).history(start=pd.Timestamp(start) - ETF_YIELD_WINDOW,
+                                                 end=end + timedelta(days=1), auto_adjust=False)
+        if history.empty:
+            return pd.Series(dtype=float)
+        history.index = pd.DatetimeIndex(history.index.date)
+        rates = etf_yield_series(history['Close'], history['Dividends'], details=True)
+        return rates[rates.index >= pd.Timestamp(start)]
+
+
+class CSVRateSource:
+    """Local file with date and rate columns"""
+
+    def __init__(self, path: str = str(DEFAULT_CACHE_DIR / "daily_rates.csv")):
+        self.path = Path(path)
+
+    def fetch(self, start: datetime, end: datetime) -> pd.Series:
+        if not self.path.exists():
+            return pd.Series(dtype=float)
+        frame = pd.read_csv(self.path, parse_dates=['date'])
+        rates = frame.set_index('date')['rate']
+        return rates[(rates.index >= pd.Timestamp(start)) & (rates.index <= pd.Timestamp(end))]
+
+
+SOURCES = {
+    'irx': lambda: YahooRateSource('^IRX'),
+    'bil': lambda: ETFYieldSource('BIL'),
+    'shv': lambda: ETFYieldSource('SHV'),
+    'csv': CSVRateSource,
+}
+
+
+def etf_yield_series(closes: pd.Series, dividends: pd.Series, details: bool = False):
+    """
+    Daily trailing two-year distribution yield
+    yield[t] = (dividends in window / 2) / mean close in window
+    Args:
+        closes: Date-indexed unadjusted closes
+        dividends: Date-indexed dividends (0 on non-ex-dates)
+        details: Also return the window's average close and dividend total
+    Returns:
+        Series of annual yields, from the first date with a full window
+        (DataFrame with rate, avg_close and dividends columns if details)
+    """
+    closes = closes.sort_index()
+    if closes.empty:
+        return pd.DataFrame(columns=['rate', 'avg_close', 'dividends']) if details else pd.Series(dtype=float)
+    dividends = dividends.reindex(closes.index).fillna(0.0)
+    window = f"{ETF_YIELD_WINDOW.days}D"
+    total = dividends.rolling(window).sum()
+    average = closes.rolling(window).mean()
+    full = closes.index >= closes.index[0] + ETF_YIELD_WINDOW
+    rates = (total / 2) / average
+    if details:
+        return pd.DataFrame({'rate': rates, 'avg_close': average, 'dividends': total})[full].dropna()
+    return rates[full].dropna()
+
+
+def etf_yield_components(ticker: str):
+    """
+    Current two-year ETF yield with its inputs, from the cached service
+    Returns:
+        tuple: (yield, average close, total dividends) or (None, None, None)
+    """
+    try:
+        service = get_risk_free_service(ticker.lower())
+        details = service.details()
+        if not details:
+            return None, None, None
+        return service.rate(), details['avg_close'], details['dividends']
+    except Exception as e:
+        logger.error(f"Error calculating {ticker} yield: {str(e)}")
+        return None, None, None
+
+
+class RiskFreeRate:
+    """
+    Cached risk-free rate series for one source
+    """
+
+    def __init__(self, source: str = 'irx', cache_dir: Optional[str] = None,
+                 rate_source=None, auto_refresh: bool = True, warehouse_path: Optional[str] = None):
+        """
+        Initialize service
+        Args:
+            source: Source name in SOURCES (also the cache column)
+            cache_dir: Directory of the shared cache file
+            rate_source: Source object overriding SOURCES[source]
+            auto_refresh: Fetch missing recent days on first use
+            warehouse_path: Warehouse receiving new rates (defaults to the pipeline's
+                warehouse, or <cache_dir>/warehouse.sqlite for a custom cache_dir)
+        """
+        if rate_source is None and source not in SOURCES:
+            raise ValueError(f"Unknown risk-free rate source: {source}")
+        self.name = source
+        self.source = rate_source if rate_source is not None else SOURCES[source]()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.cache_file = self.cache_dir / CACHE_FILENAME
+        if warehouse_path is None:
+            warehouse_path = DEFAULT_WAREHOUSE if cache_dir is None else self.cache_dir / WAREHOUSE_FILE
+        self.warehouse_path = Path(warehouse_path)
+        self.auto_refresh = auto_refresh
+        self._refreshed = False
+        self.detail_names = list(getattr(self.source, 'details', ()))
+        self._set_rates(*self._load_cached_rates())
+
+    def _detail_column(self, detail: str) -> str:
+        return f"{self.name}.{detail}"
+
+    def _load_cached_rates(self):
+        """This source's column (and detail columns) of the cache file"""
+        empty = pd.Series(dtype=float), pd.DataFrame(columns=self.detail_names, dtype=float)
+        if self.cache_file.exists():
+            try:
+                cached = pd.read_parquet(self.cache_file)
+                if self.name not in cached.columns:
+                    return empty
+                columns = [self._detail_column(detail) for detail in self.detail_names]
+                if any(column not in cached.columns for column in columns):
+                    logger.info(f"Rebuilding cached {self.name} rates to add {', '.join(self.detail_names)}")
+                    return empty
+                rates = cached[self.name].dropna()
+                details = cached.loc[rates.index, columns].set_axis(self.detail_names, axis=1)
+                return rates, details
+            except Exception as e:
+                logger.error(f"Error loading cached rates: {e}")
+        return empty
+
+    def _save_rates_cache(self):
+        """Write this source's columns back, keeping the other sources"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cached = pd.read_parquet(self.cache_file) if self.cache_file.exists() else pd.DataFrame()
+            own = [self.name] + [self._detail_column(detail) for detail in self.detail_names]
+            cached = cached.drop(columns=own, errors='ignore')
+            columns = pd.concat([self._rates.rename(self.name),
+                                 self._details.rename(columns=self._detail_column)], axis=1)
+            cached = cached.join(columns, how='outer').sort_index()
+            cached.index.name = 'date'
+            cached.to_parquet(self.cache_file)
+        except Exception as e:
+            logger.error(f"Error saving rates cache: {e}")
+
+    def _set_rates(self, rates: pd.Series, details: Optional[pd.DataFrame] = None):
+        """In-memory copy: sorted series plus arrays for searchsorted lookups"""
+        rates = rates.astype(float)
+        rates.index = pd.DatetimeIndex(rates.index).normalize()
+        keep = ~rates.index.duplicated(keep='last')
+        order = np.argsort(rates.index[keep], kind='stable')
+        rates = rates[keep].iloc[order]
+        if details is None:
+            details = pd.DataFrame(index=rates.index, columns=self.detail_names, dtype=float)
+        else:
+            details = details.astype(float).set_axis(pd.DatetimeIndex(details.index).normalize())
+            details = details[keep].iloc[order]
+        self._rates = rates
+        self._details = details
+        self._days = rates.index.to_numpy(dtype='datetime64[D]').astype(np.int64)
+        self._values = rates.to_numpy()
+
+    def refresh(self, end: Optional[datetime] = None) -> int:
+        """
+        Append days after the last cached date
+        Args:
+            end: Last date to fetch (defaults to today)
+        Returns:
+            Number of new days stored
+        """
+        self._refreshed = True
+        end = pd.Timestamp(end if end is not None else datetime.now()).normalize()
+        start = self._rates.index[-1] + timedelta(days=1) if len(self._rates) else pd.Timestamp(HISTORY_START)
+        if start > end:
+            return 0
+        try:
+            fetched = self.source.fetch(start, end)
+        except Exception as e:
+            logger.error(f"Error fetching {self.name} risk-free rates: {e}")
+            return 0
+        if isinstance(fetched, pd.DataFrame):
+            fetched = fetched.dropna(subset=['rate'])
+            new_rates, new_details = fetched['rate'], fetched[self.detail_names]
+        else:
+            new_rates = fetched.dropna()
+            new_details = pd.DataFrame(index=new_rates.index, columns=self.detail_names, dtype=float)
+        new_day = pd.DatetimeIndex(new_rates.index).normalize() >= start
+        new_rates, new_details = new_rates[new_day], new_details[new_day]
+        if new_rates.empty:
+            return 0
+        self._set_rates(pd.concat([self._rates, new_rates]), pd.concat([self._details, new_details]))
+        self._save_rates_cache()
+        self._store_in_warehouse()
+        logger.info(f"Stored {len(new_rates)} new {self.name} risk-free rates")
+        return len(new_rates)
+
+    def merge(self, rates: pd.Series) -> int:
+        """
+        Merge externally supplied rates (e.g. a local curve file) into the cache
+        Args:
+            rates: Date-indexed annual rates; they replace cached rates on the same days
+        Returns:
+            Number of rates merged
+        """
+        rates = rates.dropna()
+        if rates.empty:
+            return 0
+        details = pd.DataFrame(index=rates.index, columns=self.detail_names, dtype=float)
+        self._set_rates(pd.concat([self._rates, rates]), pd.concat([self._details, details]))
+        self._save_rates_cache()
+        self._store_in_warehouse(rates)
+        return len(rates)
+
+    def _store_in_warehouse(self, rates: Optional[pd.Series] = None):
+        """
+        Upsert rates into the warehouse
+        Args:
+            rates: Rates to store (defaults to the days after the warehouse's last
+                date for this source, so an existing cache is backfilled once)
+        """
+        try:
+            warehouse = Warehouse(str(self.warehouse_path))
+            if rates is None:
+                last = warehouse.last_rate_date(self.name)
+                rates = self._rates if last is None else self._rates[self._rates.index > last]
+            warehouse.store_rates(self.name, rates)
+        except Exception as e:
+            logger.warning(f"Could not store {self.name} rates in warehouse: {e}")
+
+    def _ensure_current(self):
+        """Refresh once per process when the cache ends before the last business day"""
+        if not self.auto_refresh or self._refreshed:
+            return
+        last_business_day = pd.Timestamp.today().normalize() - pd.offsets.BDay(1)
+        if not len(self._rates) or self._rates.index[-1] < last_business_day:
+            self.refresh()
+        self._refreshed = True
+
+    def rate(self, date=None, default: float = DEFAULT_RATE) -> float:
+        """
+        Rate in effect on a date (last known rate on or before it)
+        Args:
+            date: Date to look up (defaults to the latest rate)
+            default: Returned when no rate is known for the date
+        Returns:
+            Annual rate as a decimal
+        """
+        self._ensure_current()
+        if not len(self._values):
+            return default
+        if date is None:
+            return float(self._values[-1])
+        day = np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64)
+        position = np.searchsorted(self._days, day, side='right') - 1
+        return float(self._values[position]) if position >= 0 else default
+
+    def series(self, index, default: float = DEFAULT_RATE) -> pd.Series:
+        """
+        Rates aligned to a date index (last known rate on or before each date)
+        Args:
+            index: Dates to align to (e.g. a returns index)
+            default: Used for dates before the first known rate
+        Returns:
+            Series of annual rates on the given index
+        """
+        self._ensure_current()
+        index = pd.Index(index)
+        days = pd.DatetimeIndex(pd.to_datetime(index)).to_numpy(dtype='datetime64[D]').astype(np.int64)
+        positions = np.searchsorted(self._days, days, side='right') - 1
+        values = np.where(positions >= 0, self._values[np.maximum(positions, 0)], default) \
+            if len(self._values) else np.full(len(days), default)
+        return pd.Series(values, index=index, name=self.name)
+
+    def details(self, date=None) -> Dict[str, float]:
+        """
+        Detail values (e.g. avg_close, dividends for ETF yields) behind the
+        rate in effect on a date
+        Returns:
+            Detail name -> value, empty if the source has none or no rate is known
+        """
+        self._ensure_current()
+        if not self.detail_names or not len(self._values):
+            return {}
+        position = len(self._days) - 1 if date is None else \
+            np.searchsorted(self._days, np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64), side='right') - 1
+        return {} if position < 0 else {name: float(value) for name, value in self._details.iloc[position].items()}
+
+    def history(self, start=None, end=None) -> pd.Series:
+        """Stored rates between start and end (inclusive)"""
+        self._ensure_current()
+        return self._rates.loc[start:end].copy()
+
+
+_services: Dict[str, RiskFreeRate] = {}
+
+
+def get_risk_free_service(source: str = 'irx') -> RiskFreeRate:
+    """Process-wide service for a source, loaded once"""
+    if source not in _services:
+        _services[source] = RiskFreeRate(source)
+    return _services[source]
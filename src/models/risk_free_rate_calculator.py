@@ -1,10 +1,11 @@
 """
 Risk Free Rate Calculator
 Uses BIL ETF to calculate risk-free rate based on dividend yield
+(answered from the cached daily series in risk_free_rate.RiskFreeRate,
+refreshed at most once per process)
 """
-import yfinance as yf
-import pandas as pd
 import logging
+from .risk_free_rate import etf_yield_components
 
 logger = logging.getLogger(__name__)
 
@@ -14,49 +15,11 @@ def calculate_bil_risk_free_rate():
     Returns:
         tuple: (risk_free_rate, avg_price, total_dividends)
     """
-    try:
-        # Fetch BIL data
-        bil = yf.Ticker("BIL")
-        
-        # Get 2 years of price history using period
-        price_history = bil.history(period="2y")
-        avg_price = price_history['Close'].mean()
-        
-        # Get dividend history for same period
-        dividends = bil.dividends
-        recent_dividends = dividends[-504:]  # Last 2 years of trading days
-        total_dividends = recent_dividends.sum()
-        
-        # Calculate annualized yield
-        risk_free_rate = (total_dividends / 2) / avg_price
-        
-        return risk_free_rate, avg_price, total_dividends
-        
-    except Exception as e:
-        logger.error(f"Error calculating BIL risk-free rate: {str(e)}")
-        return None, None, None
+    return etf_yield_components("BIL")
 
 def calculate_shv_yield():
     """Calculate SHV yield for comparison"""
-    try:
-        shv = yf.Ticker("SHV")
-        
-        # Get 2 years of price history
-        price_history = shv.history(period="2y")
-        avg_price = price_history['Close'].mean()
-        
-        # Get dividend history
-        dividends = shv.dividends
-        recent_dividends = dividends[-504:]  # Last 2 years of trading days
-        total_dividends = recent_dividends.sum()
-        
-        risk_free_rate = (total_dividends / 2) / avg_price
-        
-        return risk_free_rate, avg_price, total_dividends
-        
-    except Exception as e:
-        logger.error(f"Error calculating SHV yield: {str(e)}")
-        return None, None, None
+    return etf_yield_components("SHV")
 
 if __name__ == "__main__":
     # Set up logging
@@ -0,0 +1,187 @@
+"""
+Tail Risk Calculator
+Batch Value at Risk (VaR) and Conditional VaR (CVaR / Expected Shortfall)
+for a date x ticker matrix of daily returns.
+
+Methods:
+- historical: Empirical quantile and tail mean
+- gaussian: Normal quantile from mean and standard deviation
+- cornish_fisher: Normal quantile adjusted for skew and excess kurtosis
+
+Sign convention matches PerformanceMetrics._calculate_var: results are
+return quantiles, so losses are negative (e.g. -0.021 for a 2.1% loss).
+
+All historical quantiles come from one partial sort of the returns matrix:
+np.partition isolates the smallest observations any requested level needs,
+and only that head block is fully sorted.
+"""
+import pandas as pd
+import numpy as np
+import logging
+from statistics import NormalDist
+from typing import Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('historical', 'gaussian', 'cornish_fisher')
+DEFAULT_CONFIDENCE_LEVELS = (0.95, 0.99)
+DEFAULT_HORIZONS = (1,)
+RESULT_COLUMNS = ['ticker', 'method', 'confidence', 'horizon', 'var', 'cvar']
+
+# Grid used to integrate the Cornish-Fisher quantile over the tail for CVaR
+_CF_TAIL_GRID = 64
+
+_NORMAL = NormalDist()
+
+
+def _moments(values: np.ndarray, counts: np.ndarray):
+    """Per-column mean, sample std, skew and excess kurtosis ignoring NaN"""
+    mean = np.nanmean(values, axis=0)
+    centered = values - mean
+    m2 = np.nansum(centered ** 2, axis=0) / counts
+    m3 = np.nansum(centered ** 3, axis=0) / counts
+    m4 = np.nansum(centered ** 4, axis=0) / counts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.sqrt(m2 * counts / (counts - 1))
+        skew = m3 / m2 ** 1.5
+        kurt = m4 / m2 ** 2 - 3.0
+    return mean, std, skew, kurt
+
+
+def _cornish_fisher_z(z: np.ndarray, skew: np.ndarray, kurt: np.ndarray) -> np.ndarray:
+    """Cornish-Fisher expansion of standard normal quantile(s) z"""
+    return (z
+            + (z ** 2 - 1) * skew / 6
+            + (z ** 3 - 3 * z) * kurt / 24
+            - (2 * z ** 3 - 5 * z) * skew ** 2 / 36)
+
+
+def _historical(values: np.ndarray, counts: np.ndarray, alphas: np.ndarray):
+    """
+    Historical VaR/CVaR for every (alpha, column) from a single partial sort
+    Returns:
+        (var, cvar) arrays shaped (len(alphas), n_columns)
+    """
+    n_cols = values.shape[1]
+    # Linear interpolation positions (numpy 'linear' percentile method)
+    position = (counts[None, :] - 1) * alphas[:, None]
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, counts[None, :] - 1)
+    tail_count = np.maximum(np.ceil(counts[None, :] * alphas[:, None]).astype(int), 1)
+
+    head_len = int(max(upper.max(), tail_count.max() - 1)) + 1
+    head_len = min(head_len, values.shape[0])
+
+    # NaN sorts to the end so each column's smallest values stay at the top
+    filled = np.where(np.isnan(values), np.inf, values)
+    if head_len < filled.shape[0]:
+        filled = np.partition(filled, head_len - 1, axis=0)[:head_len]
+    head = np.sort(filled, axis=0)
+    cumulative = np.cumsum(np.where(np.isinf(head), 0.0, head), axis=0)
+
+    cols = np.broadcast_to(np.arange(n_cols), lower.shape)
+    weight = position - lower
+    var = head[lower, cols] * (1 - weight) + head[upper, cols] * weight
+    cvar = cumulative[tail_count - 1, cols] / tail_count
+    return var, cvar
+
+
+def calculate_tail_risk(returns: Union[pd.Series, pd.DataFrame],
+                        confidence_levels: Sequence[float] = DEFAULT_CONFIDENCE_LEVELS,
+                        horizons: Sequence[int] = DEFAULT_HORIZONS,
+                        methods: Sequence[str] = METHODS) -> pd.DataFrame:
+    """
+    Calculate VaR and CVaR for all tickers, levels, horizons and methods
+    Args:
+        returns: Series or DataFrame of daily returns (NaN allowed for short histories)
+        confidence_levels: Confidence levels such as 0.95 and 0.99
+        horizons: Holding periods in trading days. Multi-day figures use
+            square-root-of-time scaling (mean scales linearly for parametric methods)
+        methods: Any of 'historical', 'gaussian', 'cornish_fisher'
+    Returns:
+        Long-format DataFrame with columns ticker, method, confidence, horizon, var, cvar
+    """
+    try:
+        if isinstance(returns, pd.Series):
+            returns = returns.to_frame(name=returns.name if returns.name is not None else 'returns')
+        unknown = set(methods) - set(METHODS)
+        if unknown:
+            raise ValueError(f"Unknown tail risk method(s): {sorted(unknown)}")
+
+        values = returns.to_numpy(dtype=float)
+        counts = (~np.isnan(values)).sum(axis=0)
+        usable = counts >= 2
+        if values.size == 0 or not usable.any():
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        values = values[:, usable]
+        counts = counts[usable]
+        tickers = returns.columns[usable]
+
+        confidence = np.asarray(confidence_levels, dtype=float)
+        alphas = 1.0 - confidence
+        horizon = np.asarray(horizons, dtype=float)
+        z = np.array([_NORMAL.inv_cdf(a) for a in alphas])
+        mean, std, skew, kurt = _moments(values, counts)
+
+        one_day = {}
+        if 'historical' in methods:
+            one_day['historical'] = _historical(values, counts, alphas)
+        if 'gaussian' in methods:
+            pdf = np.array([_NORMAL.pdf(x) for x in z])
+            one_day['gaussian'] = (z[:, None], (-pdf / alphas)[:, None])
+        if 'cornish_fisher' in methods:
+            z_cf = _cornish_fisher_z(z[:, None], skew[None, :], kurt[None, :])
+            # CVaR = average of the expanded quantile over the tail (midpoint rule)
+            grid = (np.arange(_CF_TAIL_GRID) + 0.5) / _CF_TAIL_GRID
+            u = alphas[:, None] * grid[None, :]
+            z_tail = np.vectorize(_NORMAL.inv_cdf)(u)
+            z_tail_cf = _cornish_fisher_z(z_tail[:, :, None], skew[None, None, :], kurt[None, None, :])
+            one_day['cornish_fisher'] = (z_cf, z_tail_cf.mean(axis=1))
+
+        frames = []
+        n_levels, n_tickers = len(confidence), len(tickers)
+        for method in methods:
+            first, second = one_day[method]
+            for h in horizon:
+                if method == 'historical':
+                    var = first * np.sqrt(h)
+                    cvar = second * np.sqrt(h)
+                else:
+                    var = mean * h + first * std * np.sqrt(h)
+                    cvar = mean * h + second * std * np.sqrt(h)
+                var = np.broadcast_to(var, (n_levels, n_tickers))
+                cvar = np.broadcast_to(cvar, (n_levels, n_tickers))
+                frames.append(pd.DataFrame({
+                    'ticker': np.tile(tickers, n_levels),
+                    'method': method,
+                    'confidence': np.repeat(confidence, n_tickers),
+                    'horizon': int(h),
+                    'var': var.ravel(),
+                    'cvar': cvar.ravel(),
+                }))
+        return pd.concat(frames, ignore_index=True)[RESULT_COLUMNS]
+
+    except Exception as e:
+        logger.error(f"Error calculating tail risk: {str(e)}")
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+
+def tail_risk_table(returns: Union[pd.Series, pd.DataFrame],
+                    confidence_levels: Sequence[float] = DEFAULT_CONFIDENCE_LEVELS,
+                    horizons: Sequence[int] = DEFAULT_HORIZONS,
+                    methods: Sequence[str] = METHODS) -> pd.DataFrame:
+    """
+    Wide view of calculate_tail_risk: one row per ticker
+    Column labels look like 'historical_var_95_1d' / 'gaussian_cvar_99_10d'.
+    """
+    long = calculate_tail_risk(returns, confidence_levels, horizons, methods)
+    if long.empty:
+        return pd.DataFrame()
+    long = long.melt(id_vars=['ticker', 'method', 'confidence', 'horizon'],
+                     value_vars=['var', 'cvar'], var_name='measure')
+    long['label'] = (long['method'] + '_' + long['measure'] + '_'
+                     + (long['confidence'] * 100).round(1).map('{:g}'.format) + '_'
+                     + long['horizon'].astype(str) + 'd')
+    wide = long.pivot(index='ticker', columns='label', values='value')
+    wide.columns.name = None
+    return wide
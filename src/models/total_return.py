@@ -0,0 +1,168 @@
+"""
+Total Return Reconstruction
+Rebuilds return indexes for every ticker from the stored 'Unadjusted Prices'
+and 'Dividends' sheets, without a second (adjusted) price download.
+
+- Price-return index: closes only
+- Total-return index: dividends reinvested at the close on the ex-date,
+  daily factor (P[t] + D[t]) / P[t-1]
+- Back-adjusted closes: vendor-style (Yahoo / CRSP) multiplicative factors,
+  every close before an ex-date scaled by (1 - D / P[ex-1]), so the last
+  close equals the unadjusted close
+
+Unadjusted closes from Yahoo are already split-adjusted, so only dividends
+need handling here. All calculations run on the full date x ticker matrix.
+"""
+import pandas as pd
+import numpy as np
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_VALUE = 100.0
+
+
+def _prepare_prices(unadj_prices: pd.DataFrame) -> pd.DataFrame:
+    """Sort by date and forward fill gaps inside each ticker's listed span"""
+    prices = unadj_prices.copy()
+    prices.index = pd.to_datetime(prices.index)
+    prices = prices.sort_index()
+    return prices.ffill().where(prices.bfill().notna() | prices.notna())
+
+
+def align_dividends(dividends: Optional[pd.DataFrame], price_index: pd.Index,
+                    columns: pd.Index) -> pd.DataFrame:
+    """
+    Map a sparse dividend matrix onto the price calendar
+    An ex-date that is not a trading day in price_index moves to the next
+    trading day; several dividends landing on one day are summed.
+    Args:
+        dividends: DataFrame of per-share dividends (rows = ex-dates, NaN = none)
+        price_index: DatetimeIndex of the price matrix
+        columns: Ticker columns of the price matrix
+    Returns:
+        Dense DataFrame of dividends (0.0 where none) shaped like the prices
+    """
+    aligned = np.zeros((len(price_index), len(columns)))
+    if dividends is None or dividends.empty:
+        return pd.DataFrame(aligned, index=price_index, columns=columns)
+
+    divs = dividends.reindex(columns=columns)
+    div_dates = pd.to_datetime(divs.index)
+    positions = price_index.searchsorted(div_dates, side='left')
+    in_range = positions < len(price_index)
+
+    values = divs.to_numpy(dtype=float)[in_range]
+    values = np.where(np.isnan(values), 0.0, values)
+    np.add.at(aligned, positions[in_range], values)
+    return pd.DataFrame(aligned, index=price_index, columns=columns)
+
+
+def _index_from_factors(factors: pd.DataFrame, prices: pd.DataFrame, base: float) -> pd.DataFrame:
+    """Cumulative index starting at base on each ticker's first price"""
+    factors = factors.where(prices.notna())
+    first_valid = prices.notna() & prices.shift(1).isna()
+    factors = factors.mask(first_valid, 1.0)
+    return base * factors.cumprod()
+
+
+def price_return_index(unadj_prices: pd.DataFrame, base: float = BASE_VALUE) -> pd.DataFrame:
+    """
+    Price-return index for every ticker
+    Args:
+        unadj_prices: Date x ticker unadjusted closes
+        base: Starting index value
+    Returns:
+        DataFrame of index levels (NaN before each ticker's first price)
+    """
+    prices = _prepare_prices(unadj_prices)
+    return _index_from_factors(prices / prices.shift(1), prices, base)
+
+
+def total_return_index(unadj_prices: pd.DataFrame, dividends: Optional[pd.DataFrame],
+                       base: float = BASE_VALUE) -> pd.DataFrame:
+    """
+    Total-return index with dividends reinvested on the ex-date
+    Args:
+        unadj_prices: Date x ticker unadjusted closes ('Unadjusted Prices' sheet)
+        dividends: Sparse dividend matrix ('Dividends' sheet)
+        base: Starting index value
+    Returns:
+        DataFrame of index levels (NaN before each ticker's first price)
+    """
+    try:
+        prices = _prepare_prices(unadj_prices)
+        divs = align_dividends(dividends, prices.index, prices.columns)
+        return _index_from_factors((prices + divs) / prices.shift(1), prices, base)
+    except Exception as e:
+        logger.error(f"Error building total return index: {str(e)}")
+        return pd.DataFrame()
+
+
+def dividend_adjustment_factors(unadj_prices: pd.DataFrame,
+                                dividends: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Vendor-style cumulative dividend adjustment factors
+    factor[t] = product over ex-dates e > t of (1 - D[e] / P[e-1])
+    Args:
+        unadj_prices: Date x ticker unadjusted closes
+        dividends: Sparse dividend matrix
+    Returns:
+        DataFrame of factors (1.0 after the last ex-date)
+    """
+    prices = _prepare_prices(unadj_prices)
+    divs = align_dividends(dividends, prices.index, prices.columns)
+    event = (1.0 - divs / prices.shift(1)).fillna(1.0)
+    # Reverse cumulative product, shifted so an ex-date only adjusts earlier closes
+    reverse_cum = event.iloc[::-1].cumprod().iloc[::-1]
+    return reverse_cum.shift(-1).fillna(1.0)
+
+
+def back_adjusted_prices(unadj_prices: pd.DataFrame,
+                         dividends: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Rebuild the vendor's adjusted closes from unadjusted closes and dividends
+    Args:
+        unadj_prices: Date x ticker unadjusted closes
+        dividends: Sparse dividend matrix
+    Returns:
+        DataFrame of adjusted closes on the same index as the input
+    """
+    try:
+        factors = dividend_adjustment_factors(unadj_prices, dividends)
+        prices = unadj_prices.copy()
+        prices.index = pd.to_datetime(prices.index)
+        prices = prices.sort_index()
+        adjusted = prices * factors
+        adjusted.index = unadj_prices.sort_index().index
+        return adjusted
+    except Exception as e:
+        logger.error(f"Error building adjusted prices: {str(e)}")
+        return pd.DataFrame()
+
+
+def compare_adjusted(vendor_adjusted: pd.DataFrame, reconstructed: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cross-check reconstructed adjusted closes against the vendor series
+    Args:
+        vendor_adjusted: 'Daily Prices' sheet (vendor adjusted closes)
+        reconstructed: Output of back_adjusted_prices
+    Returns:
+        DataFrame indexed by ticker with max_abs_rel_diff, mean_abs_rel_diff,
+        last_rel_diff and observations
+    """
+    vendor = vendor_adjusted.copy()
+    vendor.index = pd.to_datetime(vendor.index)
+    rebuilt = reconstructed.copy()
+    rebuilt.index = pd.to_datetime(rebuilt.index)
+    vendor, rebuilt = vendor.align(rebuilt, join='inner')
+
+    rel_diff = (rebuilt / vendor - 1).abs()
+    last_valid = rel_diff.apply(lambda col: col.dropna().iloc[-1] if col.notna().any() else np.nan)
+    return pd.DataFrame({
+        'max_abs_rel_diff': rel_diff.max(),
+        'mean_abs_rel_diff': rel_diff.mean(),
+        'last_rel_diff': last_valid,
+        'observations': rel_diff.notna().sum(),
+    })
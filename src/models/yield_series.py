@@ -0,0 +1,78 @@
+"""
+Yield History Calculator
+Daily distribution-yield time series for every ticker.
+
+- TTM yield: dividends with ex-dates in the trailing 12 months / close
+- 30-day yield: dividends with ex-dates in the trailing 30 calendar days,
+  annualized by 365 / 30, / close
+
+Dividends are aligned to the price calendar once, then every trailing
+window sum is a difference of two rows of the cumulative dividend matrix,
+with window starts found by a single searchsorted over the date index.
+The TTM window is the one of the Metrics sheet's %Yield column (ex-dates
+on or after the date one year earlier), but the price basis is not:
+ExcelManager divides by each day's unadjusted close, the yield an investor
+saw on that date, while %Yield divides by the latest adjusted close. The
+two closes coincide on the last day (no dividend adjusts it yet), so the
+last row of 'TTM Yield' equals %Yield; on earlier rows the adjusted close
+is lowered by the dividends paid since, so the same window over adjusted
+closes would overstate the yield of the time.
+"""
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional
+from .total_return import align_dividends
+
+logger = logging.getLogger(__name__)
+
+TTM_OFFSET = pd.DateOffset(years=1)
+SHORT_WINDOW_DAYS = 30
+
+
+def trailing_window_sum(aligned: pd.DataFrame, offset: pd.DateOffset) -> pd.DataFrame:
+    """
+    Sum values over a trailing calendar window ending on each date
+    Args:
+        aligned: Date-indexed DataFrame (sorted DatetimeIndex, 0.0 where empty)
+        offset: Window length; rows with date >= (t - offset) are included
+    Returns:
+        DataFrame of window sums shaped like the input
+    """
+    cumulative = np.vstack([np.zeros((1, aligned.shape[1])), np.cumsum(aligned.to_numpy(), axis=0)])
+    start_pos = aligned.index.searchsorted(aligned.index - offset, side='left')
+    end_pos = np.arange(1, len(aligned) + 1)
+    sums = cumulative[end_pos] - cumulative[start_pos]
+    return pd.DataFrame(sums, index=aligned.index, columns=aligned.columns)
+
+
+def calculate_yield_history(prices: pd.DataFrame, dividends: Optional[pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Calculate TTM and 30-day annualized yield series across full history
+    Args:
+        prices: Date x ticker closes (ExcelManager passes unadjusted closes; see
+            the module docstring for how that compares with %Yield)
+        dividends: Sparse dividend matrix ('Dividends' sheet)
+    Returns:
+        {'ttm': DataFrame, '30d': DataFrame} of decimal yields on the price index
+    """
+    try:
+        prices = prices.copy()
+        prices.index = pd.to_datetime(prices.index)
+        prices = prices.sort_index()
+        aligned = align_dividends(dividends, prices.index, prices.columns)
+
+        ttm_divs = trailing_window_sum(aligned, TTM_OFFSET)
+        short_divs = trailing_window_sum(aligned, pd.DateOffset(days=SHORT_WINDOW_DAYS))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ttm_yield = ttm_divs / prices
+            short_yield = short_divs * (365 / SHORT_WINDOW_DAYS) / prices
+        return {
+            'ttm': ttm_yield.where(prices.notna()),
+            '30d': short_yield.where(prices.notna()),
+        }
+
+    except Exception as e:
+        logger.error(f"Error calculating yield history: {str(e)}")
+        return {'ttm': pd.DataFrame(), '30d': pd.DataFrame()}
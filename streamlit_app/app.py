@@ -20,6 +20,8 @@ sys.path.append(ROOT_DIR)
 try:
     from streamlit_app.components.metrics_display import display_metrics
     from streamlit_app.components.charts import plot_price_history
+    from streamlit_app.components.optimizer_panel import display_optimizer
+    from streamlit_app.components.history_panel import display_run_history
     from streamlit_app.utils.excel_reader import get_latest_excel, get_file_info
 except ImportError as e:
     logger.error(f"Failed to import local modules: {e}")
@@ -110,6 +112,15 @@ try:
             st.caption(f"Last updated: {creation_time.strftime('%Y-%m-%d %H:%M:%S')}")
         else:
             st.info("No metrics available. Please run an analysis first.")
+
+    st.header("Portfolio Optimizer")
+    if latest_file:
+        display_optimizer(latest_file)
+    else:
+        st.info("No price data available. Please run an analysis first.")
+
+    st.header("Run History")
+    display_run_history("Test Output")
 except Exception as e:
     logger.error(f"Failed to render main content: {e}")
     st.error("Error displaying dashboard content. Please check the logs for details.")
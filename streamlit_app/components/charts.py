@@ -6,13 +6,15 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from src.data.sidecar import read_sheet
+
 def plot_price_history(excel_file: str):
     """
     Create an interactive price history chart
     """
     try:
         # Read price data
-        df = pd.read_excel(excel_file, sheet_name='Daily Prices')
+        df = read_sheet(excel_file, 'Daily Prices')
         df.set_index('Date', inplace=True)
         
         # Create figure with secondary y-axis
@@ -0,0 +1,52 @@
+"""
+Run history component for the Streamlit dashboard
+"""
+import streamlit as st
+
+from src.data.run_index import RunIndex
+
+
+def display_run_history(output_dir: str):
+    """
+    Show metrics over time, the runs passing a threshold and a side-by-side
+    comparison of earlier runs, read from the warehouse instead of the
+    individual workbooks
+    """
+    try:
+        index = RunIndex(output_dir)
+        index.update()
+        runs = index.runs()
+        options = index.metric_names()
+        if runs.empty or not options:
+            st.info("No run history yet. Please run an analysis first.")
+            return False
+
+        over_time, threshold_tab, compare = st.tabs(["Metrics over time", "Runs passing a threshold", "Compare runs"])
+        with over_time:
+            metric = st.selectbox("Metric", options, key="run_history_metric",
+                                  index=options.index('Sharpe 2Y') if 'Sharpe 2Y' in options else 0)
+            history = index.metric_over_time(metric)
+            tickers = st.multiselect("Tickers", history.columns.tolist(), default=history.columns.tolist()[:5],
+                                     key="run_history_tickers")
+            if tickers:
+                st.line_chart(history[tickers].dropna(how='all'))
+            st.dataframe(history[tickers] if tickers else history, use_container_width=True)
+
+        with threshold_tab:
+            col1, col2 = st.columns(2)
+            with col1:
+                ticker = st.selectbox("Ticker", history.columns.tolist(), key="run_history_threshold_ticker")
+            with col2:
+                threshold = st.number_input(f"{metric} greater than", value=1.0)
+            st.dataframe(index.warehouse.runs_where(metric, '>', threshold, ticker),
+                         use_container_width=True, hide_index=True)
+
+        with compare:
+            run_ids = runs['run_id'].tolist()[::-1]
+            selected = st.multiselect("Runs", run_ids, default=run_ids[:2], key="run_history_runs")
+            if selected:
+                st.dataframe(index.compare_runs(selected), use_container_width=True)
+        return True
+    except Exception as e:
+        st.error(f"Error loading run history: {str(e)}")
+        return False
@@ -4,13 +4,15 @@ Metrics display component for the Streamlit dashboard
 import streamlit as st
 import pandas as pd
 
+from streamlit_app.utils.excel_reader import read_metrics
+
 def display_metrics(excel_file: str):
     """
     Display metrics from the Excel file in a formatted table
     """
     try:
         # Read metrics sheet
-        df = pd.read_excel(excel_file, sheet_name='Metrics')
+        df = read_metrics(excel_file)
         
         # Format the display
         st.dataframe(
@@ -0,0 +1,86 @@
+"""
+Portfolio optimizer component for the Streamlit dashboard
+"""
+import os
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.data.sidecar import read_sheet
+from src.models.optimizer import (PortfolioOptimizer, export_to_workbook, frontier_max_sharpe,
+                                  frontier_target_volatility)
+
+FRONTIER_POINTS = 100
+
+
+@st.cache_data(show_spinner="Solving efficient frontier...")
+def _solve_frontier(excel_file: str, modified: float, risk_free_rate: float, max_weight: float):
+    """
+    Efficient frontier and risk-parity weights, solved once per workbook version
+    (modified is the file's mtime, so a re-saved workbook is solved again)
+    """
+    prices = read_sheet(excel_file, 'Daily Prices')
+    prices.set_index('Date', inplace=True)
+    returns = prices.pct_change(fill_method=None).dropna()
+
+    optimizer = PortfolioOptimizer(returns, risk_free_rate=risk_free_rate, upper=max_weight)
+    return optimizer.efficient_frontier(FRONTIER_POINTS), optimizer.risk_parity()
+
+
+def display_optimizer(excel_file: str, risk_free_rate: float = 0.03):
+    """
+    Show the efficient frontier and optimized weights for the workbook's tickers
+    Max-Sharpe and target-volatility portfolios are read off the cached frontier,
+    so moving the target slider does not re-solve it.
+    """
+    try:
+        max_weight = st.slider("Max weight per ticker", 0.05, 1.0, 1.0, 0.05)
+        target_vol = st.slider("Target volatility", 0.01, 0.40, 0.10, 0.01)
+
+        frontier, risk_parity = _solve_frontier(excel_file, os.path.getmtime(excel_file),
+                                                risk_free_rate, max_weight)
+        min_variance = frontier.loc[[frontier['volatility'].idxmin()]].set_axis(['min_variance'])
+        portfolios = pd.concat([
+            min_variance,
+            frontier_max_sharpe(frontier),
+            risk_parity,
+            frontier_target_volatility(frontier, target_vol),
+        ])
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=frontier['volatility'],
+            y=frontier['expected_return'],
+            mode='lines',
+            name='Efficient Frontier'
+        ))
+        fig.add_trace(go.Scatter(
+            x=portfolios['volatility'],
+            y=portfolios['expected_return'],
+            mode='markers+text',
+            text=portfolios.index,
+            textposition='top center',
+            name='Portfolios'
+        ))
+        fig.update_layout(
+            title="Efficient Frontier",
+            xaxis_title="Volatility",
+            yaxis_title="Expected Return",
+            xaxis_tickformat='.1%',
+            yaxis_tickformat='.1%',
+            height=500
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.dataframe(portfolios.T, use_container_width=True)
+
+        if st.button("Export to workbook"):
+            if export_to_workbook(excel_file, portfolios, frontier):
+                st.success("Added 'Optimization' sheet to workbook")
+            else:
+                st.error("Export failed. Please check the logs for details.")
+
+        return True
+    except Exception as e:
+        st.error(f"Error running optimizer: {str(e)}")
+        return False
@@ -16,6 +16,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 from src.data.excel_manager import ExcelManager
+from streamlit_app.utils.excel_reader import read_metrics
 
 # Constants from documentation
 OUTPUT_DIR = os.path.join(project_root, "Test Output")
@@ -238,7 +239,7 @@ def style_negative_red(val):
 
 try:
     # Read the test Excel file
-    df = pd.read_excel(excel_path, sheet_name='Metrics')
+    df = read_metrics(excel_path)
     
     # Filter by tickers if provided
     if tickers:
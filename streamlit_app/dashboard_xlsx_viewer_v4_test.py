@@ -9,6 +9,8 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 from src.data.excel_manager import ExcelManager
+from streamlit_app.utils.excel_reader import read_metrics
+from src.data.atomic_io import is_temp_file
 
 # Constants from documentation
 OUTPUT_DIR = os.path.join(project_root, "Test Output")
@@ -183,7 +185,7 @@ def style_negative_red(val):
 
 try:
     # Get the latest Excel file
-    excel_files = [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.xlsx')]
+    excel_files = [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.xlsx') and not is_temp_file(f)]
     if not excel_files:
         st.warning("No data files found. Please analyze some ETFs first.")
         st.stop()
@@ -192,7 +194,7 @@ try:
                      key=os.path.getmtime)
     
     # Read the metrics sheet
-    df = pd.read_excel(latest_file, sheet_name='Metrics', engine='openpyxl')
+    df = read_metrics(latest_file)
     
     # Format the dataframe
     df['Name'] = df['Name'].apply(shorten_etf_name)
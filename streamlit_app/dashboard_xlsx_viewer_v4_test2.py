@@ -16,6 +16,8 @@ import yfinance as yf
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 from src.data.excel_manager import ExcelManager
+from streamlit_app.utils.excel_reader import read_metrics
+from src.data.atomic_io import is_temp_file
 from src.visualization.relative_strength_chart_test import RelativeStrengthChart
 
 # Constants from documentation
@@ -194,7 +196,7 @@ def style_negative_red(val):
 
 try:
     # Get the latest Excel file
-    excel_files = [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.xlsx')]
+    excel_files = [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.xlsx') and not is_temp_file(f)]
     if not excel_files:
         st.warning("No data files found. Please analyze some ETFs first.")
         st.stop()
@@ -203,7 +205,7 @@ try:
                      key=os.path.getmtime)
     
     # Read the metrics sheet
-    df = pd.read_excel(latest_file, sheet_name='Metrics', engine='openpyxl')
+    df = read_metrics(latest_file)
     
     # Remove Default_Rate column if it exists
     if 'Default_Rate' in df.columns:
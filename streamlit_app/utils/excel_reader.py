@@ -3,15 +3,19 @@ Utility functions for reading Excel files
 """
 import os
 import pandas as pd
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+from src.data.sidecar import read_sidecar, with_index
+from src.data.xlsx_reader import read_xlsx_sheet
+from src.data.atomic_io import is_temp_file
+
 def get_latest_excel(output_dir: str) -> Optional[str]:
     """
     Get the path to the latest Excel file in the output directory
     """
     try:
-        files = [f for f in os.listdir(output_dir) if f.endswith('.xlsx')]
+        files = [f for f in os.listdir(output_dir) if f.endswith('.xlsx') and not is_temp_file(f)]
         if not files:
             return None
             
@@ -32,3 +36,25 @@ def get_file_info(file_path: str) -> Tuple[str, datetime]:
     except Exception as e:
         print(f"Error getting file info: {str(e)}")
         return "Unknown", datetime.now()
+
+def read_excel_sheet(file_path: str, sheet_name: str, index_col: Optional[int] = None,
+                     date_columns: Optional[List[int]] = None) -> pd.DataFrame:
+    """
+    Read one sheet, from the workbook's columnar sidecar when it is current,
+    otherwise by streaming just that sheet out of the XLSX archive
+    (date_columns: positions of date columns, needed for the archive reader)
+    """
+    frame = read_sidecar(file_path, sheet_name)
+    if frame is not None:
+        return with_index(frame, index_col)
+    try:
+        return read_xlsx_sheet(file_path, sheet_name, index_col=index_col, date_columns=date_columns)
+    except Exception as e:
+        print(f"Fast reader failed for {sheet_name}, using openpyxl: {str(e)}")
+        return pd.read_excel(file_path, sheet_name=sheet_name, index_col=index_col)
+
+def read_metrics(file_path: str) -> pd.DataFrame:
+    """
+    Read the Metrics sheet (no dates, so the archive reader needs no hints)
+    """
+    return read_excel_sheet(file_path, 'Metrics')
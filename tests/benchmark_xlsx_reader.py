@@ -0,0 +1,35 @@
+"""
+Benchmark the fast Metrics reader against pd.read_excel on Test Output
+Run from the project root: python tests/benchmark_xlsx_reader.py
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+import pandas as pd
+from src.data.xlsx_reader import read_xlsx_sheet, sheet_names
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Test Output')
+
+
+def main():
+    files = [os.path.join(OUTPUT_DIR, name) for name in sorted(os.listdir(OUTPUT_DIR)) if name.endswith('.xlsx')]
+    files = [path for path in files if 'Metrics' in sheet_names(path)]
+    timings = {'openpyxl': 0.0, 'fast': 0.0}
+    for path in files:
+        start = time.perf_counter()
+        expected = pd.read_excel(path, sheet_name='Metrics')
+        middle = time.perf_counter()
+        result = read_xlsx_sheet(path, 'Metrics')
+        timings['openpyxl'] += middle - start
+        timings['fast'] += time.perf_counter() - middle
+        pd.testing.assert_frame_equal(result, expected)
+
+    print(f"{len(files)} workbooks with a Metrics sheet (results identical)")
+    for name, seconds in timings.items():
+        print(f"{name:>9}: {seconds:.3f}s total, {1000 * seconds / len(files):.1f} ms per workbook")
+    print(f"  speedup: {timings['openpyxl'] / timings['fast']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
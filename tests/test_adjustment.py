@@ -0,0 +1,219 @@
+"""
+Unit tests for the local split and dividend adjustment engine
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+from unittest.mock import patch, MagicMock, PropertyMock
+import pandas as pd
+import numpy as np
+from src.models.adjustment import AdjustmentEngine, actions_from_dividends, dividends_from_actions
+from src.models.total_return import back_adjusted_prices, compare_adjusted
+from src.data.excel_manager import ExcelManager
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_WORKBOOK = os.path.join(PROJECT_ROOT, 'Test Output', 'dashboard_data_20241222_0943_HYG_SJNK.xlsx')
+
+
+class TestAdjustmentEngine(unittest.TestCase):
+    def setUp(self):
+        """Set up random closes with quarterly dividends"""
+        rng = np.random.default_rng(3)
+        dates = pd.bdate_range('2023-01-02', periods=300)
+        values = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, (300, 2)), axis=0))
+        self.prices = pd.DataFrame(values, index=dates, columns=['AAA', 'BBB'])
+        self.prices.iloc[:20, 1] = np.nan  # BBB lists later
+        self.dividends = pd.DataFrame({'AAA': 0.4, 'BBB': 0.25}, index=dates[[40, 100, 160, 220, 280]])
+
+    def test_matches_full_rebuild(self):
+        """Dividend factors match the total_return reconstruction"""
+        engine = AdjustmentEngine.from_sheets(self.prices, self.dividends)
+        expected = back_adjusted_prices(self.prices, self.dividends)
+        pd.testing.assert_frame_equal(engine.adjusted(), expected)
+
+    def test_incremental_dividend(self):
+        """Adding a dividend rescales history the same as rebuilding from scratch"""
+        engine = AdjustmentEngine.from_sheets(self.prices, self.dividends.iloc[:-1])
+        engine.add_action('AAA', self.dividends.index[-1], 'dividend', 0.4)
+        engine.add_action('BBB', self.dividends.index[-1], 'dividend', 0.25)
+        engine.add_action('AAA', self.dividends.index[-1], 'dividend', 0.1)  # Second payment, same ex-date
+        divs = self.dividends.copy()
+        divs.iloc[-1, 0] += 0.1
+        expected = back_adjusted_prices(self.prices, divs)
+        np.testing.assert_allclose(engine.adjusted().to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+    def test_pending_actions(self):
+        """Actions past the last close wait for the prices around them"""
+        engine = AdjustmentEngine.from_sheets(self.prices.iloc[:250], self.dividends.iloc[:3])
+        engine.add_action('AAA', self.dividends.index[3], 'dividend', 0.4)
+        engine.add_action('BBB', self.dividends.index[3], 'dividend', 0.25)
+        engine.add_action('AAA', self.dividends.index[4], 'dividend', 0.4)
+        self.assertEqual(len(engine.pending), 1)
+
+        engine.add_prices(self.prices.iloc[250:270])
+        self.assertEqual(len(engine.pending), 1)
+        engine.add_prices(self.prices.iloc[270:])
+        self.assertTrue(engine.pending.empty)
+
+        divs = self.dividends.copy()
+        divs.iloc[-1, 1] = np.nan
+        expected = back_adjusted_prices(self.prices, divs)
+        np.testing.assert_allclose(engine.adjusted().to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+    def test_split(self):
+        """A 2-for-1 split on raw closes gives a continuous adjusted series"""
+        raw = self.prices[['AAA']].copy()
+        raw.iloc[150:] /= 2
+        engine = AdjustmentEngine(raw)
+        engine.add_action('AAA', raw.index[150], 'split', 2.0)
+        np.testing.assert_allclose(engine.adjusted()['AAA'].to_numpy(), self.prices['AAA'].to_numpy() / 2)
+        with self.assertRaises(ValueError):
+            engine.add_action('AAA', raw.index[10], 'merger', 1.0)
+
+    def test_save_load(self):
+        """Stored engine reloads factors and pending actions"""
+        engine = AdjustmentEngine.from_sheets(self.prices, self.dividends)
+        engine.add_action('AAA', '2030-01-02', 'dividend', 0.5)
+        with tempfile.TemporaryDirectory() as tmp:
+            engine.save(tmp)
+            loaded = AdjustmentEngine.load(tmp)
+        pd.testing.assert_frame_equal(loaded.adjusted(), engine.adjusted(), check_freq=False)
+        self.assertEqual(len(loaded.pending), 1)
+        self.assertEqual(len(actions_from_dividends(self.dividends)), 10)
+        pd.testing.assert_frame_equal(dividends_from_actions(actions_from_dividends(self.dividends)),
+                                      self.dividends, check_freq=False)
+
+    def test_tickers_advance_separately(self):
+        """A lagging ticker catches up, and a new ticker joins, without touching the others"""
+        engine = AdjustmentEngine.from_sheets(self.prices.iloc[:250], self.dividends.iloc[:4])
+        engine.add_prices(self.prices[['AAA']].iloc[240:])  # AAA runs ahead of BBB
+        engine.add_action('AAA', self.dividends.index[4], 'dividend', 0.4)
+        engine.add_action('BBB', self.dividends.index[4], 'dividend', 0.25)
+        self.assertEqual(list(engine.pending['ticker']), ['BBB'])  # Past BBB's last close
+
+        engine.add_prices(self.prices[['BBB']].iloc[200:])
+        self.assertTrue(engine.pending.empty)
+        expected = back_adjusted_prices(self.prices, self.dividends)
+        np.testing.assert_allclose(engine.adjusted().to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+        engine.add_prices(self.prices[['AAA']].rename(columns={'AAA': 'CCC'}))
+        np.testing.assert_allclose(engine.adjusted()['CCC'].to_numpy(), self.prices['AAA'].to_numpy())
+        engine.drop_ticker('CCC')
+        self.assertEqual(list(engine.prices.columns), ['AAA', 'BBB'])
+
+    @unittest.skipUnless(os.path.exists(SAMPLE_WORKBOOK), "sample workbook not available")
+    def test_matches_vendor_adjusted(self):
+        """Incrementally maintained factors match the stored Yahoo adjusted closes"""
+        with pd.ExcelFile(SAMPLE_WORKBOOK) as xls:
+            vendor = pd.read_excel(xls, 'Daily Prices', index_col=0)
+            unadj = pd.read_excel(xls, 'Unadjusted Prices', index_col=0)
+            divs = pd.read_excel(xls, 'Dividends', index_col=0)
+        divs.index = pd.to_datetime(divs.index)
+        cutoff = divs.index[-6]
+        engine = AdjustmentEngine.from_sheets(unadj, divs[divs.index < cutoff])
+        for ex_date, row in divs[divs.index >= cutoff].iterrows():
+            for ticker, amount in row.dropna().items():
+                engine.add_action(ticker, ex_date, 'dividend', amount)
+        check = compare_adjusted(vendor, engine.adjusted())
+        self.assertTrue((check['max_abs_rel_diff'] < 1e-4).all())
+
+
+class TestIncrementalDownload(unittest.TestCase):
+    def setUp(self):
+        """Vendor history that grows by 49 days and one dividend between downloads"""
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(4)
+        self.dates = pd.bdate_range('2023-01-02', periods=300)
+        self.closes = pd.Series(50 * np.exp(np.cumsum(rng.normal(0, 0.01, 300))), index=self.dates)
+        self.dividends = pd.Series(0.4, index=self.dates[[40, 100, 160, 220, 280]])
+        self.available = self.dates[250]
+        self.split = None  # (date, ratio) of a split, once Yahoo reports it
+        self.requests = []  # (start, auto_adjust) of each history request
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def visible(self, series: pd.Series) -> pd.Series:
+        """Closes or dividends as Yahoo reports them: restated for a split already reported"""
+        series = series[:self.available]
+        return series / self.split[1] if self.split is not None and self.split[0] <= self.available else series
+
+    def fake_ticker(self, symbol):
+        ticker = MagicMock()
+
+        def history(start, end, auto_adjust):
+            self.requests.append((pd.Timestamp(start), auto_adjust))
+            closes = self.visible(self.closes).to_frame('Close')
+            if auto_adjust:
+                closes = back_adjusted_prices(closes, self.visible(self.dividends).to_frame('Close'))
+            return closes[pd.Timestamp(start):]
+
+        def splits():
+            if self.split is None or self.split[0] > self.available:
+                return pd.Series(dtype=float)
+            return pd.Series([self.split[1]], index=[self.split[0]])
+
+        ticker.history.side_effect = history
+        type(ticker).dividends = PropertyMock(side_effect=lambda: self.visible(self.dividends))
+        type(ticker).splits = PropertyMock(side_effect=splits)
+        type(ticker).actions = PropertyMock(
+            side_effect=lambda: pd.DataFrame({'Dividends': self.visible(self.dividends)}))
+        return ticker
+
+    def test_new_dividend_without_refetch(self):
+        """A repeat download fetches only new closes and applies the new dividend to stored history"""
+        manager = ExcelManager(self.tmp.name, ['AAA'])
+        with patch('src.data.excel_manager.yf.Ticker', side_effect=self.fake_ticker):
+            adj, unadj, dividends = manager.download_ticker_data('AAA')
+            self.assertEqual(len(unadj), 251)
+            self.assertEqual(len(dividends), 4)
+            self.assertEqual(self.requests, [(pd.Timestamp('2020-01-01'), True), (pd.Timestamp('2020-01-01'), False)])
+
+            self.available = self.dates[-1]
+            self.requests = []
+            adj, unadj, dividends = manager.download_ticker_data('AAA')
+        self.assertEqual(self.requests, [(self.dates[250] + pd.Timedelta(days=1), False)])  # New days, unadjusted only
+        self.assertEqual(len(unadj), 300)
+        self.assertEqual(len(dividends), 5)
+        expected = back_adjusted_prices(self.closes.to_frame('AAA'), self.dividends.to_frame('AAA'))
+        np.testing.assert_allclose(adj['AAA'].to_numpy(), expected['AAA'].to_numpy(), rtol=1e-12)
+
+        manager._forget_adjustments('AAA')
+        self.assertIsNone(manager._last_stored_close('AAA'))
+
+    def test_split_between_downloads(self):
+        """A 2-for-1 split after the stored closes refetches the restated history instead of mixing bases"""
+        manager = ExcelManager(self.tmp.name, ['AAA'])
+        with patch('src.data.excel_manager.yf.Ticker', side_effect=self.fake_ticker):
+            manager.download_ticker_data('AAA')
+            self.split = (self.dates[270], 2.0)
+            self.available = self.dates[-1]
+            self.requests = []
+            adj, unadj, dividends = manager.download_ticker_data('AAA')
+        self.assertEqual(self.requests[-2:], [(pd.Timestamp('2020-01-01'), True), (pd.Timestamp('2020-01-01'), False)])
+        np.testing.assert_allclose(unadj['AAA'].to_numpy(), self.closes.to_numpy() / 2)
+        np.testing.assert_allclose(dividends['AAA'].dropna().to_numpy(), self.dividends.to_numpy() / 2)
+        self.assertLess(adj['AAA'].pct_change().abs().max(), 0.1)  # No unreversed split drop
+
+        # The engine was rebuilt on the restated basis, so the next download is incremental again
+        self.assertEqual(manager._last_stored_close('AAA'), self.dates[-1])
+        self.requests = []
+        with patch('src.data.excel_manager.yf.Ticker', side_effect=self.fake_ticker):
+            manager.download_ticker_data('AAA')
+        self.assertEqual(self.requests, [(self.dates[-1] + pd.Timedelta(days=1), False)])
+
+    def test_restated_dividend_refetches(self):
+        """A stored dividend Yahoo now reports with another amount triggers a full download"""
+        manager = ExcelManager(self.tmp.name, ['AAA'])
+        with patch('src.data.excel_manager.yf.Ticker', side_effect=self.fake_ticker):
+            manager.download_ticker_data('AAA')
+            self.dividends.iloc[0] = 0.45
+            self.requests = []
+            manager.download_ticker_data('AAA')
+        self.assertEqual(self.requests[-1], (pd.Timestamp('2020-01-01'), False))
+
+
+if __name__ == '__main__':
+    unittest.main()
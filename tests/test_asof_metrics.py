@@ -0,0 +1,106 @@
+"""
+Unit tests for the point-in-time (as-of) metrics backfill
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+from unittest import mock
+import pandas as pd
+import numpy as np
+from src.models.asof_metrics import calculate_asof_metrics, month_end_dates, write_asof_metrics
+from src.models.performance_metrics import PerformanceMetrics
+
+
+class TestAsOfMetrics(unittest.TestCase):
+    def setUp(self):
+        """Set up three years of prices and quarterly dividends"""
+        rng = np.random.default_rng(11)
+        dates = pd.date_range(start='2021-01-04', end='2023-12-29', freq='B')
+        self.prices = pd.DataFrame({
+            'SPY': 100 * np.cumprod(1 + rng.normal(0.0004, 0.011, len(dates))),
+            'TLT': 100 * np.cumprod(1 + rng.normal(-0.0001, 0.009, len(dates))),
+        }, index=dates)
+        self.prices.iloc[:300, 1] = np.nan  # TLT listed late
+        div_dates = pd.date_range(start='2021-03-15', end='2023-12-29', freq='QS') + pd.Timedelta(days=14)
+        self.dividends = pd.DataFrame({'SPY': 1.5, 'TLT': np.nan}, index=div_dates)
+
+    def test_month_end_dates(self):
+        """Month-ends are the last trading day of each month"""
+        ends = month_end_dates(self.prices.index)
+        self.assertEqual(len(ends), 36)
+        self.assertEqual(ends[0], pd.Timestamp('2021-01-29'))
+
+    def test_matches_truncated_rerun(self):
+        """Each as-of row equals PerformanceMetrics run on truncated history"""
+        asof = [pd.Timestamp('2023-03-31'), pd.Timestamp('2023-12-29')]
+        panel = calculate_asof_metrics(self.prices, self.dividends, dates=asof,
+                                       risk_free_rate=0.03).set_index(['Date', 'Ticker'])
+        perf = PerformanceMetrics()
+        with mock.patch.object(PerformanceMetrics, '_get_risk_free_rate', return_value=0.03):
+            for date in asof:
+                truncated = self.prices[self.prices.index <= date]
+                for ticker in ['SPY', 'TLT']:
+                    series = truncated[ticker].dropna()
+                    row = panel.loc[(date, ticker)]
+                    risk = perf.calculate_risk_metrics(series)
+                    returns = perf.calculate_returns(series)
+                    if len(series) < perf.MIN_HISTORY_DAYS:
+                        # Short history: no 2Y metrics, as in the Metrics sheet
+                        self.assertEqual(risk, {})
+                        self.assertTrue(np.isnan(row['Sharpe 2Y']))
+                        self.assertTrue(np.isnan(row['Volatility']))
+                    else:
+                        self.assertAlmostEqual(row['Sharpe 2Y'], risk['sharpe_2y'], places=8)
+                        self.assertAlmostEqual(row['Volatility'], risk['volatility'], places=8)
+                        self.assertAlmostEqual(row['Max_Drawdown'], risk['max_drawdown'], places=10)
+                    self.assertAlmostEqual(row['Day%'], returns['daily_return'], places=12)
+                    self.assertAlmostEqual(row['1MTH%'], returns['one_month_return'], places=12)
+                    ytd = series[series.index.year == date.year]
+                    self.assertAlmostEqual(row['YTD%'], ytd.iloc[-1] / ytd.iloc[0] - 1, places=12)
+
+        spy_yield = panel.loc[(asof[1], 'SPY'), '%Yield']
+        self.assertAlmostEqual(spy_yield, 4 * 1.5 / self.prices.loc[asof[1], 'SPY'])
+
+    def test_missing_close_keeps_window(self):
+        """One missing close drops its returns instead of blanking 2Y metrics for 503 rows"""
+        prices = self.prices.copy()
+        prices.loc['2023-02-15', 'SPY'] = np.nan
+        asof = [pd.Timestamp('2023-03-31'), pd.Timestamp('2023-12-29')]
+        panel = calculate_asof_metrics(prices, dates=asof, risk_free_rate=0.03).set_index(['Date', 'Ticker'])
+        perf = PerformanceMetrics()
+        with mock.patch.object(PerformanceMetrics, '_get_risk_free_rate', return_value=0.03):
+            for date in asof:
+                series = prices.loc[prices.index <= date, 'SPY']
+                self.assertTrue(perf.has_min_history(series))
+                risk = perf.calculate_risk_metrics(series)
+                self.assertAlmostEqual(panel.loc[(date, 'SPY'), 'Sharpe 2Y'], risk['sharpe_2y'], places=8)
+                self.assertAlmostEqual(panel.loc[(date, 'SPY'), 'Volatility'], risk['volatility'], places=8)
+
+    def test_ytd_from_first_valid_close(self):
+        """YTD% starts at the first close of the year, not the year's first row"""
+        prices = self.prices.copy()
+        prices.loc[:'2023-03-01', 'TLT'] = np.nan  # Relisted in March
+        date = pd.Timestamp('2023-12-29')
+        panel = calculate_asof_metrics(prices, dates=[date]).set_index('Ticker')
+        ytd = prices.loc['2023', 'TLT'].dropna()
+        self.assertAlmostEqual(panel.loc['TLT', 'YTD%'], ytd.iloc[-1] / ytd.iloc[0] - 1, places=12)
+
+    def test_write_panel(self):
+        """Panel writes to its own sheet"""
+        panel = calculate_asof_metrics(self.prices, self.dividends)
+        self.assertEqual(len(panel), 36 * 2)
+        test_file = 'test_asof_metrics.xlsx'
+        try:
+            with pd.ExcelWriter(test_file, engine='xlsxwriter') as writer:
+                self.assertTrue(write_asof_metrics(panel, writer))
+            written = pd.read_excel(test_file, sheet_name='Metrics History')
+            self.assertEqual(list(written.columns), list(panel.columns))
+            self.assertEqual(len(written), len(panel))
+        finally:
+            if os.path.exists(test_file):
+                os.remove(test_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for atomic, locked workbook writes
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.data.atomic_io import FileLock, atomic_write, new_run_id, is_temp_file, parse_run_name
+from src.data.excel_manager import ExcelManager
+
+
+class TestAtomicIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dates = pd.bdate_range('2024-01-01', periods=50).date
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unique_run_ids(self):
+        """Runs started together get distinct, parseable file names"""
+        self.assertEqual(len({new_run_id() for _ in range(1000)}), 1000)
+        first, second = ExcelManager(self.tmp.name, ['SPY', 'QQQ']), ExcelManager(self.tmp.name, ['SPY', 'QQQ'])
+        self.assertNotEqual(first.excel_path, second.excel_path)
+        timestamp, tickers = parse_run_name(first.excel_path)
+        self.assertIsNotNone(timestamp)
+        self.assertEqual(tickers, ['SPY', 'QQQ'])
+
+    def test_failed_write_keeps_previous_version(self):
+        """An error mid-write leaves the old file and no temporary file"""
+        path = os.path.join(self.tmp.name, 'book.xlsx')
+        pd.DataFrame({'a': [1]}).to_excel(path)
+        with self.assertRaises(RuntimeError):
+            with atomic_write(path) as temp_path, pd.ExcelWriter(temp_path, engine='xlsxwriter') as writer:
+                self.assertTrue(is_temp_file(temp_path))
+                pd.DataFrame({'a': [2]}).to_excel(writer)
+                raise RuntimeError("interrupted")
+        self.assertEqual(pd.read_excel(path, index_col=0)['a'].tolist(), [1])
+        self.assertEqual(os.listdir(self.tmp.name), ['book.xlsx'])
+
+    def test_readers_see_complete_versions(self):
+        """A reader polling during rewrites always opens a whole workbook"""
+        path = os.path.join(self.tmp.name, 'book.xlsx')
+        pd.DataFrame({'a': np.arange(2000)}).to_excel(path)
+        done, errors = threading.Event(), []
+
+        def read():
+            while not done.is_set():
+                try:
+                    self.assertEqual(len(pd.read_excel(path)), 2000)
+                except Exception as e:
+                    errors.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for i in range(5):
+            with atomic_write(path) as temp_path:
+                pd.DataFrame({'a': np.arange(2000) + i}).to_excel(temp_path)
+        done.set()
+        reader.join()
+        self.assertEqual(errors, [])
+
+    def test_lock_serializes_writers(self):
+        """Read-modify-write under the lock loses no updates"""
+        path = os.path.join(self.tmp.name, 'counter.txt')
+        with open(path, 'w') as f:
+            f.write('0')
+
+        def increment():
+            for _ in range(20):
+                with FileLock(path, timeout=10):
+                    with open(path) as f:
+                        value = int(f.read())
+                    time.sleep(0.001)
+                    with open(path, 'w') as f:
+                        f.write(str(value + 1))
+
+        threads = [threading.Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with open(path) as f:
+            self.assertEqual(int(f.read()), 80)
+
+        with FileLock(path):
+            with self.assertRaises(TimeoutError):
+                FileLock(path, timeout=0.1).acquire()
+
+    @patch('src.data.excel_manager.calculate_and_write_metrics')
+    def test_concurrent_saves_keep_every_ticker(self, mock_metrics):
+        """Two sessions saving into one workbook do not overwrite each other"""
+        manager = ExcelManager(self.tmp.name, ['SPY', 'QQQ'])
+        manager.SNAPSHOT_DIR = manager.WAREHOUSE_FILE = None
+        prices = {ticker: pd.DataFrame({ticker: np.linspace(100, 110, 50)}, index=self.dates)
+                  for ticker in ['SPY', 'QQQ']}
+        threads = [threading.Thread(target=manager.save_ticker_data, args=(t, p, p, pd.DataFrame()))
+                   for t, p in prices.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        saved = pd.read_excel(manager.excel_path, sheet_name='Daily Prices', index_col=0)
+        self.assertEqual(sorted(saved.columns), ['QQQ', 'SPY'])
+        self.assertFalse([name for name in os.listdir(self.tmp.name) if is_temp_file(name) or name.endswith('.lock')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Unit tests for block-bootstrap Sharpe / Sortino confidence intervals
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import pandas as pd
+import numpy as np
+from src.models import bootstrap
+from src.models.bootstrap import bootstrap_sharpe_sortino, stationary_bootstrap_indices
+
+
+class TestBootstrap(unittest.TestCase):
+    def setUp(self):
+        """Set up two years of daily returns"""
+        rng = np.random.default_rng(7)
+        dates = pd.date_range(start='2022-01-03', periods=504, freq='B')
+        self.returns = pd.DataFrame({
+            'SPY': rng.normal(0.0005, 0.012, len(dates)),
+            'SHV': rng.normal(0.00018, 0.0003, len(dates)),
+        }, index=dates)
+        self.rf = 0.03
+
+    def test_point_estimates(self):
+        """Point estimates match the PerformanceMetrics definitions"""
+        result = bootstrap_sharpe_sortino(self.returns, self.rf, n_resamples=200, n_jobs=1)
+        for ticker in self.returns.columns:
+            returns = self.returns[ticker]
+            excess = returns - self.rf / 252
+            sharpe = excess.mean() / returns.std() * np.sqrt(252)
+            downside = excess[excess < 0]
+            sortino = np.sqrt(252) * excess.mean() / np.sqrt(np.mean(downside ** 2))
+            self.assertAlmostEqual(result.loc[ticker, 'sharpe'], sharpe, places=8)
+            self.assertAlmostEqual(result.loc[ticker, 'sortino'], sortino, places=8)
+            self.assertLess(result.loc[ticker, 'sharpe_lower'], result.loc[ticker, 'sharpe'])
+            self.assertGreater(result.loc[ticker, 'sharpe_upper'], result.loc[ticker, 'sharpe'])
+            self.assertGreater(result.loc[ticker, 'sharpe_se'], 0)
+
+    def test_deterministic_across_workers(self):
+        """Same seed gives identical intervals in-process and on a pool"""
+        serial = bootstrap_sharpe_sortino(self.returns, self.rf, n_resamples=1200, seed=3, n_jobs=1)
+        pooled = bootstrap_sharpe_sortino(self.returns, self.rf, n_resamples=1200, seed=3, n_jobs=2)
+        pd.testing.assert_frame_equal(serial, pooled)
+        other = bootstrap_sharpe_sortino(self.returns, self.rf, n_resamples=1200, seed=4, n_jobs=1)
+        self.assertNotEqual(serial.loc['SPY', 'sharpe_lower'], other.loc['SPY', 'sharpe_lower'])
+
+    def test_serial_leaves_no_worker_state(self):
+        """The in-process path does not keep the inputs in the module global"""
+        bootstrap_sharpe_sortino(self.returns, n_resamples=600, n_jobs=1)
+        self.assertIsNone(bootstrap._worker_statistics)
+
+    def test_indices_form_blocks(self):
+        """Index paths are valid positions made of consecutive runs"""
+        idx = stationary_bootstrap_indices(100, 50, 10, np.random.default_rng(0))
+        self.assertEqual(idx.shape, (50, 100))
+        self.assertTrue(((idx >= 0) & (idx < 100)).all())
+        steps = (np.diff(idx, axis=1) % 100) == 1
+        self.assertGreater(steps.mean(), 0.8)
+
+    def test_short_history(self):
+        """Tickers with missing early history still get intervals"""
+        returns = self.returns.copy()
+        returns.iloc[:200, 1] = np.nan
+        result = bootstrap_sharpe_sortino(returns, self.rf, n_resamples=100, n_jobs=1)
+        self.assertEqual(result.loc['SHV', 'observations'], 304)
+        self.assertTrue(np.isfinite(result.loc['SHV', 'sharpe_lower']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Unit tests for ingestion data-quality checks
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.data.data_quality import check_price_quality
+from src.data.trading_calendar import nyse_calendar
+from src.data.excel_manager import ExcelManager
+
+
+class TestDataQuality(unittest.TestCase):
+    def setUp(self):
+        """Set up clean prices on NYSE sessions, then damage copies of them"""
+        rng = np.random.default_rng(8)
+        dates = nyse_calendar.sessions('2022-01-01', '2023-12-31')
+        values = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, (len(dates), 5)), axis=0))
+        self.prices = pd.DataFrame(values, index=dates, columns=['OK', 'SPIKE', 'ZERO', 'STALE', 'SPLIT'])
+        self.prices.iloc[200, 1] *= 10
+        self.prices.iloc[300, 2] = 0.0
+        self.prices.iloc[-12:, 3] = self.prices.iloc[-13, 3]
+        self.unadj = self.prices * 1.02
+        self.unadj.iloc[400:, 4] /= 4  # Split applied to unadjusted closes only
+
+    def test_status_per_ticker(self):
+        """Each damaged ticker is quarantined for its own issue"""
+        report = check_price_quality(self.prices, self.unadj)
+        self.assertEqual(report.loc['OK', 'status'], 'ok')
+        self.assertEqual(report.loc['SPIKE', 'reversal_spikes'], 1)
+        self.assertEqual(report.loc['ZERO', 'non_positive'], 1)
+        self.assertEqual(report.loc['STALE', 'longest_stale_run'], 12)
+        self.assertEqual(report.loc['SPLIT', 'ratio_jumps'], 1)
+        self.assertTrue((report.drop('OK')['status'] == 'quarantine').all())
+        self.assertIn('split mismatch', report.loc['SPLIT', 'issues'])
+
+    def test_gaps_and_stale_warning(self):
+        """Missing sessions and mid-history repeats are warnings only"""
+        prices = self.prices[['OK']].drop(self.prices.index[[50, 51, 52]])
+        prices.iloc[100:106, 0] = prices.iloc[99, 0]
+        report = check_price_quality(prices)
+        self.assertEqual(report.loc['OK', 'missing_sessions'], 3)
+        self.assertEqual(report.loc['OK', 'status'], 'warn')
+        self.assertIn('repeated closes', report.loc['OK', 'issues'])
+
+    def test_crash_days_not_quarantined(self):
+        """A large move that only partly reverses is an outlier, not a bad print"""
+        prices = self.prices[['OK']].copy()
+        prices.iloc[150:, 0] *= 0.88
+        prices.iloc[151:, 0] *= 1.08
+        report = check_price_quality(prices)
+        self.assertEqual(report.loc['OK', 'reversal_spikes'], 0)
+        self.assertEqual(report.loc['OK', 'status'], 'warn')
+
+    @patch('src.data.excel_manager.calculate_and_write_metrics')
+    def test_excel_manager_quarantine(self, mock_metrics):
+        """Suspect downloads go to the quarantine directory, clean ones to the workbook"""
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = ExcelManager(tmp, ['OK', 'ZERO'])
+            empty_divs = pd.DataFrame()
+            for ticker in ['OK', 'ZERO']:
+                frame = self.prices[[ticker]]
+                frame.index = frame.index.date
+                self.assertTrue(manager.save_ticker_data(ticker, frame, frame, empty_divs))
+
+            self.assertEqual(list(manager.quarantined), ['ZERO'])
+            sheets = pd.read_excel(manager.excel_path, sheet_name=None, index_col=0)
+            self.assertEqual(list(sheets['Daily Prices'].columns), ['OK'])
+            self.assertEqual(sheets['Data Quality'].loc['OK', 'status'], 'ok')
+            quarantine_files = os.listdir(os.path.join(tmp, 'quarantine'))
+            self.assertEqual(len(quarantine_files), 1)
+            self.assertTrue(quarantine_files[0].endswith('_ZERO.xlsx'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for the multi-format dataset export
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+from unittest.mock import patch
+from src.data.dataset_export import export_datasets, dataset_file_name, FORMATS
+from src.data.excel_manager import ExcelManager
+
+
+class TestDatasetExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(5)
+        dates = pd.bdate_range('2024-01-02', periods=50)
+        self.prices = pd.DataFrame(100 + rng.normal(0, 1, (50, 3)).cumsum(axis=0), index=dates,
+                                   columns=['SPY', 'QQQ', 'IWM'])
+        self.prices.iloc[:5, 2] = np.nan
+        self.metrics = pd.DataFrame({'Ticker': ['SPY', 'QQQ'], 'Name': ['S&P 500', 'N/A'],
+                                     'Sharpe 2Y': [0.8, 'N/A']})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_back(self, path: str, fmt: str) -> pd.DataFrame:
+        if fmt == 'parquet':
+            return pd.read_parquet(path)
+        if fmt == 'csv.gz':
+            return pd.read_csv(path, parse_dates=['Date'])
+        if fmt == 'arrow':
+            with pa.memory_map(path) as source:
+                return pa.ipc.open_file(source).read_all().to_pandas()
+        return pd.read_json(path, lines=True, convert_dates=['Date'])
+
+    def test_round_trip_every_format(self):
+        """Each format reads back to the same prices, with dates as a leading column"""
+        written = export_datasets({'Daily Prices': self.prices, 'Metrics': self.metrics, 'Dividends': pd.DataFrame()},
+                                  self.tmp.name, list(FORMATS), indexed=['Daily Prices', 'Dividends'])
+        self.assertEqual(len(written), 2 * len(FORMATS))  # Empty Dividends skipped
+        for fmt in FORMATS:
+            path = written[('Daily Prices', fmt)]
+            self.assertEqual(os.path.basename(path), dataset_file_name('Daily Prices', fmt))
+            frame = self.read_back(path, fmt).set_index('Date')
+            np.testing.assert_array_equal(frame.index.to_numpy(dtype='datetime64[ns]'),
+                                          self.prices.index.to_numpy(dtype='datetime64[ns]'))
+            np.testing.assert_allclose(frame.to_numpy(dtype=float), self.prices.to_numpy(), equal_nan=True)
+
+            metrics = self.read_back(written[('Metrics', fmt)], fmt) if fmt != 'csv.gz' \
+                else pd.read_csv(written[('Metrics', fmt)], keep_default_na=False)
+            self.assertEqual(list(metrics.columns), ['Ticker', 'Name', 'Sharpe 2Y'])
+            self.assertEqual(list(metrics['Sharpe 2Y'].astype(str)), ['0.8', 'N/A'])
+        self.assertFalse([name for name in os.listdir(self.tmp.name) if name.startswith('~$')])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_datasets({'Daily Prices': self.prices}, self.tmp.name, ['xlsb'])
+
+    @patch('src.data.excel_manager.calculate_and_write_metrics')
+    def test_excel_manager_exports(self, mock_metrics):
+        """With EXPORT_FORMATS set, each save also writes the datasets in those formats"""
+        manager = ExcelManager(self.tmp.name, ['SPY'])
+        manager.EXPORT_FORMATS = ('parquet', 'jsonl')
+        prices = self.prices[['SPY']].set_axis(self.prices.index.date)
+        self.assertTrue(manager.save_ticker_data('SPY', prices, prices, pd.DataFrame()))
+        stem = os.path.splitext(os.path.basename(manager.excel_path))[0]
+        directory = os.path.join(self.tmp.name, ExcelManager.EXPORT_DIR, stem)
+        self.assertEqual(sorted(os.listdir(directory)),
+                         ['daily_prices.jsonl', 'daily_prices.parquet',
+                          'unadjusted_prices.jsonl', 'unadjusted_prices.parquet'])
+        daily = pd.read_parquet(os.path.join(directory, 'daily_prices.parquet'))
+        np.testing.assert_allclose(daily['SPY'].to_numpy(), prices['SPY'].to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for vectorized drawdown analytics
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import pandas as pd
+import numpy as np
+from src.models.drawdown import (
+    calculate_drawdown_series, summarize_drawdowns, top_drawdowns, max_drawdown
+)
+
+
+class TestDrawdown(unittest.TestCase):
+    def setUp(self):
+        """Set up price paths with known drawdowns"""
+        dates = pd.date_range(start='2022-01-03', periods=10, freq='B')
+        self.prices = pd.DataFrame({
+            # Peak 100 -> trough 80 (-20%), recovers on day 5, then -10% unrecovered
+            'AAA': [100, 90, 80, 95, 100, 110, 99, 105, 108, 109],
+            # Monotonic: never in drawdown
+            'BBB': [10, 11, 12, 13, 14, 15, 16, 17, 18, 19],
+            # Listed late
+            'CCC': [np.nan, np.nan, 50, 40, 45, 50, 55, 41, 50, 60],
+        }, index=dates, dtype=float)
+
+    def test_matches_expanding_max(self):
+        """Drawdown series matches the pandas expanding-max definition"""
+        dd = calculate_drawdown_series(self.prices)
+        for ticker in self.prices.columns:
+            series = self.prices[ticker].dropna()
+            peak = series.expanding(min_periods=1).max()
+            expected = (series - peak) / peak
+            np.testing.assert_allclose(dd[ticker].dropna().values, expected.values)
+
+    def test_summary(self):
+        """Depth, dates, durations and time under water"""
+        summary = summarize_drawdowns(self.prices)
+        dates = self.prices.index
+
+        aaa = summary.loc['AAA']
+        self.assertAlmostEqual(aaa['max_drawdown'], -0.20)
+        self.assertEqual(aaa['peak_date'], dates[0])
+        self.assertEqual(aaa['trough_date'], dates[2])
+        self.assertEqual(aaa['recovery_date'], dates[4])
+        self.assertEqual(aaa['drawdown_days'], 2)
+        self.assertEqual(aaa['recovery_days'], 4)
+        self.assertAlmostEqual(aaa['time_under_water'], 0.7)
+        self.assertAlmostEqual(aaa['current_drawdown'], 109 / 110 - 1)
+
+        bbb = summary.loc['BBB']
+        self.assertEqual(bbb['max_drawdown'], 0)
+        self.assertTrue(pd.isna(bbb['peak_date']))
+        self.assertEqual(bbb['time_under_water'], 0)
+
+        ccc = summary.loc['CCC']
+        self.assertAlmostEqual(ccc['max_drawdown'], 41 / 55 - 1)
+        self.assertEqual(ccc['peak_date'], dates[6])
+        self.assertEqual(ccc['trough_date'], dates[7])
+        self.assertEqual(ccc['recovery_date'], dates[9])
+
+    def test_top_episodes(self):
+        """Distinct episodes are ranked by depth"""
+        episodes = top_drawdowns(self.prices, top_n=2)
+        aaa = episodes[episodes['ticker'] == 'AAA']
+        self.assertEqual(len(aaa), 2)
+        self.assertEqual(list(aaa['rank']), [1, 2])
+        self.assertAlmostEqual(aaa.iloc[0]['depth'], -0.20)
+        self.assertAlmostEqual(aaa.iloc[1]['depth'], -0.10)
+        self.assertTrue(pd.isna(aaa.iloc[1]['recovery_date']))
+        self.assertNotIn('BBB', set(episodes['ticker']))
+
+    def test_window(self):
+        """Windowed variant only sees the trailing rows"""
+        summary = summarize_drawdowns(self.prices, window=4)
+        self.assertAlmostEqual(summary.loc['AAA', 'max_drawdown'], -0.10)
+        self.assertEqual(summary.loc['AAA', 'peak_date'], self.prices.index[5])
+
+        long_prices = pd.DataFrame(
+            {'AAA': np.linspace(100, 200, 1000)},
+            index=pd.date_range('2018-01-01', periods=1000, freq='B'))
+        long_prices.iloc[10] = 50  # Crash outside a 2Y window
+        self.assertLess(max_drawdown(long_prices['AAA']), -0.4)
+        self.assertEqual(max_drawdown(long_prices['AAA'], window='2Y'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
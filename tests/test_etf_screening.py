@@ -0,0 +1,125 @@
+"""
+Unit tests for bulk ETF screening (offline, yfinance mocked)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+import time
+from unittest.mock import patch, MagicMock
+import pandas as pd
+from src.data.etf_manager import ETFManager, RateLimiter
+from src.data.warehouse import Warehouse
+
+INFO = {
+    'SPY': {'quoteType': 'ETF', 'longName': 'SPDR S&P 500', 'totalAssets': 5e11,
+            'averageVolume': 7e7, 'expenseRatio': 0.000945},
+    'TINY': {'quoteType': 'ETF', 'totalAssets': 5e5, 'averageVolume': 5e4},
+    'THIN': {'quoteType': 'ETF', 'totalAssets': 5e7, 'averageVolume': 500},
+    'COST': {'quoteType': 'ETF', 'totalAssets': 5e7, 'averageVolume': 5e4, 'expenseRatio': 0.025},
+    'AAPL': {'quoteType': 'EQUITY', 'totalAssets': None, 'averageVolume': 5e7},
+    'GONE': {},
+}
+
+
+def fake_ticker(symbol):
+    ticker = MagicMock()
+    ticker.info = INFO[symbol]
+    return ticker
+
+
+class TestETFScreening(unittest.TestCase):
+    def setUp(self):
+        """Use a temporary cache directory and a fast rate limit"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = ETFManager(cache_dir=self.tmp.name)
+        self.manager.BULK_REQUESTS_PER_SECOND = 1000
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch('src.data.etf_manager.yf.Ticker', side_effect=fake_ticker)
+    def test_screen_messages(self, mock_ticker):
+        """Vectorized filters give the validate_etf verdicts"""
+        result = self.manager.screen_etfs(list(INFO))
+        self.assertEqual(list(result.index[result['is_valid']]), ['SPY'])
+        self.assertEqual(result.loc['TINY', 'message'], "AUM too low: $500,000")
+        self.assertEqual(result.loc['THIN', 'message'], "Volume too low: 500")
+        self.assertEqual(result.loc['COST', 'message'], "Expense ratio too high: 2.50%")
+        self.assertEqual(result.loc['AAPL', 'message'], "AAPL is not an ETF")
+        self.assertEqual(result.loc['GONE', 'message'], "Failed to fetch ETF info")
+
+        # Lower thresholds apply without refetching
+        relaxed = self.manager.screen_etfs(list(INFO), min_assets=1e5, min_volume=100, max_expense=3.0)
+        self.assertEqual(sorted(relaxed.index[relaxed['is_valid']]), ['COST', 'SPY', 'THIN', 'TINY'])
+        self.assertEqual(mock_ticker.call_count, len(INFO))
+
+    @patch('src.data.etf_manager.yf.Ticker', side_effect=fake_ticker)
+    def test_cache_fetches_only_stale(self, mock_ticker):
+        """Fresh entries come from the cache; stale and new ones are fetched"""
+        self.manager.get_metadata(['SPY', 'TINY'])
+        self.assertEqual(mock_ticker.call_count, 2)
+
+        other = ETFManager(cache_dir=self.tmp.name)
+        other.BULK_REQUESTS_PER_SECOND = 1000
+        table = other.get_metadata(['spy', 'TINY', 'THIN'])
+        self.assertEqual(mock_ticker.call_count, 3)
+        self.assertEqual(list(table.index), ['SPY', 'TINY', 'THIN'])
+
+        cached = pd.read_parquet(other.metadata_file)
+        cached.loc['SPY', 'fetched_at'] = pd.Timestamp.now() - pd.Timedelta(days=30)
+        cached.to_parquet(other.metadata_file)
+        other.get_metadata(['SPY', 'TINY', 'THIN'])
+        self.assertEqual(mock_ticker.call_count, 4)
+        self.assertEqual(mock_ticker.call_args[0][0], 'SPY')
+
+        # Every fetched row is in the warehouse metadata table
+        stored = Warehouse(str(other.warehouse_path)).query("SELECT * FROM metadata ORDER BY ticker")
+        self.assertEqual(list(stored['ticker']), ['SPY', 'THIN', 'TINY'])
+        self.assertEqual(stored.loc[0, 'name'], 'SPDR S&P 500')
+        self.assertAlmostEqual(stored.loc[0, 'expense_ratio'], 0.0945)
+
+    @patch('src.data.etf_manager.yf.Ticker', side_effect=fake_ticker)
+    def test_old_cache_without_error_column(self, mock_ticker):
+        """A cache written before the error column still serves fresh entries"""
+        self.manager.get_metadata(['SPY', 'TINY'])
+        cached = pd.read_parquet(self.manager.metadata_file)
+        cached.drop(columns='error').to_parquet(self.manager.metadata_file)
+        table = self.manager.get_metadata(['SPY', 'TINY', 'THIN'])
+        self.assertEqual(mock_ticker.call_count, 3)
+        self.assertEqual(table.loc['SPY', 'name'], 'SPDR S&P 500')
+        self.assertIn('error', pd.read_parquet(self.manager.metadata_file).columns)
+
+    def test_default_cache_dir(self):
+        """The default cache lives under the project, whatever the working directory"""
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(str(ETFManager().metadata_file),
+                         os.path.join(project_root, 'data', 'etf_metadata', 'etf_metadata.parquet'))
+
+    def test_whole_batch_fails(self):
+        """Offline or rate-limited batches are screened out and cached as failures"""
+        broken = MagicMock()
+        type(broken).info = property(lambda self: (_ for _ in ()).throw(ConnectionError("offline")))
+        with patch('src.data.etf_manager.yf.Ticker', return_value=broken) as mock_ticker:
+            result = self.manager.screen_etfs(['SPY', 'QQQ'])
+            self.assertEqual(list(result.index), ['SPY', 'QQQ'])
+            self.assertFalse(result['is_valid'].any())
+            self.assertTrue((result['message'] == "Failed to fetch ETF info").all())
+            self.assertTrue((result['error'] == "offline").all())
+
+            # Failures are cached for FAILED_TTL rather than refetched on every call
+            self.manager.screen_etfs(['SPY', 'QQQ'])
+            self.assertEqual(mock_ticker.call_count, 2)
+
+    def test_rate_limiter(self):
+        """Request starts are spaced by the rate limit"""
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50 - 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
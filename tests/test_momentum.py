@@ -0,0 +1,63 @@
+"""
+Unit tests for the momentum screener
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import pandas as pd
+import numpy as np
+from src.models.momentum import MomentumScreener
+
+
+class TestMomentum(unittest.TestCase):
+    def setUp(self):
+        """Set up steady trends plus a recently listed ticker"""
+        dates = pd.date_range(start='2023-01-02', periods=300, freq='B')
+        days = np.arange(300)
+        self.prices = pd.DataFrame({
+            'SPY': 100 * 1.001 ** days,
+            'QQQ': 100 * 1.002 ** days,
+            'TLT': 100 * 0.999 ** days,
+            'JNK': 100.0,
+        }, index=dates)
+        self.prices.loc[dates[:200], 'JNK'] = np.nan
+        self.prices.iloc[250, 0] = np.nan  # Missing quote inside SPY's history
+
+    def test_period_returns(self):
+        """Horizon and skip-month returns match the price ratios"""
+        scores = MomentumScreener(self.prices).scores()
+        self.assertAlmostEqual(scores.loc['QQQ', 'ret_3M'], 1.002 ** 63 - 1)
+        self.assertAlmostEqual(scores.loc['QQQ', 'mom_12-1'], 1.002 ** (252 - 21) - 1)
+        self.assertAlmostEqual(scores.loc['TLT', 'ret_1M'], 0.999 ** 21 - 1)
+        self.assertTrue(np.isnan(scores.loc['JNK', 'ret_6M']))
+        self.assertAlmostEqual(scores.loc['JNK', 'ret_3M'], 0.0)
+
+    def test_ranks_and_top_bottom(self):
+        """Ranks order the universe and top / bottom return the extremes"""
+        screener = MomentumScreener(self.prices)
+        scores = screener.scores()
+        self.assertEqual(scores.loc['QQQ', 'rank_ret_12M'], 1.0)
+        self.assertEqual(list(screener.top(2).index), ['QQQ', 'SPY'])
+        self.assertEqual(screener.bottom(1).index[0], 'TLT')
+        self.assertEqual(screener.top(1, by='ret_1M').index[0], 'QQQ')
+
+    def test_relative_strength_and_asof(self):
+        """Relative strength is measured against the benchmark on the as-of date"""
+        screener = MomentumScreener(self.prices)
+        scores = screener.scores(benchmark='SPY')
+        self.assertAlmostEqual(scores.loc['SPY', 'rs_6M'], 0.0)
+        self.assertAlmostEqual(scores.loc['QQQ', 'rs_1M'], (1.002 / 1.001) ** 21 - 1)
+
+        asof = self.prices.index[100] + pd.Timedelta(days=1)
+        earlier = screener.scores(asof=asof)
+        self.assertAlmostEqual(earlier.loc['QQQ', 'ret_3M'], 1.002 ** 63 - 1)
+        self.assertTrue(earlier['ret_12M'].isna().all())
+
+    def test_invalid_benchmark(self):
+        """Unknown benchmark returns an empty frame"""
+        self.assertTrue(MomentumScreener(self.prices).scores(benchmark='XYZ').empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Unit tests for the Monte Carlo forward simulation
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import pandas as pd
+import numpy as np
+from src.models.monte_carlo import simulate_forward, historical_returns
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def setUp(self):
+        """Set up unadjusted prices and monthly dividends for two income ETFs"""
+        rng = np.random.default_rng(3)
+        dates = pd.date_range(start='2022-01-03', periods=400, freq='B')
+        returns = rng.normal(0.0003, 0.01, (400, 2))
+        self.prices = pd.DataFrame(50 * np.cumprod(1 + returns, axis=0), index=dates, columns=['JEPI', 'DIVO'])
+        self.dividends = pd.DataFrame(np.nan, index=dates, columns=['JEPI', 'DIVO'])
+        self.dividends.iloc[10::21] = [0.35, 0.15]
+
+    def test_historical_returns(self):
+        """Income returns are dividends over the prior close"""
+        price_returns, income_returns = historical_returns(self.prices, self.dividends)
+        self.assertEqual(len(price_returns), 399)
+        day = self.dividends.index[10]
+        prior = self.prices['JEPI'].iloc[9]
+        self.assertAlmostEqual(income_returns.loc[day, 'JEPI'], 0.35 / prior)
+        self.assertEqual(income_returns['DIVO'].iloc[:8].sum(), 0.0)
+
+    def test_same_results_for_any_n_jobs(self):
+        """Chunk seeds make results independent of the worker count"""
+        single = simulate_forward(self.prices, self.dividends, horizon=60, n_paths=1200, n_jobs=1)
+        pooled = simulate_forward(self.prices, self.dividends, horizon=60, n_paths=1200, n_jobs=2)
+        for key in ['terminal', 'income', 'drawdown']:
+            pd.testing.assert_frame_equal(single[key], pooled[key])
+
+    def test_constant_history(self):
+        """Constant returns and yields give degenerate, exact distributions"""
+        dates = pd.date_range(start='2022-01-03', periods=300, freq='B')
+        prices = pd.DataFrame({'SVOL': 20 * 1.001 ** np.arange(300)}, index=dates)
+        dividends = pd.DataFrame({'SVOL': 0.002 * prices['SVOL'].shift(1)}, index=dates)
+        result = simulate_forward(prices, dividends, horizon=100, n_paths=600, n_jobs=1)
+
+        terminal = result['terminal'].loc['SVOL']
+        self.assertAlmostEqual(terminal['p5'], 1.001 ** 100, places=4)
+        self.assertAlmostEqual(terminal['p95'], 1.001 ** 100, places=4)
+        expected_income = 0.002 * sum(1.001 ** t for t in range(100))
+        self.assertAlmostEqual(result['income'].loc['SVOL', 'mean'], expected_income, places=4)
+        self.assertEqual(result['drawdown'].loc['SVOL', 'prob_drawdown_10%'], 0.0)
+
+    def test_report_shapes(self):
+        """Bands, percentiles and portfolio column are reported consistently"""
+        weights = pd.Series({'JEPI': 0.5, 'DIVO': 0.5})
+        for method in ['bootstrap', 'normal']:
+            result = simulate_forward(self.prices, self.dividends, horizon=63, n_paths=800,
+                                      method=method, weights=weights, n_jobs=1)
+            bands = result['bands']
+            self.assertEqual(sorted(bands['day'].unique()), [21, 42, 63])
+            self.assertEqual(set(bands['ticker']), {'JEPI', 'DIVO', 'Portfolio'})
+            self.assertTrue((bands['p5'] <= bands['p50']).all() and (bands['p50'] <= bands['p95']).all())
+
+            drawdown = result['drawdown']
+            self.assertTrue((drawdown['prob_drawdown_10%'] >= drawdown['prob_drawdown_20%']).all())
+            income = result['income']
+            self.assertAlmostEqual(income.loc['Portfolio', 'mean'],
+                                   income.loc[['JEPI', 'DIVO'], 'mean'].mean(), delta=0.01)
+            # Monthly payers: roughly three payments over 63 days
+            self.assertTrue(0.01 < income.loc['JEPI', 'p50'] < 0.04)
+
+    def test_invalid_method(self):
+        """Unknown methods return empty results"""
+        result = simulate_forward(self.prices, self.dividends, n_paths=10, method='garch', n_jobs=1)
+        self.assertTrue(result['terminal'].empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Unit tests for the portfolio optimizer
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+from src.models.optimizer import (PortfolioOptimizer, CovarianceCache, make_projection,
+                                  project_box_simplex, export_to_workbook, frontier_max_sharpe,
+                                  frontier_target_volatility)
+
+
+class TestOptimizer(unittest.TestCase):
+    def setUp(self):
+        """Set up factor-driven returns for a small ETF universe"""
+        rng = np.random.default_rng(11)
+        dates = pd.date_range(start='2022-01-03', periods=504, freq='B')
+        factors = rng.normal(0, 0.008, (504, 2))
+        loadings = rng.normal(0, 1, (2, 8))
+        values = factors @ loadings * 0.5 + rng.normal(0.0004, 0.006, (504, 8))
+        self.tickers = ['SPY', 'QQQ', 'IWM', 'TLT', 'IEI', 'HYG', 'JNK', 'SJNK']
+        self.returns = pd.DataFrame(values, index=dates, columns=self.tickers)
+        self.cache = CovarianceCache()
+
+    def test_box_simplex_projection(self):
+        """Projection is feasible and no feasible point is closer"""
+        rng = np.random.default_rng(0)
+        points = rng.normal(0, 0.5, (50, 8))
+        lower, upper = np.zeros(8), np.full(8, 0.3)
+        projected = project_box_simplex(points, lower, upper)
+        np.testing.assert_allclose(projected.sum(axis=1), 1.0, atol=1e-12)
+        self.assertTrue((projected >= -1e-15).all() and (projected <= 0.3 + 1e-15).all())
+
+        candidates = project_box_simplex(rng.normal(0, 0.5, (500, 8)), lower, upper)
+        for point, best in zip(points[:5], projected[:5]):
+            distance = np.linalg.norm(candidates - point, axis=1)
+            self.assertLessEqual(np.linalg.norm(best - point), distance.min() + 1e-12)
+
+    def test_group_projection(self):
+        """Group bounds hold and the projection beats other feasible points"""
+        tickers = pd.Index(self.tickers)
+        groups = {'High Yield': (['HYG', 'JNK', 'SJNK'], 0.0, 0.2), 'Treasury': (['TLT', 'IEI'], 0.3, 0.5)}
+        project = make_projection(tickers, 0.0, 0.6, groups)
+        rng = np.random.default_rng(1)
+        points = rng.normal(0.1, 0.4, (40, 8))
+        projected = project(points)
+        np.testing.assert_allclose(projected.sum(axis=1), 1.0, atol=1e-9)
+        high_yield = projected[:, tickers.isin(['HYG', 'JNK', 'SJNK'])].sum(axis=1)
+        treasury = projected[:, tickers.isin(['TLT', 'IEI'])].sum(axis=1)
+        self.assertTrue((high_yield <= 0.2 + 1e-9).all())
+        self.assertTrue(((treasury >= 0.3 - 1e-9) & (treasury <= 0.5 + 1e-9)).all())
+
+        candidates = project(rng.normal(0.1, 0.4, (2000, 8)))
+        for point, best in zip(points[:5], projected[:5]):
+            distance = np.linalg.norm(candidates - point, axis=1)
+            self.assertLessEqual(np.linalg.norm(best - point), distance.min() + 1e-9)
+
+    def test_overlapping_groups_rejected(self):
+        """Overlapping groups raise"""
+        groups = {'a': (['SPY', 'QQQ'], 0.0, 0.5), 'b': (['QQQ', 'IWM'], 0.0, 0.5)}
+        with self.assertRaises(ValueError):
+            make_projection(pd.Index(self.tickers), 0.0, 1.0, groups)
+
+    def test_min_variance_two_assets(self):
+        """Two uncorrelated assets match the closed-form inverse-variance weights"""
+        rng = np.random.default_rng(2)
+        returns = pd.DataFrame({'A': rng.normal(0, 0.01, 1000), 'B': rng.normal(0, 0.02, 1000)})
+        optimizer = PortfolioOptimizer(returns, covariance_method='sample', cache=self.cache)
+        c = optimizer.covariance
+        expected_a = (c[1, 1] - c[0, 1]) / (c[0, 0] + c[1, 1] - 2 * c[0, 1])
+        weights = optimizer.min_variance()
+        self.assertAlmostEqual(weights['A'].iloc[0], expected_a, places=6)
+
+    def test_frontier(self):
+        """Frontier returns rise with volatility and respect the box bounds"""
+        optimizer = PortfolioOptimizer(self.returns, upper=0.4, cache=self.cache)
+        frontier = optimizer.efficient_frontier(30)
+        self.assertEqual(len(frontier), 30)
+        self.assertTrue((np.diff(frontier['expected_return']) >= -1e-7).all())
+        self.assertTrue((frontier[self.tickers] <= 0.4 + 1e-9).all().all())
+        np.testing.assert_allclose(frontier[self.tickers].sum(axis=1), 1.0, atol=1e-9)
+
+        min_var = optimizer.min_variance()
+        self.assertAlmostEqual(frontier['volatility'].iloc[0], min_var['volatility'].iloc[0], places=6)
+
+    def test_max_sharpe_and_target_volatility(self):
+        """Max-Sharpe beats every frontier point; target volatility stays under target"""
+        optimizer = PortfolioOptimizer(self.returns, upper=0.4, cache=self.cache)
+        frontier = optimizer.efficient_frontier(30)
+        best = optimizer.max_sharpe(30)
+        self.assertGreaterEqual(best['sharpe'].iloc[0], frontier['sharpe'].max() - 1e-9)
+
+        target = frontier['volatility'].median()
+        result = optimizer.target_volatility(target, 30)
+        self.assertLessEqual(result['volatility'].iloc[0], target + 1e-12)
+
+    def test_points_from_frontier(self):
+        """Max-Sharpe and target-volatility points are read off a solved frontier"""
+        optimizer = PortfolioOptimizer(self.returns, upper=0.4, cache=self.cache)
+        frontier = optimizer.efficient_frontier(30)
+        best = frontier_max_sharpe(frontier)
+        self.assertEqual(best.index.tolist(), ['max_sharpe'])
+        self.assertAlmostEqual(best['sharpe'].iloc[0], frontier['sharpe'].max())
+        self.assertGreaterEqual(best['sharpe'].iloc[0], optimizer.max_sharpe(30)['sharpe'].iloc[0] - 1e-2)
+
+        target = frontier['volatility'].median()
+        pd.testing.assert_frame_equal(frontier_target_volatility(frontier, target),
+                                      optimizer.target_volatility(target, 30))
+        lowest = frontier_target_volatility(frontier, 0.0)
+        self.assertAlmostEqual(lowest['volatility'].iloc[0], optimizer.min_variance()['volatility'].iloc[0], places=6)
+
+    def test_risk_parity(self):
+        """Unconstrained risk parity equalizes risk contributions"""
+        optimizer = PortfolioOptimizer(self.returns, cache=self.cache)
+        weights = optimizer.risk_parity()
+        contributions = optimizer.risk_contributions(weights[self.tickers].iloc[0])
+        np.testing.assert_allclose(contributions, 1 / 8, atol=1e-6)
+
+    def test_covariance_cache(self):
+        """Estimates are reused for the same data and recomputed for new data"""
+        PortfolioOptimizer(self.returns, cache=self.cache)
+        PortfolioOptimizer(self.returns.copy(), cache=self.cache)
+        self.assertEqual(len(self.cache._entries), 1)
+        PortfolioOptimizer(self.returns.iloc[1:], cache=self.cache)
+        self.assertEqual(len(self.cache._entries), 2)
+
+    def test_export_sheet(self):
+        """Results are added to an existing workbook as a new sheet"""
+        optimizer = PortfolioOptimizer(self.returns, cache=self.cache)
+        portfolios = pd.concat([optimizer.min_variance(), optimizer.risk_parity()])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'dashboard_data.xlsx')
+            self.returns.to_excel(path, sheet_name='Daily Prices')
+            self.assertTrue(export_to_workbook(path, portfolios, optimizer.efficient_frontier(10)))
+            sheets = pd.read_excel(path, sheet_name=None)
+            self.assertIn('Optimization', sheets)
+            self.assertIn('Daily Prices', sheets)
+            self.assertEqual(sheets['Optimization'].iloc[0, 0], 'min_variance')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Unit tests for the batched portfolio evaluator
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import pandas as pd
+import numpy as np
+from src.models.portfolio import evaluate_portfolios, portfolio_returns, rebalance_flags
+
+
+def simulate_loop(returns, weights, flags):
+    """Reference day-by-day simulation of one portfolio"""
+    holdings = None
+    cash = 1.0 - weights.sum()
+    value = 1.0
+    out = []
+    for t in range(len(returns)):
+        if flags[t]:
+            holdings = value * weights
+            cash_t = value * cash
+        holdings = holdings * (1 + returns[t])
+        new_value = holdings.sum() + cash_t
+        out.append(new_value / value - 1)
+        value = new_value
+    return np.array(out)
+
+
+class TestPortfolio(unittest.TestCase):
+    def setUp(self):
+        """Set up returns for a three-ETF sleeve"""
+        rng = np.random.default_rng(5)
+        dates = pd.date_range(start='2023-01-02', periods=300, freq='B')
+        self.returns = pd.DataFrame(rng.normal(0.0003, 0.01, (300, 3)),
+                                    index=dates, columns=['SPY', 'TLT', 'JNK'])
+        self.weights = pd.DataFrame([[0.6, 0.4, 0.0], [0.2, 0.3, 0.4], [1.0, 0.0, 0.0]],
+                                    index=['60_40', 'mix_cash', 'spy'], columns=['SPY', 'TLT', 'JNK'])
+
+    def test_matches_loop_simulation(self):
+        """Batched returns equal a day-by-day holdings simulation"""
+        for rebalance in ['daily', 'monthly', 'quarterly', 'none']:
+            batched = portfolio_returns(self.returns, self.weights, rebalance)
+            flags = rebalance_flags(self.returns.index, rebalance)
+            for name, row in self.weights.iterrows():
+                expected = simulate_loop(self.returns.to_numpy(), row.to_numpy(), flags)
+                np.testing.assert_allclose(batched[name].to_numpy(), expected, atol=1e-12)
+
+    def test_single_ticker_portfolio(self):
+        """A 100% portfolio reproduces the ticker's own statistics"""
+        result = evaluate_portfolios(self.returns, self.weights, rebalance='monthly',
+                                     risk_free_rate=0.03, yields=pd.Series({'SPY': 0.013, 'TLT': 0.04}))
+        spy = self.returns['SPY']
+        self.assertAlmostEqual(result.loc['spy', 'volatility'], spy.std() * np.sqrt(252))
+        self.assertAlmostEqual(result.loc['spy', 'sharpe'], (spy.mean() - 0.03 / 252) / spy.std() * np.sqrt(252))
+        wealth = (1 + spy).cumprod()
+        self.assertAlmostEqual(result.loc['spy', 'max_drawdown'], (wealth / wealth.cummax().clip(lower=1) - 1).min())
+        self.assertAlmostEqual(result.loc['60_40', 'yield'], 0.6 * 0.013 + 0.4 * 0.04)
+
+    def test_chunking_and_arrays(self):
+        """Chunked evaluation of array weights matches a single pass"""
+        rng = np.random.default_rng(0)
+        weights = rng.dirichlet(np.ones(3), size=250)
+        whole = evaluate_portfolios(self.returns, weights, chunk_size=1000)
+        chunked = evaluate_portfolios(self.returns, weights, chunk_size=64)
+        pd.testing.assert_frame_equal(whole, chunked)
+        self.assertEqual(len(whole), 250)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Unit tests for the memory-mapped price matrix store
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+from src.data.price_store import PriceMatrixStore
+from unittest.mock import patch
+from src.models.momentum import MomentumScreener
+from src.data.excel_manager import ExcelManager
+
+INDEX_CHECKS = {'check_freq': False, 'check_index_type': False}  # Store dates are day-resolution
+
+
+class TestPriceMatrixStore(unittest.TestCase):
+    def setUp(self):
+        """Set up two years of random closes for five tickers"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'store')
+        rng = np.random.default_rng(2)
+        dates = pd.bdate_range('2022-01-03', periods=520)
+        values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (520, 5)), axis=0))
+        self.prices = pd.DataFrame(values, index=dates, columns=['AAA', 'BBB', 'CCC', 'DDD', 'EEE'])
+        self.prices.iloc[:30, 4] = np.nan
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_views(self):
+        """Reopened store returns the same prices as views of the mapped file"""
+        PriceMatrixStore.create(self.directory, self.prices.iloc[:500])
+        store = PriceMatrixStore(self.directory)
+        pd.testing.assert_frame_equal(store.frame(), self.prices.iloc[:500], **INDEX_CHECKS)
+
+        sub = store.frame(['BBB', 'CCC'], start='2022-03-01', end='2022-06-30')
+        self.assertTrue(np.shares_memory(sub.to_numpy(), store.values))
+        self.assertTrue(np.shares_memory(store.column('DDD'), store.values))
+        self.assertEqual(sub.index[0], pd.Timestamp('2022-03-01'))
+        pd.testing.assert_frame_equal(sub, self.prices.loc['2022-03-01':'2022-06-30', ['BBB', 'CCC']], **INDEX_CHECKS)
+
+        screen = MomentumScreener.from_store(self.directory).scores()
+        expected = MomentumScreener(self.prices.iloc[:500]).scores()
+        pd.testing.assert_frame_equal(screen, expected)
+
+    def test_append_in_place(self):
+        """New days and tickers are written into the preallocated space"""
+        store = PriceMatrixStore.create(self.directory, self.prices.iloc[:500, :4])
+        size = os.path.getsize(os.path.join(self.directory, 'prices.0.bin'))
+        self.assertEqual(store.append(self.prices.iloc[490:]), 20)  # Overlapping days are skipped
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, 'prices.0.bin')), size)
+        self.assertEqual(store.meta['generation'], 0)
+
+        reopened = PriceMatrixStore(self.directory)
+        self.assertEqual(reopened.tickers, list(self.prices.columns))
+        expected = self.prices.copy()
+        expected.iloc[:500, 4] = np.nan
+        pd.testing.assert_frame_equal(reopened.frame(), expected, **INDEX_CHECKS)
+        with self.assertRaises(ValueError):
+            reopened.append(self.prices)
+
+    def test_grow_and_float32(self):
+        """Outgrowing the capacity rewrites the files; float32 halves the size"""
+        store = PriceMatrixStore.create(self.directory, self.prices.iloc[:100], dtype='float32',
+                                        row_capacity=120, column_capacity=5)
+        store.append(self.prices.iloc[100:])
+        self.assertGreaterEqual(store.meta['row_capacity'], 520)
+        self.assertEqual(store.values.dtype, np.float32)
+        np.testing.assert_allclose(store.frame().to_numpy(), self.prices.to_numpy(), rtol=1e-6)
+
+    def test_reader_survives_grow(self):
+        """A reader opened before the store grows keeps its (unchanged) view"""
+        store = PriceMatrixStore.create(self.directory, self.prices.iloc[:100, :3],
+                                        row_capacity=110, column_capacity=3)
+        reader = PriceMatrixStore(self.directory)
+        before = reader.frame().copy()
+        store.append(self.prices.iloc[100:])  # New rows and tickers: both capacities grow
+        self.assertEqual(store.meta['generation'], 1)
+        pd.testing.assert_frame_equal(reader.frame(), before)
+        self.assertEqual(sorted(os.listdir(self.directory)), ['dates.1.bin', 'meta.json', 'prices.1.bin'])
+        pd.testing.assert_frame_equal(PriceMatrixStore(self.directory).frame().iloc[:100, :3], before)
+
+    def test_update(self):
+        """update() appends newer days and rewrites for new tickers or revised history"""
+        PriceMatrixStore.update(self.directory, self.prices.iloc[:300, :3])
+        store = PriceMatrixStore.update(self.directory, self.prices.iloc[:400, :3])
+        self.assertEqual(store.meta['generation'], 0)  # Appended in place
+
+        revised = self.prices.iloc[:400, 1:5].copy()
+        revised.iloc[:50] *= 0.99  # Back-adjusted for a new dividend
+        store = PriceMatrixStore.update(self.directory, revised)
+        self.assertEqual(store.meta['generation'], 1)
+        self.assertEqual(store.tickers, ['AAA', 'BBB', 'CCC', 'DDD', 'EEE'])
+        expected = self.prices.iloc[:400].copy()
+        expected.iloc[:, 1:5] = revised
+        pd.testing.assert_frame_equal(PriceMatrixStore(self.directory).frame(), expected, **INDEX_CHECKS)
+
+    @patch('src.data.excel_manager.calculate_and_write_metrics')
+    def test_excel_manager_builds_store(self, mock_metrics):
+        """Each save brings the data_dir price store up to date for the screeners"""
+        manager = ExcelManager(self.tmp.name, ['AAA', 'BBB'])
+        for ticker in ['AAA', 'BBB']:
+            prices = self.prices[[ticker]].set_axis(self.prices.index.date)
+            self.assertTrue(manager.save_ticker_data(ticker, prices, prices, pd.DataFrame()))
+        directory = os.path.join(self.tmp.name, ExcelManager.PRICE_STORE_DIR)
+        store = PriceMatrixStore(directory)
+        self.assertEqual(store.tickers, ['AAA', 'BBB'])
+        np.testing.assert_allclose(store.frame().to_numpy(), self.prices[['AAA', 'BBB']].to_numpy())
+        self.assertEqual(len(MomentumScreener.from_store(directory).scores()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+"""
+Unit tests for the cached risk-free rate service, Treasury rate cache and curve
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+import pandas as pd
+import numpy as np
+from src.models.risk_free_rate import RiskFreeRate, CSVRateSource, ETFYieldSource, etf_yield_series
+from src.models import risk_free_rate
+from src.models.risk_free_rate_calculator import calculate_bil_risk_free_rate
+from src.data.treasury_rates import TreasuryRateManager, CURVE_TICKERS
+from src.data.warehouse import Warehouse
+
+
+class FakeSource:
+    """Rates rising 1bp per business day, recording each fetch"""
+
+    def __init__(self):
+        self.calls = []
+        self.dates = pd.bdate_range('2024-01-01', '2024-03-29')
+        self.rates = pd.Series(0.04 + 0.0001 * np.arange(len(self.dates)), index=self.dates)
+
+    def fetch(self, start, end):
+        self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        return self.rates[start:end]
+
+
+class TestRiskFreeRate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = FakeSource()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _service(self, name='irx', source=None):
+        return RiskFreeRate(name, cache_dir=self.tmp.name, rate_source=source or self.source, auto_refresh=False)
+
+    def test_incremental_refresh(self):
+        """Second refresh only asks for days after the cache and keeps history"""
+        service = self._service()
+        self.assertEqual(service.refresh(end='2024-02-15'), 34)
+        self.assertEqual(service.refresh(end='2024-03-29'), 31)
+        self.assertEqual(self.source.calls[1][0], pd.Timestamp('2024-02-16'))
+
+        reloaded = self._service()
+        pd.testing.assert_series_equal(reloaded.history(), self.source.rates, check_names=False,
+                                       check_freq=False, check_index_type=False)
+        self.assertEqual(reloaded.refresh(end='2024-03-29'), 0)
+
+    def test_lookups(self):
+        """Scalar and aligned queries use the last rate on or before each date"""
+        service = self._service()
+        service.refresh(end='2024-03-29')
+        self.assertAlmostEqual(service.rate('2024-01-02'), 0.0401)
+        self.assertAlmostEqual(service.rate('2024-01-06'), service.rate('2024-01-05'))  # Saturday
+        self.assertEqual(service.rate('2023-06-01', default=0.05), 0.05)
+        self.assertAlmostEqual(service.rate(), self.source.rates.iloc[-1])
+
+        index = pd.date_range('2023-12-30', '2024-04-05', freq='D')
+        aligned = service.series(index)
+        expected = self.source.rates.reindex(index, method='ffill').fillna(0.03)
+        np.testing.assert_allclose(aligned.to_numpy(), expected.to_numpy())
+        self.assertTrue(aligned.index.equals(index))
+
+    def test_sources_share_cache(self):
+        """Each source owns one column of the same file"""
+        self._service('irx').refresh(end='2024-03-29')
+        csv_path = os.path.join(self.tmp.name, 'daily_rates.csv')
+        pd.DataFrame({'date': ['2024-01-02', '2024-01-03'], 'rate': [0.05, 0.051]}).to_csv(csv_path, index=False)
+        csv_service = self._service('csv', CSVRateSource(csv_path))
+        self.assertEqual(csv_service.refresh(end='2024-01-31'), 2)
+
+        self.assertEqual(len(self._service('irx').history()), len(self.source.rates))
+        self.assertAlmostEqual(self._service('csv', CSVRateSource(csv_path)).rate('2024-02-01'), 0.051)
+        with self.assertRaises(ValueError):
+            RiskFreeRate('fed', cache_dir=self.tmp.name)
+        self.assertTrue(risk_free_rate.DEFAULT_CACHE_DIR.is_absolute())  # Not relative to the working directory
+
+    def test_etf_yield_series(self):
+        """Two-year dividends / 2 over the average close"""
+        dates = pd.bdate_range('2020-01-01', '2023-12-29')
+        closes = pd.Series(100.0, index=dates)
+        dividends = pd.Series(0.0, index=dates)
+        dividends[dates[::21]] = 0.4  # Monthly
+        rates = etf_yield_series(closes, dividends)
+        self.assertGreaterEqual(rates.index[0], dates[0] + pd.Timedelta(days=730))
+        self.assertAlmostEqual(rates.mean(), 0.4 * 12 / 100, delta=0.002)
+
+
+    @patch('src.models.risk_free_rate.yf.Ticker')
+    def test_etf_components_from_cache(self, mock_ticker):
+        """BIL yield and its inputs come from the cached service, not a download per call"""
+        dates = pd.bdate_range('2021-01-04', '2024-03-29')
+        history = pd.DataFrame({'Close': 91.5, 'Dividends': 0.0}, index=dates)
+        history.loc[dates[::21], 'Dividends'] = 0.35
+        mock_ticker.return_value.history.side_effect = \
+            lambda start, end, auto_adjust: history[pd.Timestamp(start):pd.Timestamp(end) - pd.Timedelta(days=1)]
+
+        service = RiskFreeRate('bil', cache_dir=self.tmp.name, auto_refresh=False)
+        service.refresh(end='2024-03-29')
+        with patch.dict(risk_free_rate._services, {'bil': service}):
+            rate, avg_price, total_dividends = calculate_bil_risk_free_rate()
+            self.assertEqual(calculate_bil_risk_free_rate(), (rate, avg_price, total_dividends))
+        self.assertEqual(mock_ticker.return_value.history.call_count, 1)
+        self.assertAlmostEqual(avg_price, 91.5)
+        self.assertAlmostEqual(rate, (total_dividends / 2) / avg_price)
+        self.assertAlmostEqual(rate, 0.35 * 12 / 91.5, delta=0.002)
+
+        reloaded = RiskFreeRate('bil', cache_dir=self.tmp.name, rate_source=ETFYieldSource('BIL'), auto_refresh=False)
+        self.assertEqual(reloaded.details(), service.details())
+
+
+class TestTreasuryRateCache(unittest.TestCase):
+    @patch('src.models.risk_free_rate.yf.Ticker')
+    def test_cache_keeps_full_history(self, mock_ticker):
+        """^IRX comes from the shared risk-free cache, fetched once"""
+        dates = pd.bdate_range('2024-01-01', '2024-06-28')
+        history = pd.DataFrame({'Close': np.linspace(5.0, 5.5, len(dates))}, index=dates)
+        mock_ticker.return_value.history.side_effect = \
+            lambda start, end: history[pd.Timestamp(start):pd.Timestamp(end) - pd.Timedelta(days=1)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = TreasuryRateManager(tmp)
+            full = manager.get_treasury_rates(datetime(2024, 1, 1), datetime(2024, 6, 28))
+            self.assertEqual(len(full), len(dates))
+            narrow = manager.get_treasury_rates(datetime(2024, 3, 1), datetime(2024, 3, 29))
+            self.assertEqual(len(narrow), 21)
+            self.assertEqual(mock_ticker.return_value.history.call_count, 1)
+            shared = RiskFreeRate('irx', cache_dir=tmp, auto_refresh=False).history()
+            self.assertEqual(len(shared), len(dates))
+            self.assertEqual(sorted(os.listdir(tmp)), ['risk_free_rates.parquet', 'warehouse.sqlite'])
+            stored = Warehouse(os.path.join(tmp, 'warehouse.sqlite')).rates('irx')
+            np.testing.assert_allclose(stored.to_numpy(), shared.to_numpy())
+
+
+class TestTreasuryCurve(unittest.TestCase):
+    def setUp(self):
+        """Upward-sloping curve: 4% at 3 months to 5% at 30 years"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dates = pd.bdate_range('2024-01-01', '2024-03-29')
+        self.levels = {'^IRX': 0.04, '^FVX': 0.042, '^TNX': 0.045, '^TYX': 0.05}
+        frame = pd.DataFrame({ticker: level for ticker, level in self.levels.items()}, index=self.dates)
+        frame.index.name = 'date'
+        self.csv_path = os.path.join(self.tmp.name, 'curve.csv')
+        frame.to_csv(self.csv_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_interpolation(self):
+        """Linear between tenors, flat beyond the ends, aligned to any index"""
+        manager = TreasuryRateManager(self.tmp.name)
+        manager.load_curve_csv(self.csv_path)
+        rates = manager.interpolate_rates([0.1, 0.25, 7.5, 20.0, 40.0])
+        np.testing.assert_allclose(rates.iloc[0].to_numpy(), [0.04, 0.04, 0.0435, 0.0475, 0.05])
+
+        index = pd.date_range('2024-03-28', '2024-04-02', freq='D')
+        aligned = manager.duration_matched_rates('IEF', index)
+        self.assertTrue(aligned.index.equals(index))
+        self.assertAlmostEqual(aligned.iloc[-1], 0.042 + 0.003 * 2 / 5)
+
+        reloaded = TreasuryRateManager(self.tmp.name)
+        pd.testing.assert_frame_equal(reloaded.get_curve(), manager.get_curve())
+
+    @patch('src.data.treasury_rates.yf.Ticker')
+    def test_update_curve_incremental(self, mock_ticker):
+        """Each tenor only fetches days after its last cached date; ^IRX goes through the shared store"""
+        manager = TreasuryRateManager(self.tmp.name)
+        manager.load_curve_csv(self.csv_path)
+        later = pd.bdate_range('2024-04-01', '2024-04-12')
+        tickers = {symbol: MagicMock() for symbol in CURVE_TICKERS}
+        for symbol, ticker in tickers.items():
+            ticker.history.return_value = pd.DataFrame({'Close': 3.9 if symbol == '^IRX' else 4.1}, index=later)
+        mock_ticker.side_effect = tickers.get
+
+        curve = manager.update_curve(datetime(2024, 4, 12))
+        fetched = [call.args[0] for call in mock_ticker.call_args_list]
+        self.assertEqual(sorted(fetched), sorted(CURVE_TICKERS))  # Each tenor once
+        starts = [ticker.history.call_args.kwargs['start'] for ticker in tickers.values()]
+        self.assertEqual(starts, [pd.Timestamp('2024-03-30')] * len(CURVE_TICKERS))
+        self.assertEqual(len(curve), len(self.dates) + len(later))
+        self.assertAlmostEqual(curve.loc['2024-01-02', 30.0], 0.05)
+        self.assertAlmostEqual(curve.loc['2024-04-12', 0.25], 0.039)
+
+        # One ^IRX series: the curve's 3-month tenor is the risk-free 'irx' column
+        irx = RiskFreeRate('irx', cache_dir=self.tmp.name, auto_refresh=False).history()
+        np.testing.assert_allclose(curve[0.25].to_numpy(), irx.to_numpy())
+        self.assertNotIn('0.25', pd.read_parquet(manager.curve_file).columns)
+
+        # CSV and downloaded rates both reach the warehouse
+        warehouse = Warehouse(os.path.join(self.tmp.name, 'warehouse.sqlite'))
+        self.assertEqual(len(warehouse.rates('irx')), len(curve))
+        tens = warehouse.rates('^TNX')
+        self.assertEqual(len(tens), len(curve))
+        self.assertAlmostEqual(tens.iloc[0], 0.045)
+        self.assertAlmostEqual(tens.iloc[-1], 0.041)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the historical run index
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.data.run_index import RunIndex, parse_run_name
+
+
+def write_workbook(path, metrics=None):
+    """Dashboard-style workbook, with a Metrics sheet when metrics are given"""
+    dates = pd.bdate_range('2024-01-01', periods=5).date
+    prices = pd.DataFrame({'SPY': np.linspace(470, 475, 5)}, index=dates)
+    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+        prices.to_excel(writer, sheet_name='Daily Prices')
+        prices.to_excel(writer, sheet_name='Unadjusted Prices')
+        pd.DataFrame().to_excel(writer, sheet_name='Dividends')
+        if metrics is not None:
+            metrics.to_excel(writer, sheet_name='Metrics', index=False)
+
+
+class TestRunIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.runs = {
+            'dashboard_data_20241214_2129_QQQ_SPY': [1.1, 0.9],
+            'dashboard_data_20241216_1534_SPY_QQQ': [1.2, 1.0],
+        }
+        for run_id, sharpe in self.runs.items():
+            metrics = pd.DataFrame({'Ticker': ['SPY', 'QQQ'], 'Name': ['SPDR S&P 500', 'Invesco QQQ'],
+                                    'Sharpe 2Y': sharpe})
+            write_workbook(os.path.join(self.dir, f'{run_id}.xlsx'), metrics)
+        write_workbook(os.path.join(self.dir, 'dashboard_data_20241215_1850_SHV_BIL_SPY.xlsx'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_run_name(self):
+        timestamp, tickers = parse_run_name('dashboard_data_20241222_0943_HYG_SJNK.xlsx')
+        self.assertEqual(timestamp, pd.Timestamp('2024-12-22 09:43'))
+        self.assertEqual(tickers, ['HYG', 'SJNK'])
+        self.assertEqual(parse_run_name('dashboard_data_20241213_1950.xlsx')[1], [])
+        self.assertIsNone(parse_run_name('notes.xlsx')[0])
+
+    def test_catalog(self):
+        """Runs are ordered by timestamp with metrics in long form"""
+        index = RunIndex(self.dir)
+        self.assertEqual(index.update(), 3)
+        runs = index.runs()
+        self.assertEqual(runs['run_id'].iloc[1], 'dashboard_data_20241215_1850_SHV_BIL_SPY')
+        self.assertEqual(runs['tickers'].tolist(), ['SPY', 'SPY', 'SPY'])
+        self.assertEqual(runs['has_metrics'].tolist(), [True, False, True])
+        self.assertEqual(len(index.runs('SPY')), 3)
+        self.assertTrue(index.latest_run().endswith('dashboard_data_20241216_1534_SPY_QQQ.xlsx'))
+        self.assertEqual(index.metric_names(), ['Sharpe 2Y'])
+
+        history = index.metric_over_time('Sharpe 2Y')
+        self.assertEqual(history['QQQ'].tolist(), [0.9, 1.0])
+        self.assertEqual(history.index[0], pd.Timestamp('2024-12-14 21:29'))
+
+        comparison = index.compare_runs(list(self.runs)[::-1], tickers=['SPY'])
+        self.assertEqual(comparison.loc[('SPY', 'Sharpe 2Y')].tolist(), [1.2, 1.1])
+        names = index.warehouse.query("SELECT text_value FROM metrics WHERE metric = 'Name' AND ticker = 'QQQ'")
+        self.assertEqual(set(names['text_value']), {'Invesco QQQ'})
+
+    def test_incremental(self):
+        """Only new or changed workbooks are parsed; deleted ones drop out"""
+        RunIndex(self.dir).update()
+        reopened = RunIndex(self.dir)
+        with patch.object(reopened.warehouse, 'load_workbook') as mock_load:
+            self.assertEqual(reopened.update(), 0)
+            mock_load.assert_not_called()
+
+        path = os.path.join(self.dir, 'dashboard_data_20241217_1037_SPY.xlsx')
+        write_workbook(path, pd.DataFrame({'Ticker': ['SPY'], 'Sharpe 2Y': [1.3]}))
+        os.remove(os.path.join(self.dir, 'dashboard_data_20241214_2129_QQQ_SPY.xlsx'))
+        self.assertEqual(reopened.update(), 1)
+        self.assertEqual(RunIndex(self.dir).metric_over_time('Sharpe 2Y', ['SPY'])['SPY'].tolist(), [1.2, 1.3])
+        self.assertEqual(len(RunIndex(self.dir).runs()), 3)
+
+    def test_concurrent_sessions(self):
+        """Dashboard sessions updating at once load each workbook once and all see the same catalog"""
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            loaded = list(pool.map(lambda _: RunIndex(self.dir).update(), range(4)))
+        self.assertEqual(sorted(loaded), [0, 0, 0, 3])
+        self.assertEqual(len(RunIndex(self.dir).runs()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for the columnar workbook sidecar
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+import shutil
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.data.sidecar import write_sidecar, read_sheet, read_sheets, read_sidecar, sidecar_dir, SIDECAR_SHEETS
+from src.data.excel_manager import ExcelManager
+from src.data.xlsx_reader import sheet_names
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_WORKBOOK = os.path.join(PROJECT_ROOT, 'Test Output', 'dashboard_data_20241222_0943_HYG_SJNK.xlsx')
+
+
+class TestSidecar(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'book.xlsx')
+        dates = pd.bdate_range('2024-01-01', periods=30).date
+        prices = pd.DataFrame({'AAA': np.linspace(10, 12, 30), 'BBB': np.linspace(20, 19, 30)}, index=dates)
+        metrics = pd.DataFrame({'Ticker': ['AAA', 'BBB'], 'Name': ['Fund A', 'Fund B'], 'Sharpe 2Y': [0.5, np.nan]})
+        prices.loc[dates[3], 'BBB'] = np.nan
+        self.frames = {'Daily Prices': prices, 'Unadjusted Prices': prices.round(), 'Dividends': pd.DataFrame(),
+                       'Metrics': metrics, 'TTM Yield': 0.5 / prices, '30D Yield': 0.5 / prices}
+        with pd.ExcelWriter(self.path, engine='xlsxwriter') as writer:
+            for sheet, frame in self.frames.items():
+                frame.to_excel(writer, sheet_name=sheet, index=sheet != 'Metrics')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_excel(self):
+        """Sidecar reads equal openpyxl reads, with and without an index column"""
+        self.assertTrue(write_sidecar(self.path))
+        for sheet in SIDECAR_SHEETS:
+            for index_col in (None, 0):
+                expected = pd.read_excel(self.path, sheet_name=sheet, index_col=index_col)
+                self.assertIsNotNone(read_sidecar(self.path, sheet))
+                pd.testing.assert_frame_equal(read_sheet(self.path, sheet, index_col), expected)
+
+    def test_frames_match_excel(self):
+        """Frames passed in are stored as the XLSX reads them, without parsing it"""
+        with patch('src.data.sidecar.pd.ExcelFile', side_effect=AssertionError('workbook parsed')):
+            self.assertTrue(write_sidecar(self.path, self.frames))
+        for sheet in SIDECAR_SHEETS:
+            for index_col in (None, 0):
+                expected = pd.read_excel(self.path, sheet_name=sheet, index_col=index_col)
+                pd.testing.assert_frame_equal(read_sheet(self.path, sheet, index_col), expected)
+
+    def test_missing_frames_read_back(self):
+        """Sheets without a frame fall back to the workbook"""
+        self.assertTrue(write_sidecar(self.path, {'Daily Prices': self.frames['Daily Prices']}))
+        expected = pd.read_excel(self.path, sheet_name='Metrics')
+        pd.testing.assert_frame_equal(read_sidecar(self.path, 'Metrics'), expected)
+
+    def test_stale_and_foreign(self):
+        """Edited or foreign workbooks fall back to the XLSX"""
+        self.assertIsNone(read_sidecar(self.path, 'Metrics'))
+        write_sidecar(self.path)
+        with pd.ExcelWriter(self.path, engine='openpyxl', mode='a') as writer:
+            pd.DataFrame({'x': [1]}).to_excel(writer, sheet_name='Extra')
+        self.assertIsNone(read_sidecar(self.path, 'Metrics'))
+        sheets = read_sheets(self.path, ['Metrics', 'Extra'])
+        self.assertEqual(list(sheets['Extra']['x']), [1])
+        self.assertEqual(len(sheets['Metrics']), 2)
+
+    @patch('src.data.excel_manager.calculate_and_write_metrics')
+    def test_excel_manager_writes_sidecar(self, mock_metrics):
+        """Saving a ticker refreshes the sidecar that later reads use"""
+        manager = ExcelManager(self.tmp.name, ['AAA'])
+        prices = pd.read_excel(self.path, sheet_name='Daily Prices', index_col=0)[['AAA']]
+        prices.index = prices.index.date
+        self.assertTrue(manager.save_ticker_data('AAA', prices, prices, pd.DataFrame()))
+        self.assertTrue((sidecar_dir(manager.excel_path) / 'manifest.json').exists())
+        self.assertIsNotNone(read_sidecar(manager.excel_path, 'Daily Prices'))
+        daily = manager.get_ticker_data('AAA')[0]
+        self.assertAlmostEqual(daily.iloc[-1], 12.0)
+        for sheet in ('Daily Prices', 'Unadjusted Prices', 'Dividends'):
+            pd.testing.assert_frame_equal(read_sidecar(manager.excel_path, sheet),
+                                          pd.read_excel(manager.excel_path, sheet_name=sheet))
+
+    @patch('src.data.excel_manager.calculate_and_write_metrics')
+    def test_yield_history_from_sidecar(self, mock_metrics):
+        """Stored yield sheets are read from the sidecar, not the XLSX"""
+        manager = ExcelManager(self.tmp.name, ['AAA'])
+        prices = self.frames['Daily Prices'][['AAA']]
+        dividends = pd.DataFrame({'AAA': [0.3, 0.3]}, index=prices.index[[5, 25]])
+        self.assertTrue(manager.save_ticker_data('AAA', prices, prices, dividends))
+        expected = pd.read_excel(manager.excel_path, sheet_name='TTM Yield', index_col=0)
+        with patch('src.data.sidecar.pd.read_excel', side_effect=AssertionError('workbook parsed')):
+            yields = manager.get_yield_history()
+        self.assertEqual(len(yields['ttm']), len(prices))
+        np.testing.assert_allclose(yields['ttm']['AAA'], expected['AAA'])
+        self.assertFalse(yields['30d'].empty)
+
+    @unittest.skipUnless(os.path.exists(SAMPLE_WORKBOOK), "sample workbook not available")
+    def test_sample_workbook(self):
+        """Stored dashboard workbook round-trips through the sidecar"""
+        path = os.path.join(self.tmp.name, os.path.basename(SAMPLE_WORKBOOK))
+        shutil.copy(SAMPLE_WORKBOOK, path)
+        self.assertTrue(write_sidecar(path))
+        stored = [sheet for sheet in SIDECAR_SHEETS if sheet in sheet_names(path)]
+        expected = pd.read_excel(path, sheet_name=stored, index_col=0)
+        for sheet, frame in read_sheets(path, stored, index_col=0).items():
+            pd.testing.assert_frame_equal(frame, expected[sheet])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Unit tests for the content-addressed snapshot store
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.data.snapshot_store import SnapshotStore, main, DEFAULT_ROOT
+from src.data.excel_manager import ExcelManager
+
+INDEX_CHECKS = {'check_freq': False, 'check_index_type': False}  # Snapshot dates are day-resolution
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        """Three years of prices for two tickers, with a gap and sparse dividends"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(os.path.join(self.tmp.name, 'snapshots'))
+        rng = np.random.default_rng(5)
+        dates = pd.bdate_range('2022-01-03', '2024-12-20')
+        self.prices = pd.DataFrame(100 + rng.normal(0, 1, (len(dates), 2)).cumsum(axis=0),
+                                   index=dates, columns=['SPY', 'QQQ'])
+        self.prices.iloc[10:15, 1] = np.nan
+        self.dividends = pd.DataFrame({'SPY': [1.6, np.nan, 1.7], 'QQQ': [np.nan, 0.5, 0.6]},
+                                      index=pd.to_datetime(['2022-03-18', '2023-06-20', '2024-09-20']))
+        self.metrics = pd.DataFrame({'Ticker': ['SPY', 'QQQ'], 'Name': ['SPDR', 'Invesco'],
+                                     'Sharpe 2Y': [1.2, 0.9], 'Default_Rate': ['N/A', 0.01]})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sheets(self, prices):
+        return {'Daily Prices': prices, 'Unadjusted Prices': prices + 1, 'Dividends': self.dividends}
+
+    def test_round_trip_and_dedup(self):
+        """A repeat run writes only its manifest; sheets rebuild exactly"""
+        first = self.store.put_run('run_1', self.sheets(self.prices), self.metrics)
+        self.assertEqual(first['blocks_reused'], 3)  # Unadjusted Prices shares the date index blocks
+        repeat = self.store.put_run('run_2', self.sheets(self.prices), self.metrics)
+        self.assertEqual(repeat['blocks_written'], 0)
+
+        # One more day only rewrites the current-year blocks
+        extra = pd.DataFrame([[101.0, 99.0]], index=[pd.Timestamp('2024-12-23')], columns=['SPY', 'QQQ'])
+        longer = self.store.put_run('run_3', self.sheets(pd.concat([self.prices, extra])))
+        self.assertEqual(longer['blocks_written'], 5)  # Shared 2024 index, plus 2024 for 2 tickers x 2 sheets
+
+        run = self.store.get_run('run_2')
+        pd.testing.assert_frame_equal(run['Daily Prices'], self.prices, **INDEX_CHECKS)
+        pd.testing.assert_frame_equal(run['Dividends'], self.dividends, **INDEX_CHECKS)
+        self.assertEqual(run['Metrics']['Default_Rate'].tolist(), ['N/A', '0.01'])
+        self.assertEqual(self.store.runs()['tickers'].tolist(), ['SPY,QQQ'] * 3)
+
+        path = os.path.join(self.tmp.name, 'restored.xlsx')
+        self.assertTrue(self.store.restore_workbook('run_1', path))
+        restored = pd.read_excel(path, sheet_name='Unadjusted Prices', index_col=0)
+        np.testing.assert_allclose(restored.to_numpy(), (self.prices + 1).to_numpy())
+
+    def test_retention_and_compaction(self):
+        """Retention drops old repeat runs; compaction frees their blocks and packs the rest"""
+        for i, day in enumerate(['2024-01-10 09:00', '2024-01-10 09:05', '2024-01-10 09:10', '2024-06-03 10:00']):
+            prices = self.prices.loc[:'2024-01-09'] if i < 3 else self.prices
+            self.store.put_run(f'run_{i}', self.sheets(prices + i), created=pd.Timestamp(day).to_pydatetime())
+        self.store.put_run('other', {'Daily Prices': self.prices[['SPY']]}, created=datetime(2024, 1, 1))
+
+        deleted = self.store.apply_retention(keep_last=1, max_age_days=30, keep_daily=True, now=datetime(2024, 6, 10))
+        self.assertEqual(sorted(deleted), ['run_0', 'run_1'])
+        self.assertEqual(self.store.run_ids(), ['other', 'run_2', 'run_3'])
+
+        result = self.store.compact()
+        self.assertGreater(result['blocks_removed'], 0)
+        self.assertGreater(result['bytes_freed'], 0)
+        self.assertEqual(list(self.store.blocks_dir.iterdir()), [])
+        reopened = SnapshotStore(self.store.root)
+        pd.testing.assert_frame_equal(reopened.get_run('run_3')['Daily Prices'], self.prices + 3, **INDEX_CHECKS)
+        self.assertEqual(reopened.stats()['blocks'], result['blocks_kept'])
+
+        main(['--root', str(self.store.root), 'compact', '--keep-last', '1', '--max-age-days', '0',
+              '--no-keep-daily'])
+        self.assertEqual(SnapshotStore(self.store.root).run_ids(), ['other', 'run_3'])
+
+    def test_concurrent_runs_and_compaction(self):
+        """Sessions saving the same new blocks at once, while the store compacts, lose nothing"""
+        self.store.put_run('seed', self.sheets(self.prices))
+
+        def save(i):
+            if i % 10 == 5:
+                return SnapshotStore(self.store.root).compact()
+            prices = self.prices.copy()
+            prices.iloc[-1] = 500 + i // 10  # A few distinct final years, written by many threads at once
+            return SnapshotStore(self.store.root).put_run(f'run_{i:02d}', self.sheets(prices))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(save, range(40)))
+        store = SnapshotStore(self.store.root)
+        self.assertEqual(len(store.run_ids()), 37)
+        store.compact()
+        for run_id in store.run_ids():
+            self.assertEqual(store.get_run(run_id)['Daily Prices'].shape, self.prices.shape)
+        self.assertFalse([path for path in self.store.root.rglob('~$*')])
+
+    def test_cli_default_is_pipeline_store(self):
+        """The CLI works on the store ExcelManager writes to"""
+        self.assertEqual(DEFAULT_ROOT.parts[-2:], ('Test Output', ExcelManager.SNAPSHOT_DIR))
+
+    @patch('src.data.excel_manager.calculate_and_write_metrics')
+    def test_excel_manager_snapshots(self, mock_metrics):
+        """Each save records the run in the data_dir snapshot store"""
+        manager = ExcelManager(self.tmp.name, ['SPY'])
+        prices = self.prices[['SPY']].set_axis(self.prices.index.date)
+        self.assertTrue(manager.save_ticker_data('SPY', prices, prices, pd.DataFrame()))
+        store = SnapshotStore(os.path.join(self.tmp.name, ExcelManager.SNAPSHOT_DIR))
+        run_id = os.path.splitext(os.path.basename(manager.excel_path))[0]
+        self.assertEqual(store.run_ids(), [run_id])
+        np.testing.assert_allclose(store.get_run(run_id)['Daily Prices']['SPY'].to_numpy(), prices['SPY'].to_numpy())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Unit tests for batch VaR / CVaR calculations
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.models.tail_risk import calculate_tail_risk, tail_risk_table
+from src.models.metrics_writer import calculate_metrics_table
+
+
+class TestTailRisk(unittest.TestCase):
+    def setUp(self):
+        """Set up a returns matrix with a late-listed ticker"""
+        rng = np.random.default_rng(42)
+        dates = pd.date_range(start='2022-01-03', periods=504, freq='B')
+        self.returns = pd.DataFrame({
+            'SPY': rng.normal(0.0004, 0.012, len(dates)),
+            'JNK': rng.standard_t(4, len(dates)) * 0.005,
+            'NEW': rng.normal(0.0, 0.02, len(dates)),
+        }, index=dates)
+        self.returns.iloc[:300, 2] = np.nan
+
+    def test_historical_matches_percentile(self):
+        """Partial-sort quantiles match np.percentile for every level"""
+        result = calculate_tail_risk(self.returns, confidence_levels=(0.9, 0.95, 0.99),
+                                     methods=('historical',))
+        for _, row in result.iterrows():
+            series = self.returns[row['ticker']].dropna()
+            alpha = 1 - row['confidence']
+            expected_var = np.percentile(series, alpha * 100)
+            self.assertAlmostEqual(row['var'], expected_var, places=12)
+            tail = np.sort(series.values)[:int(np.ceil(len(series) * alpha))]
+            self.assertAlmostEqual(row['cvar'], tail.mean(), places=12)
+            self.assertLessEqual(row['cvar'], row['var'])
+
+    def test_parametric_methods(self):
+        """Gaussian matches the closed form; Cornish-Fisher reacts to fat tails"""
+        result = calculate_tail_risk(self.returns, confidence_levels=(0.99,), horizons=(1, 10))
+        spy = self.returns['SPY']
+        gaussian = result[(result['method'] == 'gaussian') & (result['ticker'] == 'SPY')
+                          & (result['horizon'] == 1)].iloc[0]
+        self.assertAlmostEqual(gaussian['var'], spy.mean() - 2.326347874 * spy.std(), places=6)
+
+        ten_day = result[(result['method'] == 'historical') & (result['ticker'] == 'SPY')
+                         & (result['horizon'] == 10)].iloc[0]
+        one_day = result[(result['method'] == 'historical') & (result['ticker'] == 'SPY')
+                         & (result['horizon'] == 1)].iloc[0]
+        self.assertAlmostEqual(ten_day['var'], one_day['var'] * np.sqrt(10))
+
+        jnk = result[(result['ticker'] == 'JNK') & (result['horizon'] == 1)].set_index('method')
+        self.assertLess(jnk.loc['cornish_fisher', 'var'], jnk.loc['gaussian', 'var'])
+        self.assertLess(jnk.loc['cornish_fisher', 'cvar'], jnk.loc['cornish_fisher', 'var'])
+
+    def test_wide_table(self):
+        """Wide table has one row per ticker"""
+        table = tail_risk_table(self.returns, confidence_levels=(0.95,), methods=('historical',))
+        self.assertEqual(sorted(table.index), ['JNK', 'NEW', 'SPY'])
+        self.assertIn('historical_var_95_1d', table.columns)
+        self.assertIn('historical_cvar_95_1d', table.columns)
+
+    @patch('src.models.performance_metrics.calculate_bil_risk_free_rate', return_value=0.04)
+    def test_metrics_min_history(self, mock_rate):
+        """Metrics VaR/CVaR need two years of closes, the same as Sharpe 2Y"""
+        prices = 100 * (1 + self.returns.fillna(0.0)).cumprod()
+        prices.loc[self.returns.index[:300], 'NEW'] = np.nan
+        extra = pd.date_range(start=prices.index[-1] + pd.offsets.BDay(1), periods=20, freq='B')
+        prices = pd.concat([prices, pd.DataFrame(prices.iloc[-1].to_dict(), index=extra)])  # 524 rows, NEW 224 closes
+        metrics = calculate_metrics_table(prices, pd.DataFrame(), lookup_names=False).set_index('Ticker')
+
+        self.assertEqual(metrics.loc['NEW', 'Sharpe 2Y'], 0.0)
+        self.assertEqual(metrics.loc['NEW', 'VaR 95%'], 0.0)
+        self.assertEqual(metrics.loc['NEW', 'CVaR 95%'], 0.0)
+        window = prices[['SPY', 'JNK']].iloc[-504:].pct_change(fill_method=None).iloc[1:]
+        expected = tail_risk_table(window, confidence_levels=(0.95,), methods=('historical',))
+        for ticker in ['SPY', 'JNK']:
+            self.assertNotEqual(metrics.loc[ticker, 'Sharpe 2Y'], 0.0)
+            self.assertAlmostEqual(metrics.loc[ticker, 'VaR 95%'], expected.at[ticker, 'historical_var_95_1d'])
+            self.assertAlmostEqual(metrics.loc[ticker, 'CVaR 95%'], expected.at[ticker, 'historical_cvar_95_1d'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Unit tests for total-return reconstruction from unadjusted prices and dividends
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import pandas as pd
+import numpy as np
+from src.models.total_return import (
+    align_dividends, price_return_index, total_return_index,
+    back_adjusted_prices, compare_adjusted
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_WORKBOOK = os.path.join(PROJECT_ROOT, 'Test Output', 'dashboard_data_20241222_0943_HYG_SJNK.xlsx')
+
+
+class TestTotalReturn(unittest.TestCase):
+    def setUp(self):
+        """Set up flat prices with one dividend"""
+        dates = pd.date_range(start='2024-01-01', periods=6, freq='B')
+        self.prices = pd.DataFrame({
+            'AAA': [100.0, 100.0, 99.0, 99.0, 99.0, 99.0],
+            'BBB': [np.nan, 50.0, 50.0, 51.0, 51.0, 51.0],
+        }, index=dates)
+        # AAA goes ex 1.0 on day 3; BBB's ex-date falls on a Saturday
+        self.dividends = pd.DataFrame({
+            'AAA': [1.0, np.nan],
+            'BBB': [np.nan, 0.5],
+        }, index=[dates[2], pd.Timestamp('2024-01-06')])
+
+    def test_align_dividends(self):
+        """Ex-dates off the calendar move to the next trading day"""
+        aligned = align_dividends(self.dividends, self.prices.index, self.prices.columns)
+        self.assertEqual(aligned['AAA'].sum(), 1.0)
+        self.assertEqual(aligned.loc['2024-01-03', 'AAA'], 1.0)
+        self.assertEqual(aligned.loc['2024-01-08', 'BBB'], 0.5)
+
+    def test_indexes(self):
+        """Dividends are reinvested in the total-return index only"""
+        pr = price_return_index(self.prices)
+        tr = total_return_index(self.prices, self.dividends)
+        self.assertAlmostEqual(pr['AAA'].iloc[-1], 99.0)
+        self.assertAlmostEqual(tr['AAA'].iloc[-1], 100.0)
+        self.assertTrue(np.isnan(tr['BBB'].iloc[0]))
+        self.assertAlmostEqual(tr['BBB'].iloc[1], 100.0)
+        self.assertAlmostEqual(tr['BBB'].iloc[-1], 100.0 * 51.0 / 50.0 * 51.5 / 51.0)
+
+    def test_back_adjusted(self):
+        """Closes before the ex-date are scaled by (1 - D / P[ex-1])"""
+        adjusted = back_adjusted_prices(self.prices, self.dividends)
+        self.assertAlmostEqual(adjusted['AAA'].iloc[0], 100.0 * 0.99)
+        self.assertAlmostEqual(adjusted['AAA'].iloc[2], 99.0)
+        self.assertAlmostEqual(adjusted['AAA'].iloc[-1], 99.0)
+
+    @unittest.skipUnless(os.path.exists(SAMPLE_WORKBOOK), "sample workbook not available")
+    def test_matches_vendor_adjusted(self):
+        """Reconstruction matches the stored Yahoo adjusted closes"""
+        with pd.ExcelFile(SAMPLE_WORKBOOK) as xls:
+            vendor = pd.read_excel(xls, 'Daily Prices', index_col=0)
+            unadj = pd.read_excel(xls, 'Unadjusted Prices', index_col=0)
+            divs = pd.read_excel(xls, 'Dividends', index_col=0)
+        check = compare_adjusted(vendor, back_adjusted_prices(unadj, divs))
+        self.assertTrue((check['max_abs_rel_diff'] < 1e-4).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Unit tests for the trading calendar and date alignment in ExcelManager
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+from datetime import date
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.data.trading_calendar import TradingCalendar, easter_sunday
+from src.data.excel_manager import ExcelManager
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def setUp(self):
+        """Calendar covering the test years"""
+        self.calendar = TradingCalendar(start='2020-01-01', end='2025-12-31')
+
+    def test_holidays(self):
+        """Rule-based holidays match the published NYSE schedules"""
+        holidays_2024 = ['2024-01-01', '2024-01-15', '2024-02-19', '2024-03-29', '2024-05-27',
+                         '2024-06-19', '2024-07-04', '2024-09-02', '2024-11-28', '2024-12-25']
+        self.assertEqual(list(self.calendar.holidays(2024, 2024).strftime('%Y-%m-%d')), holidays_2024)
+
+        # 2022: New Year's Day on Saturday is not observed; Juneteenth on Sunday moves to Monday
+        holidays_2022 = self.calendar.holidays(2022, 2022).strftime('%Y-%m-%d')
+        self.assertNotIn('2021-12-31', holidays_2022)
+        self.assertIn('2022-06-20', holidays_2022)
+        self.assertIn('2022-12-26', holidays_2022)
+        self.assertEqual(easter_sunday(2025), date(2025, 4, 20))
+
+    def test_sessions_and_half_days(self):
+        """Session counts and early closes"""
+        self.assertEqual(len(self.calendar.sessions('2023-01-01', '2023-12-31')), 250)
+        self.assertEqual(len(self.calendar.sessions('2024-01-01', '2024-12-31')), 252)
+        self.assertFalse(self.calendar.is_session(['2025-01-09'])[0])
+        half_days = list(self.calendar.half_days(2024, 2024).strftime('%Y-%m-%d'))
+        self.assertEqual(half_days, ['2024-07-03', '2024-11-29', '2024-12-24'])
+
+    def test_day_ordinals(self):
+        """Ordinal differences count trading days; non-sessions map to the prior session"""
+        ordinals = self.calendar.day_ordinals(['2024-03-28', '2024-03-29', '2024-04-01', '2024-04-02'])
+        self.assertEqual(list(np.diff(ordinals)), [0, 1, 1])
+        self.assertEqual(self.calendar.day_ordinals(['2020-01-02'])[0], 0)
+
+    def test_union_index(self):
+        """Union keeps every date once, sorted, optionally filling sessions"""
+        a = pd.Index([date(2024, 1, 3), date(2024, 1, 2)])
+        b = pd.DatetimeIndex(['2024-01-05', '2024-01-03', '2024-01-06'])
+        union = self.calendar.union_index([a, b])
+        self.assertEqual(list(union.strftime('%m-%d')), ['01-02', '01-03', '01-05', '01-06'])
+        filled = self.calendar.union_index([a, b], fill_sessions=True)
+        self.assertIn(pd.Timestamp('2024-01-04'), filled)
+
+
+class TestExcelManagerAlignment(unittest.TestCase):
+    @patch('src.data.excel_manager.calculate_and_write_metrics')
+    def test_save_keeps_all_dates(self, mock_metrics):
+        """A second ticker with extra dates no longer loses them"""
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = ExcelManager(tmp, ['AAA', 'BBB'])
+            dates_a = [date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 4)]
+            dates_b = [date(2024, 1, 3), date(2024, 1, 4), date(2024, 1, 5), date(2024, 1, 8)]
+            prices_a = pd.DataFrame({'AAA': [10.0, 11.0, 12.0]}, index=dates_a)
+            prices_b = pd.DataFrame({'BBB': [20.0, 21.0, 22.0, 23.0]}, index=dates_b)
+            divs_a = pd.DataFrame({'AAA': [0.1]}, index=[date(2024, 1, 3)])
+            divs_b = pd.DataFrame({'BBB': [0.2]}, index=[date(2024, 1, 5)])
+
+            self.assertTrue(manager.save_ticker_data('AAA', prices_a, prices_a, divs_a))
+            self.assertTrue(manager.save_ticker_data('BBB', prices_b, prices_b, divs_b))
+
+            daily, unadj, divs = manager.get_ticker_data('BBB')
+            self.assertEqual(len(daily), 5)
+            self.assertEqual(daily.loc['2024-01-08'], 23.0)
+            self.assertTrue(np.isnan(daily.loc['2024-01-02']))
+            aaa = manager.get_ticker_data('AAA')[0]
+            self.assertEqual(aaa.loc['2024-01-02'], 10.0)
+            self.assertTrue(np.isnan(aaa.loc['2024-01-08']))
+            self.assertEqual(divs.dropna().index.strftime('%Y-%m-%d').tolist(), ['2024-01-05'])
+
+
+if __name__ == '__main__':
+    unittest.main()
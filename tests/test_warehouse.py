@@ -0,0 +1,117 @@
+"""
+Unit tests for the SQLite warehouse
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+import sqlite3
+from contextlib import closing
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.data.warehouse import Warehouse
+from src.data.excel_manager import ExcelManager
+
+
+def write_workbook(path, sharpe):
+    """Small dashboard-style workbook with the given Sharpe ratios"""
+    dates = pd.bdate_range('2024-01-01', periods=10).date
+    prices = pd.DataFrame({'JNK': np.linspace(95, 96, 10), 'HYG': np.linspace(78, 79, 10)}, index=dates)
+    dividends = pd.DataFrame({'JNK': [0.5, np.nan], 'HYG': [np.nan, 0.4]}, index=[dates[2], dates[6]])
+    metrics = pd.DataFrame({'Ticker': ['JNK', 'HYG'], 'Name': ['SPDR HY', 'iShares HY'], 'Sharpe 2Y': sharpe})
+    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+        prices.to_excel(writer, sheet_name='Daily Prices')
+        (prices + 1).to_excel(writer, sheet_name='Unadjusted Prices')
+        dividends.to_excel(writer, sheet_name='Dividends')
+        metrics.to_excel(writer, sheet_name='Metrics', index=False)
+
+
+class TestWarehouse(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.warehouse = Warehouse(os.path.join(self.tmp.name, 'warehouse.sqlite'))
+        for name, sharpe in [('run_a', [1.2, 0.4]), ('run_b', [0.8, 1.1]), ('run_c', [1.5, np.nan])]:
+            path = os.path.join(self.tmp.name, f'{name}.xlsx')
+            write_workbook(path, sharpe)
+            self.assertTrue(self.warehouse.load_workbook(path))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_runs_where(self):
+        """All runs where JNK Sharpe > 1"""
+        runs = self.warehouse.runs_where('Sharpe 2Y', '>', 1, 'JNK')
+        self.assertEqual(runs['run_id'].tolist(), ['run_a', 'run_c'])
+        history = self.warehouse.metric_history('Sharpe 2Y')
+        self.assertAlmostEqual(history.loc['run_b', 'HYG'], 1.1)
+        self.assertTrue(np.isnan(history.loc['run_c', 'HYG']))
+        names = self.warehouse.query("SELECT text_value FROM metrics WHERE metric = 'Name' AND run_id = 'run_a' "
+                                     "ORDER BY ticker")
+        self.assertEqual(names['text_value'].tolist(), ['iShares HY', 'SPDR HY'])
+        with self.assertRaises(ValueError):
+            self.warehouse.runs_where('Sharpe 2Y', '; DROP TABLE runs', 1)
+
+    def test_prices_and_dividends(self):
+        """Re-loading runs upserts prices; dividends filter by metadata category"""
+        prices = self.warehouse.prices(['JNK', 'HYG'], start='2024-01-03')
+        self.assertEqual(len(prices), 8)
+        self.assertAlmostEqual(self.warehouse.prices(['HYG'], column='close')['HYG'].iloc[0], 79.0)
+        self.assertEqual(self.warehouse.query("SELECT COUNT(*) AS n FROM prices")['n'][0], 20)
+
+        metadata = pd.DataFrame({'quote_type': ['ETF', 'ETF'], 'name': ['SPDR HY', 'iShares HY'],
+                                 'category': ['High Yield Bond', 'High Yield Bond'], 'aum': [8e9, 1.5e10],
+                                 'avg_volume': [4e6, 3e7], 'expense_ratio': [0.4, 0.49],
+                                 'fetched_at': pd.Timestamp('2024-06-01')}, index=pd.Index(['JNK', 'HYG'], name='ticker'))
+        self.warehouse.store_metadata(metadata)
+        dividends = self.warehouse.dividends(category='High Yield Bond')
+        self.assertEqual(dividends['ticker'].tolist(), ['HYG', 'JNK'])
+        self.assertAlmostEqual(dividends['value'].sum(), 0.9)
+
+    def test_partial_prices_keep_stored(self):
+        """Upserting only adjusted closes leaves the stored unadjusted closes alone"""
+        dates = pd.bdate_range('2024-01-01', periods=10).date
+        self.warehouse.store_prices(pd.DataFrame({'JNK': np.linspace(90, 91, 10)}, index=dates), None)
+        prices = self.warehouse.prices(['JNK'])
+        self.assertAlmostEqual(prices['JNK'].iloc[0], 90.0)
+        close = self.warehouse.prices(['JNK'], column='close')
+        self.assertAlmostEqual(close['JNK'].iloc[0], 96.0)
+        self.assertEqual(close['JNK'].count(), 10)
+
+    def test_rates(self):
+        """Rate series round-trip by source"""
+        rates = pd.Series([0.05, 0.051], index=pd.to_datetime(['2024-01-02', '2024-01-03']))
+        self.warehouse.store_rates('irx', rates)
+        stored = self.warehouse.rates('irx', start='2024-01-03')
+        self.assertEqual(stored.tolist(), [0.051])
+
+    def test_runs_and_upgrade(self):
+        """Runs carry file state for the run index; older warehouse files gain the columns"""
+        runs = self.warehouse.runs()
+        self.assertEqual(runs['run_id'].tolist(), ['run_a', 'run_b', 'run_c'])
+        self.assertTrue(runs['has_metrics'].all())
+        self.assertEqual(runs['size'].iloc[0], os.path.getsize(os.path.join(self.tmp.name, 'run_a.xlsx')))
+        self.warehouse.delete_run('run_b')
+        self.assertEqual(self.warehouse.runs()['run_id'].tolist(), ['run_a', 'run_c'])
+        self.assertNotIn('run_b', self.warehouse.metric_history('Sharpe 2Y').index)
+
+        old = os.path.join(self.tmp.name, 'old.sqlite')
+        with closing(sqlite3.connect(old)) as conn:
+            conn.execute("CREATE TABLE runs (run_id TEXT PRIMARY KEY, workbook TEXT, tickers TEXT, loaded_at TEXT)")
+        self.assertTrue(Warehouse(old).load_workbook(os.path.join(self.tmp.name, 'run_a.xlsx')))
+        self.assertEqual(len(Warehouse(old).runs()), 1)
+
+    @patch('src.data.excel_manager.calculate_and_write_metrics')
+    def test_excel_manager_populates(self, mock_metrics):
+        """Each save loads the workbook into the data_dir warehouse"""
+        manager = ExcelManager(self.tmp.name, ['JNK'])
+        prices = pd.DataFrame({'JNK': np.linspace(95, 96, 10)}, index=pd.bdate_range('2024-01-01', periods=10).date)
+        self.assertTrue(manager.save_ticker_data('JNK', prices, prices, pd.DataFrame()))
+        run_id = os.path.splitext(os.path.basename(manager.excel_path))[0]
+        runs = self.warehouse.query("SELECT run_id, tickers FROM runs WHERE run_id = ?", (run_id,))
+        self.assertEqual(runs['tickers'].tolist(), ['JNK'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Unit tests for the streaming workbook export
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.data.workbook_export import write_streaming_workbook, read_split_sheet, sheet_parts
+from src.data.price_store import PriceMatrixStore
+from src.data.excel_manager import ExcelManager
+from src.data.sidecar import sidecar_dir
+from src.data.warehouse import Warehouse
+from src.data.snapshot_store import SnapshotStore
+
+INDEX_CHECKS = {'check_freq': False, 'check_index_type': False, 'check_names': False}
+
+
+class TestWorkbookExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'universe.xlsx')
+        rng = np.random.default_rng(9)
+        dates = pd.bdate_range('2023-01-02', periods=300)
+        self.prices = pd.DataFrame(100 + rng.normal(0, 1, (300, 12)).cumsum(axis=0), index=dates,
+                                   columns=[f'T{i:02d}' for i in range(12)])
+        self.prices.iloc[:20, 3] = np.nan
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sheet_parts(self):
+        self.assertEqual(sheet_parts('Daily Prices', 10, 4),
+                         [('Daily Prices', slice(0, 4)), ('Daily Prices (2)', slice(4, 8)),
+                          ('Daily Prices (3)', slice(8, 10))])
+        self.assertEqual(sheet_parts('Dividends', 0), [('Dividends', slice(0, 0))])
+
+    def test_round_trip_from_store(self):
+        """Store-backed sheets stream in small chunks and read back unchanged"""
+        store = PriceMatrixStore.create(os.path.join(self.tmp.name, 'store'), self.prices)
+        metrics = pd.DataFrame({'Ticker': ['T00', 'T01'], 'Name': ['Fund 0', None], 'Sharpe 2Y': [0.7, 1.1]})
+        written = write_streaming_workbook(self.path, {'Daily Prices': store, 'Dividends': pd.DataFrame()},
+                                           metrics=metrics, row_chunk=64)
+        self.assertEqual(written, {'Daily Prices': ['Daily Prices'], 'Dividends': ['Dividends'],
+                                   'Metrics': ['Metrics']})
+        daily = pd.read_excel(self.path, sheet_name='Daily Prices', index_col=0)
+        pd.testing.assert_frame_equal(daily, self.prices, **INDEX_CHECKS)
+        pd.testing.assert_frame_equal(pd.read_excel(self.path, sheet_name='Metrics'), metrics)
+        self.assertTrue(pd.read_excel(self.path, sheet_name='Dividends').empty)
+
+    def test_split_beyond_column_limit(self):
+        """Sheets wider than the limit continue on numbered sheets"""
+        written = write_streaming_workbook(self.path, {'Daily Prices': self.prices}, max_columns=5)
+        self.assertEqual(written['Daily Prices'], ['Daily Prices', 'Daily Prices (2)', 'Daily Prices (3)'])
+        pd.testing.assert_frame_equal(read_split_sheet(self.path, 'Daily Prices'), self.prices, **INDEX_CHECKS)
+
+    @patch('src.models.performance_metrics.calculate_bil_risk_free_rate', return_value=0.04)
+    def test_excel_manager_save_universe(self, mock_rate):
+        """The manager's universe export writes all data sheets atomically"""
+        manager = ExcelManager(self.tmp.name, list(self.prices.columns))
+        manager.UNIVERSE_METRICS_CHUNK = 5
+        self.assertTrue(manager.save_universe(self.prices, self.prices + 1))
+        unadjusted = pd.read_excel(manager.excel_path, sheet_name='Unadjusted Prices', index_col=0)
+        pd.testing.assert_frame_equal(unadjusted, self.prices + 1, **INDEX_CHECKS)
+
+        # Metrics calculated in chunks, then the same follow-up as a per-ticker save
+        metrics = pd.read_excel(manager.excel_path, sheet_name='Metrics')
+        self.assertEqual(list(metrics['Ticker']), list(self.prices.columns))
+        self.assertEqual(list(metrics['Name']), list(self.prices.columns))
+        expected = self.prices['T05'].iloc[-1] / self.prices['T05'].iloc[-2] - 1
+        self.assertAlmostEqual(metrics.loc[5, 'Day%'], expected)
+        self.assertTrue((sidecar_dir(manager.excel_path) / 'manifest.json').exists())
+        run_id = os.path.splitext(os.path.basename(manager.excel_path))[0]
+        warehouse = Warehouse(os.path.join(self.tmp.name, ExcelManager.WAREHOUSE_FILE))
+        self.assertEqual(warehouse.runs()['run_id'].tolist(), [run_id])
+        self.assertEqual(len(warehouse.metric_history('Day%').columns), 12)
+        self.assertIn(run_id, SnapshotStore(os.path.join(self.tmp.name, ExcelManager.SNAPSHOT_DIR)).run_ids())
+        store = PriceMatrixStore(os.path.join(self.tmp.name, ExcelManager.PRICE_STORE_DIR))
+        pd.testing.assert_frame_equal(store.frame(), self.prices, **INDEX_CHECKS)
+
+    def test_save_universe_from_own_store(self):
+        """A universe read from the data_dir price store is written without rewriting the store"""
+        directory = os.path.join(self.tmp.name, ExcelManager.PRICE_STORE_DIR)
+        store = PriceMatrixStore.create(directory, self.prices)
+        manager = ExcelManager(self.tmp.name, list(self.prices.columns))
+        metrics = pd.DataFrame({'Ticker': ['T00'], 'Name': ['Fund 0'], 'Sharpe 2Y': [0.7]})
+        self.assertTrue(manager.save_universe(store, store, metrics=metrics))
+        self.assertEqual(PriceMatrixStore(directory).meta['generation'], store.meta['generation'])
+        pd.testing.assert_frame_equal(pd.read_excel(manager.excel_path, sheet_name='Metrics'), metrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
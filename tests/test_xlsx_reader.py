@@ -0,0 +1,93 @@
+"""
+Unit tests for the fast single-sheet XLSX reader
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+import tempfile
+from datetime import datetime
+from unittest import mock
+import openpyxl
+import pandas as pd
+import numpy as np
+from src.data.xlsx_reader import read_xlsx_sheet, sheet_names
+from src.data.sidecar import write_sidecar
+from streamlit_app.utils.excel_reader import read_excel_sheet, read_metrics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'Test Output')
+
+
+class TestXlsxReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'external.xlsx')
+        dates = pd.bdate_range('2024-01-01', periods=5).date
+        with pd.ExcelWriter(self.path, engine='xlsxwriter') as writer:
+            pd.DataFrame({'SPY': np.linspace(470, 475, 5)}, index=dates).to_excel(writer, sheet_name='Daily Prices')
+            pd.DataFrame({'Ticker': ['SPY', 'HYG', 'QQQ'], 'Name': ['SPDR', 'N/A', 'Invesco'],
+                          'Day%': [0.01, -0.002, np.nan], 'Count': [3, 4, 5]}).to_excel(
+                writer, sheet_name='Metrics', index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_read_excel(self):
+        """Typed columns, NA strings, blanks and dates match pd.read_excel"""
+        self.assertEqual(sheet_names(self.path), ['Daily Prices', 'Metrics'])
+        metrics = read_xlsx_sheet(self.path, 'Metrics')
+        pd.testing.assert_frame_equal(metrics, pd.read_excel(self.path, sheet_name='Metrics'))
+        self.assertEqual(metrics['Count'].dtype, np.int64)
+        prices = read_xlsx_sheet(self.path, 'Daily Prices', index_col=0, date_columns=[0])
+        pd.testing.assert_frame_equal(prices, pd.read_excel(self.path, sheet_name='Daily Prices', index_col=0))
+        with self.assertRaises(ValueError):
+            read_xlsx_sheet(self.path, 'Missing')
+
+    def test_cell_types(self):
+        """Booleans, formulas, errors, gaps and blank rows from another writer"""
+        path = os.path.join(self.tmp.name, 'mixed.xlsx')
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = 'Data'
+        sheet.append(['Ticker', 'Flag', 'Value', 'When'])
+        sheet.append(['SPY', True, 1.5, datetime(2024, 3, 1)])
+        sheet.append([])
+        sheet.append(['QQQ', False, '=1/0', None])
+        sheet['C5'] = 7
+        workbook.save(path)
+        expected = pd.read_excel(path, sheet_name='Data')
+        pd.testing.assert_frame_equal(read_xlsx_sheet(path, 'Data', date_columns=[3]), expected)
+
+    def test_excel_reader_plugin(self):
+        """The dashboard reader prefers a current sidecar, then the archive reader"""
+        expected = pd.read_excel(self.path, sheet_name='Metrics')
+        pd.testing.assert_frame_equal(read_metrics(self.path), expected)
+        write_sidecar(self.path)
+        pd.testing.assert_frame_equal(read_metrics(self.path), expected)
+        expected = pd.read_excel(self.path, sheet_name='Daily Prices', index_col=0)
+        with mock.patch('src.data.sidecar.pd.read_feather', wraps=pd.read_feather) as feather:
+            prices = read_excel_sheet(self.path, 'Daily Prices', index_col=0)
+        self.assertEqual(feather.call_count, 1)  # Index applied to the frame already read
+        pd.testing.assert_frame_equal(prices, expected)
+
+    def test_excel_reader_fallback(self):
+        """Without a sidecar, a failing archive reader falls back to openpyxl"""
+        expected = pd.read_excel(self.path, sheet_name='Daily Prices', index_col=0)
+        with mock.patch('streamlit_app.utils.excel_reader.read_xlsx_sheet', side_effect=ValueError('bad archive')):
+            prices = read_excel_sheet(self.path, 'Daily Prices', index_col=0)
+        pd.testing.assert_frame_equal(prices, expected)
+
+    @unittest.skipUnless(os.path.isdir(OUTPUT_DIR), "Test Output not available")
+    def test_output_workbooks(self):
+        """Every stored Metrics sheet reads the same as with openpyxl"""
+        for name in sorted(os.listdir(OUTPUT_DIR)):
+            path = os.path.join(OUTPUT_DIR, name)
+            if name.endswith('.xlsx') and 'Metrics' in sheet_names(path):
+                with self.subTest(workbook=name):
+                    pd.testing.assert_frame_equal(read_xlsx_sheet(path, 'Metrics'),
+                                                  pd.read_excel(path, sheet_name='Metrics'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Unit tests for rolling TTM and 30-day yield history
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+from src.models.yield_series import calculate_yield_history, trailing_window_sum
+from src.models.total_return import back_adjusted_prices
+from src.models.metrics_writer import calculate_metrics_table
+
+
+class TestYieldSeries(unittest.TestCase):
+    def setUp(self):
+        """Set up two years of flat prices with monthly dividends"""
+        dates = pd.date_range(start='2022-01-03', end='2023-12-29', freq='B')
+        self.prices = pd.DataFrame({'JNK': 100.0, 'SPY': 400.0}, index=dates)
+        div_dates = pd.date_range(start='2022-01-10', end='2023-12-29', freq='MS') + pd.Timedelta(days=9)
+        self.dividends = pd.DataFrame({'JNK': 0.5}, index=div_dates)
+        self.dividends['SPY'] = np.nan
+        self.dividends.loc[self.dividends.index[::3], 'SPY'] = 1.5
+
+    def test_matches_metrics_ttm(self):
+        """TTM yield on every date matches the Metrics sheet's one-date formula"""
+        ttm = calculate_yield_history(self.prices, self.dividends)['ttm']
+        for date in self.prices.index[::37]:
+            one_year_ago = date - pd.DateOffset(years=1)
+            for ticker in self.prices.columns:
+                divs = self.dividends[ticker].dropna()
+                expected = divs[(divs.index >= one_year_ago) & (divs.index <= date)].sum() / self.prices.loc[date, ticker]
+                self.assertAlmostEqual(ttm.loc[date, ticker], expected)
+        self.assertAlmostEqual(ttm['JNK'].iloc[-1], 0.06)
+
+    @patch('src.models.performance_metrics.calculate_bil_risk_free_rate', return_value=0.04)
+    def test_price_basis_against_metrics(self, mock_rate):
+        """Over unadjusted closes the last TTM row is %Yield; adjusted closes overstate earlier rows"""
+        unadjusted = self.prices * np.linspace(0.9, 1.1, len(self.prices))[:, None]
+        adjusted = back_adjusted_prices(unadjusted, self.dividends)
+        metrics = calculate_metrics_table(adjusted.copy(), self.dividends.copy(), lookup_names=False)
+        ttm = calculate_yield_history(unadjusted, self.dividends)['ttm']
+        np.testing.assert_allclose(ttm.iloc[-1].to_numpy(), metrics['%Yield'].to_numpy())
+
+        on_adjusted = calculate_yield_history(adjusted, self.dividends)['ttm']
+        self.assertAlmostEqual(on_adjusted['JNK'].iloc[-1], ttm['JNK'].iloc[-1])
+        self.assertTrue((ttm.loc['2023-06-30'] < on_adjusted.loc['2023-06-30']).all())
+
+    def test_30d_annualized(self):
+        """30-day yield annualizes the latest monthly distribution"""
+        short = calculate_yield_history(self.prices, self.dividends)['30d']
+        self.assertAlmostEqual(short.loc['2023-06-20', 'JNK'], 0.5 * 365 / 30 / 100)
+        self.assertEqual(short.loc['2022-01-05', 'JNK'], 0.0)
+
+    def test_trailing_window_sum(self):
+        """Window sums equal a direct rolling sum on a daily calendar"""
+        index = pd.date_range('2024-01-01', periods=60, freq='D')
+        values = pd.DataFrame({'A': np.arange(60, dtype=float)}, index=index)
+        sums = trailing_window_sum(values, pd.DateOffset(days=9))
+        expected = values['A'].rolling(10, min_periods=1).sum()
+        np.testing.assert_allclose(sums['A'].values, expected.values)
+
+
+if __name__ == '__main__':
+    unittest.main()